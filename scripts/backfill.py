@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Backfill a directory of invoices through the provider Batch APIs.
+
+Every PDF is processed by one shared pipeline running in batch mode, so the
+calls of all invoices in flight are grouped per stage into provider batches
+(batch pricing, separate quota from interactive traffic).  Results are
+written next to each PDF as ``<name>.json``.
+
+Usage: python scripts/backfill.py <directory> [--concurrency 200] [--batch-size 100]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from invoice_ingestion.config import Settings
+from invoice_ingestion.llm.call_log_writer import start_writer, stop_writer
+from invoice_ingestion.pipeline import ExtractionPipeline
+
+
+async def process_one(pipeline: ExtractionPipeline, path: Path, semaphore: asyncio.Semaphore) -> bool:
+    async with semaphore:
+        try:
+            result = await pipeline.process(path.read_bytes(), path.name)
+        except Exception as e:
+            print(f"FAILED {path.name}: {e}")
+            return False
+    output_path = path.with_suffix(".json")
+    with open(output_path, "w") as f:
+        json.dump(result.model_dump(mode="json"), f, indent=2, default=str)
+    print(f"ok     {path.name} ({result.extraction_metadata.confidence_tier})")
+    return True
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--concurrency", type=int, default=200,
+                        help="Invoices in flight at once (should exceed --batch-size)")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--max-wait", type=float, default=None,
+                        help="Seconds to wait for a batch to fill before submitting")
+    parser.add_argument("--skip-existing", action="store_true",
+                        help="Skip PDFs that already have a .json result")
+    args = parser.parse_args()
+
+    if not args.directory.is_dir():
+        print(f"Error: Not a directory: {args.directory}")
+        sys.exit(1)
+
+    overrides: dict = {"llm_execution_mode": "batch"}
+    if args.batch_size is not None:
+        overrides["batch_max_size"] = args.batch_size
+    if args.max_wait is not None:
+        overrides["batch_max_wait_seconds"] = args.max_wait
+    settings = Settings(**overrides)
+
+    pdfs = sorted(args.directory.glob("*.pdf"))
+    if args.skip_existing:
+        pdfs = [p for p in pdfs if not p.with_suffix(".json").exists()]
+    print(f"Backfilling {len(pdfs)} invoices (batch size {settings.batch_max_size})")
+
+    pipeline = ExtractionPipeline(settings)
+    start_writer(settings)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    start = time.monotonic()
+    try:
+        outcomes = await asyncio.gather(*(process_one(pipeline, p, semaphore) for p in pdfs))
+    finally:
+        await pipeline.aclose()
+        await stop_writer()
+
+    elapsed = time.monotonic() - start
+    print("-" * 50)
+    print(f"Processed {sum(outcomes)}/{len(pdfs)} in {elapsed / 60:.1f} min")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main())
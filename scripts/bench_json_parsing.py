@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Measure JSON parse failure rate and parse time over logged LLM responses.
+
+Reads the logged responses of ``llm_calls`` and reports, per stage:
+
+- which extraction strategy succeeded (direct / fenced block / brace slice)
+  and how many responses could not be parsed at all;
+- mean parse time with the stdlib ``json`` module vs. ``orjson`` (the
+  pipeline's ``find_json``, without its stats and logging).
+
+Use ``--split-at`` to compare calls made before and after a deploy, e.g.
+when structured output was switched on.
+
+Usage: python scripts/bench_json_parsing.py [--split-at 2025-01-31T12:00] [--limit 5000]
+"""
+import argparse
+import asyncio
+import json
+import re
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from dotenv import load_dotenv
+from sqlalchemy import or_, select
+
+from invoice_ingestion.llm.response_parser import STRATEGIES, find_json
+from invoice_ingestion.storage.database import AsyncSessionLocal
+from invoice_ingestion.storage.models import LLMCall
+from invoice_ingestion.storage.repositories import LLMBlobRepo
+
+_FENCED_BLOCK = re.compile(r'```(?:json)?\s*\n(.*?)\n\s*```', re.DOTALL)
+
+
+def _stdlib_extract(text: str) -> dict:
+    """The pre-orjson parser, kept here as the timing baseline."""
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    block = _FENCED_BLOCK.search(text)
+    if block:
+        try:
+            return json.loads(block.group(1))
+        except json.JSONDecodeError:
+            pass
+    first, last = text.find('{'), text.rfind('}')
+    if first != -1 and last > first:
+        try:
+            return json.loads(text[first:last + 1])
+        except json.JSONDecodeError:
+            pass
+    raise ValueError("unparseable")
+
+
+def _classify(text: str) -> str:
+    """Return the first strategy that parses *text*, or ``"failed"``."""
+    text = text.strip()
+    try:
+        json.loads(text)
+        return STRATEGIES[0]
+    except json.JSONDecodeError:
+        pass
+    block = _FENCED_BLOCK.search(text)
+    if block:
+        try:
+            json.loads(block.group(1))
+            return STRATEGIES[1]
+        except json.JSONDecodeError:
+            pass
+    try:
+        _stdlib_extract(text)
+        return STRATEGIES[2]
+    except ValueError:
+        return "failed"
+
+
+def _time_parser(parser, texts: list[str], rounds: int) -> float:
+    """Mean milliseconds per response for *parser* over *texts*."""
+    if not texts:
+        return 0.0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            try:
+                parser(text)
+            except ValueError:
+                pass
+    return (time.perf_counter() - start) * 1000 / (rounds * len(texts))
+
+
+async def load_responses(limit: int) -> list[tuple[str, datetime, str]]:
+    async with AsyncSessionLocal() as session:
+        stmt = (
+            select(LLMCall.stage, LLMCall.created_at, LLMCall.response_hash, LLMCall.response_content)
+            .where(or_(LLMCall.response_hash.isnot(None), LLMCall.response_content.isnot(None)))
+            .order_by(LLMCall.created_at.desc())
+            .limit(limit)
+        )
+        rows = (await session.execute(stmt)).all()
+        # Responses live in llm_blobs; rows written before that carry them inline
+        texts = await LLMBlobRepo(session).get_texts([row.response_hash for row in rows])
+    return [
+        (row.stage, row.created_at, texts.get(row.response_hash, row.response_content))
+        for row in rows
+        if row.response_hash in texts or row.response_content is not None
+    ]
+
+
+def report(label: str, rows: list[tuple[str, datetime, str]], rounds: int) -> None:
+    by_stage: dict[str, list[str]] = defaultdict(list)
+    for stage, _, content in rows:
+        by_stage[stage].append(content)
+
+    print(f"\n== {label} ({len(rows)} responses) ==")
+    print(f"{'stage':<24}{'n':>6}{'direct':>8}{'fenced':>8}{'brace':>8}{'failed':>8}"
+          f"{'json ms':>10}{'orjson ms':>11}")
+    for stage, texts in sorted(by_stage.items()):
+        counts = Counter(_classify(t) for t in texts)
+        n = len(texts)
+        stdlib_ms = _time_parser(_stdlib_extract, texts, rounds)
+        orjson_ms = _time_parser(find_json, texts, rounds)
+        print(
+            f"{stage:<24}{n:>6}"
+            f"{counts['direct'] / n:>8.1%}{counts['fenced_block'] / n:>8.1%}"
+            f"{counts['brace_slice'] / n:>8.1%}{counts['failed'] / n:>8.1%}"
+            f"{stdlib_ms:>10.3f}{orjson_ms:>11.3f}"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--split-at", type=datetime.fromisoformat, default=None,
+                        help="Report calls before and after this timestamp separately")
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=20, help="Timing repetitions per response")
+    args = parser.parse_args()
+
+    rows = await load_responses(args.limit)
+    if not rows:
+        print("No logged LLM responses found.")
+        return
+
+    if args.split_at is None:
+        report("all calls", rows, args.rounds)
+        return
+
+    split = args.split_at
+    before = [r for r in rows if r[1].replace(tzinfo=None) < split.replace(tzinfo=None)]
+    after = [r for r in rows if r[1].replace(tzinfo=None) >= split.replace(tzinfo=None)]
+    report(f"before {split.isoformat()}", before, args.rounds)
+    report(f"after {split.isoformat()}", after, args.rounds)
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Compare sequential and parallel Pass 1A/1B extraction per complexity tier.
+
+Every invoice is extracted twice, once per mode, and the report shows per
+complexity tier the median latency of each mode, the latency saved, and
+how many key fields each mode gets right:
+
+    python scripts/bench_parallel_extraction.py invoices/*.pdf --expected data/expected/
+
+With ``--expected`` (one ``<pdf stem>.json`` ExtractionResult per invoice,
+e.g. reviewed extractions) both modes are scored against it; without it
+the parallel results are scored against the sequential ones (agreement).
+
+``--cassette`` records both modes into one cassette (``--record``) and
+replays them afterwards, so the comparison can be repeated offline with
+``--latency recorded``.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from invoice_ingestion.config import Settings
+from invoice_ingestion.models.schema import ExtractionResult
+from invoice_ingestion.pipeline import ExtractionPipeline
+
+
+def _key_fields(result: ExtractionResult) -> dict:
+    """The fields both modes are scored on."""
+    totals = result.totals
+    return {
+        "invoice_number": result.invoice.invoice_number.value,
+        "account_number": result.account.account_number.value,
+        "total_amount_due": round(totals.total_amount_due.value, 2) if totals.total_amount_due else None,
+        "charge_count": len(result.charges),
+        "charge_sum": round(sum(c.amount.value for c in result.charges), 2),
+        "charge_meters": sorted(str(c.applies_to_meter) for c in result.charges),
+        "meter_count": len(result.meters),
+    }
+
+
+def _score(result: ExtractionResult, reference: ExtractionResult) -> float:
+    got, want = _key_fields(result), _key_fields(reference)
+    return sum(got[field] == want[field] for field in want) / len(want)
+
+
+async def _extract(pipeline: ExtractionPipeline, name: str, data: bytes) -> tuple[ExtractionResult, float]:
+    start = time.perf_counter()
+    result = await pipeline.process(data, name, persist=False)
+    return result, time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="+", type=Path)
+    parser.add_argument("--expected", type=Path, default=None, help="Directory of <stem>.json ground truth")
+    parser.add_argument("--cassette", default=None, help="Record/replay LLM calls through this cassette")
+    parser.add_argument("--record", action="store_true", help="Record the cassette instead of replaying it")
+    parser.add_argument("--latency", choices=["none", "recorded", "lognormal"], default="recorded")
+    args = parser.parse_args()
+
+    missing = [p for p in args.pdfs if not p.exists()]
+    if missing:
+        print(f"Error: File not found: {missing[0]}")
+        sys.exit(1)
+
+    common = {"enable_learning_loop": False, "adaptive_max_tokens": False}
+    if args.cassette:
+        common.update(
+            llm_replay_mode="record" if args.record else "replay",
+            llm_cassette_path=args.cassette,
+            llm_replay_latency=args.latency,
+        )
+    # One sweep per mode: in record mode each pipeline appends to the
+    # cassette the previous one saved
+    runs: dict[str, dict[str, tuple[ExtractionResult, float]]] = {}
+    for mode in ("sequential", "parallel"):
+        pipeline = ExtractionPipeline(Settings(**common, parallel_extraction=mode == "parallel"))
+        try:
+            runs[mode] = {path.name: await _extract(pipeline, path.name, path.read_bytes()) for path in args.pdfs}
+        finally:
+            await pipeline.aclose()
+
+    # tier -> mode -> latencies / scores
+    latencies: dict[str, dict[str, list[float]]] = defaultdict(lambda: defaultdict(list))
+    scores: dict[str, dict[str, list[float]]] = defaultdict(lambda: defaultdict(list))
+    for path in args.pdfs:
+        seq_result, seq_seconds = runs["sequential"][path.name]
+        par_result, par_seconds = runs["parallel"][path.name]
+        reference = seq_result
+        if args.expected:
+            expected = args.expected / f"{path.stem}.json"
+            if not expected.exists():
+                print(f"  {path.name}: no expected output, skipped")
+                continue
+            reference = ExtractionResult.model_validate(json.loads(expected.read_text()))
+        tier = reference.classification.complexity_tier.value
+        if args.expected:
+            scores[tier]["sequential"].append(_score(seq_result, reference))
+        scores[tier]["parallel"].append(_score(par_result, reference))
+        latencies[tier]["sequential"].append(seq_seconds)
+        latencies[tier]["parallel"].append(par_seconds)
+        print(f"  {path.name}: {tier}, sequential {seq_seconds:.1f}s, parallel {par_seconds:.1f}s")
+
+    label = "accuracy" if args.expected else "agreement with sequential"
+    print(f"\n{'tier':<14}{'n':>4}{'seq p50':>10}{'par p50':>10}{'saved':>8}   {label}")
+    for tier in sorted(latencies):
+        seq = statistics.median(latencies[tier]["sequential"])
+        par = statistics.median(latencies[tier]["parallel"])
+        par_score = statistics.mean(scores[tier]["parallel"])
+        accuracy = f"parallel {par_score:.1%}"
+        if args.expected:
+            accuracy = f"sequential {statistics.mean(scores[tier]['sequential']):.1%}, {accuracy}"
+        print(f"{tier:<14}{len(latencies[tier]['sequential']):>4}{seq:>9.1f}s{par:>9.1f}s"
+              f"{(seq - par) / seq:>8.0%}   {accuracy}")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Benchmark ExtractionPipeline.process offline from a recorded cassette.
+
+Record once against live endpoints, then replay anywhere without network or
+database access:
+
+    python scripts/bench_pipeline.py record invoices/*.pdf --cassette data/cassettes/bench.json
+    python scripts/bench_pipeline.py replay invoices/*.pdf --cassette data/cassettes/bench.json \
+        --iterations 5 --concurrency 8 --latency lognormal
+
+Replay reports wall time, throughput, CPU time and per-invoice latency
+percentiles, how much of the summed pass time the dependency graph hid by
+overlapping independent passes, and latency, LLM calls and tokens per
+complexity tier (with the fast lane's share).  ``--latency none`` isolates the pipeline's own CPU work;
+``recorded`` / ``lognormal`` approximate production concurrency behaviour.
+``--profile`` writes a cProfile dump of the replay run.
+"""
+import argparse
+import asyncio
+import cProfile
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from invoice_ingestion.config import Settings
+from invoice_ingestion.passes.audit_policy import audit_policy_stats
+from invoice_ingestion.passes.speculation import speculation_stats
+from invoice_ingestion.pipeline import ExtractionPipeline
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+async def run(
+    pipeline: ExtractionPipeline, files: list[tuple[str, bytes]], concurrency: int, results: list,
+) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    durations: list[float] = []
+
+    async def one(name: str, data: bytes) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            result = await pipeline.process(data, name, persist=False)
+            durations.append(time.perf_counter() - start)
+            results.append((result, durations[-1]))
+
+    await asyncio.gather(*(one(name, data) for name, data in files))
+    return durations
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("pdfs", nargs="+", type=Path)
+    parser.add_argument("--cassette", default="./data/cassettes/bench.json")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--latency", choices=["none", "recorded", "lognormal"], default="none")
+    parser.add_argument("--profile", type=Path, default=None, help="Write cProfile stats here (replay only)")
+    args = parser.parse_args()
+
+    missing = [p for p in args.pdfs if not p.exists()]
+    if missing:
+        print(f"Error: File not found: {missing[0]}")
+        sys.exit(1)
+    files = [(p.name, p.read_bytes()) for p in args.pdfs]
+
+    settings = Settings(
+        llm_replay_mode=args.mode,
+        llm_cassette_path=args.cassette,
+        llm_replay_latency=args.latency,
+        # Keep prompts independent of database state so replays match
+        enable_learning_loop=False,
+        adaptive_max_tokens=False,
+    )
+    pipeline = ExtractionPipeline(settings)
+
+    if args.mode == "record":
+        try:
+            await run(pipeline, files, args.concurrency, [])
+        finally:
+            await pipeline.aclose()
+        print(f"Recorded {len(files)} invoices into {args.cassette}")
+        return
+
+    profiler = cProfile.Profile() if args.profile else None
+    durations: list[float] = []
+    results: list = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    for _ in range(args.iterations):
+        durations.extend(await run(pipeline, files, args.concurrency, results))
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    n = len(durations)
+    print(f"Invoices:      {n} ({len(files)} x {args.iterations}), concurrency {args.concurrency}, "
+          f"latency={args.latency}")
+    print(f"Wall time:     {wall:.2f}s  ({n / wall:.2f} invoices/s)")
+    print(f"CPU time:      {cpu:.2f}s  ({cpu / n * 1000:.0f} ms/invoice)")
+    print(f"Per invoice:   p50 {statistics.median(durations) * 1000:.0f} ms, "
+          f"p95 {_percentile(durations, 95) * 1000:.0f} ms, max {max(durations) * 1000:.0f} ms")
+    timed = [r.extraction_metadata for r, _ in results if r.extraction_metadata.stage_timings]
+    if timed:
+        busy = statistics.mean(sum(t.end_ms - t.start_ms for t in m.stage_timings.values()) for m in timed)
+        span = statistics.mean(max(t.end_ms for t in m.stage_timings.values()) for m in timed)
+        path, count = Counter(" > ".join(m.critical_path) for m in timed).most_common(1)[0]
+        print(f"Pass overlap:  {busy:.0f} ms summed vs {span:.0f} ms end to end ({busy / max(span, 1):.2f}x)")
+        print(f"Critical path: {path} ({count}/{len(timed)})")
+    by_tier: dict[str, list] = defaultdict(list)
+    for result, seconds in results:
+        by_tier[result.classification.complexity_tier.value].append((result.extraction_metadata, seconds))
+    print(f"{'Tier':<14}{'n':>5}{'p50 ms':>9}{'calls':>7}{'in tok':>9}{'out tok':>9}{'fast lane':>11}")
+    for tier, rows in sorted(by_tier.items()):
+        usage = [m.llm_usage for m, _ in rows]
+        fast = sum("fast_lane" in m.flags for m, _ in rows)
+        print(f"{tier:<14}{len(rows):>5}{statistics.median(s for _, s in rows) * 1000:>9.0f}"
+              f"{statistics.mean(u.calls for u in usage):>7.1f}"
+              f"{statistics.mean(u.input_tokens for u in usage):>9.0f}"
+              f"{statistics.mean(u.output_tokens for u in usage):>9.0f}{fast / len(rows):>11.0%}")
+    speculation = speculation_stats.snapshot()
+    if speculation["started"]:
+        print(f"Speculative 1A: {speculation['hits']}/{speculation['started']} kept "
+              f"({speculation['hit_rate']:.0%}), {speculation['mean_saved_ms']} ms saved per hit")
+    audit_policy = audit_policy_stats.snapshot()
+    if audit_policy["decisions"]:
+        print(f"Audit policy: {audit_policy['calls_avoided']}/{audit_policy['decisions']} audit calls avoided, "
+              f"{audit_policy['question_share']:.0%} of questions and {audit_policy['page_share']:.0%} of pages "
+              f"sent when audited; accuracy delta {audit_policy['accuracy_delta']:.1%} "
+              f"over {audit_policy['shadow_audits']} shadow audits")
+    if args.profile:
+        print(f"Profile:       {args.profile}")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main())
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Rebuild the learned charge classifications from reviewed extractions.
+
+The review API keeps ``charge_classifications`` up to date as extractions
+are approved and charges corrected.  This rebuilds the table from history:
+it is emptied, then every accepted or reviewed extraction is replayed in
+order, its charges confirmed and its charge corrections applied.
+
+Usage: python scripts/build_charge_cache.py [--limit 10000]
+"""
+import argparse
+import asyncio
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, select
+
+from invoice_ingestion.learning.charge_cache import learn_from_correction, learn_from_extraction
+from invoice_ingestion.storage.database import AsyncSessionLocal, close_db
+from invoice_ingestion.storage.models import ChargeClassification, Extraction
+from invoice_ingestion.storage.repositories import CorrectionRepo
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    stmt = (select(Extraction.extraction_id, Extraction.result_json)
+            .where(Extraction.status.in_(("accepted", "reviewed")))
+            .order_by(Extraction.created_at))
+    if args.limit:
+        stmt = stmt.limit(args.limit)
+
+    extractions = descriptions = corrections = 0
+    try:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(ChargeClassification))
+            repo = CorrectionRepo(session)
+            for extraction_id, result_json in (await session.execute(stmt)).all():
+                extractions += 1
+                descriptions += await learn_from_extraction(session, result_json)
+                for correction in await repo.get_by_extraction(extraction_id):
+                    corrections += await learn_from_correction(
+                        session, result_json, correction.field_path, correction.corrected_value,
+                    )
+            await session.commit()
+    finally:
+        await close_db()
+
+    print(f"Learned from {extractions} extractions: {descriptions} charge descriptions, "
+          f"{corrections} charge corrections")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main())
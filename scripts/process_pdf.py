@@ -13,7 +13,7 @@ from invoice_ingestion.config import Settings
 from invoice_ingestion.pipeline import ExtractionPipeline
 
 
-async def main(pdf_path: str) -> None:
+async def main(pdf_path: str, force: bool = False) -> None:
     """Process a single PDF and print the result."""
     path = Path(pdf_path)
     if not path.exists():
@@ -32,7 +32,7 @@ async def main(pdf_path: str) -> None:
     print(f"File size: {len(file_bytes):,} bytes")
 
     try:
-        result = await pipeline.process(file_bytes, path.name)
+        result = await pipeline.process(file_bytes, path.name, force=force)
 
         print(f"\nExtraction ID: {result.extraction_metadata.extraction_id}")
         print(f"Commodity: {result.classification.commodity_type}")
@@ -68,8 +68,9 @@ async def main(pdf_path: str) -> None:
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/process_pdf.py <path-to-pdf>")
+    args = [a for a in sys.argv[1:] if a != "--force"]
+    if len(args) != 1:
+        print("Usage: python scripts/process_pdf.py [--force] <path-to-pdf>")
         sys.exit(1)
 
-    asyncio.run(main(sys.argv[1]))
+    asyncio.run(main(args[0], force="--force" in sys.argv[1:]))
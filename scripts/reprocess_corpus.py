@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Queue partial reprocessing of stored extractions after a rule change.
+
+Every matching extraction gets a reprocess job that reuses its stored pass
+outputs and re-runs only ``--from-pass`` and the passes depending on it,
+e.g. ``pass3`` after a validation rule change or ``confidence`` after a
+weight change (no LLM calls).  The workers pick the jobs up as usual.
+
+Usage: python scripts/reprocess_corpus.py --from-pass pass3 [--status accepted] [--commodity gas] [--limit 1000]
+"""
+import argparse
+import asyncio
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from invoice_ingestion.config import Settings
+from invoice_ingestion.storage.checkpoints import REPROCESS_FROM
+from invoice_ingestion.storage.database import AsyncSessionLocal, close_db
+from invoice_ingestion.storage.models import Extraction
+from invoice_ingestion.storage.repositories import JobRepo
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--from-pass", required=True, choices=list(REPROCESS_FROM))
+    parser.add_argument("--status", default=None, help="Only extractions with this status")
+    parser.add_argument("--commodity", default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--priority", type=int, default=-10, help="Below uploads by default")
+    args = parser.parse_args()
+
+    settings = Settings()
+    pdf_dir = Path(settings.local_storage_path) / "pdfs"
+    # Select once up front: reprocessed results are new extractions themselves
+    stmt = select(Extraction.extraction_id, Extraction.blob_name).order_by(Extraction.created_at)
+    if args.status:
+        stmt = stmt.where(Extraction.status == args.status)
+    if args.commodity:
+        stmt = stmt.where(Extraction.commodity_type == args.commodity)
+    if args.limit:
+        stmt = stmt.limit(args.limit)
+
+    queued = missing = 0
+    try:
+        async with AsyncSessionLocal() as session:
+            extractions = (await session.execute(stmt)).all()
+            jobs = JobRepo(session)
+            for extraction_id, blob_name in extractions:
+                pdf_path = pdf_dir / f"{extraction_id}.pdf"
+                if not pdf_path.exists():
+                    missing += 1
+                    continue
+                await jobs.enqueue(
+                    {
+                        "filename": f"reprocess_{blob_name or extraction_id}",
+                        "file_path": str(pdf_path),
+                        "reprocess_of": str(extraction_id),
+                        "from_pass": args.from_pass,
+                    },
+                    priority=args.priority,
+                    max_attempts=settings.job_max_attempts,
+                )
+                queued += 1
+            await session.commit()
+    finally:
+        await close_db()
+
+    print(f"Queued {queued} reprocess jobs from {args.from_pass}"
+          + (f"; {missing} skipped without a stored PDF" if missing else ""))
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Soak-test the worker's database usage.
+
+Runs the per-invoice database work of the pipeline (dedup lookup, claim
+the file hash, store the result) at a fixed concurrency for a
+while. For every window it reports the server connections held by this
+process and the per-invoice DB latency. With one engine per worker, both
+should stay flat.
+
+    python scripts/soak_db.py --duration 600 --concurrency 8
+    python scripts/soak_db.py --engine-per-invoice   # old behaviour, for comparison
+
+Rows are written with a ``soak-`` blob name and deleted at the end.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from uuid import uuid4
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from invoice_ingestion.config import Settings
+from invoice_ingestion.storage.database import AsyncSessionLocal, close_db, engine_options, init_db
+from invoice_ingestion.storage.models import Extraction
+from invoice_ingestion.storage.repositories import ExtractionRepo
+
+APPLICATION_NAME = "invoice-soak"
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+async def one_invoice(settings: Settings, engine_per_invoice: bool) -> float:
+    """Database work of one invoice; returns its DB time in ms."""
+    start = time.perf_counter()
+    if engine_per_invoice:
+        # What process_blob used to do: a fresh engine and pool per blob, never disposed
+        engine = create_async_engine(settings.database_url.get_secret_value(), pool_size=10, max_overflow=20,
+                                     connect_args={"server_settings": {"application_name": APPLICATION_NAME}})
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+    else:
+        sessions = AsyncSessionLocal
+
+    file_hash = uuid4().hex * 2
+    async with sessions() as session:
+        repo = ExtractionRepo(session)
+        await repo.get_reusable_by_hash(file_hash)
+        extraction_id = await repo.claim_hash(file_hash, f"soak-{file_hash[:12]}", stale_after=1800)
+        await session.commit()
+    async with sessions() as session:
+        await ExtractionRepo(session).upsert(Extraction(
+            extraction_id=extraction_id, file_hash=file_hash, blob_name=f"soak-{file_hash[:12]}",
+            status="accepted", result_json={"soak": True}, confidence_score=0.9, confidence_tier="auto_accept",
+        ))
+        await session.commit()
+    return (time.perf_counter() - start) * 1000
+
+
+async def connection_count() -> int:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            text("SELECT count(*) FROM pg_stat_activity WHERE application_name = :name"),
+            {"name": APPLICATION_NAME},
+        )
+        return result.scalar() or 0
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=300, help="Seconds to run")
+    parser.add_argument("--window", type=float, default=30, help="Seconds per report line")
+    parser.add_argument("--concurrency", type=int, default=None, help="Default: INVOICE_JOB_CONCURRENCY")
+    parser.add_argument("--engine-per-invoice", action="store_true",
+                        help="Create a new engine for every invoice (the old process_blob behaviour)")
+    args = parser.parse_args()
+
+    settings = Settings()
+    if args.concurrency:
+        settings = settings.model_copy(update={"job_concurrency": args.concurrency})
+    options = engine_options(settings)
+    options["connect_args"] = {**options["connect_args"], "server_settings": {"application_name": APPLICATION_NAME}}
+    init_db(settings.database_url, **options)
+    print(f"Concurrency {settings.job_concurrency}, pool {options['pool_size']}+{options['max_overflow']}, "
+          f"{'engine per invoice' if args.engine_per_invoice else 'one engine'}")
+    print(f"{'t (s)':>6} {'invoices':>9} {'p50 ms':>8} {'p95 ms':>8} {'conns':>6}")
+
+    deadline = time.monotonic() + args.duration
+    window: list[float] = []
+    rows: list[tuple[float, float, int]] = []
+
+    async def runner() -> None:
+        while time.monotonic() < deadline:
+            window.append(await one_invoice(settings, args.engine_per_invoice))
+
+    runners = [asyncio.create_task(runner()) for _ in range(settings.job_concurrency)]
+    started = time.monotonic()
+    try:
+        while time.monotonic() < deadline:
+            await asyncio.sleep(min(args.window, max(deadline - time.monotonic(), 0.1)))
+            samples, window[:] = list(window), []
+            if not samples:
+                continue
+            connections = await connection_count()
+            p50, p95 = statistics.median(samples), _percentile(samples, 95)
+            rows.append((p50, p95, connections))
+            print(f"{time.monotonic() - started:6.0f} {len(samples):9d} {p50:8.1f} {p95:8.1f} {connections:6d}")
+        await asyncio.gather(*runners)
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Extraction).where(Extraction.blob_name.like("soak-%")))
+            await session.commit()
+        await close_db()
+
+    if len(rows) < 2:
+        print("Run longer than two windows to judge drift")
+        return
+    first, last = rows[0], rows[-1]
+    print(f"p95 drift {last[1] / first[1]:.2f}x, connections {first[2]} -> {last[2]} "
+          f"(pool limit {options['pool_size'] + options['max_overflow']})")
+    if last[2] > options["pool_size"] + options["max_overflow"] + 1:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main())
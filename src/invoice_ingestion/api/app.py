@@ -4,9 +4,14 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from ..config import Settings
-from ..storage.database import init_db, close_db
+from ..llm.call_log_writer import start_writer, stop_writer
+from ..storage.database import close_db, engine_options, init_db
+from ..workers.job_consumer import JobConsumer
 from .routes import extraction, review, health, webhook, upload, corrections, llm_calls
 
+# How long shutdown waits for jobs running in the embedded consumer
+SHUTDOWN_GRACE_SECONDS = 30.0
+
 
 def create_app(settings: Settings | None = None) -> FastAPI:
     """Create and configure the FastAPI application."""
@@ -16,9 +21,18 @@ def create_app(settings: Settings | None = None) -> FastAPI:
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         # Startup
-        init_db(settings.database_url.get_secret_value())
+        init_db(settings.database_url, **engine_options(settings))
+        start_writer(settings)
+        consumer = None
+        if settings.embedded_job_consumer:
+            consumer = JobConsumer(settings)
+            consumer.start()
         yield
-        # Shutdown
+        # Shutdown: let running jobs finish briefly (the rest are retried
+        # once their leases expire), then flush queued LLM call logs
+        if consumer is not None:
+            await consumer.stop(timeout=SHUTDOWN_GRACE_SECONDS)
+        await stop_writer()
         await close_db()
 
     app = FastAPI(
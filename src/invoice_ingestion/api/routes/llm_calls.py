@@ -1,12 +1,14 @@
 """LLM calls API routes for troubleshooting."""
 from __future__ import annotations
 
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import UTC, datetime
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from ...storage.database import get_session
-from ...storage.repositories import LLMCallRepo
+from ...storage.repositories import LLMBlobRepo, LLMCallRepo, LLMCallRollupRepo
 
 router = APIRouter()
 
@@ -31,40 +33,47 @@ def _estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
 
 @router.get("")
 async def list_llm_calls(
-    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
     limit: int = Query(50, ge=1, le=200),
     extraction_id: UUID | None = None,
     stage: str | None = None,
     model: str | None = None,
     session=Depends(get_session),
 ):
-    """List LLM calls with optional filters."""
+    """List LLM calls with optional filters, newest first."""
     repo = LLMCallRepo(session)
     calls = await repo.list_calls(
-        offset=offset,
         limit=limit,
+        before=_decode_cursor(cursor) if cursor else None,
         extraction_id=extraction_id,
         stage=stage,
         model=model,
     )
+    next_cursor = _encode_cursor(calls[-1].created_at, calls[-1].call_id) if len(calls) == limit else None
     return {
         "items": [_serialize_call(c) for c in calls],
-        "offset": offset,
         "limit": limit,
+        "next_cursor": next_cursor,
     }
 
 
 @router.get("/stats")
 async def get_llm_stats(
     extraction_id: UUID | None = None,
+    start: datetime | None = Query(None, description="Include calls from this hour on"),
+    end: datetime | None = Query(None, description="Include calls before this hour"),
     session=Depends(get_session),
 ):
     """Get aggregate stats about LLM calls.
 
-    Pass ``extraction_id`` to scope stats to a single extraction.
+    Stats are read from the hourly rollups, optionally limited to
+    ``[start, end)``.  Pass ``extraction_id`` to scope stats to a single
+    extraction instead (computed from its calls directly).
     """
-    repo = LLMCallRepo(session)
-    stats = await repo.get_stats(extraction_id=extraction_id)
+    if extraction_id is not None:
+        stats = await LLMCallRepo(session).get_stats(extraction_id=extraction_id)
+    else:
+        stats = await LLMCallRollupRepo(session).get_stats(start=_utc_naive(start), end=_utc_naive(end))
 
     # Enrich by_model with estimated cost
     total_cost = 0.0
@@ -94,19 +103,36 @@ async def get_calls_by_extraction(
 @router.get("/{call_id}")
 async def get_llm_call(call_id: UUID, session=Depends(get_session)):
     """Get a single LLM call with full details."""
-    repo = LLMCallRepo(session)
-    # Use list_calls with a filter would work but let's add a get_by_id method
-    calls = await repo.list_calls(limit=1)
-    # For now, iterate to find
-    stmt_calls = await repo.list_calls(limit=1000)
-    call = next((c for c in stmt_calls if c.call_id == call_id), None)
+    call = await LLMCallRepo(session).get_by_id(call_id)
     if not call:
         raise HTTPException(status_code=404, detail="LLM call not found")
-    return _serialize_call_full(call)
+    texts = await LLMBlobRepo(session).get_texts(
+        [call.system_prompt_hash, call.user_prompt_hash, call.response_hash],
+    )
+    return _serialize_call_full(call, texts)
+
+
+def _utc_naive(ts: datetime | None) -> datetime | None:
+    """Timestamps are stored as naive UTC."""
+    if ts is None or ts.tzinfo is None:
+        return ts
+    return ts.astimezone(UTC).replace(tzinfo=None)
+
+
+def _encode_cursor(created_at: datetime, call_id: UUID) -> str:
+    return urlsafe_b64encode(f"{created_at.isoformat()}|{call_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created_at, call_id = urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(call_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 def _serialize_call(call) -> dict:
-    """Serialize LLM call for list view (truncated content)."""
+    """Serialize an LLM call summary row for list view (previews computed in SQL)."""
     return {
         "call_id": str(call.call_id),
         "extraction_id": str(call.extraction_id) if call.extraction_id else None,
@@ -121,15 +147,14 @@ def _serialize_call(call) -> dict:
         "duration_ms": call.duration_ms,
         "error_message": call.error_message,
         "created_at": call.created_at.isoformat() if call.created_at else None,
-        # Truncated preview
-        "system_prompt_preview": (call.system_prompt[:200] + "...") if call.system_prompt and len(call.system_prompt) > 200 else call.system_prompt,
-        "user_prompt_preview": (call.user_prompt[:200] + "...") if call.user_prompt and len(call.user_prompt) > 200 else call.user_prompt,
-        "response_preview": (call.response_content[:200] + "...") if call.response_content and len(call.response_content) > 200 else call.response_content,
+        "system_prompt_preview": call.system_prompt_preview,
+        "user_prompt_preview": call.user_prompt_preview,
+        "response_preview": call.response_preview,
     }
 
 
-def _serialize_call_full(call) -> dict:
-    """Serialize LLM call with full content."""
+def _serialize_call_full(call, texts: dict[str, str]) -> dict:
+    """Serialize LLM call with full content, rehydrated from *texts* (hash → text)."""
     return {
         "call_id": str(call.call_id),
         "extraction_id": str(call.extraction_id) if call.extraction_id else None,
@@ -147,7 +172,7 @@ def _serialize_call_full(call) -> dict:
         "error_message": call.error_message,
         "created_at": call.created_at.isoformat() if call.created_at else None,
         # Full content
-        "system_prompt": call.system_prompt,
-        "user_prompt": call.user_prompt,
-        "response_content": call.response_content,
+        "system_prompt": texts.get(call.system_prompt_hash, call.system_prompt),
+        "user_prompt": texts.get(call.user_prompt_hash, call.user_prompt),
+        "response_content": texts.get(call.response_hash, call.response_content),
     }
@@ -9,6 +9,7 @@ from sqlalchemy.orm.attributes import flag_modified
 from ...storage.database import get_session
 from ...storage.repositories import ExtractionRepo, CorrectionRepo
 from ...storage.models import Correction
+from ...learning.charge_cache import learn_from_correction, learn_from_extraction
 from ...learning.correction_inference import infer_correction_category, CATEGORY_DESCRIPTIONS
 
 router = APIRouter()
@@ -40,6 +41,20 @@ def _set_nested_value(data: dict, path: str, value: Any) -> None:
     current[keys[-1]] = value
 
 
+# Charge fields that hold a plain value rather than a ``{"value": ...}`` dict
+_PLAIN_CHARGE_FIELDS = {"category", "subcategory", "charge_owner", "charge_section", "applies_to_meter",
+                        "charge_period.attribution_type", "charge_period.start", "charge_period.end"}
+
+
+def _set_charge_value(data: dict, path: str, value: Any) -> None:
+    """Set a charge field by line id: ``charges.<line_id>.<field>``."""
+    _, line_id, field = path.split(".", 2)
+    charge = next((c for c in data.get("charges") or [] if c.get("line_id") == line_id), None)
+    if charge is None:
+        return
+    _set_nested_value(charge, field if field in _PLAIN_CHARGE_FIELDS else f"{field}.value", value)
+
+
 class CorrectionInput(BaseModel):
     field_path: str
     extracted_value: str | None = None
@@ -137,7 +152,11 @@ async def submit_corrections(
 
         # Apply correction to result_json
         # The field_path is like "invoice.invoice_number" - we need to set the .value
-        _set_nested_value(result_json, f"{c.field_path}.value", c.corrected_value)
+        if c.field_path.startswith("charges.") and c.field_path.count(".") >= 2:
+            _set_charge_value(result_json, c.field_path, c.corrected_value)
+            await learn_from_correction(session, result_json, c.field_path, c.corrected_value)
+        else:
+            _set_nested_value(result_json, f"{c.field_path}.value", c.corrected_value)
 
     # Update extraction with corrected result_json and new status
     extraction.result_json = result_json
@@ -157,6 +176,7 @@ async def approve_extraction(extraction_id: UUID, session=Depends(get_session)):
         raise HTTPException(status_code=404, detail="Extraction not found")
 
     await repo.update_status(extraction_id, "accepted")
+    await learn_from_extraction(session, extraction.result_json)
     await session.commit()
     return {"status": "accepted"}
 
@@ -172,6 +192,7 @@ async def approve_all_green(extraction_id: UUID, session=Depends(get_session)):
     # Mark as accepted if overall confidence is high enough
     if extraction.confidence_score and extraction.confidence_score >= 0.90:
         await repo.update_status(extraction_id, "accepted")
+        await learn_from_extraction(session, extraction.result_json)
         await session.commit()
         return {"status": "accepted", "message": "All fields above threshold"}
 
@@ -1,64 +1,61 @@
 """Upload API route for local testing."""
 from __future__ import annotations
-import os
-import traceback
+import asyncio
 from pathlib import Path
-from uuid import uuid4
-from fastapi import APIRouter, File, UploadFile, HTTPException, BackgroundTasks, Request
+from typing import Literal
+from uuid import UUID, uuid4
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Query, Request
 import structlog
-
-# Load .env for local development
 from dotenv import load_dotenv
-load_dotenv()
 
 from ...config import Settings
-from ...pipeline import ExtractionPipeline
+from ...storage.checkpoints import REPROCESS_FROM
+from ...storage.database import get_session
+from ...storage.repositories import ExtractionRepo, JobRepo
+
+# Load .env for local development
+load_dotenv()
 
 router = APIRouter()
-logger = structlog.get_logger(__name__)
 
-# Store processing status
-_processing_status: dict[str, dict] = {}
+ReprocessFrom = Literal[tuple(REPROCESS_FROM)]
+logger = structlog.get_logger(__name__)
 
 
-async def _process_invoice(file_bytes: bytes, filename: str, job_id: str):
-    """Background task to process uploaded invoice."""
-    try:
-        _processing_status[job_id] = {"status": "processing", "filename": filename}
-        logger.info("upload_processing_start", job_id=job_id, filename=filename)
-
-        # Load settings fresh (with env vars from .env)
-        settings = Settings()
-
-        pipeline = ExtractionPipeline(settings)
-        result = await pipeline.process(file_bytes, filename)
-
-        _processing_status[job_id] = {
-            "status": "completed",
-            "filename": filename,
-            "extraction_id": str(result.extraction_metadata.extraction_id),
-            "confidence": result.extraction_metadata.overall_confidence,
-            "confidence_tier": result.extraction_metadata.confidence_tier.value,
-        }
-        logger.info("upload_processing_complete", job_id=job_id, extraction_id=str(result.extraction_metadata.extraction_id))
-    except Exception as e:
-        logger.error("upload_processing_failed", job_id=job_id, error=str(e), traceback=traceback.format_exc())
-        _processing_status[job_id] = {
-            "status": "failed",
-            "filename": filename,
-            "error": str(e),
-        }
+def _serialize_job(job) -> dict:
+    payload = job.payload or {}
+    data = {
+        "job_id": str(job.job_id),
+        "status": job.status,
+        "filename": payload.get("filename"),
+        "priority": job.priority,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+    }
+    if payload.get("reprocess_of"):
+        data["reprocess_of"] = payload["reprocess_of"]
+    if payload.get("from_pass"):
+        data["from_pass"] = payload["from_pass"]
+    if job.result:
+        data.update(job.result)
+    if job.error:
+        data["error"] = job.error
+    return data
 
 
 @router.post("/")
 async def upload_invoice(
     request: Request,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    priority: int = Query(0, description="Higher runs first"),
+    force: bool = Query(False, description="Extract again even if this file was already processed"),
+    session=Depends(get_session),
 ):
     """Upload a PDF invoice for processing.
 
-    Returns a job_id to check processing status.
+    The file is saved and a job enqueued; returns a job_id to check
+    processing status.  A file already extracted completes with the
+    existing extraction unless ``force`` is set.
     """
     if not file.filename or not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are accepted")
@@ -72,17 +69,30 @@ async def upload_invoice(
     if len(file_bytes) > 50 * 1024 * 1024:  # 50MB limit
         raise HTTPException(status_code=400, detail="File too large (max 50MB)")
 
-    # Generate job ID
-    job_id = str(uuid4())
+    settings: Settings = request.app.state.settings
+    job_id = uuid4()
+
+    # Consumers read the file from shared local storage
+    upload_dir = Path(settings.local_storage_path) / "uploads"
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    file_path = upload_dir / f"{job_id}.pdf"
+    await asyncio.to_thread(file_path.write_bytes, file_bytes)
 
-    # Start background processing
-    _processing_status[job_id] = {"status": "queued", "filename": file.filename}
-    background_tasks.add_task(_process_invoice, file_bytes, file.filename, job_id)
+    payload = {"filename": file.filename, "file_path": str(file_path), "owned_file": True}
+    if force:
+        payload["force"] = True
+    await JobRepo(session).enqueue(
+        payload,
+        priority=priority,
+        max_attempts=settings.job_max_attempts,
+        job_id=job_id,
+    )
+    await session.commit()
 
-    logger.info("upload_queued", job_id=job_id, filename=file.filename, size_bytes=len(file_bytes))
+    logger.info("upload_queued", job_id=str(job_id), filename=file.filename, size_bytes=len(file_bytes))
 
     return {
-        "job_id": job_id,
+        "job_id": str(job_id),
         "filename": file.filename,
         "status": "queued",
         "message": "Invoice queued for processing",
@@ -90,46 +100,52 @@ async def upload_invoice(
 
 
 @router.get("/status/{job_id}")
-async def get_upload_status(job_id: str):
+async def get_upload_status(job_id: UUID, session=Depends(get_session)):
     """Check the status of an uploaded invoice."""
-    if job_id not in _processing_status:
+    job = await JobRepo(session).get_by_id(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
-
-    return _processing_status[job_id]
+    return _serialize_job(job)
 
 
 @router.get("/jobs")
-async def list_jobs():
-    """List all processing jobs."""
-    return {"jobs": list(_processing_status.values())}
+async def list_jobs(
+    limit: int = Query(100, ge=1, le=500),
+    status: str | None = None,
+    session=Depends(get_session),
+):
+    """List recent processing jobs."""
+    jobs = await JobRepo(session).list_jobs(limit=limit, status=status)
+    return {"jobs": [_serialize_job(j) for j in jobs]}
 
 
 @router.post("/reprocess/{extraction_id}")
 async def reprocess_invoice(
     extraction_id: str,
-    background_tasks: BackgroundTasks,
+    request: Request,
+    priority: int = Query(10, description="Higher runs first; interactive reprocessing jumps the upload queue"),
+    from_pass: ReprocessFrom | None = Query(
+        None, description="Re-run this pass and those depending on it, reusing the stored earlier passes",
+    ),
+    session=Depends(get_session),
 ):
     """Reprocess an existing invoice.
 
     Useful after editing correction rules to see updated extraction results.
+    With ``from_pass`` (e.g. ``pass2`` after a schema-mapping prompt change,
+    ``pass3`` after a validation rule change, ``confidence`` after a weight
+    change) only that pass and the passes depending on it run again.
     """
-    from uuid import UUID
-    from ...storage.database import AsyncSessionLocal
-    from ...storage.repositories import ExtractionRepo
-
-    # Load the extraction to get the PDF path
-    async with AsyncSessionLocal() as session:
-        repo = ExtractionRepo(session)
-        try:
-            extraction = await repo.get_by_id(UUID(extraction_id))
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid extraction ID")
+    repo = ExtractionRepo(session)
+    try:
+        extraction = await repo.get_by_id(UUID(extraction_id))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid extraction ID")
 
-        if not extraction:
-            raise HTTPException(status_code=404, detail="Extraction not found")
+    if not extraction:
+        raise HTTPException(status_code=404, detail="Extraction not found")
 
-    # Load settings to get local storage path
-    settings = Settings()
+    settings: Settings = request.app.state.settings
 
     # Find the PDF file
     pdf_path = Path(settings.local_storage_path) / "pdfs" / f"{extraction_id}.pdf"
@@ -144,25 +160,21 @@ async def reprocess_invoice(
                 detail=f"PDF file not found at {pdf_path}. Cannot reprocess."
             )
 
-    # Read the PDF
-    file_bytes = pdf_path.read_bytes()
-
-    # Generate job ID
-    job_id = str(uuid4())
     filename = f"reprocess_{extraction.blob_name or extraction_id}"
-
-    # Start background processing
-    _processing_status[job_id] = {
-        "status": "queued",
-        "filename": filename,
-        "reprocess_of": extraction_id,
-    }
-    background_tasks.add_task(_process_invoice, file_bytes, filename, job_id)
-
-    logger.info("reprocess_queued", job_id=job_id, extraction_id=extraction_id)
+    payload = {"filename": filename, "file_path": str(pdf_path), "reprocess_of": extraction_id}
+    if from_pass:
+        payload["from_pass"] = from_pass
+    job = await JobRepo(session).enqueue(
+        payload,
+        priority=priority,
+        max_attempts=settings.job_max_attempts,
+    )
+    await session.commit()
+
+    logger.info("reprocess_queued", job_id=str(job.job_id), extraction_id=extraction_id)
 
     return {
-        "job_id": job_id,
+        "job_id": str(job.job_id),
         "extraction_id": extraction_id,
         "status": "queued",
         "message": "Invoice queued for reprocessing",
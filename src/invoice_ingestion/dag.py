@@ -0,0 +1,179 @@
+"""Dependency-graph scheduler for the pipeline passes.
+
+Each node declares the nodes whose results it reads.  The scheduler starts
+a node as soon as all of its dependencies have finished, so independent
+nodes overlap and end-to-end latency follows the critical path instead of
+the sum of the passes.
+
+A node may have a timeout and a fallback.  A node that raises or times out
+yields its fallback value when it has one; otherwise the whole run fails
+and the nodes still running are cancelled.  Every run records a
+``Timeline``: when each node started and finished, and the critical path.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+NodeFn = Callable[[dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass
+class Node:
+    """One schedulable step; ``run`` receives the results of all finished nodes."""
+
+    name: str
+    run: NodeFn
+    deps: tuple[str, ...] = ()
+    timeout: float | None = None
+    # Value to continue with when the node raises or times out
+    fallback: Callable[[BaseException], Any] | None = None
+
+
+@dataclass
+class NodeTiming:
+    start_ms: float
+    end_ms: float
+    status: str = "ok"  # ok, fallback, timeout, failed, cancelled
+
+    @property
+    def duration_ms(self) -> float:
+        return self.end_ms - self.start_ms
+
+
+@dataclass
+class Timeline:
+    """Start/end of every node, relative to the start of the run."""
+
+    timings: dict[str, NodeTiming] = field(default_factory=dict)
+    critical_path: list[str] = field(default_factory=list)
+
+    @property
+    def total_ms(self) -> float:
+        return max((t.end_ms for t in self.timings.values()), default=0.0)
+
+    @property
+    def busy_ms(self) -> float:
+        """Sum of node durations: the latency of running them one by one."""
+        return sum(t.duration_ms for t in self.timings.values())
+
+    def as_dict(self) -> dict:
+        return {
+            "total_ms": round(self.total_ms),
+            "busy_ms": round(self.busy_ms),
+            "critical_path": self.critical_path,
+            "nodes": {
+                name: {"start_ms": round(t.start_ms), "end_ms": round(t.end_ms), "status": t.status}
+                for name, t in self.timings.items()
+            },
+        }
+
+
+class Graph:
+    """A validated set of nodes, runnable any number of times."""
+
+    def __init__(self, nodes: Iterable[Node]):
+        self.nodes: dict[str, Node] = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate node {node.name!r}")
+            self.nodes[node.name] = node
+        for node in self.nodes.values():
+            unknown = [dep for dep in node.deps if dep not in self.nodes]
+            if unknown:
+                raise ValueError(f"Node {node.name!r} depends on unknown {unknown}")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> list[str]:
+        order: list[str] = []
+        state: dict[str, str] = {}
+
+        def visit(name: str, path: list[str]) -> None:
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dep in self.nodes[name].deps:
+                visit(dep, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name, [])
+        return order
+
+    async def run(self, initial: dict[str, Any] | None = None) -> tuple[dict[str, Any], Timeline]:
+        """Run every node; return all results and the timeline.
+
+        *initial* results are available to every node from the start.
+        Raises the first unhandled node error after cancelling the rest.
+        """
+        results: dict[str, Any] = dict(initial or {})
+        timeline = Timeline()
+        started = time.perf_counter()
+        tasks: dict[str, asyncio.Task] = {}
+
+        def now_ms() -> float:
+            return (time.perf_counter() - started) * 1000
+
+        async def run_node(node: Node) -> None:
+            if node.deps:
+                await asyncio.wait([tasks[dep] for dep in node.deps])
+                if any(tasks[dep].cancelled() or tasks[dep].exception() for dep in node.deps):
+                    return  # The run is failing; the scheduler cancels everything
+            timing = NodeTiming(start_ms=now_ms(), end_ms=0.0)
+            timeline.timings[node.name] = timing
+            try:
+                if node.timeout is not None:
+                    value = await asyncio.wait_for(node.run(results), node.timeout)
+                else:
+                    value = await node.run(results)
+            except asyncio.CancelledError:
+                timing.status = "cancelled"
+                raise
+            except Exception as e:
+                if node.fallback is None:
+                    timing.status = "failed"
+                    raise
+                timing.status = "timeout" if isinstance(e, asyncio.TimeoutError) else "fallback"
+                value = node.fallback(e)
+            finally:
+                timing.end_ms = now_ms()
+            results[node.name] = value
+
+        for name in self.order:
+            tasks[name] = asyncio.create_task(run_node(self.nodes[name]), name=f"node-{name}")
+        try:
+            await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+            failed = next((t for t in tasks.values() if t.done() and not t.cancelled() and t.exception()), None)
+            if failed is not None:
+                raise failed.exception()
+        finally:
+            pending = [t for t in tasks.values() if not t.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for task in tasks.values():
+                if not task.cancelled():
+                    task.exception()  # Mark retrieved
+            timeline.critical_path = self._critical_path(timeline)
+        return results, timeline
+
+    def _critical_path(self, timeline: Timeline) -> list[str]:
+        """Walk back from the last node to finish through the dependency that finished last."""
+        timings = timeline.timings
+        if not timings:
+            return []
+        name = max(timings, key=lambda n: timings[n].end_ms)
+        path = [name]
+        while True:
+            deps = [dep for dep in self.nodes[name].deps if dep in timings]
+            if not deps:
+                break
+            name = max(deps, key=lambda n: timings[n].end_ms)
+            path.append(name)
+        return path[::-1]
@@ -0,0 +1,5 @@
+"""Local fake LLM provider for load and failover testing."""
+from .scenario import Scenario, load_scenario
+from .server import create_app
+
+__all__ = ["Scenario", "create_app", "load_scenario"]
@@ -0,0 +1,93 @@
+"""Load-test scenarios for the fake LLM provider.
+
+A scenario sets the baseline behaviour of the fake endpoints (latency, error
+rates, output size, quota) and an optional timeline of phases that override
+it — e.g. a Foundry brownout where the Claude endpoint slows down and starts
+failing for a few minutes while Azure OpenAI stays healthy.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+SCENARIO_DIR = Path(__file__).parent / "scenarios"
+
+Api = Literal["anthropic", "openai"]
+
+
+class Behaviour(BaseModel):
+    """Tunable endpoint behaviour; ``None`` in a phase means "inherit"."""
+
+    latency_ms: float | None = None
+    latency_per_output_token_ms: float | None = None
+    latency_sigma: float | None = None
+    error_429_rate: float | None = Field(default=None, ge=0.0, le=1.0)
+    error_500_rate: float | None = Field(default=None, ge=0.0, le=1.0)
+    retry_after_seconds: float | None = None
+    output_tokens: int | None = None
+
+
+class Phase(Behaviour):
+    """Overrides applied between ``start_seconds`` and ``start_seconds + duration_seconds``."""
+
+    name: str = ""
+    start_seconds: float = 0.0
+    duration_seconds: float | None = None
+    # APIs affected by this phase; all when empty
+    apis: list[Api] = Field(default_factory=list)
+
+    def active(self, elapsed: float, api: Api) -> bool:
+        if self.apis and api not in self.apis:
+            return False
+        if elapsed < self.start_seconds:
+            return False
+        return self.duration_seconds is None or elapsed < self.start_seconds + self.duration_seconds
+
+
+class Scenario(Behaviour):
+    """A named fake-provider configuration."""
+
+    name: str = "baseline"
+    description: str = ""
+    latency_ms: float = 900.0
+    latency_per_output_token_ms: float = 12.0
+    latency_sigma: float = 0.25
+    error_429_rate: float = 0.0
+    error_500_rate: float = 0.0
+    retry_after_seconds: float = 2.0
+    output_tokens: int = 600
+    # Per-deployment quotas over a sliding minute; exceeding them returns 429
+    tpm_limit: int | None = None
+    rpm_limit: int | None = None
+    # Repeat the phase timeline every N seconds (None: play once)
+    cycle_seconds: float | None = None
+    phases: list[Phase] = Field(default_factory=list)
+
+    def effective(self, elapsed: float, api: Api) -> Behaviour:
+        """Return the behaviour in force *elapsed* seconds into the run."""
+        if self.cycle_seconds:
+            elapsed %= self.cycle_seconds
+        values = {name: getattr(self, name) for name in Behaviour.model_fields}
+        for phase in self.phases:
+            if phase.active(elapsed, api):
+                values.update({k: v for k, v in phase.model_dump(include=set(Behaviour.model_fields)).items()
+                               if v is not None})
+        return Behaviour(**values)
+
+
+def available_scenarios() -> list[str]:
+    return sorted(p.stem for p in SCENARIO_DIR.glob("*.json"))
+
+
+def load_scenario(name_or_path: str) -> Scenario:
+    """Load a bundled scenario by name, or any scenario JSON file by path."""
+    path = Path(name_or_path)
+    if not path.suffix:
+        path = SCENARIO_DIR / f"{name_or_path}.json"
+    if not path.exists():
+        raise FileNotFoundError(
+            f"Scenario not found: {name_or_path} (bundled: {', '.join(available_scenarios())})"
+        )
+    return Scenario.model_validate_json(path.read_text())
@@ -0,0 +1,300 @@
+"""Fake Anthropic Messages / Azure OpenAI Chat Completions server.
+
+Point the real clients at it through their normal settings::
+
+    invoice-fake-provider --scenario foundry_brownout --port 8090
+    INVOICE_AZURE_AI_ENDPOINT=http://localhost:8090 \\
+    INVOICE_AZURE_OPENAI_ENDPOINT=http://localhost:8090 ...
+
+Endpoints:
+
+- ``POST /v1/messages`` — Anthropic Messages (as served by Azure AI Foundry)
+- ``POST /openai/deployments/{deployment}/chat/completions`` — Azure OpenAI
+- ``GET /_stats`` — request / status counters per API
+- ``POST /_scenario`` — switch scenario at runtime (``{"name": "..."}``)
+
+Responses carry plausible token usage; when the request asks for structured
+output (forced tool call or ``json_schema`` response format) the body is a
+minimal JSON instance of the requested schema.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import random
+import time
+from collections import Counter, deque
+from uuid import uuid4
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from ..llm.deployment_pool import CHARS_PER_TOKEN, IMAGE_TOKEN_ESTIMATE
+from .scenario import Api, Scenario, available_scenarios, load_scenario
+
+QUOTA_WINDOW_SECONDS = 60.0
+
+
+def example_from_schema(schema: dict | None):
+    """Build the smallest JSON value that satisfies *schema* (required fields only)."""
+    if not schema:
+        return {}
+    if "default" in schema:
+        return schema["default"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    for combinator in ("anyOf", "oneOf"):
+        if combinator in schema:
+            options = [s for s in schema[combinator] if s.get("type") != "null"] or schema[combinator]
+            return example_from_schema(options[0])
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object" or "properties" in schema:
+        props = schema.get("properties", {})
+        return {name: example_from_schema(props.get(name, {})) for name in schema.get("required", [])}
+    return {"array": [], "string": "", "integer": 0, "number": 0.0, "boolean": False}.get(kind)
+
+
+class _Quota:
+    """Sliding-minute token and request counters for one deployment."""
+
+    def __init__(self) -> None:
+        self.window: deque[tuple[float, int]] = deque()
+
+    def admit(self, tokens: int, tpm: int | None, rpm: int | None, now: float) -> bool:
+        while self.window and now - self.window[0][0] >= QUOTA_WINDOW_SECONDS:
+            self.window.popleft()
+        if rpm is not None and len(self.window) >= rpm:
+            return False
+        if tpm is not None and sum(t for _, t in self.window) + tokens > tpm:
+            return False
+        self.window.append((now, tokens))
+        return True
+
+
+class FakeProvider:
+    """Scenario-driven behaviour shared by both wire formats."""
+
+    def __init__(self, scenario: Scenario, seed: int | None = None):
+        self.scenario = scenario
+        self.started = time.monotonic()
+        self._rng = random.Random(seed)
+        self._quotas: dict[str, _Quota] = {}
+        self.stats: Counter[str] = Counter()
+
+    def switch(self, scenario: Scenario) -> None:
+        self.scenario = scenario
+        self.started = time.monotonic()
+        self._quotas.clear()
+
+    async def handle(self, api: Api, deployment: str, input_tokens: int, max_tokens: int):
+        """Decide the outcome of one call.
+
+        Returns ``(status, output_tokens, truncated, retry_after)`` after
+        sleeping for the simulated latency.
+        """
+        now = time.monotonic()
+        behaviour = self.scenario.effective(now - self.started, api)
+        self.stats[f"{api}.requests"] += 1
+
+        quota = self._quotas.setdefault(f"{api}:{deployment}", _Quota())
+        if not quota.admit(input_tokens + max_tokens, self.scenario.tpm_limit, self.scenario.rpm_limit, now):
+            self.stats[f"{api}.429_quota"] += 1
+            return 429, 0, False, behaviour.retry_after_seconds
+
+        roll = self._rng.random()
+        if roll < behaviour.error_429_rate:
+            await asyncio.sleep(0.05)
+            self.stats[f"{api}.429"] += 1
+            return 429, 0, False, behaviour.retry_after_seconds
+        if roll < behaviour.error_429_rate + behaviour.error_500_rate:
+            # Server errors tend to arrive after part of the normal latency
+            await asyncio.sleep(self._latency(behaviour, 0) / 2000)
+            self.stats[f"{api}.500"] += 1
+            return 500, 0, False, None
+
+        wanted = max(1, int(self._rng.lognormvariate(math.log(behaviour.output_tokens), 0.4)))
+        output_tokens = min(wanted, max_tokens)
+        await asyncio.sleep(self._latency(behaviour, output_tokens) / 1000)
+        self.stats[f"{api}.200"] += 1
+        return 200, output_tokens, wanted > max_tokens, None
+
+    def _latency(self, behaviour, output_tokens: int) -> float:
+        base = behaviour.latency_ms + behaviour.latency_per_output_token_ms * output_tokens
+        if behaviour.latency_sigma:
+            base *= self._rng.lognormvariate(0.0, behaviour.latency_sigma)
+        return base
+
+
+def _count_input_tokens(texts: list[str], image_count: int) -> int:
+    return sum(len(t) for t in texts) // CHARS_PER_TOKEN + IMAGE_TOKEN_ESTIMATE * image_count
+
+
+def _retry_headers(retry_after: float | None) -> dict:
+    if retry_after is None:
+        return {}
+    return {"retry-after": str(math.ceil(retry_after)), "retry-after-ms": str(int(retry_after * 1000))}
+
+
+def create_app(scenario: Scenario | None = None, seed: int | None = None) -> FastAPI:
+    """Create the fake provider application."""
+    provider = FakeProvider(scenario or load_scenario("baseline"), seed=seed)
+    app = FastAPI(title="Fake LLM Provider", version="0.1.0")
+    app.state.provider = provider
+
+    @app.post("/v1/messages")
+    async def anthropic_messages(request: Request):
+        body = await request.json()
+        texts = [body.get("system") or ""] if isinstance(body.get("system"), str) else []
+        images = 0
+        for message in body.get("messages", []):
+            content = message.get("content")
+            if isinstance(content, str):
+                texts.append(content)
+                continue
+            for block in content or []:
+                if block.get("type") == "text":
+                    texts.append(block.get("text", ""))
+                elif block.get("type") == "image":
+                    images += 1
+        input_tokens = _count_input_tokens(texts, images)
+        max_tokens = int(body.get("max_tokens", 4096))
+
+        status, output_tokens, truncated, retry_after = await provider.handle(
+            "anthropic", body.get("model", ""), input_tokens, max_tokens,
+        )
+        if status == 429:
+            return JSONResponse(
+                {"type": "error", "error": {"type": "rate_limit_error", "message": "Rate limit exceeded"}},
+                status_code=429, headers=_retry_headers(retry_after),
+            )
+        if status >= 500:
+            return JSONResponse(
+                {"type": "error", "error": {"type": "api_error", "message": "Internal server error"}},
+                status_code=status,
+            )
+
+        tool_choice = body.get("tool_choice") or {}
+        tool = next((t for t in body.get("tools", []) if t.get("name") == tool_choice.get("name")), None)
+        if tool is not None:
+            content = [{
+                "type": "tool_use", "id": f"toolu_{uuid4().hex[:24]}",
+                "name": tool["name"], "input": example_from_schema(tool.get("input_schema")),
+            }]
+            stop_reason = "max_tokens" if truncated else "tool_use"
+        else:
+            content = [{"type": "text", "text": "{}"}]
+            stop_reason = "max_tokens" if truncated else "end_turn"
+
+        return {
+            "id": f"msg_{uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", ""),
+            "content": content,
+            "stop_reason": stop_reason,
+            "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+        }
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def azure_chat_completions(deployment: str, request: Request):
+        body = await request.json()
+        texts: list[str] = []
+        images = 0
+        for message in body.get("messages", []):
+            content = message.get("content")
+            if isinstance(content, str):
+                texts.append(content)
+                continue
+            for part in content or []:
+                if part.get("type") == "text":
+                    texts.append(part.get("text", ""))
+                elif part.get("type") == "image_url":
+                    images += 1
+        input_tokens = _count_input_tokens(texts, images)
+        max_tokens = int(body.get("max_tokens") or body.get("max_completion_tokens") or 4096)
+
+        status, output_tokens, truncated, retry_after = await provider.handle(
+            "openai", deployment, input_tokens, max_tokens,
+        )
+        if status == 429:
+            seconds = math.ceil(retry_after or 1)
+            return JSONResponse(
+                {"error": {"code": "429", "message": (
+                    "Requests to the ChatCompletions_Create Operation under Azure OpenAI API have "
+                    f"exceeded token rate limit of your current tier. Please retry after {seconds} seconds."
+                )}},
+                status_code=429, headers=_retry_headers(retry_after),
+            )
+        if status >= 500:
+            return JSONResponse(
+                {"error": {
+                    "code": "InternalServerError",
+                    "message": "The server had an error processing your request.",
+                }},
+                status_code=status,
+            )
+
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            text = json.dumps(example_from_schema(response_format.get("json_schema", {}).get("schema")))
+        else:
+            text = "{}"
+
+        return {
+            "id": f"chatcmpl-{uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": deployment,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "length" if truncated else "stop",
+            }],
+            "usage": {
+                "prompt_tokens": input_tokens,
+                "completion_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        }
+
+    @app.get("/_stats")
+    async def stats():
+        return {
+            "scenario": provider.scenario.name,
+            "elapsed_seconds": round(time.monotonic() - provider.started, 1),
+            "counters": dict(provider.stats),
+        }
+
+    @app.post("/_scenario")
+    async def switch_scenario(request: Request):
+        body = await request.json()
+        try:
+            provider.switch(load_scenario(body["name"]))
+        except (KeyError, FileNotFoundError) as e:
+            return JSONResponse({"error": str(e), "available": available_scenarios()}, status_code=400)
+        return {"scenario": provider.scenario.name}
+
+    return app
+
+
+def main() -> None:
+    """Console entry point: ``invoice-fake-provider``."""
+    import click
+    import uvicorn
+
+    @click.command()
+    @click.option("--scenario", default="baseline", show_default=True,
+                  help=f"Bundled scenario ({', '.join(available_scenarios())}) or path to a JSON file")
+    @click.option("--host", default="127.0.0.1", show_default=True)
+    @click.option("--port", default=8090, show_default=True, type=int)
+    @click.option("--seed", default=None, type=int, help="Seed for latency and error sampling")
+    def run(scenario: str, host: str, port: int, seed: int | None) -> None:
+        app = create_app(load_scenario(scenario), seed=seed)
+        click.echo(f"Fake provider on http://{host}:{port} (scenario: {app.state.provider.scenario.name})")
+        uvicorn.run(app, host=host, port=port, log_level="warning")
+
+    run()
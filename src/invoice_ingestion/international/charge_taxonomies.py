@@ -1,6 +1,8 @@
 """Country-specific charge taxonomies."""
 from __future__ import annotations
 
+import re
+
 CHARGE_TAXONOMIES: dict[str, dict[str, dict]] = {
     "DE": {
         "Arbeitspreis": {"category": "energy", "section": "supply", "translation": "Energy Charge (Working Price)"},
@@ -79,20 +81,26 @@ CHARGE_TAXONOMIES: dict[str, dict[str, dict]] = {
 }
 
 
+# ISO codes filed under another taxonomy key
+COUNTRY_ALIASES = {"GB": "UK"}
+
+
 def lookup_charge(country_code: str, description: str) -> dict | None:
     """Look up a charge description in the country taxonomy.
     Returns matching taxonomy entry or None.
+
+    Terms match as whole words, longest first, so "RO" does not match
+    "from" and "Energía activa" wins over "Energía".
     """
-    taxonomy = CHARGE_TAXONOMIES.get(country_code, {})
-    desc_lower = description.lower()
+    taxonomy = get_taxonomy(country_code)
 
-    for key, info in taxonomy.items():
-        if key.lower() in desc_lower:
-            return info
+    for key in sorted(taxonomy, key=len, reverse=True):
+        if re.search(rf"(?<!\w){re.escape(key)}(?!\w)", description, re.IGNORECASE):
+            return taxonomy[key]
 
     return None
 
 
 def get_taxonomy(country_code: str) -> dict[str, dict]:
     """Get the full charge taxonomy for a country."""
-    return CHARGE_TAXONOMIES.get(country_code, {})
+    return CHARGE_TAXONOMIES.get(COUNTRY_ALIASES.get(country_code, country_code), {})
@@ -0,0 +1,211 @@
+"""Learned charge classifications per utility and charge description.
+
+The same utility prints the same charge descriptions every month, so how
+a description was classified (category, section, owner, attribution) on
+reviewed invoices is a reliable answer for the next one.  Entries are
+keyed by utility and normalized description and live in the
+``charge_classifications`` table:
+
+- an approved extraction confirms the classification of each of its
+  charges (``learn_from_extraction``);
+- a reviewer's correction of a charge's classification replaces the entry
+  and is trusted immediately (``learn_from_correction``);
+- an approved extraction that disagrees with an entry counts as a
+  contradiction; an entry with contradictions is not used, and one
+  contradicted more often than confirmed takes the new classification.
+
+The pipeline keeps the trusted entries in memory
+(``ChargeClassificationCache``) and the deterministic Pass 2 mapper looks
+charges up there before anything else.
+"""
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# The classification fields learned per description
+CLASSIFICATION_FIELDS = ("category", "charge_section", "charge_owner", "attribution_type")
+# Approvals needed before an entry learned from extractions is used
+MIN_CONFIRMATIONS = 3
+
+_NON_WORD = re.compile(r"[\W\d_]+")
+_CORRECTION_PATH = re.compile(
+    r"^charges\.([^.]+)\.(category|charge_section|charge_owner|charge_period\.attribution_type)$"
+)
+
+
+def normalize_utility(utility) -> str:
+    return " ".join(str(utility or "").casefold().split())
+
+
+def normalize_description(description) -> str:
+    """Lowercase words only: drops numbers, dates, punctuation and spacing differences."""
+    return " ".join(_NON_WORD.sub(" ", str(description or "").casefold()).split())
+
+
+def _value(field_):
+    return field_.get("value") if isinstance(field_, dict) else field_
+
+
+def charge_classification(charge: dict) -> dict | None:
+    """The learnable classification of an output charge, or None if incomplete."""
+    classification = {
+        "category": charge.get("category"),
+        "charge_section": charge.get("charge_section"),
+        "charge_owner": charge.get("charge_owner"),
+        "attribution_type": (charge.get("charge_period") or {}).get("attribution_type") or "current",
+    }
+    return classification if all(classification.values()) else None
+
+
+@dataclass
+class CachedClassification:
+    """One learned description: its classification and how well it is supported."""
+
+    category: str
+    charge_section: str
+    charge_owner: str
+    attribution_type: str = "current"
+    confirmations: int = 0
+    contradictions: int = 0
+    source: str = "accepted"  # accepted, correction
+
+    @property
+    def classification(self) -> dict:
+        return {name: getattr(self, name) for name in CLASSIFICATION_FIELDS}
+
+    def trusted(self, min_confirmations: int = MIN_CONFIRMATIONS) -> bool:
+        if self.contradictions:
+            return False
+        return self.source == "correction" or self.confirmations >= min_confirmations
+
+
+def observe(entry: CachedClassification | None, classification: dict, source: str) -> CachedClassification:
+    """Update *entry* with one reviewed classification of its description."""
+    if source == "correction":
+        return CachedClassification(**classification, confirmations=1, source="correction")
+    if entry is None:
+        return CachedClassification(**classification, confirmations=1)
+    if entry.classification == classification:
+        entry.confirmations += 1
+    else:
+        entry.contradictions += 1
+        if entry.contradictions > entry.confirmations:
+            return CachedClassification(**classification, confirmations=1)
+    return entry
+
+
+class ChargeClassificationCache:
+    """Trusted learned classifications in memory, keyed for O(1) lookup."""
+
+    def __init__(self, min_confirmations: int = MIN_CONFIRMATIONS, refresh_seconds: float = 300.0):
+        self.min_confirmations = min_confirmations
+        self.refresh_seconds = refresh_seconds
+        self._entries: dict[str, dict[str, dict]] = {}
+        self._loaded_at: float | None = None
+
+    def load(self, entries: dict[tuple[str, str], CachedClassification]) -> None:
+        """Replace the cache with the trusted ones of *entries* (keyed by normalized utility, description)."""
+        by_utility: dict[str, dict[str, dict]] = {}
+        for (utility, description), entry in entries.items():
+            if entry.trusted(self.min_confirmations):
+                by_utility.setdefault(utility, {})[description] = entry.classification
+        self._entries = by_utility
+        self._loaded_at = time.monotonic()
+
+    async def load_from_database(self) -> None:
+        """Load the table, at most once per ``refresh_seconds``."""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+
+        from ..storage.database import AsyncSessionLocal
+        from ..storage.repositories import ChargeClassificationRepo
+
+        async with AsyncSessionLocal() as session:
+            rows = await ChargeClassificationRepo(session).list_all()
+        self.load({(row.utility, row.description_key): _entry(row) for row in rows})
+        logger.info("charge_cache_loaded", utilities=len(self._entries),
+                    descriptions=sum(len(d) for d in self._entries.values()))
+
+    def for_utility(self, utility) -> dict[str, dict]:
+        """Normalized description → classification for *utility*."""
+        return self._entries.get(normalize_utility(utility), {})
+
+    def lookup(self, utility, description) -> dict | None:
+        return self.for_utility(utility).get(normalize_description(description))
+
+
+def _entry(row) -> CachedClassification:
+    return CachedClassification(
+        category=row.category,
+        charge_section=row.charge_section,
+        charge_owner=row.charge_owner,
+        attribution_type=row.attribution_type or "current",
+        confirmations=row.confirmations,
+        contradictions=row.contradictions,
+        source=row.source,
+    )
+
+
+async def _record(repo, utility: str, description, classification: dict, source: str) -> None:
+    key = normalize_description(description)
+    if not utility or not key:
+        return
+    row = await repo.get(utility, key)
+    entry = observe(_entry(row) if row is not None else None, classification, source)
+    await repo.save(utility, key, str(description), entry)
+
+
+async def learn_from_extraction(session, result_json: dict | None) -> int:
+    """Confirm the classification of every charge of an approved extraction.
+
+    A description printed on several lines counts once.  Returns the
+    number of descriptions recorded.
+    """
+    from ..storage.repositories import ChargeClassificationRepo
+
+    result_json = result_json or {}
+    utility = normalize_utility(_value((result_json.get("account") or {}).get("utility_provider")))
+    if not utility:
+        return 0
+    repo = ChargeClassificationRepo(session)
+    seen: set[str] = set()
+    for charge in result_json.get("charges") or []:
+        classification = charge_classification(charge)
+        description = _value(charge.get("description"))
+        if classification is None or normalize_description(description) in seen:
+            continue
+        seen.add(normalize_description(description))
+        await _record(repo, utility, description, classification, "accepted")
+    seen.discard("")
+    return len(seen)
+
+
+async def learn_from_correction(session, result_json: dict | None, field_path: str, corrected_value: str) -> bool:
+    """Record a reviewer's correction of a charge classification field.
+
+    *field_path* is ``charges.<line_id>.<field>`` (the Pass 3 convention)
+    and *result_json* the extraction with the correction applied.  Returns
+    whether the correction was a charge classification.
+    """
+    from ..storage.repositories import ChargeClassificationRepo
+
+    match = _CORRECTION_PATH.match(field_path)
+    if not match or not result_json:
+        return False
+    charge = next((c for c in result_json.get("charges") or [] if c.get("line_id") == match.group(1)), None)
+    utility = normalize_utility(_value((result_json.get("account") or {}).get("utility_provider")))
+    if charge is None or not utility:
+        return False
+    classification = charge_classification(charge)
+    if classification is None:
+        return False
+    classification[match.group(2).rsplit(".", 1)[-1]] = corrected_value
+    await _record(ChargeClassificationRepo(session), utility, _value(charge.get("description")),
+                  classification, "correction")
+    return True
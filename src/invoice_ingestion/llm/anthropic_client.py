@@ -5,10 +5,14 @@ import asyncio
 import time
 
 import anthropic
+import orjson
 import structlog
+from pydantic import BaseModel
 
 from .base import LLMClient, LLMResponse
 from .call_logger import get_logger
+from .file_store import FILES_API_BETA, PageFileCache
+from .structured_output import anthropic_tool
 
 logger = structlog.get_logger(__name__)
 
@@ -25,6 +29,24 @@ RETRYABLE_EXCEPTIONS = (
 )
 
 
+def request_log_fields(request: dict) -> tuple[str, str, list]:
+    """Return ``(system_prompt, user_prompt, image_blocks)`` from a Messages request."""
+    user_prompt = ""
+    images: list = []
+    for msg in request["messages"]:
+        if msg["role"] == "user":
+            content = msg["content"]
+            if isinstance(content, str):
+                user_prompt = content
+            elif isinstance(content, list):
+                for item in content:
+                    if item.get("type") == "text":
+                        user_prompt = item.get("text", "")
+                    elif item.get("type") == "image":
+                        images.append(item)
+    return request.get("system", ""), user_prompt, images
+
+
 class AnthropicClient(LLMClient):
     """LLM client for Claude models deployed via Azure AI Foundry.
 
@@ -38,9 +60,17 @@ class AnthropicClient(LLMClient):
         model: str = "claude-sonnet-4-5-20250929",
         timeout: int = 120,
         azure_endpoint: str | None = None,
+        file_cache: PageFileCache | None = None,
+        max_retries: int = MAX_RETRIES,
     ):
         self._model = model
         self._timeout = timeout
+        self._max_retries = max_retries
+        # With retries disabled (e.g. inside a DeploymentPool) the SDK must
+        # not retry on its own either.
+        sdk_kwargs = {"max_retries": 0} if max_retries == 0 else {}
+        # When set, page images are uploaded once and referenced by file ID
+        self._file_cache = file_cache
 
         if azure_endpoint:
             # Azure AI Foundry: Claude models are deployed as serverless APIs
@@ -49,12 +79,14 @@ class AnthropicClient(LLMClient):
                 api_key=api_key,
                 base_url=f"{azure_endpoint.rstrip('/')}",
                 timeout=float(timeout),
+                **sdk_kwargs,
             )
             self._provider = "azure_ai"
         else:
             self._client = anthropic.AsyncAnthropic(
                 api_key=api_key,
                 timeout=float(timeout),
+                **sdk_kwargs,
             )
             self._provider = "anthropic"
 
@@ -66,20 +98,15 @@ class AnthropicClient(LLMClient):
         temperature: float = 0.0,
         max_tokens: int = 4096,
         json_mode: bool = False,
+        response_model: type[BaseModel] | None = None,
     ) -> LLMResponse:
         """Text-only completion using the Anthropic Messages API."""
-        messages = [{"role": "user", "content": user_prompt}]
-
-        if json_mode:
-            if not system_prompt.rstrip().endswith("Respond with valid JSON only."):
-                system_prompt = system_prompt.rstrip() + "\n\nRespond with valid JSON only."
-
-        return await self._call_with_retry(
-            system_prompt=system_prompt,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
+        request = self.build_request(
+            system_prompt, user_prompt, None,
+            temperature=temperature, max_tokens=max_tokens,
+            json_mode=json_mode, response_model=response_model,
         )
+        return await self._call_with_retry(request)
 
     async def complete_vision(
         self,
@@ -90,119 +117,163 @@ class AnthropicClient(LLMClient):
         temperature: float = 0.0,
         max_tokens: int = 8192,
         json_mode: bool = False,
+        response_model: type[BaseModel] | None = None,
     ) -> LLMResponse:
         """Vision completion with base64-encoded images."""
-        content: list[dict] = []
+        file_ids = None
+        if self._file_cache is not None and images:
+            try:
+                file_ids = await self._file_cache.file_ids(images)
+            except Exception as e:
+                logger.warning("page_upload_failed_inlining", error=str(e), model=self._model)
 
-        # Add image blocks first
-        for base64_str in images:
-            content.append({
-                "type": "image",
-                "source": {
-                    "type": "base64",
-                    "media_type": "image/png",
-                    "data": base64_str,
-                },
-            })
+        request = self.build_request(
+            system_prompt, user_prompt, images,
+            temperature=temperature, max_tokens=max_tokens,
+            json_mode=json_mode, response_model=response_model,
+            image_file_ids=file_ids,
+        )
+        return await self._call_with_retry(request)
 
-        # Add text block
-        content.append({"type": "text", "text": user_prompt})
+    def build_request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        images: list[str] | None,
+        *,
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool = False,
+        response_model: type[BaseModel] | None = None,
+        image_file_ids: list[str] | None = None,
+    ) -> dict:
+        """Build the Messages API parameters for one call.
+
+        Shared by the synchronous path and the batch backend so both send
+        byte-identical requests.  ``image_file_ids``, when given, replace the
+        inline base64 images with Files API references.
+        """
+        if image_file_ids:
+            content: list[dict] = [
+                {"type": "image", "source": {"type": "file", "file_id": file_id}}
+                for file_id in image_file_ids
+            ]
+            content.append({"type": "text", "text": user_prompt})
+            messages = [{"role": "user", "content": content}]
+        elif images:
+            content = []
 
-        messages = [{"role": "user", "content": content}]
+            # Add image blocks first
+            for base64_str in images:
+                content.append({
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": "image/png",
+                        "data": base64_str,
+                    },
+                })
+
+            # Add text block
+            content.append({"type": "text", "text": user_prompt})
+            messages = [{"role": "user", "content": content}]
+        else:
+            messages = [{"role": "user", "content": user_prompt}]
 
-        if json_mode:
+        if json_mode and response_model is None:
             if not system_prompt.rstrip().endswith("Respond with valid JSON only."):
                 system_prompt = system_prompt.rstrip() + "\n\nRespond with valid JSON only."
 
-        return await self._call_with_retry(
-            system_prompt=system_prompt,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
+        request = {
+            "model": self._model,
+            "system": system_prompt,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        if response_model is not None:
+            # Force a single tool call whose input schema is the response model
+            tool, tool_choice = anthropic_tool(response_model)
+            request["tools"] = [tool]
+            request["tool_choice"] = tool_choice
+        if image_file_ids:
+            request["extra_headers"] = {"anthropic-beta": FILES_API_BETA}
+        return request
+
+    @staticmethod
+    def parse_response(response, latency_ms: int = 0) -> LLMResponse:
+        """Convert a Messages API ``Message`` into an ``LLMResponse``."""
+        # With structured output the answer is the forced tool call's input,
+        # which is already parsed JSON.
+        content_text = ""
+        for block in response.content:
+            if block.type == "tool_use":
+                content_text = orjson.dumps(block.input).decode()
+                break
+            if block.type == "text":
+                content_text += block.text
+
+        return LLMResponse(
+            content=content_text,
+            model=response.model,
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens,
+            finish_reason=response.stop_reason or "",
+            latency_ms=latency_ms,
         )
 
+    @property
+    def provider(self) -> str:
+        """Provider label used in call logs (``azure_ai`` or ``anthropic``)."""
+        return self._provider
+
     def get_model_name(self) -> str:
         """Return the model name being used."""
         return f"{self._model} ({self._provider})"
 
-    async def _call_with_retry(
-        self,
-        system_prompt: str,
-        messages: list[dict],
-        temperature: float,
-        max_tokens: int,
-    ) -> LLMResponse:
+    async def _call_with_retry(self, request: dict) -> LLMResponse:
         """Call the Anthropic API with exponential backoff retries."""
         last_exception: Exception | None = None
 
-        # Extract user prompt and images for logging
-        user_prompt = ""
-        images: list = []
-        for msg in messages:
-            if msg["role"] == "user":
-                content = msg["content"]
-                if isinstance(content, str):
-                    user_prompt = content
-                elif isinstance(content, list):
-                    for item in content:
-                        if item.get("type") == "text":
-                            user_prompt = item.get("text", "")
-                        elif item.get("type") == "image":
-                            images.append(item)
-
         # Start logging
         call_logger = get_logger()
+        record = None
         if call_logger:
             from .call_logger import get_current_stage
-            call_logger.start_call(
+            system_prompt, user_prompt, images = request_log_fields(request)
+            record = call_logger.start_call(
                 stage=get_current_stage(),
                 model=self._model,
                 provider=self._provider,
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 images=images,
-                temperature=temperature,
-                max_tokens=max_tokens,
+                temperature=request["temperature"],
+                max_tokens=request["max_tokens"],
             )
 
-        for attempt in range(MAX_RETRIES + 1):
+        for attempt in range(self._max_retries + 1):
             try:
                 start = time.monotonic()
-                response = await self._client.messages.create(
-                    model=self._model,
-                    system=system_prompt,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                )
+                response = await self._client.messages.create(**request)
                 elapsed_ms = int((time.monotonic() - start) * 1000)
 
-                # Extract content text from response
-                content_text = ""
-                for block in response.content:
-                    if block.type == "text":
-                        content_text += block.text
+                result = self.parse_response(response, elapsed_ms)
 
                 # Log successful call
                 if call_logger:
                     call_logger.end_call(
-                        response_content=content_text,
-                        input_tokens=response.usage.input_tokens,
-                        output_tokens=response.usage.output_tokens,
+                        record,
+                        response_content=result.content,
+                        input_tokens=result.input_tokens,
+                        output_tokens=result.output_tokens,
                     )
 
-                return LLMResponse(
-                    content=content_text,
-                    model=response.model,
-                    input_tokens=response.usage.input_tokens,
-                    output_tokens=response.usage.output_tokens,
-                    finish_reason=response.stop_reason or "",
-                    latency_ms=elapsed_ms,
-                )
+                return result
 
             except RETRYABLE_EXCEPTIONS as exc:
                 last_exception = exc
-                if attempt < MAX_RETRIES:
+                if attempt < self._max_retries:
                     delay = RETRY_DELAYS[attempt]
                     logger.warning(
                         "anthropic_api_retry",
@@ -216,13 +287,13 @@ class AnthropicClient(LLMClient):
                 else:
                     logger.error(
                         "anthropic_api_exhausted_retries",
-                        attempts=MAX_RETRIES + 1,
+                        attempts=self._max_retries + 1,
                         error=str(exc),
                         model=self._model,
                         provider=self._provider,
                     )
                     # Log failed call
                     if call_logger:
-                        call_logger.end_call(error_message=str(exc))
+                        call_logger.end_call(record, error_message=str(exc))
 
         raise last_exception  # type: ignore[misc]
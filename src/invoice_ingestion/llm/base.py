@@ -26,8 +26,13 @@ class LLMClient(ABC):
         temperature: float = 0.0,
         max_tokens: int = 4096,
         json_mode: bool = False,
+        response_model: type[BaseModel] | None = None,
     ) -> LLMResponse:
-        """Text-only completion."""
+        """Text-only completion.
+
+        When ``response_model`` is given the provider's native structured
+        output is used and ``content`` is JSON matching the model's schema.
+        """
         ...
 
     @abstractmethod
@@ -40,6 +45,7 @@ class LLMClient(ABC):
         temperature: float = 0.0,
         max_tokens: int = 8192,
         json_mode: bool = False,
+        response_model: type[BaseModel] | None = None,
     ) -> LLMResponse:
         """Vision completion with images."""
         ...
@@ -0,0 +1,442 @@
+"""Batch execution mode: provider Batch APIs behind the ``LLMClient`` interface.
+
+Bulk backfills do not need interactive latency, but every synchronous call
+consumes the same TPM quota as live traffic.  ``BatchLLMClient`` collects the
+calls that many concurrent pipelines make for a stage, submits them as one
+provider batch (Anthropic Message Batches / Azure OpenAI Global Batch) and
+resolves each caller's future when the batch finishes.  Pipelines are plain
+coroutines awaiting ``complete_*`` — they simply stay suspended until their
+result is available.
+
+Backends:
+
+- ``AnthropicBatchBackend`` — ``messages.batches`` on the Anthropic-compatible
+  endpoint.
+- ``OpenAIBatchBackend`` — JSONL upload + ``batches.create`` on Azure OpenAI
+  (requires a *Global-Batch* deployment for the model).
+- ``LocalBatchBackend`` — in-process fake that answers through another
+  ``LLMClient`` after a configurable turnaround; used by tests and dry runs.
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from uuid import uuid4
+
+import orjson
+import structlog
+from pydantic import BaseModel
+
+from .base import LLMClient, LLMResponse
+from .call_logger import get_current_stage, get_logger
+
+logger = structlog.get_logger(__name__)
+
+# Consecutive failed polls (network, 5xx) before a batch's callers are failed;
+# the retries back off from the poll interval up to MAX_POLL_BACKOFF_SECONDS
+MAX_POLL_ERRORS = 5
+MAX_POLL_BACKOFF_SECONDS = 600.0
+
+
+class BatchError(RuntimeError):
+    """A request inside a provider batch failed, expired or was cancelled."""
+
+
+@dataclass
+class BatchRequest:
+    """One queued ``complete_text`` / ``complete_vision`` call."""
+
+    system_prompt: str
+    user_prompt: str
+    images: list[str] | None
+    temperature: float
+    max_tokens: int
+    json_mode: bool = False
+    response_model: type[BaseModel] | None = None
+    custom_id: str = field(default_factory=lambda: uuid4().hex)
+
+
+class BatchBackend(ABC):
+    """Submits batches to a provider and reports their results."""
+
+    @abstractmethod
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        """Submit *requests* as one batch and return the batch ID."""
+        ...
+
+    @abstractmethod
+    async def poll(self, batch_id: str) -> dict[str, LLMResponse | Exception] | None:
+        """Return results keyed by ``custom_id``, or ``None`` while still running."""
+        ...
+
+    @abstractmethod
+    def get_model_name(self) -> str:
+        """Return the model name being used."""
+        ...
+
+    @property
+    def provider(self) -> str:
+        return "batch"
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """Message Batches API for an ``AnthropicClient``'s deployment."""
+
+    def __init__(self, client):
+        self._client = client
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        batch = await self._client._client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": r.custom_id,
+                    "params": self._client.build_request(
+                        r.system_prompt, r.user_prompt, r.images,
+                        temperature=r.temperature, max_tokens=r.max_tokens,
+                        json_mode=r.json_mode, response_model=r.response_model,
+                    ),
+                }
+                for r in requests
+            ],
+        )
+        return batch.id
+
+    async def poll(self, batch_id: str) -> dict[str, LLMResponse | Exception] | None:
+        batches = self._client._client.messages.batches
+        batch = await batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return None
+
+        results: dict[str, LLMResponse | Exception] = {}
+        async for entry in await batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                results[entry.custom_id] = self._client.parse_response(entry.result.message)
+            else:
+                detail = getattr(entry.result, "error", None)
+                results[entry.custom_id] = BatchError(f"batch request {entry.result.type}: {detail}")
+        return results
+
+    def get_model_name(self) -> str:
+        return f"{self._client.get_model_name()} [batch]"
+
+    @property
+    def provider(self) -> str:
+        return self._client.provider
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """Azure OpenAI Global Batch for an ``OpenAIClient``'s deployment."""
+
+    ENDPOINT = "/chat/completions"
+
+    def __init__(self, client):
+        self._client = client
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        lines = io.BytesIO()
+        for r in requests:
+            body = self._client.build_request(
+                r.system_prompt, r.user_prompt, r.images,
+                temperature=r.temperature, max_tokens=r.max_tokens,
+                json_mode=r.json_mode, response_model=r.response_model,
+            )
+            lines.write(orjson.dumps({
+                "custom_id": r.custom_id,
+                "method": "POST",
+                "url": self.ENDPOINT,
+                "body": body,
+            }))
+            lines.write(b"\n")
+
+        api = self._client._client
+        upload = await api.files.create(file=("batch.jsonl", lines.getvalue()), purpose="batch")
+        batch = await api.batches.create(
+            input_file_id=upload.id,
+            endpoint=self.ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def poll(self, batch_id: str) -> dict[str, LLMResponse | Exception] | None:
+        from openai.types.chat import ChatCompletion
+
+        api = self._client._client
+        batch = await api.batches.retrieve(batch_id)
+        if batch.status in ("validating", "in_progress", "finalizing", "cancelling"):
+            return None
+
+        results: dict[str, LLMResponse | Exception] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await api.files.content(file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                row = orjson.loads(line)
+                response = row.get("response") or {}
+                if row.get("error") or response.get("status_code", 200) >= 400:
+                    results[row["custom_id"]] = BatchError(
+                        f"batch request failed: {row.get('error') or response.get('body')}"
+                    )
+                else:
+                    completion = ChatCompletion.model_validate(response["body"])
+                    results[row["custom_id"]] = self._client.parse_response(completion)
+
+        if batch.status != "completed" and not results:
+            raise BatchError(f"batch {batch_id} {batch.status}")
+        return results
+
+    def get_model_name(self) -> str:
+        return f"{self._client.get_model_name()} [batch]"
+
+    @property
+    def provider(self) -> str:
+        return self._client.provider
+
+
+class LocalBatchBackend(BatchBackend):
+    """In-process stand-in for a provider batch service.
+
+    Requests are answered by *handler* once *turnaround_seconds* have passed
+    since submission, mimicking the submit → poll → results cycle.
+    """
+
+    def __init__(self, handler: LLMClient, turnaround_seconds: float = 0.0):
+        self._handler = handler
+        self._turnaround = turnaround_seconds
+        self._batches: dict[str, tuple[float, list[BatchRequest]]] = {}
+        self.submitted: list[list[str]] = []
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        batch_id = f"local_{uuid4().hex}"
+        self._batches[batch_id] = (time.monotonic(), list(requests))
+        self.submitted.append([r.custom_id for r in requests])
+        return batch_id
+
+    async def poll(self, batch_id: str) -> dict[str, LLMResponse | Exception] | None:
+        submitted_at, requests = self._batches[batch_id]
+        if time.monotonic() - submitted_at < self._turnaround:
+            return None
+        del self._batches[batch_id]
+
+        async def answer(r: BatchRequest) -> LLMResponse:
+            kwargs = {
+                "temperature": r.temperature, "max_tokens": r.max_tokens,
+                "json_mode": r.json_mode, "response_model": r.response_model,
+            }
+            if r.images:
+                return await self._handler.complete_vision(r.system_prompt, r.user_prompt, r.images, **kwargs)
+            return await self._handler.complete_text(r.system_prompt, r.user_prompt, **kwargs)
+
+        outcomes = await asyncio.gather(*(answer(r) for r in requests), return_exceptions=True)
+        return {r.custom_id: outcome for r, outcome in zip(requests, outcomes)}
+
+    def get_model_name(self) -> str:
+        return f"{self._handler.get_model_name()} [local batch]"
+
+
+@dataclass
+class _Pending:
+    request: BatchRequest
+    future: asyncio.Future
+    stage: str
+    call_logger: object
+    enqueued_at: float
+
+
+class BatchLLMClient(LLMClient):
+    """``LLMClient`` that defers calls into provider batches.
+
+    Calls are grouped per pipeline stage.  A group is submitted when it
+    reaches ``max_batch_size`` or when its oldest call has waited
+    ``max_wait_seconds``.  Call ``aclose()`` at the end of a run to submit
+    partial groups and wait for outstanding batches.
+
+    A batch may run for up to a day, so a failed poll is retried; callers
+    are failed only when the batch itself failed (``BatchError``) or after
+    ``max_poll_errors`` consecutive failed polls.
+    """
+
+    def __init__(
+        self,
+        backend: BatchBackend,
+        *,
+        max_batch_size: int = 100,
+        max_wait_seconds: float = 30.0,
+        poll_interval_seconds: float = 30.0,
+        max_poll_errors: int = MAX_POLL_ERRORS,
+    ):
+        self._backend = backend
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_seconds
+        self._poll_interval = poll_interval_seconds
+        self._max_poll_errors = max_poll_errors
+        self._pending: dict[str, list[_Pending]] = {}
+        self._timers: dict[str, asyncio.Task] = {}
+        self._inflight: set[asyncio.Task] = set()
+
+    async def complete_text(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+        json_mode: bool = False,
+        response_model: type[BaseModel] | None = None,
+    ) -> LLMResponse:
+        return await self._enqueue(BatchRequest(
+            system_prompt, user_prompt, None, temperature, max_tokens, json_mode, response_model,
+        ))
+
+    async def complete_vision(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        images: list[str],
+        *,
+        temperature: float = 0.0,
+        max_tokens: int = 8192,
+        json_mode: bool = False,
+        response_model: type[BaseModel] | None = None,
+    ) -> LLMResponse:
+        return await self._enqueue(BatchRequest(
+            system_prompt, user_prompt, images, temperature, max_tokens, json_mode, response_model,
+        ))
+
+    def get_model_name(self) -> str:
+        return self._backend.get_model_name()
+
+    @property
+    def pending_count(self) -> int:
+        return sum(len(group) for group in self._pending.values())
+
+    async def _enqueue(self, request: BatchRequest) -> LLMResponse:
+        loop = asyncio.get_running_loop()
+        stage = get_current_stage()
+        item = _Pending(request, loop.create_future(), stage, get_logger(), time.monotonic())
+        group = self._pending.setdefault(stage, [])
+        group.append(item)
+
+        if len(group) >= self._max_batch_size:
+            self._flush(stage)
+        elif stage not in self._timers:
+            self._timers[stage] = asyncio.create_task(self._flush_after(stage, self._max_wait))
+
+        return await item.future
+
+    async def _flush_after(self, stage: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._timers.pop(stage, None)
+        self._flush(stage)
+
+    def _flush(self, stage: str) -> None:
+        timer = self._timers.pop(stage, None)
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+        items = self._pending.pop(stage, [])
+        if not items:
+            return
+        task = asyncio.create_task(self._run_batch(stage, items))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, stage: str, items: list[_Pending]) -> None:
+        try:
+            batch_id = await self._backend.submit([i.request for i in items])
+            logger.info("llm_batch_submitted", stage=stage, batch_id=batch_id, size=len(items))
+            results = await self._wait_for(batch_id)
+        except Exception as exc:
+            logger.error("llm_batch_failed", stage=stage, size=len(items), error=str(exc))
+            for item in items:
+                self._log_call(item, error=exc)
+                if not item.future.done():
+                    item.future.set_exception(exc)
+            return
+
+        logger.info("llm_batch_completed", stage=stage, batch_id=batch_id, size=len(items))
+        for item in items:
+            outcome = results.get(item.request.custom_id) or BatchError("missing from batch results")
+            if isinstance(outcome, Exception):
+                self._log_call(item, error=outcome)
+                if not item.future.done():
+                    item.future.set_exception(outcome)
+            else:
+                self._log_call(item, response=outcome)
+                if not item.future.done():
+                    item.future.set_result(outcome)
+
+    async def _wait_for(self, batch_id: str) -> dict[str, LLMResponse | Exception]:
+        """Poll until the batch has ended, riding out transient poll errors."""
+        errors = 0
+        while True:
+            try:
+                results = await self._backend.poll(batch_id)
+            except BatchError:
+                raise  # The batch failed, expired or was cancelled
+            except Exception as exc:
+                errors += 1
+                if errors >= self._max_poll_errors:
+                    raise
+                delay = min(self._poll_interval * 2 ** errors, MAX_POLL_BACKOFF_SECONDS)
+                logger.warning("llm_batch_poll_failed", batch_id=batch_id, consecutive_errors=errors,
+                               retry_in=delay, error=str(exc))
+                await asyncio.sleep(delay)
+                continue
+            if results is not None:
+                return results
+            errors = 0
+            await asyncio.sleep(self._poll_interval)
+
+    def _log_call(self, item: _Pending, response: LLMResponse | None = None, error: Exception | None = None) -> None:
+        """Record the call against the pipeline that enqueued it."""
+        call_logger = item.call_logger
+        if call_logger is None:
+            return
+        r = item.request
+        record = call_logger.start_call(
+            stage=item.stage,
+            model=self._backend.get_model_name(),
+            provider=self._backend.provider,
+            system_prompt=r.system_prompt,
+            user_prompt=r.user_prompt,
+            images=r.images,
+            temperature=r.temperature,
+            max_tokens=r.max_tokens,
+        )
+        # Duration covers queueing and batch turnaround
+        record.start_time = item.enqueued_at
+        if response is not None:
+            call_logger.end_call(
+                record,
+                response_content=response.content,
+                input_tokens=response.input_tokens,
+                output_tokens=response.output_tokens,
+            )
+        else:
+            call_logger.end_call(record, error_message=str(error))
+
+    async def aclose(self) -> None:
+        """Submit every partial group and wait for all batches to finish."""
+        for stage in list(self._pending):
+            self._flush(stage)
+        while self._inflight:
+            await asyncio.gather(*list(self._inflight), return_exceptions=True)
+
+
+def make_batch_client(client: LLMClient, **kwargs) -> BatchLLMClient:
+    """Wrap a provider client so its calls go through the provider's Batch API."""
+    from .anthropic_client import AnthropicClient
+    from .openai_client import OpenAIClient
+
+    if isinstance(client, AnthropicClient):
+        backend: BatchBackend = AnthropicBatchBackend(client)
+    elif isinstance(client, OpenAIClient):
+        backend = OpenAIBatchBackend(client)
+    else:
+        raise TypeError(f"No batch backend for {type(client).__name__}")
+    return BatchLLMClient(backend, **kwargs)
@@ -0,0 +1,232 @@
+"""Write-behind persistence of LLM call logs.
+
+Pipelines hand their finished call records to a process-wide
+``CallLogWriter`` instead of writing them inline.  A background task drains
+the bounded queue and writes whole batches — across pipelines — with one
+multi-row ``INSERT`` per batch.  When the queue is full, new records are
+dropped and counted rather than blocking extractions or growing memory.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterable
+
+import structlog
+
+from ..storage.llm_blobs import KnownHashes
+from .call_logger import BLOB_COLUMNS, LLMCallRecord
+
+logger = structlog.get_logger(__name__)
+
+WriteBatch = Callable[[list[LLMCallRecord]], Awaitable[None]]
+
+
+# Prompt hashes this process has already written to llm_blobs.  Responses
+# are nearly always unique, so they are not tracked (they would only evict
+# the prompt templates that do repeat)
+_stored_prompts = KnownHashes()
+
+
+async def insert_records(records: list[LLMCallRecord]) -> None:
+    """Insert *records* into ``llm_calls`` in one transaction, as a multi-row insert.
+
+    Responses and prompt texts not seen before go to ``llm_blobs``, and the
+    batch is folded into the hourly ``llm_call_rollups``, in the same
+    transaction.
+    """
+    from sqlalchemy import insert
+
+    from ..storage.database import AsyncSessionLocal
+    from ..storage.llm_rollups import build_rollups
+    from ..storage.models import LLMCall
+    from ..storage.repositories import LLMBlobRepo, LLMCallRollupRepo
+
+    rows: list[dict] = []
+    texts: dict[str, str] = {}
+    prompts: set[str] = set()
+    for record in records:
+        row = record.to_row()
+        rows.append(row)
+        for field_name, column in BLOB_COLUMNS.items():
+            digest = row[f"{column}_hash"]
+            if digest is not None and digest not in _stored_prompts:
+                texts[digest] = getattr(record, field_name)
+                if field_name != "response_content":
+                    prompts.add(digest)
+
+    async with AsyncSessionLocal() as session:
+        await LLMBlobRepo(session).put_many(texts)
+        await session.execute(insert(LLMCall), rows)
+        await LLMCallRollupRepo(session).add_many(build_rollups(rows))
+        await session.commit()
+
+    for digest in prompts:
+        _stored_prompts.add(digest)
+
+
+class CallLogWriter:
+    """Batch LLM call records into bulk inserts on a background task."""
+
+    def __init__(
+        self,
+        max_queue: int = 10_000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        write: WriteBatch = insert_records,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._write = write
+        self._queue: asyncio.Queue[LLMCallRecord] = asyncio.Queue(maxsize=max_queue)
+        self._task: asyncio.Task | None = None
+        # Records taken off the queue by _run while it waits to fill a batch
+        self._pending: list[LLMCallRecord] = []
+        self._inflight: asyncio.Future | None = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending_count(self) -> int:
+        return self._queue.qsize() + len(self._pending)
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run(), name="call-log-writer")
+
+    def submit(self, records: Iterable[LLMCallRecord]) -> int:
+        """Queue *records* for writing; returns how many were accepted."""
+        accepted = dropped = 0
+        for record in records:
+            try:
+                self._queue.put_nowait(record)
+                accepted += 1
+            except asyncio.QueueFull:
+                dropped += 1
+        if dropped:
+            self.dropped += dropped
+            logger.warning("llm_call_log_dropped", dropped=dropped, total_dropped=self.dropped,
+                           queue_size=self._queue.maxsize)
+        return accepted
+
+    async def aclose(self) -> None:
+        """Stop the background task and write everything still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._inflight is not None:
+            await self._inflight
+            self._inflight = None
+        batch, self._pending = self._pending, []
+        await self._flush(batch)
+        while not self._queue.empty():
+            await self._flush(self._take(self.batch_size))
+        logger.info("llm_call_log_writer_closed", written=self.written,
+                    dropped=self.dropped, failed=self.failed)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending_count,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    # ── Internals ────────────────────────────────────────────────────────
+
+    def _take(self, limit: int) -> list[LLMCallRecord]:
+        batch: list[LLMCallRecord] = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Kept on the instance so that aclose writes a batch still filling
+            batch = self._pending
+            batch.append(await self._queue.get())
+            # Give concurrent pipelines up to flush_interval to fill the batch
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                batch.extend(self._take(self.batch_size - len(batch)))
+                remaining = deadline - loop.time()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except TimeoutError:
+                    break
+            self._pending = []
+            # Shielded so that stopping mid-write lets the write finish; aclose awaits it
+            self._inflight = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._inflight)
+
+    async def _flush(self, batch: list[LLMCallRecord]) -> None:
+        if not batch:
+            return
+        try:
+            await self._write(batch)
+            self.written += len(batch)
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                self._record_failure(batch, e)
+                return
+            logger.warning("llm_call_log_batch_failed", size=len(batch), error=str(e))
+
+        # One bad extraction (e.g. its row was never stored, so the foreign
+        # key fails) must not lose the other pipelines' calls: retry per extraction
+        groups: dict = defaultdict(list)
+        for record in batch:
+            groups[record.extraction_id].append(record)
+        for records in groups.values():
+            try:
+                await self._write(records)
+                self.written += len(records)
+            except Exception as e:
+                self._record_failure(records, e)
+
+    def _record_failure(self, records: list[LLMCallRecord], error: Exception) -> None:
+        self.failed += len(records)
+        logger.error("llm_calls_save_failed", count=len(records),
+                     extraction_id=str(records[0].extraction_id), error=str(error))
+
+
+# Process-wide writer, started by the API lifespan and the workers
+_writer: CallLogWriter | None = None
+
+
+def get_writer() -> CallLogWriter | None:
+    """Return the running writer, or None when call logs are written inline."""
+    return _writer if _writer is not None and _writer.running else None
+
+
+def start_writer(settings) -> CallLogWriter:
+    """Create and start the process-wide writer from *settings*."""
+    global _writer
+    if _writer is None or not _writer.running:
+        _writer = CallLogWriter(
+            max_queue=settings.call_log_queue_size,
+            batch_size=settings.call_log_batch_size,
+            flush_interval=settings.call_log_flush_interval_seconds,
+        )
+        _writer.start()
+    return _writer
+
+
+async def stop_writer() -> None:
+    """Flush and stop the process-wide writer, if any."""
+    global _writer
+    if _writer is not None:
+        writer, _writer = _writer, None
+        await writer.aclose()
@@ -1,15 +1,28 @@
-"""Log LLM calls for troubleshooting."""
+"""Log LLM calls for troubleshooting.
+
+The active logger and pipeline stage are held in context variables, so
+every asyncio task (one per pipeline run, plus the tasks it spawns) sees its
+own values and concurrent pipelines in one process never mix their records.
+"""
 from __future__ import annotations
 
 import time
-from dataclasses import dataclass, field
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
 from typing import TYPE_CHECKING
 from uuid import UUID, uuid4
 
+from ..storage.llm_blobs import preview, text_hash
+
 if TYPE_CHECKING:
     from ..storage.models import LLMCall
 
 
+# Text fields stored in llm_blobs → prefix of their hash and preview columns
+BLOB_COLUMNS = {"system_prompt": "system_prompt", "user_prompt": "user_prompt", "response_content": "response"}
+
+
 @dataclass
 class LLMCallRecord:
     """Record of a single LLM call."""
@@ -39,39 +52,40 @@ class LLMCallRecord:
     # Timing
     start_time: float = 0.0
     duration_ms: int | None = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+    def to_row(self) -> dict:
+        """Column values for a bulk insert into ``llm_calls``.
+
+        Prompts and the response are replaced by their ``llm_blobs`` hash
+        and a preview; the texts themselves are stored separately (see
+        ``insert_records``).
+        """
+        row = asdict(self)
+        del row["start_time"]
+        for field_name, column in BLOB_COLUMNS.items():
+            text = row.pop(field_name)
+            row[f"{column}_hash"] = text_hash(text) if text is not None else None
+            row[f"{column}_preview"] = preview(text)
+        return row
 
     def to_model(self) -> "LLMCall":
         """Convert to SQLAlchemy model."""
         from ..storage.models import LLMCall
 
-        return LLMCall(
-            call_id=self.call_id,
-            extraction_id=self.extraction_id,
-            stage=self.stage,
-            model=self.model,
-            provider=self.provider,
-            system_prompt=self.system_prompt,
-            user_prompt=self.user_prompt,
-            has_images=self.has_images,
-            image_count=self.image_count,
-            temperature=self.temperature,
-            max_tokens=self.max_tokens,
-            response_content=self.response_content,
-            error_message=self.error_message,
-            input_tokens=self.input_tokens,
-            output_tokens=self.output_tokens,
-            total_tokens=self.total_tokens,
-            duration_ms=self.duration_ms,
-        )
+        return LLMCall(**self.to_row())
 
 
 class LLMCallLogger:
-    """Collects LLM calls during pipeline execution."""
+    """Collects LLM calls during pipeline execution.
+
+    ``start_call`` returns the record for that call; pass it back to
+    ``end_call``.  Any number of calls may be in flight at once.
+    """
 
     def __init__(self, extraction_id: UUID | None = None):
         self.extraction_id = extraction_id
         self.calls: list[LLMCallRecord] = []
-        self._current_call: LLMCallRecord | None = None
 
     def start_call(
         self,
@@ -98,21 +112,17 @@ class LLMCallLogger:
             max_tokens=max_tokens,
             start_time=time.monotonic(),
         )
-        self._current_call = record
         return record
 
     def end_call(
         self,
+        record: LLMCallRecord,
         response_content: str | None = None,
         error_message: str | None = None,
         input_tokens: int | None = None,
         output_tokens: int | None = None,
     ):
-        """Finish recording the current LLM call."""
-        if self._current_call is None:
-            return
-
-        record = self._current_call
+        """Finish recording the LLM call started as *record*."""
         record.response_content = response_content
         record.error_message = error_message
         record.input_tokens = input_tokens
@@ -122,45 +132,41 @@ class LLMCallLogger:
         record.duration_ms = int((time.monotonic() - record.start_time) * 1000)
 
         self.calls.append(record)
-        self._current_call = None
 
     async def save_to_database(self):
-        """Save all recorded calls to the database."""
+        """Save all recorded calls to the database in one multi-row insert.
+
+        Long-running processes submit to the write-behind
+        ``CallLogWriter`` instead; this is the inline path for scripts.
+        """
         if not self.calls:
             return
 
-        from ..storage.database import AsyncSessionLocal
-        from ..storage.repositories import LLMCallRepo
+        from .call_log_writer import insert_records
 
-        async with AsyncSessionLocal() as session:
-            repo = LLMCallRepo(session)
-            for record in self.calls:
-                await repo.create(record.to_model())
-            await session.commit()
+        await insert_records(self.calls)
 
 
-# Global logger instance for the current extraction
-_current_logger: LLMCallLogger | None = None
-_current_stage: str = ""
+# Logger and stage for the current extraction, per asyncio task
+_current_logger: ContextVar[LLMCallLogger | None] = ContextVar("llm_call_logger", default=None)
+_current_stage: ContextVar[str] = ContextVar("llm_call_stage", default="")
 
 
 def get_logger() -> LLMCallLogger | None:
     """Get the current LLM call logger."""
-    return _current_logger
+    return _current_logger.get()
 
 
 def set_logger(logger: LLMCallLogger | None):
     """Set the current LLM call logger."""
-    global _current_logger
-    _current_logger = logger
+    _current_logger.set(logger)
 
 
 def get_current_stage() -> str:
     """Get the current pipeline stage."""
-    return _current_stage
+    return _current_stage.get()
 
 
 def set_current_stage(stage: str):
     """Set the current pipeline stage for logging."""
-    global _current_stage
-    _current_stage = stage
+    _current_stage.set(stage)
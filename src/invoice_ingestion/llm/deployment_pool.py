@@ -0,0 +1,295 @@
+"""Load balancing across several deployments of the same model.
+
+A single Azure deployment caps throughput at its TPM/RPM quota.
+``DeploymentPool`` spreads calls over any number of deployments — other
+regions, other resources, other keys — behind the normal ``LLMClient``
+interface.
+
+Routing is weighted least-outstanding-requests: each call goes to the
+deployment with the lowest ``(outstanding + 1) × latency / weight``, where
+latency is an EWMA of observed call latency and the score is inflated by
+the deployment's recent 429 rate.  Deployments that return 429 are cooled
+down for the provider's ``Retry-After``; a per-deployment sliding one-minute
+window keeps the estimated tokens admitted under each deployment's TPM quota
+so calls are routed away *before* the provider starts throttling.
+
+Member clients should be constructed with ``max_retries=0`` — the pool
+retries on a different deployment instead of hammering the one that failed.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import structlog
+from pydantic import BaseModel
+
+from .base import LLMClient, LLMResponse
+
+logger = structlog.get_logger(__name__)
+
+# Rough token cost of one high-detail page image, used for quota estimates
+IMAGE_TOKEN_ESTIMATE = 1600
+# Characters per token when estimating prompt size
+CHARS_PER_TOKEN = 4
+
+# EWMA smoothing factor for latency and throttle rate
+EWMA_ALPHA = 0.2
+# How strongly a deployment's recent 429 rate pushes traffic away from it
+THROTTLE_PENALTY = 4.0
+# Latency assumed for a deployment before its first response
+DEFAULT_LATENCY_MS = 5000.0
+# Cooldown after a 429 without Retry-After, and after other transient errors
+DEFAULT_THROTTLE_COOLDOWN = 10.0
+ERROR_COOLDOWN = 2.0
+
+QUOTA_WINDOW_SECONDS = 60.0
+
+
+class NoDeploymentAvailableError(RuntimeError):
+    """Every deployment is throttled or over quota for longer than allowed."""
+
+
+@dataclass
+class Deployment:
+    """One model deployment and its live routing statistics."""
+
+    name: str
+    client: LLMClient
+    weight: float = 1.0
+    tpm_limit: int | None = None
+    rpm_limit: int | None = None
+
+    outstanding: int = 0
+    latency_ewma_ms: float | None = None
+    throttle_ewma: float = 0.0
+    cooldown_until: float = 0.0
+    requests: int = 0
+    throttled: int = 0
+    errors: int = 0
+    _window: deque = field(default_factory=deque, repr=False)
+
+    def _trim(self, now: float) -> None:
+        while self._window and now - self._window[0][0] >= QUOTA_WINDOW_SECONDS:
+            self._window.popleft()
+
+    def window_tokens(self, now: float) -> int:
+        self._trim(now)
+        return sum(tokens for _, tokens in self._window)
+
+    def available_at(self, tokens: int, now: float) -> float:
+        """Earliest time this deployment can admit a call of *tokens*."""
+        ready = max(now, self.cooldown_until)
+        self._trim(now)
+        if self.rpm_limit is not None and len(self._window) >= self.rpm_limit:
+            ready = max(ready, self._window[0][0] + QUOTA_WINDOW_SECONDS)
+        if self.tpm_limit is not None and self._window:
+            used = self.window_tokens(now)
+            if used + tokens > self.tpm_limit:
+                # Wait until enough of the window has expired
+                excess = used + tokens - self.tpm_limit
+                for ts, t in self._window:
+                    excess -= t
+                    if excess <= 0:
+                        ready = max(ready, ts + QUOTA_WINDOW_SECONDS)
+                        break
+        return ready
+
+    def score(self) -> float:
+        latency = self.latency_ewma_ms or DEFAULT_LATENCY_MS
+        return (self.outstanding + 1) * latency * (1 + THROTTLE_PENALTY * self.throttle_ewma) / self.weight
+
+    def admit(self, tokens: int, now: float) -> None:
+        self._window.append((now, tokens))
+        self.outstanding += 1
+        self.requests += 1
+
+    def record_success(self, latency_ms: float) -> None:
+        self.outstanding -= 1
+        if self.latency_ewma_ms is None:
+            self.latency_ewma_ms = latency_ms
+        else:
+            self.latency_ewma_ms += EWMA_ALPHA * (latency_ms - self.latency_ewma_ms)
+        self.throttle_ewma *= 1 - EWMA_ALPHA
+
+    def record_throttle(self, retry_after: float | None, now: float) -> None:
+        self.outstanding -= 1
+        self.throttled += 1
+        self.throttle_ewma += EWMA_ALPHA * (1 - self.throttle_ewma)
+        self.cooldown_until = now + (retry_after if retry_after is not None else DEFAULT_THROTTLE_COOLDOWN)
+
+    def record_error(self, now: float) -> None:
+        self.outstanding -= 1
+        self.errors += 1
+        self.cooldown_until = now + ERROR_COOLDOWN
+
+    def snapshot(self, now: float) -> dict:
+        return {
+            "name": self.name,
+            "model": self.client.get_model_name(),
+            "weight": self.weight,
+            "outstanding": self.outstanding,
+            "latency_ewma_ms": round(self.latency_ewma_ms, 1) if self.latency_ewma_ms else None,
+            "throttle_rate": round(self.throttle_ewma, 3),
+            "cooling_down": self.cooldown_until > now,
+            "window_tokens": self.window_tokens(now),
+            "tpm_limit": self.tpm_limit,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "errors": self.errors,
+        }
+
+
+def _status_code(exc: Exception) -> int | None:
+    return getattr(exc, "status_code", None)
+
+
+def _retry_after(exc: Exception) -> float | None:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    for header in ("retry-after-ms", "retry-after"):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            seconds = float(value)
+        except ValueError:
+            continue
+        return seconds / 1000 if header == "retry-after-ms" else seconds
+    return None
+
+
+def _is_transient(exc: Exception) -> bool:
+    """Connection errors, timeouts, 408/409/429 and 5xx are worth retrying elsewhere."""
+    status = _status_code(exc)
+    if status is None:
+        return isinstance(exc, (OSError, asyncio.TimeoutError)) or "Connection" in type(exc).__name__ \
+            or "Timeout" in type(exc).__name__
+    return status in (408, 409, 429) or status >= 500
+
+
+def estimate_request_tokens(system_prompt: str, user_prompt: str, images: list[str] | None, max_tokens: int) -> int:
+    """Tokens a provider will count against TPM when admitting the call."""
+    prompt = (len(system_prompt) + len(user_prompt)) // CHARS_PER_TOKEN
+    return prompt + IMAGE_TOKEN_ESTIMATE * len(images or []) + max_tokens
+
+
+class DeploymentPool(LLMClient):
+    """``LLMClient`` that routes each call to the best of several deployments."""
+
+    def __init__(
+        self,
+        deployments: list[Deployment],
+        *,
+        max_attempts: int | None = None,
+        max_wait_seconds: float = 60.0,
+    ):
+        if not deployments:
+            raise ValueError("DeploymentPool needs at least one deployment")
+        self._deployments = deployments
+        self._max_attempts = max_attempts or 2 * len(deployments) + 1
+        self._max_wait = max_wait_seconds
+
+    async def complete_text(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+        json_mode: bool = False,
+        response_model: type[BaseModel] | None = None,
+    ) -> LLMResponse:
+        tokens = estimate_request_tokens(system_prompt, user_prompt, None, max_tokens)
+        return await self._dispatch(
+            tokens,
+            lambda client: client.complete_text(
+                system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens,
+                json_mode=json_mode, response_model=response_model,
+            ),
+        )
+
+    async def complete_vision(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        images: list[str],
+        *,
+        temperature: float = 0.0,
+        max_tokens: int = 8192,
+        json_mode: bool = False,
+        response_model: type[BaseModel] | None = None,
+    ) -> LLMResponse:
+        tokens = estimate_request_tokens(system_prompt, user_prompt, images, max_tokens)
+        return await self._dispatch(
+            tokens,
+            lambda client: client.complete_vision(
+                system_prompt, user_prompt, images, temperature=temperature, max_tokens=max_tokens,
+                json_mode=json_mode, response_model=response_model,
+            ),
+        )
+
+    def get_model_name(self) -> str:
+        return f"{self._deployments[0].client.get_model_name()} (pool of {len(self._deployments)})"
+
+    @property
+    def deployments(self) -> list[Deployment]:
+        return self._deployments
+
+    def stats(self) -> list[dict]:
+        now = time.monotonic()
+        return [d.snapshot(now) for d in self._deployments]
+
+    async def _select(self, tokens: int) -> Deployment:
+        """Pick the best deployment, waiting if all are throttled or over quota."""
+        deadline = time.monotonic() + self._max_wait
+        while True:
+            now = time.monotonic()
+            ready = [d for d in self._deployments if d.available_at(tokens, now) <= now]
+            if ready:
+                return min(ready, key=Deployment.score)
+
+            next_ready = min(d.available_at(tokens, now) for d in self._deployments)
+            if next_ready > deadline:
+                raise NoDeploymentAvailableError(
+                    f"All {len(self._deployments)} deployments throttled or over quota"
+                )
+            logger.info("deployment_pool_waiting", wait_seconds=round(next_ready - now, 2))
+            await asyncio.sleep(max(next_ready - now, 0.01))
+
+    async def _dispatch(self, tokens: int, call) -> LLMResponse:
+        last_exception: Exception | None = None
+        for attempt in range(self._max_attempts):
+            deployment = await self._select(tokens)
+            start = time.monotonic()
+            deployment.admit(tokens, start)
+            try:
+                response = await call(deployment.client)
+            except asyncio.CancelledError:
+                # Speculative calls are cancelled on a miss; the slot must not leak
+                deployment.outstanding -= 1
+                raise
+            except Exception as exc:
+                now = time.monotonic()
+                if _status_code(exc) == 429:
+                    deployment.record_throttle(_retry_after(exc), now)
+                    logger.warning("deployment_throttled", deployment=deployment.name, attempt=attempt + 1)
+                elif _is_transient(exc):
+                    deployment.record_error(now)
+                    logger.warning("deployment_error", deployment=deployment.name,
+                                   attempt=attempt + 1, error=str(exc))
+                else:
+                    # Request errors (400, 401, ...) would fail on every deployment
+                    deployment.outstanding -= 1
+                    raise
+                last_exception = exc
+                continue
+
+            deployment.record_success((time.monotonic() - start) * 1000)
+            return response
+
+        raise last_exception  # type: ignore[misc]
@@ -14,21 +14,38 @@ class FailoverLLMClient(LLMClient):
         self._fallback = fallback
         self._failover_count = 0
 
-    async def complete_text(self, system_prompt, user_prompt, *, temperature=0.0, max_tokens=4096, json_mode=False) -> LLMResponse:
+    async def complete_text(
+        self, system_prompt, user_prompt, *, temperature=0.0, max_tokens=4096, json_mode=False, response_model=None
+    ) -> LLMResponse:
         try:
-            return await self._primary.complete_text(system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens, json_mode=json_mode)
+            return await self._primary.complete_text(
+                system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens,
+                json_mode=json_mode, response_model=response_model,
+            )
         except Exception as e:
             logger.warning("primary_llm_failed", error=str(e), model=self._primary.get_model_name())
             self._failover_count += 1
-            return await self._fallback.complete_text(system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens, json_mode=json_mode)
-
-    async def complete_vision(self, system_prompt, user_prompt, images, *, temperature=0.0, max_tokens=8192, json_mode=False) -> LLMResponse:
+            return await self._fallback.complete_text(
+                system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens,
+                json_mode=json_mode, response_model=response_model,
+            )
+
+    async def complete_vision(
+        self, system_prompt, user_prompt, images, *,
+        temperature=0.0, max_tokens=8192, json_mode=False, response_model=None,
+    ) -> LLMResponse:
         try:
-            return await self._primary.complete_vision(system_prompt, user_prompt, images, temperature=temperature, max_tokens=max_tokens, json_mode=json_mode)
+            return await self._primary.complete_vision(
+                system_prompt, user_prompt, images, temperature=temperature, max_tokens=max_tokens,
+                json_mode=json_mode, response_model=response_model,
+            )
         except Exception as e:
             logger.warning("primary_llm_vision_failed", error=str(e), model=self._primary.get_model_name())
             self._failover_count += 1
-            return await self._fallback.complete_vision(system_prompt, user_prompt, images, temperature=temperature, max_tokens=max_tokens, json_mode=json_mode)
+            return await self._fallback.complete_vision(
+                system_prompt, user_prompt, images, temperature=temperature, max_tokens=max_tokens,
+                json_mode=json_mode, response_model=response_model,
+            )
 
     def get_model_name(self) -> str:
         return f"{self._primary.get_model_name()} (failover: {self._fallback.get_model_name()})"
@@ -0,0 +1,162 @@
+"""Upload page images once and reference them by file ID.
+
+Passes 0.5, 1A, 1B and 4 all send the same rendered pages.  Inlined as
+base64 that is several MB per request and the full page set again for every
+pass.  With a ``PageFileCache`` each distinct page (keyed by content hash) is
+uploaded once to the provider's file store; requests then carry only the
+file IDs.
+
+Only the Anthropic Messages API accepts file references for images.  Azure
+OpenAI Chat Completions has no equivalent, so OpenAI clients keep inlining.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from uuid import uuid4
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Beta header required for file references in the Messages API
+FILES_API_BETA = "files-api-2025-04-14"
+
+
+class FileStore(ABC):
+    """Provider-side storage for uploaded files."""
+
+    @abstractmethod
+    async def upload(self, data: bytes, filename: str, media_type: str) -> str:
+        """Upload *data* and return its file ID."""
+        ...
+
+    @abstractmethod
+    async def delete(self, file_id: str) -> None:
+        """Delete a previously uploaded file."""
+        ...
+
+
+class AnthropicFileStore(FileStore):
+    """Anthropic Files API (also exposed by Azure AI Foundry Claude deployments)."""
+
+    def __init__(self, api_key: str, azure_endpoint: str | None = None, timeout: int = 120):
+        import anthropic
+
+        kwargs: dict = {"api_key": api_key, "timeout": float(timeout)}
+        if azure_endpoint:
+            kwargs["base_url"] = azure_endpoint.rstrip("/")
+        self._client = anthropic.AsyncAnthropic(**kwargs)
+
+    async def upload(self, data: bytes, filename: str, media_type: str) -> str:
+        result = await self._client.beta.files.upload(
+            file=(filename, data, media_type),
+            betas=[FILES_API_BETA],
+        )
+        return result.id
+
+    async def delete(self, file_id: str) -> None:
+        await self._client.beta.files.delete(file_id, betas=[FILES_API_BETA])
+
+
+class LocalFileStore(FileStore):
+    """In-memory stand-in for a provider file store (tests, dry runs)."""
+
+    def __init__(self) -> None:
+        self.files: dict[str, bytes] = {}
+        self.upload_count = 0
+
+    async def upload(self, data: bytes, filename: str, media_type: str) -> str:
+        file_id = f"file_{uuid4().hex}"
+        self.files[file_id] = data
+        self.upload_count += 1
+        return file_id
+
+    async def delete(self, file_id: str) -> None:
+        self.files.pop(file_id, None)
+
+
+class PageFileCache:
+    """Maps page image content to uploaded file IDs.
+
+    Keys are the SHA-256 of the base64 image, so the same page rendered for
+    different passes (or re-submitted invoices) resolves to the same upload.
+    Concurrent requests for a page that is still uploading share that upload.
+    Least recently used entries beyond ``max_entries`` are deleted from the
+    provider in the background.
+    """
+
+    def __init__(self, store: FileStore, max_entries: int = 2048):
+        self._store = store
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, asyncio.Future] = OrderedDict()
+        self._cleanup: set[asyncio.Task] = set()
+        self.hits = 0
+        self.uploads = 0
+        self.bytes_uploaded = 0
+
+    async def file_ids(self, images: list[str]) -> list[str]:
+        """Return file IDs for base64 *images*, uploading any not seen before."""
+        return list(await asyncio.gather(*(self.file_id(image) for image in images)))
+
+    async def file_id(self, image_base64: str) -> str:
+        key = hashlib.sha256(image_base64.encode()).hexdigest()
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            try:
+                return await asyncio.shield(entry)
+            except asyncio.CancelledError:
+                # The uploading request was cancelled, not this one: upload it here
+                if entry.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.file_id(image_base64)
+                raise
+
+        entry = asyncio.get_running_loop().create_future()
+        self._entries[key] = entry
+        try:
+            data = base64.b64decode(image_base64)
+            file_id = await self._store.upload(data, f"page_{key[:16]}.png", "image/png")
+        except BaseException as exc:
+            # Do not cache failures or cancelled uploads; the next request retries
+            self._entries.pop(key, None)
+            if isinstance(exc, Exception):
+                entry.set_exception(exc)
+                # Mark retrieved so waiters-less futures do not warn
+                entry.exception()
+            else:
+                entry.cancel()
+            raise
+
+        entry.set_result(file_id)
+        self.uploads += 1
+        self.bytes_uploaded += len(data)
+        logger.debug("page_uploaded", file_id=file_id, size_bytes=len(data))
+        self._evict()
+        return file_id
+
+    def _evict(self) -> None:
+        while len(self._entries) > self._max_entries:
+            _, entry = self._entries.popitem(last=False)
+            if entry.done() and not entry.cancelled() and entry.exception() is None:
+                task = asyncio.create_task(self._delete(entry.result()))
+                self._cleanup.add(task)
+                task.add_done_callback(self._cleanup.discard)
+
+    async def _delete(self, file_id: str) -> None:
+        try:
+            await self._store.delete(file_id)
+        except Exception as e:
+            logger.warning("page_file_delete_failed", file_id=file_id, error=str(e))
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "uploads": self.uploads,
+            "bytes_uploaded": self.bytes_uploaded,
+        }
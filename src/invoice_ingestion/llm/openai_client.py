@@ -6,9 +6,11 @@ import time
 
 import openai
 import structlog
+from pydantic import BaseModel
 
 from .base import LLMClient, LLMResponse
 from .call_logger import get_logger
+from .structured_output import openai_response_format
 
 logger = structlog.get_logger(__name__)
 
@@ -25,6 +27,26 @@ RETRYABLE_EXCEPTIONS = (
 )
 
 
+def request_log_fields(request: dict) -> tuple[str, str, list]:
+    """Return ``(system_prompt, user_prompt, image_parts)`` from a Chat request."""
+    system_prompt = ""
+    user_prompt = ""
+    images: list = []
+    for msg in request["messages"]:
+        if msg["role"] == "system":
+            system_prompt = msg["content"] if isinstance(msg["content"], str) else str(msg["content"])
+        elif msg["role"] == "user":
+            if isinstance(msg["content"], str):
+                user_prompt = msg["content"]
+            elif isinstance(msg["content"], list):
+                for item in msg["content"]:
+                    if item.get("type") == "text":
+                        user_prompt = item.get("text", "")
+                    elif item.get("type") == "image_url":
+                        images.append(item)
+    return system_prompt, user_prompt, images
+
+
 class OpenAIClient(LLMClient):
     """LLM client for GPT models deployed via Azure OpenAI Service.
 
@@ -38,9 +60,14 @@ class OpenAIClient(LLMClient):
         model: str = "gpt-4o",
         azure_endpoint: str = "",
         timeout: int = 120,
+        max_retries: int = MAX_RETRIES,
     ):
         self._model = model
         self._timeout = timeout
+        self._max_retries = max_retries
+        # With retries disabled (e.g. inside a DeploymentPool) the SDK must
+        # not retry on its own either.
+        sdk_kwargs = {"max_retries": 0} if max_retries == 0 else {}
 
         if not azure_endpoint:
             raise ValueError(
@@ -51,8 +78,10 @@ class OpenAIClient(LLMClient):
         self._client = openai.AsyncAzureOpenAI(
             api_key=api_key,
             azure_endpoint=azure_endpoint,
-            api_version="2024-06-01",
+            # json_schema response formats need 2024-08-01 or later
+            api_version="2024-10-21",
             timeout=float(timeout),
+            **sdk_kwargs,
         )
 
     async def complete_text(
@@ -63,23 +92,15 @@ class OpenAIClient(LLMClient):
         temperature: float = 0.0,
         max_tokens: int = 4096,
         json_mode: bool = False,
+        response_model: type[BaseModel] | None = None,
     ) -> LLMResponse:
         """Text-only completion using the Azure OpenAI Chat Completions API."""
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-
-        kwargs: dict = {}
-        if json_mode:
-            kwargs["response_format"] = {"type": "json_object"}
-
-        return await self._call_with_retry(
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            **kwargs,
+        request = self.build_request(
+            system_prompt, user_prompt, None,
+            temperature=temperature, max_tokens=max_tokens,
+            json_mode=json_mode, response_model=response_model,
         )
+        return await self._call_with_retry(request)
 
     async def complete_vision(
         self,
@@ -90,125 +111,135 @@ class OpenAIClient(LLMClient):
         temperature: float = 0.0,
         max_tokens: int = 8192,
         json_mode: bool = False,
+        response_model: type[BaseModel] | None = None,
     ) -> LLMResponse:
         """Vision completion with base64-encoded images."""
-        # Build user content with images and text
-        user_content: list[dict] = []
-
-        for base64_str in images:
-            user_content.append({
-                "type": "image_url",
-                "image_url": {
-                    "url": f"data:image/png;base64,{base64_str}",
-                    "detail": "high",
-                },
-            })
-
-        user_content.append({"type": "text", "text": user_prompt})
-
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_content},
-        ]
-
-        kwargs: dict = {}
-        if json_mode:
-            kwargs["response_format"] = {"type": "json_object"}
-
-        return await self._call_with_retry(
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            **kwargs,
+        request = self.build_request(
+            system_prompt, user_prompt, images,
+            temperature=temperature, max_tokens=max_tokens,
+            json_mode=json_mode, response_model=response_model,
+        )
+        return await self._call_with_retry(request)
+
+    def build_request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        images: list[str] | None,
+        *,
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool = False,
+        response_model: type[BaseModel] | None = None,
+    ) -> dict:
+        """Build the Chat Completions request body for one call.
+
+        Shared by the synchronous path and the batch backend so both send
+        byte-identical requests.
+        """
+        if images:
+            # Build user content with images and text
+            user_content: list[dict] = []
+
+            for base64_str in images:
+                user_content.append({
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:image/png;base64,{base64_str}",
+                        "detail": "high",
+                    },
+                })
+
+            user_content.append({"type": "text", "text": user_prompt})
+        else:
+            user_content = user_prompt
+
+        request: dict = {
+            "model": self._model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content},
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        if response_model is not None:
+            request["response_format"] = openai_response_format(response_model)
+        elif json_mode:
+            request["response_format"] = {"type": "json_object"}
+        return request
+
+    def parse_response(self, response, latency_ms: int = 0) -> LLMResponse:
+        """Convert a ``ChatCompletion`` into an ``LLMResponse``."""
+        choice = response.choices[0]
+
+        input_tokens = 0
+        output_tokens = 0
+        if response.usage is not None:
+            input_tokens = response.usage.prompt_tokens
+            output_tokens = response.usage.completion_tokens
+
+        return LLMResponse(
+            content=choice.message.content or "",
+            model=response.model or self._model,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            finish_reason=choice.finish_reason or "",
+            latency_ms=latency_ms,
         )
 
+    @property
+    def provider(self) -> str:
+        """Provider label used in call logs."""
+        return "azure_openai"
+
     def get_model_name(self) -> str:
         """Return the model name being used."""
         return f"{self._model} (azure_openai)"
 
-    async def _call_with_retry(
-        self,
-        messages: list[dict],
-        temperature: float,
-        max_tokens: int,
-        **kwargs,
-    ) -> LLMResponse:
+    async def _call_with_retry(self, request: dict) -> LLMResponse:
         """Call the Azure OpenAI API with exponential backoff retries."""
         last_exception: Exception | None = None
 
-        # Extract prompts for logging
-        system_prompt = ""
-        user_prompt = ""
-        images: list = []
-        for msg in messages:
-            if msg["role"] == "system":
-                system_prompt = msg["content"] if isinstance(msg["content"], str) else str(msg["content"])
-            elif msg["role"] == "user":
-                if isinstance(msg["content"], str):
-                    user_prompt = msg["content"]
-                elif isinstance(msg["content"], list):
-                    for item in msg["content"]:
-                        if item.get("type") == "text":
-                            user_prompt = item.get("text", "")
-                        elif item.get("type") == "image_url":
-                            images.append(item)
-
         # Start logging
         call_logger = get_logger()
+        record = None
         if call_logger:
             from .call_logger import get_current_stage
-            call_logger.start_call(
+            system_prompt, user_prompt, images = request_log_fields(request)
+            record = call_logger.start_call(
                 stage=get_current_stage(),
                 model=self._model,
                 provider="azure_openai",
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 images=images,
-                temperature=temperature,
-                max_tokens=max_tokens,
+                temperature=request["temperature"],
+                max_tokens=request["max_tokens"],
             )
 
-        for attempt in range(MAX_RETRIES + 1):
+        for attempt in range(self._max_retries + 1):
             try:
                 start = time.monotonic()
-                response = await self._client.chat.completions.create(
-                    model=self._model,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    **kwargs,
-                )
+                response = await self._client.chat.completions.create(**request)
                 elapsed_ms = int((time.monotonic() - start) * 1000)
 
-                choice = response.choices[0]
-                content_text = choice.message.content or ""
-
-                input_tokens = 0
-                output_tokens = 0
-                if response.usage is not None:
-                    input_tokens = response.usage.prompt_tokens
-                    output_tokens = response.usage.completion_tokens
+                result = self.parse_response(response, elapsed_ms)
 
                 # Log successful call
                 if call_logger:
                     call_logger.end_call(
-                        response_content=content_text,
-                        input_tokens=input_tokens,
-                        output_tokens=output_tokens,
+                        record,
+                        response_content=result.content,
+                        input_tokens=result.input_tokens,
+                        output_tokens=result.output_tokens,
                     )
 
-                return LLMResponse(
-                    content=content_text,
-                    model=response.model or self._model,
-                    input_tokens=input_tokens,
-                    output_tokens=output_tokens,
-                    finish_reason=choice.finish_reason or "",
-                    latency_ms=elapsed_ms,
-                )
+                return result
 
             except RETRYABLE_EXCEPTIONS as exc:
                 last_exception = exc
-                if attempt < MAX_RETRIES:
+                if attempt < self._max_retries:
                     delay = RETRY_DELAYS[attempt]
                     logger.warning(
                         "azure_openai_api_retry",
@@ -221,12 +252,12 @@ class OpenAIClient(LLMClient):
                 else:
                     logger.error(
                         "azure_openai_api_exhausted_retries",
-                        attempts=MAX_RETRIES + 1,
+                        attempts=self._max_retries + 1,
                         error=str(exc),
                         model=self._model,
                     )
                     # Log failed call
                     if call_logger:
-                        call_logger.end_call(error_message=str(exc))
+                        call_logger.end_call(record, error_message=str(exc))
 
         raise last_exception  # type: ignore[misc]
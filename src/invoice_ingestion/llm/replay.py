@@ -0,0 +1,227 @@
+"""Record/replay LLM client for offline, deterministic pipeline runs.
+
+In *record* mode ``ReplayLLMClient`` forwards every call to a real client and
+stores the response, token usage and latency in a cassette file, keyed by a
+hash of the request.  In *replay* mode it answers from the cassette without
+any network access, optionally sleeping for a simulated latency, so
+``ExtractionPipeline.process`` can be benchmarked and regression-tested on a
+machine with no Azure credentials.
+
+Request keys cover the model, both prompts, the page image hashes and the
+response model.  ``max_tokens`` and ``temperature`` are left out: budgets are
+sized adaptively from call history and would otherwise make every replay a
+miss.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import os
+import random
+import tempfile
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+import orjson
+import structlog
+from pydantic import BaseModel
+
+from .base import LLMClient, LLMResponse
+
+logger = structlog.get_logger(__name__)
+
+CASSETTE_VERSION = 1
+
+LATENCY_MODES = ("none", "recorded", "lognormal")
+
+
+class CassetteMissError(LookupError):
+    """Replay found no recorded response for a request."""
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def request_key(
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    images: list[str] | None,
+    response_model: type[BaseModel] | None,
+) -> tuple[str, dict]:
+    """Return ``(key, fingerprint)`` identifying a request in a cassette."""
+    fingerprint = {
+        "model": model,
+        "system_prompt_hash": _sha256(system_prompt),
+        "user_prompt_hash": _sha256(user_prompt),
+        "image_hashes": [_sha256(image) for image in images or []],
+        "response_model": response_model.__name__ if response_model else None,
+    }
+    return _sha256(orjson.dumps(fingerprint, option=orjson.OPT_SORT_KEYS).decode()), fingerprint
+
+
+class Cassette:
+    """Recorded responses, persisted as one JSON file.
+
+    Identical requests may be recorded several times (e.g. the same invoice
+    processed twice); replay cycles through the recordings in order.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.entries: dict[str, list[dict]] = {}
+        self._cursor: dict[str, int] = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: str | Path) -> Cassette:
+        cassette = cls(path)
+        if cassette.path.exists():
+            data = orjson.loads(cassette.path.read_bytes())
+            if data.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version in {path}: {data.get('version')}")
+            cassette.entries = data.get("entries", {})
+        return cassette
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.entries.values())
+
+    def add(self, key: str, fingerprint: dict, response: LLMResponse) -> None:
+        self.entries.setdefault(key, []).append({
+            **fingerprint,
+            "response": response.model_dump(),
+            "recorded_at": datetime.now(UTC).isoformat(),
+        })
+        self._dirty = True
+
+    def next(self, key: str) -> dict | None:
+        recordings = self.entries.get(key)
+        if not recordings:
+            return None
+        index = self._cursor.get(key, 0)
+        self._cursor[key] = index + 1
+        return recordings[index % len(recordings)]
+
+    def save(self) -> None:
+        """Write the cassette atomically (no-op when nothing was recorded)."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = orjson.dumps(
+            {"version": CASSETTE_VERSION, "entries": self.entries},
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS,
+        )
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, self.path)
+        self._dirty = False
+        logger.info("cassette_saved", path=str(self.path), recordings=len(self))
+
+
+class ReplayLLMClient(LLMClient):
+    """Records calls made through *inner*, or replays them when *inner* is None.
+
+    ``latency`` controls replay timing: ``"none"`` returns immediately,
+    ``"recorded"`` sleeps for the recorded latency, and ``"lognormal"`` draws
+    from a log-normal distribution centred on the recorded latency with
+    shape ``latency_sigma`` (seeded, so runs are reproducible).
+    """
+
+    def __init__(
+        self,
+        model: str,
+        cassette: Cassette,
+        inner: LLMClient | None = None,
+        *,
+        latency: str = "none",
+        latency_sigma: float = 0.35,
+        seed: int = 0,
+    ):
+        if latency not in LATENCY_MODES:
+            raise ValueError(f"latency must be one of {LATENCY_MODES}, got {latency!r}")
+        self._model = model
+        self._cassette = cassette
+        self._inner = inner
+        self._latency = latency
+        self._sigma = latency_sigma
+        self._rng = random.Random(seed)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def recording(self) -> bool:
+        return self._inner is not None
+
+    async def complete_text(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+        json_mode: bool = False,
+        response_model: type[BaseModel] | None = None,
+    ) -> LLMResponse:
+        key, fingerprint = request_key(self._model, system_prompt, user_prompt, None, response_model)
+        if self._inner is not None:
+            response = await self._inner.complete_text(
+                system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens,
+                json_mode=json_mode, response_model=response_model,
+            )
+            self._cassette.add(key, fingerprint, response)
+            return response
+        return await self._replay(key)
+
+    async def complete_vision(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        images: list[str],
+        *,
+        temperature: float = 0.0,
+        max_tokens: int = 8192,
+        json_mode: bool = False,
+        response_model: type[BaseModel] | None = None,
+    ) -> LLMResponse:
+        key, fingerprint = request_key(self._model, system_prompt, user_prompt, images, response_model)
+        if self._inner is not None:
+            response = await self._inner.complete_vision(
+                system_prompt, user_prompt, images, temperature=temperature, max_tokens=max_tokens,
+                json_mode=json_mode, response_model=response_model,
+            )
+            self._cassette.add(key, fingerprint, response)
+            return response
+        return await self._replay(key)
+
+    def get_model_name(self) -> str:
+        if self._inner is not None:
+            return self._inner.get_model_name()
+        return f"{self._model} (replay)"
+
+    async def _replay(self, key: str) -> LLMResponse:
+        entry = self._cassette.next(key)
+        if entry is None:
+            self.misses += 1
+            raise CassetteMissError(f"No recording for {self._model} request {key[:12]}")
+        self.hits += 1
+
+        response = LLMResponse(**entry["response"])
+        delay_ms = self._delay_ms(response.latency_ms)
+        if delay_ms > 0:
+            start = time.monotonic()
+            await asyncio.sleep(delay_ms / 1000)
+            response.latency_ms = int((time.monotonic() - start) * 1000)
+        else:
+            response.latency_ms = 0
+        return response
+
+    def _delay_ms(self, recorded_ms: int) -> float:
+        if self._latency == "none" or recorded_ms <= 0:
+            return 0.0
+        if self._latency == "recorded":
+            return float(recorded_ms)
+        return self._rng.lognormvariate(math.log(recorded_ms), self._sigma)
@@ -1,40 +1,110 @@
 """Extract JSON from LLM responses."""
 from __future__ import annotations
-import json
 import re
+import time
+from collections import Counter
 
+import orjson
+import structlog
 
-def extract_json_from_response(text: str) -> dict:
-    """Extract JSON from LLM response text.
+logger = structlog.get_logger(__name__)
+
+# Strategy names, in the order they are attempted
+STRATEGIES = ("direct", "fenced_block", "brace_slice")
+
+_FENCED_BLOCK = re.compile(r'```(?:json)?\s*\n(.*?)\n\s*```', re.DOTALL)
+
+
+class ParseStats:
+    """Process-wide counters for which extraction strategy succeeded.
+
+    With native structured output every response should parse on the first
+    strategy; anything else is a provider or prompt regression worth seeing.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.by_strategy: Counter[str] = Counter()
+        self.failures = 0
+        self.total_ns = 0
+
+    def record(self, strategy: str | None, elapsed_ns: int) -> None:
+        if strategy is None:
+            self.failures += 1
+        else:
+            self.by_strategy[strategy] += 1
+        self.total_ns += elapsed_ns
+
+    def snapshot(self) -> dict:
+        parsed = sum(self.by_strategy.values())
+        total = parsed + self.failures
+        return {
+            "total": total,
+            "by_strategy": {s: self.by_strategy.get(s, 0) for s in STRATEGIES},
+            "failures": self.failures,
+            "failure_rate": round(self.failures / total, 4) if total else 0.0,
+            "fallback_rate": round((parsed - self.by_strategy.get("direct", 0)) / total, 4) if total else 0.0,
+            "mean_parse_ms": round(self.total_ns / total / 1e6, 4) if total else 0.0,
+        }
+
+
+parse_stats = ParseStats()
+
+
+def _try_loads(text: str) -> dict | None:
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return None
+
+
+def find_json(text: str) -> tuple[dict | None, str | None]:
+    """Parse the JSON in LLM response *text* without recording stats or logging.
 
     Strategies in order:
     1. Direct JSON parse of entire text
     2. Find ```json ... ``` block
     3. Find first { to last }
+
+    Returns the result and the strategy that produced it, both None when
+    nothing parses.
     """
     text = text.strip()
 
     # Strategy 1: direct parse
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
+    result = _try_loads(text)
+    strategy = "direct" if result is not None else None
 
     # Strategy 2: ```json block
-    json_block = re.search(r'```(?:json)?\s*\n(.*?)\n\s*```', text, re.DOTALL)
-    if json_block:
-        try:
-            return json.loads(json_block.group(1))
-        except json.JSONDecodeError:
-            pass
+    if result is None:
+        json_block = _FENCED_BLOCK.search(text)
+        if json_block:
+            result = _try_loads(json_block.group(1))
+            strategy = "fenced_block" if result is not None else None
 
     # Strategy 3: first { to last }
-    first_brace = text.find('{')
-    last_brace = text.rfind('}')
-    if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-        try:
-            return json.loads(text[first_brace:last_brace + 1])
-        except json.JSONDecodeError:
-            pass
-
-    raise ValueError(f"Could not extract JSON from response: {text[:200]}...")
+    if result is None:
+        first_brace = text.find('{')
+        last_brace = text.rfind('}')
+        if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
+            result = _try_loads(text[first_brace:last_brace + 1])
+            strategy = "brace_slice" if result is not None else None
+
+    return result, strategy
+
+
+def extract_json_from_response(text: str) -> dict:
+    """Extract JSON from LLM response text (see ``find_json``)."""
+    start = time.perf_counter_ns()
+    text = text.strip()
+    result, strategy = find_json(text)
+    parse_stats.record(strategy, time.perf_counter_ns() - start)
+
+    if result is None:
+        logger.warning("json_parse_failed", response_length=len(text))
+        raise ValueError(f"Could not extract JSON from response: {text[:200]}...")
+    if strategy != "direct":
+        logger.info("json_parse_fallback", strategy=strategy, response_length=len(text))
+    return result
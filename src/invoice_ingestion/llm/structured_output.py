@@ -0,0 +1,79 @@
+"""Provider-native structured output from Pydantic response models.
+
+Each pass declares the Pydantic model its response must match.  The model's
+JSON schema is sent to the provider — as a forced tool call for Anthropic and
+as a ``json_schema`` response format for Azure OpenAI — so the completion is
+constrained to JSON instead of being scraped out of free text afterwards.
+"""
+from __future__ import annotations
+
+import copy
+import re
+from functools import cache
+
+from pydantic import BaseModel
+
+# Tool and schema names must match ^[a-zA-Z0-9_-]{1,64}$ on both providers.
+_NAME_PATTERN = re.compile(r"[^a-zA-Z0-9_-]")
+
+
+def schema_name(model: type[BaseModel]) -> str:
+    """Return the tool / schema name used for *model*."""
+    return _NAME_PATTERN.sub("_", model.__name__)[:64]
+
+
+def _inline_refs(node, defs: dict):
+    """Recursively replace ``$ref`` pointers with their definitions."""
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#/$defs/"):
+            target = copy.deepcopy(defs[ref.split("/")[-1]])
+            # Sibling keys (e.g. "description", "default") override the target
+            target.update({k: v for k, v in node.items() if k != "$ref"})
+            return _inline_refs(target, defs)
+        return {k: _inline_refs(v, defs) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_inline_refs(item, defs) for item in node]
+    return node
+
+
+@cache
+def _cached_schema(model: type[BaseModel]) -> dict:
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+    schema = _inline_refs(schema, defs)
+    schema.pop("title", None)
+    return schema
+
+
+def response_schema(model: type[BaseModel]) -> dict:
+    """Return a self-contained JSON schema for *model* (no ``$defs``)."""
+    return copy.deepcopy(_cached_schema(model))
+
+
+def anthropic_tool(model: type[BaseModel]) -> tuple[dict, dict]:
+    """Return ``(tools entry, tool_choice)`` forcing a call that matches *model*."""
+    name = schema_name(model)
+    tool = {
+        "name": name,
+        "description": (model.__doc__ or f"Return the {name} result.").strip().splitlines()[0],
+        "input_schema": response_schema(model),
+    }
+    return tool, {"type": "tool", "name": name}
+
+
+def openai_response_format(model: type[BaseModel]) -> dict:
+    """Return a Chat Completions ``response_format`` constraining output to *model*.
+
+    ``strict`` is left off: strict mode requires every property to be listed
+    as required and forbids open objects, which the extraction models rely on
+    for provider-specific fields.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": schema_name(model),
+            "schema": response_schema(model),
+            "strict": False,
+        },
+    }
@@ -0,0 +1,140 @@
+"""Adaptive ``max_tokens`` sizing per pipeline pass.
+
+Providers reserve the full ``max_tokens`` against the deployment's TPM quota
+when a request is admitted, so asking for 8192 output tokens on a one-page
+residential bill wastes quota that another invoice could have used.  Budgets
+are predicted from classification signals (line items, meters, pages) and,
+when available, from the output tokens previously observed for the same
+format fingerprint in ``llm_calls``.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import structlog
+
+from ..models.internal import ClassificationResult
+
+logger = structlog.get_logger(__name__)
+
+# Hard upper bound when no setting overrides it.  Both Claude Sonnet and
+# GPT-4o accept at least 16K output tokens.
+DEFAULT_MAX_OUTPUT_TOKENS = 16384
+
+# Headroom applied on top of the heuristic estimate and the observed history.
+HEURISTIC_HEADROOM = 1.5
+HISTORY_HEADROOM = 1.25
+
+# Minimum number of historical calls before history replaces the heuristic's headroom.
+MIN_HISTORY_SAMPLES = 3
+
+# Budgets are rounded up to this granularity to keep request shapes stable.
+ROUNDING = 512
+
+
+@dataclass(frozen=True)
+class StageBudget:
+    """Per-stage output token model: ``base + sum(unit_cost * units)``."""
+
+    base: int
+    per_line_item: int = 0
+    per_meter: int = 0
+    per_page: int = 0
+    per_question: int = 0
+    floor: int = 1024
+    # Fixed value used when adaptive sizing is disabled
+    default: int = 8192
+
+
+STAGE_BUDGETS: dict[str, StageBudget] = {
+    "pass1_combined": StageBudget(
+        base=1500, per_line_item=280, per_meter=650, per_page=60, floor=2048, default=8192,
+    ),
+    "pass1a_extraction": StageBudget(base=700, per_meter=450, per_page=60, floor=1536, default=8192),
+    "pass1b_extraction": StageBudget(base=600, per_line_item=190, per_page=40, floor=1536, default=8192),
+    "pass2_schema_mapping": StageBudget(
+        base=1200, per_line_item=230, per_meter=450, per_page=20, floor=2048, default=8192,
+    ),
+    "pass4_audit": StageBudget(base=250, per_question=130, floor=1024, default=4096),
+}
+
+
+def estimate_meter_count(classification: ClassificationResult) -> int:
+    """Guess the meter count before Pass 1A has run."""
+    if "multi_meter" in classification.complexity_signals:
+        return 3
+    return 1
+
+
+def estimate_max_tokens(
+    stage: str,
+    classification: ClassificationResult,
+    page_count: int,
+    *,
+    meter_count: int | None = None,
+    question_count: int = 0,
+    history: list[tuple[int, int | None]] | None = None,
+    ceiling: int = DEFAULT_MAX_OUTPUT_TOKENS,
+) -> int:
+    """Predict the ``max_tokens`` to request for *stage*.
+
+    *history* holds ``(output_tokens, max_tokens)`` pairs from earlier calls
+    for the same stage and format fingerprint.  With enough samples the
+    largest observation (plus headroom) replaces the heuristic's headroom,
+    but never goes below the heuristic estimate for this invoice: a bill
+    with more line items than the format's past bills needs more tokens
+    than they did.  History is ignored when one of those calls hit its cap
+    — a truncated response says nothing about how long the full answer
+    would have been, so the heuristic is kept and allowed to grow to the
+    ceiling.
+    """
+    budget = STAGE_BUDGETS.get(stage)
+    if budget is None:
+        return min(8192, ceiling)
+
+    if meter_count is None:
+        meter_count = estimate_meter_count(classification)
+
+    estimate = (
+        budget.base
+        + budget.per_line_item * max(classification.estimated_line_item_count, 0)
+        + budget.per_meter * max(meter_count, 1)
+        + budget.per_page * max(page_count, 1)
+        + budget.per_question * max(question_count, 0)
+    )
+    tokens = estimate * HEURISTIC_HEADROOM
+    source = "heuristic"
+
+    if history and len(history) >= MIN_HISTORY_SAMPLES:
+        truncated = any(cap is not None and out >= cap for out, cap in history)
+        if not truncated:
+            tokens = max(max(out for out, _ in history) * HISTORY_HEADROOM, estimate)
+            source = "history"
+
+    result = int(math.ceil(tokens / ROUNDING) * ROUNDING)
+    result = max(budget.floor, min(result, ceiling))
+
+    logger.debug("max_tokens_estimated", stage=stage, max_tokens=result, source=source)
+    return result
+
+
+async def load_output_token_history(format_fingerprint: str) -> dict[str, list[tuple[int, int | None]]]:
+    """Load recent ``(output_tokens, max_tokens)`` per stage for a fingerprint.
+
+    Returns an empty mapping for unknown fingerprints or when the database
+    is unavailable — sizing then falls back to the heuristic.
+    """
+    if not format_fingerprint or format_fingerprint == "unknown":
+        return {}
+
+    from ..storage.database import AsyncSessionLocal
+    from ..storage.repositories import LLMCallRepo
+
+    try:
+        async with AsyncSessionLocal() as session:
+            repo = LLMCallRepo(session)
+            return await repo.get_output_token_history(format_fingerprint, stages=list(STAGE_BUDGETS))
+    except Exception as e:
+        logger.warning("output_token_history_unavailable", error=str(e))
+        return {}
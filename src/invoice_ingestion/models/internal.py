@@ -74,6 +74,30 @@ class ClassificationResult(BaseModel):
     date_format: str | None = None
 
 
+class ClassificationResponse(BaseModel):
+    """Raw Pass 0.5 model output, before complexity scoring.
+
+    Used as the structured-output schema for the classification call; the
+    routing fields of ``ClassificationResult`` are derived from it locally.
+    """
+
+    commodity_type: CommodityType
+    commodity_confidence: float = 0.5
+    market_type: MarketModel = MarketModel.UNKNOWN
+    complexity_signals: list[str] = Field(default_factory=list)
+    estimated_line_item_count: int = 0
+    language: str = "en"
+    format_fingerprint: str = "unknown"
+    country_code: str | None = None
+    number_format: str | None = None
+    date_format: str | None = None
+    has_vat: bool = False
+    has_multiple_vat_rates: bool = False
+    has_calorific_conversion: bool = False
+    has_contracted_capacity: bool = False
+    has_structured_data: bool = False
+
+
 # ---------------------------------------------------------------------------
 # Pass 1A – Structure & Metering Extraction
 # ---------------------------------------------------------------------------
@@ -110,6 +134,17 @@ class Pass2Result(BaseModel):
     data: dict = Field(default_factory=dict)
 
 
+class MappedExtraction(BaseModel):
+    """Shape of the Pass 2 model output (the merged, normalised extraction)."""
+
+    invoice: dict = Field(default_factory=dict)
+    account: dict = Field(default_factory=dict)
+    meters: list[dict] = Field(default_factory=list)
+    charges: list[dict] = Field(default_factory=list)
+    totals: dict = Field(default_factory=dict)
+    traceability: list[dict] = Field(default_factory=list)
+
+
 # ---------------------------------------------------------------------------
 # Pass 3 – Validation
 # ---------------------------------------------------------------------------
@@ -147,6 +182,24 @@ class AuditQuestion(BaseModel):
     field_to_check: str | None = None
 
 
+class AuditAnswer(BaseModel):
+    """A single answer returned by the audit model."""
+
+    question_id: str | None = None
+    field_checked: str
+    answer_value: str | None = None
+    answer_raw_string: str | None = None
+    found_on: str | None = None
+    confidence: float = 0.0
+    notes: str | None = None
+
+
+class AuditResponse(BaseModel):
+    """Shape of the Pass 4 model output."""
+
+    audit_answers: list[AuditAnswer] = Field(default_factory=list)
+
+
 class Pass4Result(BaseModel):
     """Output of the independent audit pass (Pass 4)."""
 
@@ -154,4 +207,6 @@ class Pass4Result(BaseModel):
     fields_checked: int = 0
     fields_matched: int = 0
     mismatches: list[dict] = Field(default_factory=list)
+    # Flattened answers by field checked, kept to re-score against a new extraction
+    answers: dict = Field(default_factory=dict)
     audit_model: str = ""
@@ -193,6 +193,22 @@ class LocaleContext(BaseModel):
     market_model: MarketModel = MarketModel.UNKNOWN
 
 
+class LLMUsage(BaseModel):
+    """LLM calls and tokens spent on one extraction."""
+
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+class StageTiming(BaseModel):
+    """When a pipeline stage ran, in ms from the start of the run."""
+
+    start_ms: int
+    end_ms: int
+    status: str = "ok"  # ok, fallback, timeout
+
+
 class ExtractionMetadata(BaseModel):
     """Metadata for a single extraction run."""
 
@@ -208,6 +224,10 @@ class ExtractionMetadata(BaseModel):
     processing_time_ms: int = 0
     source_document: SourceDocument = Field(default_factory=lambda: SourceDocument(file_hash="", file_type="unknown", page_count=0))
     locale_context: LocaleContext | None = None
+    # Stage start/end times and the chain of stages that set the latency
+    stage_timings: dict[str, StageTiming] = Field(default_factory=dict)
+    critical_path: list[str] = Field(default_factory=list)
+    llm_usage: LLMUsage = Field(default_factory=LLMUsage)
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,226 @@
+"""Audit policy: whether to run Pass 4, which questions to ask, which pages to send.
+
+The audit exists to catch extraction errors that the extraction's own
+confidence and Pass 3 validation do not show.  With the policy on, Pass 4
+waits for Pass 3 and ``plan_audit`` decides per invoice:
+
+- skip when the invoice is certain to go to ``full_review`` without the
+  audit: audit mismatches can only lower the confidence score, so the
+  pre-audit tier already decides the outcome;
+- ask every question when validation did not run, when the invoice's
+  format has a poor review record, or when the invoice is not simple and
+  its format has no good review record;
+- otherwise ask only the questions about uncertain fields (a Pass 3 issue
+  in the same section, confidence below the minimum, or nothing to judge
+  by) and skip the audit when none remain.
+
+Only the pages the asked fields were extracted from are sent (plus page
+1), or all pages when the extraction does not say.
+
+A sample of the skipped invoices is audited anyway (``shadow_rate``) to
+measure what skipping costs; the shadow audit does not change how the
+invoice is scored.  ``audit_policy_stats`` reports the audit
+calls avoided and the share of shadow-audited skips whose confidence tier
+the audit changed.
+"""
+from __future__ import annotations
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+import structlog
+
+from ..models.confidence import compute_confidence, iter_field_confidences
+from ..models.internal import AuditQuestion, ClassificationResult, Pass3Result
+from ..models.schema import ComplexityTier, ConfidenceTier
+
+logger = structlog.get_logger(__name__)
+
+_INDEX = re.compile(r"\[\d+\]")
+_PAGE = re.compile(r"page\s*(\d+)", re.IGNORECASE)
+
+
+@dataclass
+class AuditPlan:
+    """What Pass 4 does for one invoice."""
+
+    run: bool
+    reason: str
+    questions: list[AuditQuestion] = field(default_factory=list)
+    pages: list[int] | None = None  # 1-based; None sends every page
+
+
+def pre_audit_tier(extraction: dict) -> ConfidenceTier:
+    """The confidence tier the extraction gets if no audit mismatch is found."""
+    return compute_confidence(
+        extraction=extraction,
+        validation={"math_results": {}, "line_dispositions": []},
+        audit={},
+    ).tier
+
+
+def format_accuracy(review_history: list[bool]) -> float | None:
+    """Share of reviewed invoices of the format approved without corrections."""
+    return sum(review_history) / len(review_history) if review_history else None
+
+
+def _section(path: str) -> str:
+    return path.split(".", 1)[0]
+
+
+def field_confidence(extraction: dict, field_to_check: str) -> float | None:
+    """Lowest confidence among the fields a question checks, or None if none carry one."""
+    section, _, leaf = field_to_check.partition(".")
+    paths = [(_INDEX.sub("", path), confidence) for path, confidence in iter_field_confidences(extraction)]
+    in_section = [(path, confidence) for path, confidence in paths if _section(path) == section]
+    matching = [confidence for path, confidence in in_section if leaf and leaf in path] \
+        or [confidence for _, confidence in in_section]
+    return min(matching) if matching else None
+
+
+def _uncertain(question: AuditQuestion, extraction: dict, issue_sections: set[str], min_confidence: float) -> bool:
+    checked = question.field_to_check or ""
+    if _section(checked) in issue_sections:
+        return True
+    confidence = field_confidence(extraction, checked)
+    return confidence is None or confidence < min_confidence
+
+
+def source_pages(extraction: dict, sections: set[str]) -> set[int]:
+    """Pages named in the ``source_location`` of fields in *sections*."""
+    pages: set[int] = set()
+
+    def walk(obj) -> None:
+        if isinstance(obj, dict):
+            location = obj.get("source_location")
+            if isinstance(location, str):
+                pages.update(int(page) for page in _PAGE.findall(location))
+            for value in obj.values():
+                walk(value)
+        elif isinstance(obj, list):
+            for item in obj:
+                walk(item)
+
+    for section in sections:
+        walk(extraction.get(section))
+    return pages
+
+
+def plan_audit(
+    classification: ClassificationResult,
+    questions: list[AuditQuestion],
+    extraction: dict,
+    pass3: Pass3Result | None,
+    page_count: int,
+    review_history: list[bool] | None = None,
+    *,
+    min_field_confidence: float = 0.95,
+    min_format_accuracy: float = 0.95,
+    min_format_history: int = 10,
+) -> AuditPlan:
+    """Decide the audit for one invoice; see the module docstring.
+
+    *questions* is the full set from ``build_audit_questions`` and
+    *review_history* the review outcomes of earlier invoices of the same
+    format (True: approved without corrections).
+    """
+    if pre_audit_tier(extraction) == ConfidenceTier.FULL_REVIEW:
+        return AuditPlan(run=False, reason="full_review_certain")
+    if pass3 is None:
+        return AuditPlan(run=True, reason="no_validation", questions=list(questions))
+
+    history = review_history or []
+    accuracy = format_accuracy(history)
+    trusted_format = len(history) >= min_format_history and accuracy >= min_format_accuracy
+    poor_format = len(history) >= min_format_history and accuracy < min_format_accuracy
+    simple = classification.complexity_tier == ComplexityTier.SIMPLE
+    if poor_format or not (simple or trusted_format):
+        selected, reason = list(questions), "poor_format" if poor_format else "untrusted_format"
+    else:
+        issue_sections = {_section(issue.field) for issue in pass3.issues if issue.severity in ("fatal", "warning")}
+        selected = [q for q in questions if _uncertain(q, extraction, issue_sections, min_field_confidence)]
+        if not selected:
+            return AuditPlan(run=False, reason="clean")
+        reason = "uncertain_fields"
+
+    pages = source_pages(extraction, {_section(q.field_to_check or "") for q in selected})
+    pages = {page for page in pages if 1 <= page <= page_count}
+    return AuditPlan(
+        run=True,
+        reason=reason,
+        questions=selected,
+        pages=sorted(pages | {1}) if pages else None,
+    )
+
+
+class AuditPolicyStats:
+    """Process-wide counters for audit policy decisions."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.decisions: Counter[str] = Counter()
+        self.audited = 0
+        self.skipped = 0
+        self.questions_asked = 0
+        self.questions_available = 0
+        self.pages_sent = 0
+        self.pages_available = 0
+        self.shadow_audits = 0
+        self.shadow_tier_changes = 0
+
+    def record(self, plan: AuditPlan, question_count: int, page_count: int) -> None:
+        """*question_count*/*page_count*: what an unconditional audit would have used."""
+        self.decisions[plan.reason] += 1
+        if not plan.run:
+            self.skipped += 1
+            return
+        self.audited += 1
+        self.questions_asked += len(plan.questions)
+        self.questions_available += question_count
+        self.pages_sent += len(plan.pages) if plan.pages is not None else page_count
+        self.pages_available += page_count
+
+    def record_shadow(self, tier_changed: bool) -> None:
+        """A skipped invoice audited anyway; *tier_changed* if the audit changed its tier."""
+        self.shadow_audits += 1
+        self.shadow_tier_changes += tier_changed
+
+    def snapshot(self) -> dict:
+        decided = self.audited + self.skipped
+        return {
+            "decisions": decided,
+            "audited": self.audited,
+            "skipped": self.skipped,
+            "calls_avoided": self.skipped - self.shadow_audits,
+            "skip_rate": round(self.skipped / decided, 4) if decided else 0.0,
+            "by_reason": dict(self.decisions),
+            "question_share": round(self.questions_asked / self.questions_available, 4)
+            if self.questions_available else 0.0,
+            "page_share": round(self.pages_sent / self.pages_available, 4) if self.pages_available else 0.0,
+            "shadow_audits": self.shadow_audits,
+            # Share of shadow-audited skips whose tier the audit would have changed
+            "accuracy_delta": round(self.shadow_tier_changes / self.shadow_audits, 4)
+            if self.shadow_audits else 0.0,
+        }
+
+
+audit_policy_stats = AuditPolicyStats()
+
+
+async def load_review_history(format_fingerprint: str) -> list[bool]:
+    """Review outcomes of recent invoices of a format; empty when unknown or unavailable."""
+    if not format_fingerprint or format_fingerprint == "unknown":
+        return []
+
+    from ..storage.database import AsyncSessionLocal
+    from ..storage.repositories import ExtractionRepo
+
+    try:
+        async with AsyncSessionLocal() as session:
+            return await ExtractionRepo(session).get_review_history(format_fingerprint)
+    except Exception as e:
+        logger.warning("review_history_unavailable", error=str(e))
+        return []
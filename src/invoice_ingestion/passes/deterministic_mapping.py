@@ -0,0 +1,290 @@
+"""Deterministic schema mapping: the part of Pass 2 that needs no model.
+
+Most of what Pass 2 does is already known locally: unit names and
+conversions (``unit_conversion``), country charge taxonomies
+(``charge_taxonomies``) and the output enums.  ``map_deterministically``
+merges Pass 1A and 1B and maps every meter and charge it can map with
+certainty; the rest is returned as residue for a much smaller LLM call
+(``schema_mapping_residue`` prompt), or none at all when nothing remains.
+
+A charge is resolved when its category, section and owner were learned
+for this utility's description (``learning.charge_cache``) or come from the
+country taxonomy, or when Pass 1B's own classification uses valid values
+that agree with the section and ownership rules of the schema mapping
+prompt, and its description needs no translation.  A meter is resolved
+when its consumption converts to the canonical unit without guessing
+(no default calorific value or power factor).
+"""
+from __future__ import annotations
+
+import copy
+import re
+from dataclasses import dataclass, field
+
+from ..international.charge_taxonomies import lookup_charge
+from ..international.unit_conversion import convert_units, get_canonical_unit, normalize_unit_name
+from ..learning.charge_cache import normalize_description
+from ..models.internal import ClassificationResult, Pass1AResult, Pass1BResult
+from ..models.schema import AttributionType, ChargeCategory, ChargeOwner, ChargeSection, MarketModel
+
+_CATEGORIES = {c.value for c in ChargeCategory}
+_SECTIONS = {s.value for s in ChargeSection}
+_OWNERS = {o.value for o in ChargeOwner}
+_ATTRIBUTIONS = {a.value for a in AttributionType}
+# Categories that belong to the meter on a single-meter invoice
+_METERED_CATEGORIES = {ChargeCategory.ENERGY.value, ChargeCategory.DEMAND.value}
+# Markets where the supply section is billed by a supplier
+_COMPETITIVE_MARKETS = {MarketModel.DEREGULATED, MarketModel.LIBERALIZED_EU}
+# Countries whose canonical units are the US ones (therms, gallons)
+_US_UNIT_COUNTRIES = {None, "US", "CA"}
+# "Energy charge (Arbeitspreis)": translated, original kept in parentheses
+_TRANSLATED = re.compile(r"\(.+\)\s*$")
+
+
+@dataclass
+class DeterministicMapping:
+    """Merged extraction plus what still needs the model.
+
+    *data* holds every meter and charge; the residue entries are the raw
+    Pass 1A/1B versions, to be replaced by the model's mapping.
+    """
+
+    data: dict
+    residue_meters: list[int] = field(default_factory=list)
+    residue_charges: list[int] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return not self.residue_meters and not self.residue_charges
+
+
+def _value(field_):
+    return field_.get("value") if isinstance(field_, dict) else field_
+
+
+def _number(value) -> float | None:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _region(classification: ClassificationResult) -> str:
+    return "US" if classification.country_code in _US_UNIT_COUNTRIES else "EU"
+
+
+def _canonical_unit(unit: str, classification: ClassificationResult) -> str:
+    """The conversion-table name of *unit* (CCF of water is its own unit)."""
+    if unit == "CCF" and classification.commodity_type == "water":
+        return "CCF_water"
+    return unit
+
+
+def map_meter(meter: dict, classification: ClassificationResult) -> dict | None:
+    """Normalize a Pass 1A meter, or None when that takes judgement."""
+    consumption = meter.get("consumption") or {}
+    raw_value = _number(consumption.get("raw_value"))
+    if raw_value is None or not consumption.get("raw_unit"):
+        return None
+    raw_unit = normalize_unit_name(str(consumption["raw_unit"]).strip())
+    target = get_canonical_unit(classification.commodity_type, _region(classification))
+
+    value = raw_value
+    factors = meter.get("conversion_factors") or {}
+    calorific = _number(_value(factors.get("calorific_value")))
+    correction = _number(_value(factors.get("volume_correction_factor")))
+    if raw_unit == "m³" and target == "kWh" and correction:
+        value *= correction
+    try:
+        normalized = convert_units(
+            value, _canonical_unit(raw_unit, classification), _canonical_unit(target, classification),
+            calorific_value=calorific,
+        )
+    except ValueError:
+        return None
+
+    demand = meter.get("demand")
+    if demand:
+        demand_unit = normalize_unit_name(str(demand.get("unit") or ""))
+        if demand_unit != "kW" or _number(demand.get("value")) is None:
+            return None
+
+    mapped = copy.deepcopy(meter)
+    if demand:
+        mapped["demand"]["unit"] = "kW"
+    formula = "no conversion"
+    if raw_unit != target:
+        steps = [f"{raw_value:g} {raw_unit}"]
+        if value != raw_value:
+            steps.append(f"{correction:g} (volume correction)")
+        if raw_unit == "m³" and target == "kWh":
+            steps.append(f"{calorific:g} kWh/m³")
+        formula = " x ".join(steps) + f" = {normalized:g} {target}"
+    mapped["consumption"] = {
+        **consumption,
+        "raw_unit": raw_unit,
+        "normalized_value": round(normalized, 4),
+        "normalized_unit": target,
+        "normalization_formula": formula,
+    }
+    return mapped
+
+
+def _owner(section: str, classification: ClassificationResult) -> str:
+    if section == ChargeSection.TAXES:
+        return ChargeOwner.GOVERNMENT.value
+    if section == ChargeSection.SUPPLY and (
+        classification.has_supplier_split or classification.market_type in _COMPETITIVE_MARKETS
+    ):
+        return ChargeOwner.SUPPLIER.value
+    return ChargeOwner.UTILITY.value
+
+
+def _consistent(category: str, section: str, owner: str, classification: ClassificationResult) -> bool:
+    """Whether a Pass 1B classification already satisfies the mapping rules."""
+    if category not in _CATEGORIES or section not in _SECTIONS or owner not in _OWNERS:
+        return False
+    if category == ChargeCategory.TAX and section != ChargeSection.TAXES:
+        return False
+    if (owner == ChargeOwner.GOVERNMENT) != (section == ChargeSection.TAXES):
+        return False
+    if section == ChargeSection.SUPPLY and _owner(section, classification) == ChargeOwner.SUPPLIER:
+        return owner == ChargeOwner.SUPPLIER
+    return True
+
+
+def map_charge(
+    charge: dict,
+    classification: ClassificationResult,
+    meters: list[str],
+    billing_period: tuple | None,
+    known_charges: dict[str, dict] | None = None,
+) -> dict | None:
+    """Classify and complete a Pass 1B charge, or None when that takes judgement."""
+    description = _value(charge.get("description"))
+    amount = charge.get("amount")
+    if not description or not isinstance(amount, dict) or _number(amount.get("value")) is None:
+        return None
+    description = str(description)
+    english = (classification.language or "en").startswith("en")
+
+    mapped = copy.deepcopy(charge)
+    learned = (known_charges or {}).get(normalize_description(description))
+    entry = lookup_charge(classification.country_code or "", description)
+    if not english and not _TRANSLATED.search(description):
+        if entry is None:
+            return None
+        mapped["description"] = {
+            **(charge["description"] if isinstance(charge["description"], dict) else {}),
+            "value": f"{entry['translation']} ({description})",
+        }
+    if learned is not None:
+        for name in ("category", "charge_section", "charge_owner"):
+            mapped[name] = learned[name]
+    elif entry is not None:
+        mapped["category"] = entry["category"]
+        mapped["charge_section"] = entry["section"]
+        mapped["charge_owner"] = _owner(entry["section"], classification)
+    elif not _consistent(
+        charge.get("category"), charge.get("charge_section"), charge.get("charge_owner"), classification,
+    ):
+        return None
+
+    if charge.get("quantity_unit"):
+        mapped["quantity_unit"] = normalize_unit_name(str(charge["quantity_unit"]).strip())
+
+    period = charge.get("charge_period")
+    if period and (period.get("start") or period.get("end")):
+        if not (period.get("start") and period.get("end")):
+            return None
+        if period.get("attribution_type", "current") not in _ATTRIBUTIONS:
+            return None
+    elif billing_period:
+        mapped["charge_period"] = {
+            **(period or {}),
+            "start": billing_period[0],
+            "end": billing_period[1],
+            "attribution_type": (period or {}).get("attribution_type")
+                                or (learned or {}).get("attribution_type") or AttributionType.CURRENT.value,
+        }
+
+    meter = charge.get("applies_to_meter")
+    if meter:
+        if str(meter) not in meters:
+            return None
+    elif len(meters) == 1 and mapped["category"] in _METERED_CATEGORIES:
+        mapped["applies_to_meter"] = meters[0]
+    return mapped
+
+
+def map_deterministically(
+    classification: ClassificationResult,
+    pass1a: Pass1AResult,
+    pass1b: Pass1BResult | None,
+    known_charges: dict[str, dict] | None = None,
+) -> DeterministicMapping:
+    """Merge Pass 1A and 1B, mapping what needs no model; see the module docstring.
+
+    *known_charges* maps normalized descriptions to the classification
+    learned for this utility (``ChargeClassificationCache.for_utility``);
+    a known description is classified from it before the taxonomy.
+    """
+    billing = pass1a.invoice.get("billing_period") or {}
+    start, end = _value(billing.get("start")), _value(billing.get("end"))
+    billing_period = (start, end) if start and end else None
+    meter_numbers = [str(_value(m.get("meter_number"))) for m in pass1a.meters if _value(m.get("meter_number"))]
+
+    meters: list[dict] = []
+    residue_meters: list[int] = []
+    for index, meter in enumerate(pass1a.meters):
+        mapped = map_meter(meter, classification)
+        if mapped is None:
+            residue_meters.append(index)
+        meters.append(mapped or meter)
+
+    charges: list[dict] = []
+    residue_charges: list[int] = []
+    for index, charge in enumerate(pass1b.charges if pass1b else []):
+        # The residue is matched back to its charge by line_id
+        charge = {**charge, "line_id": charge.get("line_id") or f"L{index + 1:03d}"}
+        mapped = map_charge(charge, classification, meter_numbers, billing_period, known_charges)
+        if mapped is None:
+            residue_charges.append(index)
+        charges.append(mapped or charge)
+
+    data = {
+        "invoice": pass1a.invoice,
+        "account": pass1a.account,
+        "meters": meters,
+        "charges": charges,
+        "totals": pass1b.totals if pass1b else {},
+        "traceability": [],
+    }
+    return DeterministicMapping(data, residue_meters, residue_charges)
+
+
+def merge_residue(mapping: DeterministicMapping, mapped: dict) -> list[str]:
+    """Put the model's mapping of the residue into *mapping.data*.
+
+    Charges are matched by line_id, meters by position (or meter number
+    when the model returned a different count).  Returns the line ids of
+    residue charges the model left out; those keep their raw version.
+    """
+    data = mapping.data
+    returned_meters = mapped.get("meters") or []
+    if len(returned_meters) == len(mapping.residue_meters):
+        for index, meter in zip(mapping.residue_meters, returned_meters):
+            data["meters"][index] = meter
+    else:
+        by_number = {str(_value(m.get("meter_number"))): m for m in returned_meters}
+        for index in mapping.residue_meters:
+            number = str(_value(data["meters"][index].get("meter_number")))
+            data["meters"][index] = by_number.get(number, data["meters"][index])
+
+    by_line = {c.get("line_id"): c for c in mapped.get("charges") or []}
+    missing = []
+    for index in mapping.residue_charges:
+        line_id = data["charges"][index]["line_id"]
+        if line_id in by_line:
+            data["charges"][index] = by_line[line_id]
+        else:
+            missing.append(line_id)
+    data["traceability"] = mapped.get("traceability") or []
+    return missing
@@ -3,7 +3,7 @@ from __future__ import annotations
 import structlog
 from ..llm.base import LLMClient
 from ..llm.response_parser import extract_json_from_response
-from ..models.internal import IngestionResult, ClassificationResult
+from ..models.internal import IngestionResult, ClassificationResult, ClassificationResponse
 from ..models.classification import classify_complexity
 from ..prompts.registry import PromptRegistry
 
@@ -33,6 +33,7 @@ async def run_pass05(
         images=images,
         temperature=0.0,
         max_tokens=2048,
+        response_model=ClassificationResponse,
     )
 
     # Parse response
@@ -62,7 +63,7 @@ async def run_pass05(
         has_prior_period_adjustments="prior_period_adjustments" in signals,
         estimated_line_item_count=data.get("estimated_line_item_count", 0),
         format_fingerprint=data.get("format_fingerprint", "unknown"),
-        language=data.get("language", ingestion.language_detected),
+        language=data.get("language") or ingestion.language_detected,
         has_multiple_vat_rates=data.get("has_multiple_vat_rates", False),
         has_calorific_conversion=data.get("has_calorific_conversion", False),
         has_contracted_capacity=data.get("has_contracted_capacity", False),
@@ -0,0 +1,89 @@
+"""Fast lane: combined single-call extraction for simple invoices (Sonnet).
+
+A simple-tier bill (see ``classify_complexity``) is extracted by one vision
+call that returns the merged, normalised Pass 2 shape directly, instead of
+1A, 1B and schema mapping.  ``accept_fast_lane`` then decides locally from
+Pass 3 validation and the confidence score whether the result stands or
+the invoice goes through the full multi-pass path.
+"""
+from __future__ import annotations
+
+import structlog
+
+from ..llm.base import LLMClient
+from ..llm.response_parser import extract_json_from_response
+from ..models.confidence import compute_confidence
+from ..models.internal import ClassificationResult, IngestionResult, MappedExtraction, Pass2Result, Pass3Result
+from ..models.schema import ComplexityTier
+from ..prompts.registry import PromptRegistry
+from .pass1a_extraction import prompt_variables
+
+logger = structlog.get_logger(__name__)
+
+
+def routes_to_fast_lane(classification: ClassificationResult) -> bool:
+    return classification.complexity_tier == ComplexityTier.SIMPLE
+
+
+async def run_pass1_combined(
+    ingestion: IngestionResult,
+    classification: ClassificationResult,
+    llm_client: LLMClient,
+    prompt_registry: PromptRegistry,
+    few_shot_context: str | None = None,
+    max_tokens: int = 8192,
+) -> Pass2Result:
+    """Extract structure, metering, charges and totals in one call."""
+    images = [p.image_base64 for p in ingestion.pages]
+
+    domain_files = ["cross_commodity"]
+    if classification.commodity_type == "natural_gas":
+        domain_files.append("gas_concepts")
+    elif classification.commodity_type == "electricity":
+        domain_files.append("electricity_concepts")
+    elif classification.commodity_type == "water":
+        domain_files.append("water_concepts")
+
+    prompt = prompt_registry.render(
+        "extraction_combined",
+        variables=prompt_variables(classification),
+        few_shot_context=few_shot_context,
+        domain_knowledge=domain_files,
+    )
+
+    response = await llm_client.complete_vision(
+        system_prompt=(
+            "You are an expert energy utility invoice analyst. Extract the complete invoice "
+            "-- structure, metering, charges and totals -- in the final normalized schema."
+        ),
+        user_prompt=prompt,
+        images=images,
+        temperature=0.0,
+        max_tokens=max_tokens,
+        response_model=MappedExtraction,
+    )
+
+    data = extract_json_from_response(response.content)
+
+    logger.info(
+        "pass1_combined_complete",
+        charge_count=len(data.get("charges", [])),
+        meter_count=len(data.get("meters", [])),
+    )
+
+    return Pass2Result(data=data)
+
+
+def accept_fast_lane(data: dict, pass3: Pass3Result, min_confidence: float) -> tuple[bool, str]:
+    """Whether the combined extraction stands, and why not if it does not."""
+    if not data.get("charges") or not data.get("totals"):
+        return False, "incomplete"
+    fatal = [issue.field for issue in pass3.issues if issue.severity == "fatal"]
+    if fatal:
+        return False, f"fatal:{fatal[0]}"
+    confidence = compute_confidence(extraction=data, validation={}, audit={})
+    if confidence.fatal_triggered:
+        return False, "low_confidence_fatal_field"
+    if confidence.score < min_confidence:
+        return False, f"confidence:{confidence.score}"
+    return True, "accepted"
@@ -9,12 +9,25 @@ from ..prompts.registry import PromptRegistry
 logger = structlog.get_logger(__name__)
 
 
+def prompt_variables(classification: ClassificationResult) -> dict:
+    """The classification fields the Pass 1A prompt is rendered from."""
+    return {
+        "commodity_type": classification.commodity_type,
+        "market_type": classification.market_type or "regulated",
+        "country_code": classification.country_code or "US",
+        "number_format": classification.number_format or "1,234.56",
+        "date_format": classification.date_format or "MM/DD/YYYY",
+        "language": classification.language or "en",
+    }
+
+
 async def run_pass1a(
     ingestion: IngestionResult,
     classification: ClassificationResult,
     llm_client: LLMClient,
     prompt_registry: PromptRegistry,
     few_shot_context: str | None = None,
+    max_tokens: int = 8192,
 ) -> Pass1AResult:
     """Extract invoice structure and metering data from all pages."""
     # Build images list (all pages)
@@ -30,14 +43,7 @@ async def run_pass1a(
         domain_files.append("water_concepts")
 
     # Build variables
-    variables = {
-        "commodity_type": classification.commodity_type,
-        "market_type": classification.market_type or "regulated",
-        "country_code": classification.country_code or "US",
-        "number_format": classification.number_format or "1,234.56",
-        "date_format": classification.date_format or "MM/DD/YYYY",
-        "language": classification.language or "en",
-    }
+    variables = prompt_variables(classification)
 
     prompt = prompt_registry.render(
         "extraction_1a",
@@ -53,7 +59,8 @@ async def run_pass1a(
         user_prompt=prompt,
         images=images,
         temperature=0.0,
-        max_tokens=8192,
+        max_tokens=max_tokens,
+        response_model=Pass1AResult,
     )
 
     logger.info("pass1a_llm_response", content_length=len(response.content), content_preview=response.content[:500])
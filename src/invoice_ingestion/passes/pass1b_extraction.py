@@ -9,20 +9,30 @@ from ..prompts.registry import PromptRegistry
 
 logger = structlog.get_logger(__name__)
 
+# Stands in for the Pass 1A context when 1A and 1B run concurrently
+PARALLEL_1A_CONTEXT = (
+    "Pass 1A is running concurrently, so its output is not available. "
+    "For applies_to_meter, use the meter number printed with the charge exactly as shown, "
+    "or null if the charge does not name a meter."
+)
+
 
 async def run_pass1b(
     ingestion: IngestionResult,
     classification: ClassificationResult,
-    pass1a_result: Pass1AResult,
+    pass1a_result: Pass1AResult | None,
     llm_client: LLMClient,
     prompt_registry: PromptRegistry,
     few_shot_context: str | None = None,
+    max_tokens: int = 8192,
 ) -> Pass1BResult:
     """Extract charges and financial data from all pages.
 
     Pass 1A output is injected as context so the model knows the invoice
     structure (account, meters) already extracted. This avoids duplication
-    and gives the model anchoring data.
+    and gives the model anchoring data.  Without it (*pass1a_result* is
+    None: parallel extraction) 1B works from the classification alone and
+    its meter references are reconciled with Pass 1A afterwards.
     """
     # Build images list (all pages)
     images = [p.image_base64 for p in ingestion.pages]
@@ -37,11 +47,16 @@ async def run_pass1b(
         domain_files.append("water_concepts")
 
     # Serialize Pass 1A output for context injection
-    pass_1a_output = json.dumps({
-        "invoice": pass1a_result.invoice,
-        "account": pass1a_result.account,
-        "meters": pass1a_result.meters,
-    }, indent=2, default=str)
+    if pass1a_result is not None:
+        pass_1a_context = json.dumps({
+            "invoice": pass1a_result.invoice,
+            "account": pass1a_result.account,
+            "meters": pass1a_result.meters,
+        }, indent=2, default=str)
+        structure_note = "The invoice structure has already been extracted in a previous pass."
+    else:
+        pass_1a_context = PARALLEL_1A_CONTEXT
+        structure_note = "The invoice structure is extracted in a separate pass."
 
     # Build variables
     variables = {
@@ -50,7 +65,8 @@ async def run_pass1b(
         "number_format": classification.number_format or "1,234.56",
         "date_format": classification.date_format or "MM/DD/YYYY",
         "language": classification.language,
-        "pass_1a_output": pass_1a_output,
+        "market_type": classification.market_type or "regulated",
+        "pass_1a_context": pass_1a_context,
     }
 
     prompt = prompt_registry.render(
@@ -61,11 +77,15 @@ async def run_pass1b(
     )
 
     response = await llm_client.complete_vision(
-        system_prompt="You are an expert energy utility invoice analyst. Focus ONLY on charges, totals, VAT, and financial data. The invoice structure has already been extracted in a previous pass.",
+        system_prompt=(
+            "You are an expert energy utility invoice analyst. Focus ONLY on charges, totals, VAT, "
+            f"and financial data. {structure_note}"
+        ),
         user_prompt=prompt,
         images=images,
         temperature=0.0,
-        max_tokens=8192,
+        max_tokens=max_tokens,
+        response_model=Pass1BResult,
     )
 
     data = extract_json_from_response(response.content)
@@ -4,8 +4,9 @@ import json
 import structlog
 from ..llm.base import LLMClient
 from ..llm.response_parser import extract_json_from_response
-from ..models.internal import ClassificationResult, Pass1AResult, Pass1BResult, Pass2Result
+from ..models.internal import ClassificationResult, MappedExtraction, Pass1AResult, Pass1BResult, Pass2Result
 from ..prompts.registry import PromptRegistry
+from .deterministic_mapping import DeterministicMapping, map_deterministically, merge_residue
 
 logger = structlog.get_logger(__name__)
 
@@ -16,6 +17,9 @@ async def run_pass2(
     pass1b_result: Pass1BResult,
     llm_client: LLMClient,
     prompt_registry: PromptRegistry,
+    max_tokens: int = 8192,
+    deterministic: bool = False,
+    known_charges: dict[str, dict] | None = None,
 ) -> Pass2Result:
     """Merge and normalize extracted data into the final schema.
 
@@ -25,7 +29,24 @@ async def run_pass2(
     - Charge classification (category, section, owner)
     - Temporal attribution (current period vs. prior period adjustments)
     - Field naming normalization to match output schema
+
+    With *deterministic*, everything ``map_deterministically`` can map is
+    mapped locally and only the residue goes to the model, if any;
+    *known_charges* are the classifications learned for this utility.
     """
+    if deterministic:
+        mapping = map_deterministically(classification, pass1a_result, pass1b_result, known_charges)
+        logger.info(
+            "pass2_deterministic_mapping",
+            charges=len(mapping.data["charges"]),
+            residue_charges=len(mapping.residue_charges),
+            meters=len(mapping.data["meters"]),
+            residue_meters=len(mapping.residue_meters),
+        )
+        if not mapping.complete:
+            await _map_residue(mapping, classification, llm_client, prompt_registry, max_tokens)
+        return Pass2Result(data=mapping.data)
+
     # Merge Pass 1A and Pass 1B into a single JSON payload
     merged_extraction = {
         "invoice": pass1a_result.invoice,
@@ -91,8 +112,9 @@ async def run_pass2(
         ),
         user_prompt=prompt,
         temperature=0.0,
-        max_tokens=8192,
+        max_tokens=max_tokens,
         json_mode=True,
+        response_model=MappedExtraction,
     )
 
     data = extract_json_from_response(response.content)
@@ -115,3 +137,52 @@ async def run_pass2(
     )
 
     return Pass2Result(data=data)
+
+
+async def _map_residue(
+    mapping: DeterministicMapping,
+    classification: ClassificationResult,
+    llm_client: LLMClient,
+    prompt_registry: PromptRegistry,
+    max_tokens: int,
+) -> None:
+    """Map the meters and charges the deterministic mapper left, in place."""
+    data = mapping.data
+    billing = data["invoice"].get("billing_period") or {}
+    period = [b.get("value") if isinstance(b, dict) else b for b in (billing.get("start"), billing.get("end"))]
+    meter_numbers = [
+        m["meter_number"].get("value") if isinstance(m.get("meter_number"), dict) else m.get("meter_number")
+        for m in data["meters"]
+    ]
+
+    # Build variables for prompt template (must match placeholders in schema_mapping_residue.md)
+    variables = {
+        "meters": json.dumps([data["meters"][i] for i in mapping.residue_meters], indent=2, default=str),
+        "charges": json.dumps([data["charges"][i] for i in mapping.residue_charges], indent=2, default=str),
+        "billing_period": " to ".join(str(p) for p in period) if all(period) else "unknown",
+        "meter_numbers": json.dumps(meter_numbers, default=str),
+        "commodity_type": classification.commodity_type,
+        "market_type": classification.market_type or "regulated",
+        "country_code": classification.country_code or "US",
+        "language": classification.language or "en",
+        "number_format": classification.number_format or "1,234.56",
+    }
+
+    prompt = prompt_registry.render("schema_mapping_residue", variables=variables)
+
+    response = await llm_client.complete_text(
+        system_prompt=(
+            "You are a data normalization specialist for energy utility invoices. "
+            "Normalize and classify the given meters and charges into the standardized "
+            "output schema. Respond with valid JSON only."
+        ),
+        user_prompt=prompt,
+        temperature=0.0,
+        max_tokens=max_tokens,
+        json_mode=True,
+        response_model=MappedExtraction,
+    )
+
+    missing = merge_residue(mapping, extract_json_from_response(response.content))
+    if missing:
+        logger.warning("pass2_residue_charges_missing", line_ids=missing)
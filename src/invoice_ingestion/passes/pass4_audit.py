@@ -4,8 +4,9 @@ import re
 import structlog
 from ..llm.base import LLMClient
 from ..llm.response_parser import extract_json_from_response
-from ..models.internal import IngestionResult, ClassificationResult, Pass4Result, AuditQuestion
+from ..models.internal import IngestionResult, ClassificationResult, Pass4Result, AuditQuestion, AuditResponse
 from ..prompts.registry import PromptRegistry
+from .pass1a_extraction import prompt_variables
 
 logger = structlog.get_logger(__name__)
 
@@ -98,12 +99,28 @@ def build_audit_questions(classification: ClassificationResult, locale_context:
     return questions
 
 
+def flatten_audit_answers(data: dict) -> dict:
+    """Map ``{"audit_answers": [...]}`` to ``{field_checked: answer_value}``.
+
+    Responses already in the flat form are returned unchanged.
+    """
+    items = data.get("audit_answers")
+    if not isinstance(items, list):
+        return data
+    flat: dict = {}
+    for item in items:
+        if isinstance(item, dict) and item.get("field_checked"):
+            value = item.get("answer_value")
+            flat[item["field_checked"]] = "" if value in (None, "NOT_FOUND") else str(value)
+    return flat
+
+
 def compare_audit(extraction: dict, audit_answers: dict) -> list[dict]:
     """Compare audit answers to extraction values. Returns list of mismatches."""
     mismatches: list[dict] = []
 
     # Total amount due
-    audit_total = _parse_number(audit_answers.get("total_amount_due", ""))
+    audit_total = _parse_number(_answer(audit_answers, "total_amount_due", "totals.total_amount_due"))
     extraction_total = _nested_get(extraction, "totals.total_amount_due.value")
     if audit_total is not None and extraction_total is not None:
         if abs(audit_total - extraction_total) > 0.50:
@@ -115,7 +132,7 @@ def compare_audit(extraction: dict, audit_answers: dict) -> list[dict]:
             })
 
     # Meter count
-    audit_meters = _parse_number(audit_answers.get("meter_count", ""))
+    audit_meters = _parse_number(_answer(audit_answers, "meter_count", "meters.count"))
     extraction_meters = len(extraction.get("meters", []))
     if audit_meters is not None and int(audit_meters) != extraction_meters:
         mismatches.append({
@@ -126,7 +143,7 @@ def compare_audit(extraction: dict, audit_answers: dict) -> list[dict]:
         })
 
     # Account number
-    audit_acct = audit_answers.get("account_number", "").strip()
+    audit_acct = _answer(audit_answers, "account_number", "account.account_number").strip()
     extraction_acct = _nested_get(extraction, "account.account_number.value")
     if audit_acct and extraction_acct and audit_acct != str(extraction_acct):
         mismatches.append({
@@ -146,43 +163,81 @@ async def run_pass4(
     audit_llm: LLMClient,
     prompt_registry: PromptRegistry,
     locale_context: dict | None = None,
+    max_tokens: int = 4096,
 ) -> Pass4Result:
     """Run audit pass with different LLM."""
-    questions = build_audit_questions(classification, locale_context)
+    audit = await ask_audit_questions(
+        ingestion, classification, audit_llm, prompt_registry,
+        locale_context=locale_context, max_tokens=max_tokens,
+    )
+    return score_audit(audit, extraction)
 
-    # Format questions for prompt
-    questions_text = "\n".join(f"{i+1}. {q.question}" for i, q in enumerate(questions))
 
-    images = [p.image_base64 for p in ingestion.pages]
+async def ask_audit_questions(
+    ingestion: IngestionResult,
+    classification: ClassificationResult,
+    audit_llm: LLMClient,
+    prompt_registry: PromptRegistry,
+    locale_context: dict | None = None,
+    max_tokens: int = 4096,
+    questions: list[AuditQuestion] | None = None,
+    pages: list[int] | None = None,
+) -> Pass4Result:
+    """Ask the audit model the questions; the answers do not depend on the extraction.
 
-    prompt = prompt_registry.render("audit", variables={"questions": questions_text})
+    *questions* defaults to ``build_audit_questions`` and *pages* (1-based)
+    to every page.  Returns an unscored result: ``score_audit`` compares
+    its answers with the extraction once Pass 2 is done.
+    """
+    if questions is None:
+        questions = build_audit_questions(classification, locale_context)
+
+    # Format questions for prompt; the answer's field_checked is the bracketed key
+    questions_text = "\n".join(f"{i+1}. [{q.field_to_check}] {q.question}" for i, q in enumerate(questions))
+
+    images = [p.image_base64 for p in ingestion.pages if pages is None or p.page_number in pages]
+
+    prompt = prompt_registry.render(
+        "audit", variables={**prompt_variables(classification), "audit_questions": questions_text},
+    )
 
     response = await audit_llm.complete_vision(
         system_prompt="You are an independent invoice verification specialist. Answer each question based ONLY on what you see in the invoice images. Do NOT guess.",
         user_prompt=prompt,
         images=images,
         temperature=0.0,
-        max_tokens=4096,
+        max_tokens=max_tokens,
+        response_model=AuditResponse,
     )
 
-    answers = extract_json_from_response(response.content)
+    answers = flatten_audit_answers(extract_json_from_response(response.content))
 
     # Fill in answers
     for q in questions:
         q.answer = answers.get(q.field_to_check, answers.get(q.question, ""))
 
-    # Compare with extraction
-    mismatches = compare_audit(extraction, answers)
-
     return Pass4Result(
         questions_asked=questions,
         fields_checked=len(questions),
-        fields_matched=len(questions) - len(mismatches),
-        mismatches=mismatches,
+        answers=answers,
         audit_model=audit_llm.get_model_name(),
     )
 
 
+def score_audit(audit: Pass4Result, extraction: dict) -> Pass4Result:
+    """Compare the audit answers with the extraction."""
+    mismatches = compare_audit(extraction, audit.answers)
+    return audit.model_copy(update={
+        "fields_matched": audit.fields_checked - len(mismatches),
+        "mismatches": mismatches,
+    })
+
+
+def _answer(answers: dict, *keys: str) -> str:
+    """The first non-empty answer under any of *keys* (short or question field names)."""
+    return next((str(answers[key]) for key in keys if answers.get(key)), "")
+
+
 def _parse_number(s: str) -> float | None:
     if not s:
         return None
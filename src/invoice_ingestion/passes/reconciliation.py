@@ -0,0 +1,111 @@
+"""Deterministic reconciliation of Pass 1A and Pass 1B run in parallel.
+
+In parallel extraction mode Pass 1B never sees the meters Pass 1A found, so
+the meter references on its charges are whatever the model read next to
+each line: a masked or reformatted meter number, or nothing at all.  This
+step aligns them with the Pass 1A meters before schema mapping, without any
+LLM call:
+
+- ``applies_to_meter`` is rewritten to the Pass 1A meter number it refers
+  to (same digits ignoring formatting and leading zeros, or a unique
+  suffix match for masked numbers); on a single-meter invoice every
+  meter-specific charge belongs to that meter.
+- A charge without a meter on a multi-meter invoice is assigned the meter
+  whose consumption equals the charge quantity, when exactly one does.
+- A charge without a period takes the invoice billing period.
+
+References that match no Pass 1A meter are kept as extracted and reported.
+"""
+from __future__ import annotations
+
+import copy
+import re
+
+from ..models.internal import Pass1AResult, Pass1BResult
+
+_NON_ALNUM = re.compile(r"[^0-9A-Z]")
+# Shortest masked meter number ("...4521") matched by suffix
+_MIN_SUFFIX = 4
+
+
+def _value(field):
+    return field.get("value") if isinstance(field, dict) else field
+
+
+def _normalize_meter(number) -> str:
+    return _NON_ALNUM.sub("", str(number).upper()).lstrip("0")
+
+
+def _match_meter(reference: str, meters: dict[str, str]) -> str | None:
+    """Return the Pass 1A meter number *reference* refers to, if any."""
+    key = _normalize_meter(reference)
+    if not key:
+        return None
+    if key in meters:
+        return meters[key]
+    if len(key) >= _MIN_SUFFIX:
+        suffix = [number for normalized, number in meters.items()
+                  if normalized.endswith(key) or key.endswith(normalized)]
+        if len(suffix) == 1:
+            return suffix[0]
+    if len(meters) == 1:
+        return next(iter(meters.values()))
+    return None
+
+
+def _meter_by_quantity(quantity, consumption: dict[str, float]) -> str | None:
+    try:
+        quantity = float(quantity)
+    except (TypeError, ValueError):
+        return None
+    matches = [number for number, value in consumption.items() if abs(value - quantity) < 0.01]
+    return matches[0] if len(matches) == 1 else None
+
+
+def reconcile_extractions(pass1a: Pass1AResult, pass1b: Pass1BResult) -> tuple[Pass1BResult, list[str]]:
+    """Align Pass 1B charges with the Pass 1A meters and billing period.
+
+    Returns the reconciled Pass 1B result (the input is not modified) and
+    the meter references that matched no Pass 1A meter.
+    """
+    meters: dict[str, str] = {}
+    consumption: dict[str, float] = {}
+    for meter in pass1a.meters:
+        number = _value(meter.get("meter_number"))
+        if not number:
+            continue
+        number = str(number)
+        meters.setdefault(_normalize_meter(number), number)
+        raw = (meter.get("consumption") or {}).get("raw_value")
+        if isinstance(raw, (int, float)) and raw:
+            consumption[number] = float(raw)
+
+    period = pass1a.invoice.get("billing_period") or {}
+    period_start, period_end = _value(period.get("start")), _value(period.get("end"))
+
+    charges = copy.deepcopy(pass1b.charges)
+    unmatched: list[str] = []
+    for charge in charges:
+        reference = charge.get("applies_to_meter")
+        if reference:
+            matched = _match_meter(reference, meters)
+            if matched is not None:
+                charge["applies_to_meter"] = matched
+            elif str(reference) not in unmatched:
+                unmatched.append(str(reference))
+        elif len(meters) > 1:
+            matched = _meter_by_quantity(_value(charge.get("quantity")), consumption)
+            if matched is not None:
+                charge["applies_to_meter"] = matched
+
+        charge_period = charge.get("charge_period")
+        has_period = bool(charge_period and (charge_period.get("start") or charge_period.get("end")))
+        if period_start and period_end and not has_period:
+            charge["charge_period"] = {
+                **(charge_period or {}),
+                "start": period_start,
+                "end": period_end,
+                "attribution_type": (charge_period or {}).get("attribution_type") or "current",
+            }
+
+    return Pass1BResult(charges=charges, totals=pass1b.totals), unmatched
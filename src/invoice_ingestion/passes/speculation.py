@@ -0,0 +1,108 @@
+"""Speculative Pass 1A: predict the classification locally, start 1A early.
+
+Pass 1A's prompt depends on the classification only through the commodity
+and the locale (country, number and date format, language).  The text layer
+usually gives those away, so ``predict_classification`` guesses them from
+commodity keywords and ``detect_locale``, and Pass 1A starts on the guess
+while Pass 0.5 is still running.  When Pass 0.5 returns, the speculative
+result is kept if the classification renders the same 1A prompt inputs
+(``agrees``) and calls for no larger ``max_tokens`` than the speculation was
+sent with, and cancelled and re-run otherwise.
+
+Market type is left out of the comparison: it is background context in the
+1A prompt, not something the extraction depends on, and the text layer
+cannot tell it reliably.
+
+``speculation_stats`` counts hits and misses per process and sums the
+latency the hits saved.
+"""
+from __future__ import annotations
+
+import re
+from collections import Counter
+
+from ..international.locale_detection import detect_locale
+from ..models.internal import ClassificationResult, IngestionResult
+from .pass1a_extraction import prompt_variables
+
+# Word-boundary keyword patterns per commodity, matched on the text layer
+COMMODITY_KEYWORDS: dict[str, re.Pattern] = {
+    "electricity": re.compile(
+        r"\b(kwh|mwh|kw|kva|kvarh|electricity|electric|strom|électricité|electricite|"
+        r"electricidad|elettricità|energia elettrica|elektriciteit)\b", re.IGNORECASE),
+    "natural_gas": re.compile(
+        r"\b(therms?|ccf|mcf|m3|natural gas|gas|erdgas|brennwert|zustandszahl|calorific|gaz)\b|m³",
+        re.IGNORECASE),
+    "water": re.compile(
+        r"\b(gallons?|water|sewer|wastewater|wasser|abwasser|eau|agua|acqua)\b", re.IGNORECASE),
+}
+# The winning commodity needs this many hits and this lead over the runner-up
+MIN_KEYWORD_HITS = 3
+MIN_LEAD_RATIO = 2.0
+
+
+def predict_commodity(text: str) -> str | None:
+    """Guess the commodity from keyword counts; None when unclear."""
+    counts = {commodity: len(pattern.findall(text)) for commodity, pattern in COMMODITY_KEYWORDS.items()}
+    ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    (best, hits), (_, runner_up) = ranked[0], ranked[1]
+    if hits < MIN_KEYWORD_HITS or hits < runner_up * MIN_LEAD_RATIO:
+        return None
+    return best
+
+
+def predict_classification(ingestion: IngestionResult) -> ClassificationResult | None:
+    """Predict the classification fields Pass 1A needs, or None without a usable text layer."""
+    text = " ".join(p.extracted_text or "" for p in ingestion.pages)
+    commodity = predict_commodity(text)
+    if commodity is None:
+        return None
+    locale = detect_locale(text, language=ingestion.language_detected)
+    return ClassificationResult(
+        commodity_type=commodity,
+        commodity_confidence=0.0,
+        complexity_tier="standard",
+        market_type=locale["market_model"],
+        language=ingestion.language_detected,
+        country_code=locale["country_code"],
+        number_format=locale["number_format"],
+        date_format=locale["date_format"],
+    )
+
+
+def agrees(predicted: ClassificationResult, classification: ClassificationResult) -> bool:
+    """Whether Pass 1A on *predicted* is the run *classification* would have started."""
+    ours, theirs = prompt_variables(predicted), prompt_variables(classification)
+    return all(ours[key] == theirs[key] for key in ours if key != "market_type")
+
+
+class SpeculationStats:
+    """Process-wide counters for speculative Pass 1A runs."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.outcomes: Counter[str] = Counter()
+        self.saved_ms = 0.0
+
+    def record(self, outcome: str, saved_ms: float = 0.0) -> None:
+        """*outcome*: hit, miss, failed (the speculative call raised) or skipped (no prediction)."""
+        self.outcomes[outcome] += 1
+        self.saved_ms += saved_ms
+
+    def snapshot(self) -> dict:
+        hits, misses = self.outcomes["hit"], self.outcomes["miss"]
+        started = hits + misses + self.outcomes["failed"]
+        return {
+            "started": started,
+            "hits": hits,
+            "misses": misses,
+            "failed": self.outcomes["failed"],
+            "skipped": self.outcomes["skipped"],
+            "hit_rate": round(hits / started, 4) if started else 0.0,
+            "mean_saved_ms": round(self.saved_ms / hits) if hits else 0,
+        }
+
+
+speculation_stats = SpeculationStats()
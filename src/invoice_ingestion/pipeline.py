@@ -1,20 +1,32 @@
 """Pipeline orchestrator: Pass 0 → 0.5 → 1A → 1B → 2 → 3 → 4 → confidence gate."""
 from __future__ import annotations
+import asyncio
 import json
+import random
 import time
 import structlog
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 from .config import Settings
+from .dag import Graph, Node
 from .storage.database import get_engine, AsyncSessionLocal
 from .storage.models import Extraction
-from .storage.repositories import ExtractionRepo
+from .storage.checkpoints import (
+    IMAGE_STAGES, REPROCESS_FROM, chain_input_hashes, downstream, ingestion_metadata, resumable,
+    restore_ingestion,
+)
+from .storage.repositories import CheckpointRepo, ExtractionRepo
 from .llm.base import LLMClient
 from .llm.anthropic_client import AnthropicClient
 from .llm.openai_client import OpenAIClient
 from .llm.failover import FailoverLLMClient
+from .llm.batch import BatchLLMClient, make_batch_client
+from .llm.file_store import AnthropicFileStore, PageFileCache
+from .llm.deployment_pool import Deployment, DeploymentPool
+from .llm.replay import Cassette, ReplayLLMClient
 from .llm.response_parser import extract_json_from_response
 from .prompts.registry import PromptRegistry
 from .models.schema import (
@@ -25,27 +37,40 @@ from .models.schema import (
     MonetaryAmount, ConfidentValue, MathDisposition, BillingPeriod,
     ChargeCategory, ChargeOwner, ChargeSection, MathCheck, ChargePeriod,
     AttributionType, Consumption, ReadType, Demand, DemandType, TOUPeriod,
-    VATSummaryEntry, VATCategory,
+    VATSummaryEntry, VATCategory, StageTiming, LLMUsage, ComplexityTier,
+)
+from .models.internal import (
+    IngestionResult, ClassificationResult, Pass1AResult, Pass1BResult, Pass2Result, Pass3Result, Pass4Result,
 )
-from .models.internal import IngestionResult, ClassificationResult
 from .models.confidence import compute_confidence, determine_tier
 from .passes.pass0_ingestion import run_pass0
 from .passes.pass05_classification import run_pass05
+from .passes.pass1_combined_extraction import accept_fast_lane, routes_to_fast_lane, run_pass1_combined
 from .passes.pass1a_extraction import run_pass1a
 from .passes.pass1b_extraction import run_pass1b
 from .passes.pass2_schema_mapping import run_pass2
 from .passes.pass3_validation import run_pass3
-from .passes.pass4_audit import run_pass4
+from .passes.pass4_audit import ask_audit_questions, build_audit_questions, score_audit
+from .passes.audit_policy import audit_policy_stats, load_review_history, plan_audit, pre_audit_tier
+from .passes.reconciliation import reconcile_extractions
+from .passes.speculation import agrees, predict_classification, speculation_stats
+from .learning.charge_cache import ChargeClassificationCache
 from .learning.correction_store import CorrectionStore
 from .learning.few_shot_injection import get_few_shot_context
 from .learning.fingerprinting import FingerprintLibrary
 from .drift.detection import detect_drift
 from .international.locale_detection import detect_locale
-from .utils.hashing import compute_string_hash
+from .utils.hashing import compute_file_hash, compute_string_hash
+from .llm.call_log_writer import get_writer
 from .llm.call_logger import LLMCallLogger, set_logger, set_current_stage
+from .llm.token_budget import STAGE_BUDGETS, estimate_max_tokens, load_output_token_history
 
 logger = structlog.get_logger(__name__)
 
+# Runs in progress in this process by file hash; concurrent requests for the
+# same file await the one run instead of starting their own
+_inflight: dict[str, asyncio.Future] = {}
+
 
 class ExtractionPipeline:
     """Orchestrates the full extraction pipeline."""
@@ -54,9 +79,15 @@ class ExtractionPipeline:
         self.settings = settings
         self.prompt_registry = PromptRegistry()
         self.correction_store = CorrectionStore()
+        self.charge_cache = ChargeClassificationCache(
+            min_confirmations=settings.charge_cache_min_confirmations,
+            refresh_seconds=settings.charge_cache_refresh_seconds,
+        )
         self.fingerprint_library = FingerprintLibrary()
 
         # Initialize LLM clients
+        self._batch_clients: list[BatchLLMClient] = []
+        self._cassette: Cassette | None = None
         self._init_llm_clients()
 
     def _init_llm_clients(self):
@@ -64,190 +95,408 @@ class ExtractionPipeline:
 
         If azure_ai_endpoint is configured, uses Claude for classification/extraction/mapping
         and GPT-4o for audit. Otherwise, uses GPT-4o (Azure OpenAI) for all passes.
+        Either provider may be a pool of deployments (``*_deployments`` settings).
         """
+        if self.settings.llm_replay_mode == "replay":
+            self._init_replay_clients()
+            return
+
         azure_ai_key = self.settings.azure_ai_api_key.get_secret_value()
         azure_ai_endpoint = self.settings.azure_ai_endpoint
         azure_openai_key = self.settings.azure_openai_api_key.get_secret_value()
-        azure_openai_endpoint = self.settings.azure_openai_endpoint
 
-        if azure_ai_endpoint and azure_ai_key:
-            # Claude models via Azure AI Foundry
-            logger.info("llm_init", mode="azure_ai_claude", extraction_model=self.settings.extraction_model)
+        # One page cache per Claude endpoint: file IDs are only valid there
+        self._page_file_caches: dict[str, PageFileCache] = {}
 
-            self._classification_client: LLMClient = AnthropicClient(
-                api_key=azure_ai_key,
-                model=self.settings.classification_model,
-                azure_endpoint=azure_ai_endpoint,
-            )
+        if (azure_ai_endpoint and azure_ai_key) or self.settings.azure_ai_deployments:
+            # Claude models via Azure AI Foundry
+            logger.info("llm_init", mode="azure_ai_claude", extraction_model=self.settings.extraction_model,
+                        claude_deployments=max(len(self.settings.azure_ai_deployments), 1))
 
-            extraction_primary: LLMClient = AnthropicClient(
-                api_key=azure_ai_key,
-                model=self.settings.extraction_model,
-                azure_endpoint=azure_ai_endpoint,
-            )
+            self._classification_client: LLMClient = self._claude_client(self.settings.classification_model)
+            extraction_primary = self._claude_client(self.settings.extraction_model)
 
             # Failover: Claude (Azure AI) → GPT-4o (Azure OpenAI)
-            if self.settings.enable_failover and azure_openai_key:
-                extraction_fallback = OpenAIClient(
-                    api_key=azure_openai_key,
-                    model="gpt-4o",
-                    azure_endpoint=azure_openai_endpoint,
-                )
+            if self.settings.enable_failover and (azure_openai_key or self.settings.azure_openai_deployments):
+                extraction_fallback = self._openai_client("gpt-4o")
                 self._extraction_client = FailoverLLMClient(extraction_primary, extraction_fallback)
             else:
                 self._extraction_client = extraction_primary
 
-            self._schema_mapping_client: LLMClient = AnthropicClient(
-                api_key=azure_ai_key,
-                model=self.settings.schema_mapping_model,
-                azure_endpoint=azure_ai_endpoint,
-            )
+            self._schema_mapping_client: LLMClient = self._claude_client(self.settings.schema_mapping_model)
         else:
             # All passes use GPT-4o via Azure OpenAI
-            logger.info("llm_init", mode="azure_openai_only", extraction_model=self.settings.extraction_model)
+            logger.info("llm_init", mode="azure_openai_only", extraction_model=self.settings.extraction_model,
+                        openai_deployments=max(len(self.settings.azure_openai_deployments), 1))
 
-            self._classification_client: LLMClient = OpenAIClient(
-                api_key=azure_openai_key,
-                model=self.settings.classification_model,
-                azure_endpoint=azure_openai_endpoint,
-            )
-
-            self._extraction_client: LLMClient = OpenAIClient(
-                api_key=azure_openai_key,
-                model=self.settings.extraction_model,
-                azure_endpoint=azure_openai_endpoint,
-            )
-
-            self._schema_mapping_client: LLMClient = OpenAIClient(
-                api_key=azure_openai_key,
-                model=self.settings.schema_mapping_model,
-                azure_endpoint=azure_openai_endpoint,
-            )
+            self._classification_client: LLMClient = self._openai_client(self.settings.classification_model)
+            self._extraction_client: LLMClient = self._openai_client(self.settings.extraction_model)
+            self._schema_mapping_client: LLMClient = self._openai_client(self.settings.schema_mapping_model)
 
         # Audit: always GPT-4o via Azure OpenAI
-        self._audit_client: LLMClient = OpenAIClient(
-            api_key=azure_openai_key,
-            model=self.settings.audit_model,
-            azure_endpoint=azure_openai_endpoint,
+        self._audit_client: LLMClient = self._openai_client(self.settings.audit_model)
+
+        if self.settings.llm_replay_mode == "record":
+            self._cassette = Cassette.load(self.settings.llm_cassette_path)
+            self._classification_client = self._replay_client(
+                self.settings.classification_model, self._classification_client)
+            self._extraction_client = self._replay_client(self.settings.extraction_model, self._extraction_client)
+            self._schema_mapping_client = self._replay_client(
+                self.settings.schema_mapping_model, self._schema_mapping_client)
+            self._audit_client = self._replay_client(self.settings.audit_model, self._audit_client)
+
+    def _init_replay_clients(self) -> None:
+        """Serve every pass from the recorded cassette (no network access)."""
+        self._cassette = Cassette.load(self.settings.llm_cassette_path)
+        logger.info("llm_init", mode="replay", cassette=self.settings.llm_cassette_path,
+                    recordings=len(self._cassette))
+        self._classification_client = self._replay_client(self.settings.classification_model)
+        self._extraction_client = self._replay_client(self.settings.extraction_model)
+        self._schema_mapping_client = self._replay_client(self.settings.schema_mapping_model)
+        self._audit_client = self._replay_client(self.settings.audit_model)
+
+    def _replay_client(self, model: str, inner: LLMClient | None = None) -> ReplayLLMClient:
+        return ReplayLLMClient(
+            model,
+            self._cassette,
+            inner,
+            latency=self.settings.llm_replay_latency,
+            latency_sigma=self.settings.llm_replay_latency_sigma,
         )
 
-    async def process(self, file_bytes: bytes, blob_name: str) -> ExtractionResult:
-        """Run the full extraction pipeline."""
-        start_time = time.monotonic()
-        extraction_id = uuid4()
-        flags: list[str] = []
-
-        logger.info("pipeline_start", extraction_id=str(extraction_id), blob_name=blob_name)
+    def _page_files_for(self, endpoint: str, api_key: str) -> PageFileCache | None:
+        if not self.settings.enable_file_uploads:
+            return None
+        if endpoint not in self._page_file_caches:
+            self._page_file_caches[endpoint] = PageFileCache(
+                AnthropicFileStore(api_key=api_key, azure_endpoint=endpoint),
+                max_entries=self.settings.file_cache_max_entries,
+            )
+        return self._page_file_caches[endpoint]
+
+    def _claude_client(self, model: str) -> LLMClient:
+        """Claude client for *model*: a single endpoint, a pool, or a batch client."""
+        deployments = self.settings.azure_ai_deployments
+        # Batch jobs have their own quota, so pools only apply to sync calls
+        if not deployments or self.settings.llm_execution_mode == "batch":
+            if deployments:
+                endpoint, key = deployments[0].endpoint, deployments[0].api_key.get_secret_value()
+            else:
+                endpoint, key = self.settings.azure_ai_endpoint, self.settings.azure_ai_api_key.get_secret_value()
+            return self._maybe_batch(AnthropicClient(
+                api_key=key,
+                model=model,
+                azure_endpoint=endpoint,
+                file_cache=self._page_files_for(endpoint, key),
+            ))
+
+        return DeploymentPool([
+            Deployment(
+                name=d.name or d.endpoint,
+                client=AnthropicClient(
+                    api_key=d.api_key.get_secret_value(),
+                    model=model,
+                    azure_endpoint=d.endpoint,
+                    file_cache=self._page_files_for(d.endpoint, d.api_key.get_secret_value()),
+                    max_retries=0,
+                ),
+                weight=d.weight,
+                tpm_limit=d.tpm_limit,
+                rpm_limit=d.rpm_limit,
+            )
+            for d in deployments
+        ])
+
+    def _openai_client(self, model: str) -> LLMClient:
+        """Azure OpenAI client for *model*: a single endpoint, a pool, or a batch client."""
+        deployments = self.settings.azure_openai_deployments
+        if not deployments or self.settings.llm_execution_mode == "batch":
+            if deployments:
+                endpoint, key = deployments[0].endpoint, deployments[0].api_key.get_secret_value()
+            else:
+                endpoint = self.settings.azure_openai_endpoint
+                key = self.settings.azure_openai_api_key.get_secret_value()
+            return self._maybe_batch(OpenAIClient(
+                api_key=key,
+                model=model,
+                azure_endpoint=endpoint,
+            ))
+
+        return DeploymentPool([
+            Deployment(
+                name=d.name or d.endpoint,
+                client=OpenAIClient(
+                    api_key=d.api_key.get_secret_value(),
+                    model=model,
+                    azure_endpoint=d.endpoint,
+                    max_retries=0,
+                ),
+                weight=d.weight,
+                tpm_limit=d.tpm_limit,
+                rpm_limit=d.rpm_limit,
+            )
+            for d in deployments
+        ])
+
+    def _maybe_batch(self, client: LLMClient) -> LLMClient:
+        """Route *client* through the provider Batch API when batch mode is on."""
+        if self.settings.llm_execution_mode != "batch":
+            return client
+        batch_client = make_batch_client(
+            client,
+            max_batch_size=self.settings.batch_max_size,
+            max_wait_seconds=self.settings.batch_max_wait_seconds,
+            poll_interval_seconds=self.settings.batch_poll_interval_seconds,
+        )
+        self._batch_clients.append(batch_client)
+        return batch_client
 
-        # Set up LLM call logger for this extraction
-        call_logger = LLMCallLogger(extraction_id=extraction_id)
-        set_logger(call_logger)
+    async def aclose(self) -> None:
+        """Submit any partially filled batches and save recorded LLM calls."""
+        for client in self._batch_clients:
+            await client.aclose()
+        if self._cassette is not None:
+            self._cassette.save()
 
-        # Load corrections from database for learning loop
-        if self.settings.enable_learning_loop:
-            await self.correction_store.load_from_database()
+    async def process(
+        self,
+        file_bytes: bytes,
+        blob_name: str,
+        *,
+        persist: bool = True,
+        force: bool = False,
+        extraction_id: UUID | None = None,
+        reuse_from: UUID | None = None,
+        from_pass: str | None = None,
+    ) -> ExtractionResult:
+        """Run the full extraction pipeline.
+
+        A file whose hash already has an accepted or pending-review
+        extraction returns the stored result without any LLM calls.
+        Concurrent requests for the same file share one run: within this
+        process through an in-flight map, across processes through a
+        ``processing`` claim row in the database.  ``force=True`` always
+        runs a fresh extraction (reprocessing) as *extraction_id*, default
+        a new one.
+
+        Each pass's output is checkpointed; a run claiming a previously
+        failed extraction, or a forced run retried with the same
+        *extraction_id*, resumes after the passes already done.  A forced
+        run with *reuse_from* also reuses that earlier extraction's pass
+        outputs, except *from_pass* (a ``REPROCESS_FROM`` key) and the
+        passes reading from it.
+
+        With ``persist=False`` the database is neither read (dedup,
+        corrections, token history) nor written (result, LLM call logs) —
+        used for offline benchmarks against a replay cassette.
+        """
+        if not persist:
+            return await self._run(file_bytes, blob_name, uuid4(), persist=False)
+        if force:
+            return await self._run(
+                file_bytes, blob_name, extraction_id or uuid4(), reuse_from=reuse_from, from_pass=from_pass,
+            )
 
-        # --- Pass 0: Ingestion ---
+        file_hash = compute_file_hash(file_bytes)
+        while (inflight := _inflight.get(file_hash)) is not None:
+            logger.info("dedup_inflight_wait", file_hash=file_hash[:16], blob_name=blob_name)
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # The leading run was cancelled; unless this request was too, try again
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        future: asyncio.Future[ExtractionResult] = asyncio.get_running_loop().create_future()
+        _inflight[file_hash] = future
         try:
-            ingestion = run_pass0(file_bytes, dpi=self.settings.dpi)
-        except Exception as e:
-            logger.error("pass0_failed", error=str(e))
+            result = await self._process_deduplicated(file_bytes, blob_name, file_hash)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved: nobody may be waiting
             raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            _inflight.pop(file_hash, None)
 
-        # --- Pass 0.5: Classification ---
+    async def find_existing(self, file_hash: str) -> ExtractionResult | None:
+        """Return the stored result for *file_hash* if it may be reused."""
+        async with AsyncSessionLocal() as session:
+            existing = await ExtractionRepo(session).get_reusable_by_hash(file_hash)
+        if existing is None:
+            return None
+        return ExtractionResult.model_validate(existing.result_json)
+
+    async def _process_deduplicated(self, file_bytes: bytes, blob_name: str, file_hash: str) -> ExtractionResult:
+        """Reuse the stored result for *file_hash*, or claim the hash and run.
+
+        While another process holds the claim, poll until its run stores a
+        result (reused) or fails (claimed here).  The running process
+        refreshes its claim every third of ``dedup_claim_ttl_seconds``, so
+        only a claim not refreshed for that long (a crashed run) is taken
+        over.
+        """
+        waiting = False
+        while True:
+            extraction_id = None
+            async with AsyncSessionLocal() as session:
+                repo = ExtractionRepo(session)
+                existing = await repo.get_reusable_by_hash(file_hash)
+                if existing is None:
+                    extraction_id = await repo.claim_hash(
+                        file_hash, blob_name, stale_after=self.settings.dedup_claim_ttl_seconds,
+                    )
+                await session.commit()
+            if existing is not None:
+                logger.info("dedup_hit", file_hash=file_hash[:16], extraction_id=str(existing.extraction_id))
+                return ExtractionResult.model_validate(existing.result_json)
+            if extraction_id is not None:
+                break
+            if not waiting:
+                logger.info("dedup_claim_wait", file_hash=file_hash[:16], blob_name=blob_name)
+                waiting = True
+            await asyncio.sleep(self.settings.dedup_poll_interval_seconds)
+
+        heartbeat = asyncio.create_task(self._heartbeat_claim(extraction_id))
         try:
-            set_current_stage("pass05_classification")
-            # Get few-shot context if learning loop enabled
-            few_shot = ""
-            if self.settings.enable_learning_loop:
-                few_shot = get_few_shot_context(self.correction_store)
-
-            classification = await run_pass05(
-                ingestion, self._classification_client, self.prompt_registry,
-                few_shot_context=few_shot or None,
-            )
-        except Exception as e:
-            logger.error("pass05_failed", error=str(e))
-            flags.append("classification_failed")
-            # Use defaults
-            classification = ClassificationResult(
-                commodity_type="electricity", commodity_confidence=0.0,
-                complexity_tier="standard", complexity_signals=[],
-                market_type="unknown",
-            )
-
-        # Detect locale
-        all_text = " ".join(p.extracted_text or "" for p in ingestion.pages)
-        locale_info = detect_locale(all_text, language=classification.language)
+            return await self._run(file_bytes, blob_name, extraction_id)
+        except BaseException:
+            await asyncio.shield(self._release_claim(extraction_id))
+            raise
+        finally:
+            heartbeat.cancel()
 
-        # Build few-shot for extraction passes
-        few_shot_extraction = ""
-        if self.settings.enable_learning_loop:
-            utility_name = None  # will be filled after pass 1a
-            few_shot_extraction = get_few_shot_context(
-                self.correction_store,
-                commodity=classification.commodity_type,
-            )
-        few_shot_hash = compute_string_hash(few_shot_extraction) if few_shot_extraction else None
+    async def _heartbeat_claim(self, extraction_id: UUID) -> None:
+        interval = self.settings.dedup_claim_ttl_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with AsyncSessionLocal() as session:
+                    held = await ExtractionRepo(session).touch_claim(extraction_id)
+                    await session.commit()
+            except Exception as e:
+                logger.warning("dedup_heartbeat_failed", extraction_id=str(extraction_id), error=str(e))
+                continue
+            if not held:
+                logger.warning("dedup_claim_lost", extraction_id=str(extraction_id))
+                return
 
-        # --- Pass 1A: Structure & Metering ---
+    async def _release_claim(self, extraction_id: UUID) -> None:
         try:
-            set_current_stage("pass1a_extraction")
-            pass1a = await run_pass1a(
-                ingestion, classification, self._extraction_client, self.prompt_registry,
-                few_shot_context=few_shot_extraction or None,
-            )
+            async with AsyncSessionLocal() as session:
+                await ExtractionRepo(session).release_claim(extraction_id)
+                await session.commit()
         except Exception as e:
-            logger.error("pass1a_failed", error=str(e))
-            flags.append("pass1a_failed")
-            pass1a = None
-
-        # --- Pass 1B: Charges & Financial ---
+            # The claim goes stale and is taken over after dedup_claim_ttl_seconds
+            logger.error("dedup_release_failed", extraction_id=str(extraction_id), error=str(e))
+
+    def _stage_fingerprints(self) -> dict[str, str]:
+        """What, besides its inputs, determines each stage's output."""
+        s, prompts = self.settings, self.prompt_registry
+        return {
+            "pass0_ingestion": f"dpi={s.dpi}",
+            "pass05_classification": f"{s.classification_model}:{prompts.get_hash('classification')}",
+            "pass1_combined": f"{s.extraction_model}:{prompts.get_hash('extraction_combined')}",
+            "pass1a_extraction": f"{s.extraction_model}:{prompts.get_hash('extraction_1a')}",
+            "pass1b_extraction": f"{s.extraction_model}:{prompts.get_hash('extraction_1b')}"
+                                 + (":parallel" if s.parallel_extraction else ""),
+            "pass2_schema_mapping": f"{s.schema_mapping_model}:{prompts.get_hash('schema_mapping')}"
+                                    + (f":deterministic:{prompts.get_hash('schema_mapping_residue')}"
+                                       if s.deterministic_mapping else ""),
+            "pass4_audit": f"{s.audit_model}:{prompts.get_hash('audit')}" + (":policy" if s.audit_policy else ""),
+        }
+
+    async def _load_checkpoints(
+        self,
+        extraction_id: UUID,
+        input_hashes: dict[str, str],
+        reuse_from: UUID | None = None,
+        from_pass: str | None = None,
+    ) -> dict[str, dict]:
+        rerun = downstream(REPROCESS_FROM[from_pass]) if REPROCESS_FROM.get(from_pass) else set()
         try:
-            set_current_stage("pass1b_extraction")
-            pass1b = await run_pass1b(
-                ingestion, classification, pass1a, self._extraction_client, self.prompt_registry,
-                few_shot_context=few_shot_extraction or None,
-            )
+            async with AsyncSessionLocal() as session:
+                repo = CheckpointRepo(session)
+                stored = {}
+                if reuse_from is not None:
+                    reused = await repo.get_for_extraction(reuse_from)
+                    stored = {stage: checkpoint for stage, checkpoint in reused.items() if stage not in rerun}
+                # This run's own checkpoints (a retry) win over reused ones
+                stored.update(await repo.get_for_extraction(extraction_id))
         except Exception as e:
-            logger.error("pass1b_failed", error=str(e))
-            flags.append("pass1b_failed")
-            pass1b = None
+            logger.warning("checkpoint_load_failed", extraction_id=str(extraction_id), error=str(e))
+            return {}
+        return resumable(stored, input_hashes)
 
-        # --- Pass 2: Schema Mapping ---
+    async def _save_checkpoint(self, extraction_id: UUID, stage: str, input_hash: str, output: dict) -> None:
+        # A lost checkpoint only costs a re-run of this pass on retry
         try:
-            set_current_stage("pass2_schema_mapping")
-            pass2 = await run_pass2(
-                classification, pass1a, pass1b, self._schema_mapping_client, self.prompt_registry,
-            )
-            merged_data = pass2.data
+            async with AsyncSessionLocal() as session:
+                await CheckpointRepo(session).save(extraction_id, stage, input_hash, output)
+                await session.commit()
         except Exception as e:
-            logger.error("pass2_failed", error=str(e))
-            flags.append("pass2_failed")
-            merged_data = {}
+            logger.warning("checkpoint_save_failed", extraction_id=str(extraction_id), stage=stage, error=str(e))
 
-        # --- Pass 3: Validation ---
-        try:
-            pass3 = run_pass3(merged_data, country_code=locale_info.get("country_code"))
-            for issue in pass3.issues:
-                if issue.severity == "fatal":
-                    flags.append(f"fatal:{issue.field}")
-        except Exception as e:
-            logger.error("pass3_failed", error=str(e))
-            flags.append("pass3_failed")
-            pass3 = None
+    async def _run(
+        self,
+        file_bytes: bytes,
+        blob_name: str,
+        extraction_id: UUID,
+        *,
+        persist: bool = True,
+        reuse_from: UUID | None = None,
+        from_pass: str | None = None,
+    ) -> ExtractionResult:
+        """Run every pass on *file_bytes* as extraction *extraction_id*."""
+        start_time = time.monotonic()
 
-        # --- Pass 4: Audit ---
+        logger.info("pipeline_start", extraction_id=str(extraction_id), blob_name=blob_name)
+
+        # Set up LLM call logger for this extraction
+        call_logger = LLMCallLogger(extraction_id=extraction_id)
+        set_logger(call_logger)
+
+        # Skip the passes an earlier attempt (or the reprocessed extraction) finished
+        if from_pass is not None and from_pass not in REPROCESS_FROM:
+            raise ValueError(f"Unknown from_pass {from_pass!r}; expected one of {', '.join(REPROCESS_FROM)}")
+        input_hashes = chain_input_hashes(compute_file_hash(file_bytes), self._stage_fingerprints())
+        restored = {}
+        if persist:
+            restored = await self._load_checkpoints(extraction_id, input_hashes, reuse_from, from_pass)
+        if restored:
+            logger.info("pipeline_resumed", extraction_id=str(extraction_id), restored=list(restored),
+                        reuse_from=str(reuse_from) if reuse_from else None, from_pass=from_pass)
+
+        # --- Passes 0 to 4, each started as soon as its inputs are ready ---
+        run = _ExtractionRun(self, file_bytes, extraction_id, persist=persist,
+                             restored=restored, input_hashes=input_hashes)
+        graph = run.graph()
         try:
-            set_current_stage("pass4_audit")
-            pass4 = await run_pass4(
-                ingestion, classification, merged_data, self._audit_client,
-                self.prompt_registry, locale_context=locale_info,
-            )
-        except Exception as e:
-            logger.error("pass4_failed", error=str(e))
-            flags.append("pass4_failed")
-            pass4 = None
+            results, timeline = await graph.run()
+        finally:
+            run.cancel_speculation()
+        logger.info("pipeline_timeline", extraction_id=str(extraction_id), **timeline.as_dict())
+
+        ingestion: IngestionResult = results["pass0_ingestion"]
+        classification: ClassificationResult = results["pass05_classification"]
+        locale_info: dict = results["locale"]
+        merged_data: dict = results["pass2_schema_mapping"]
+        pass3: Pass3Result | None = results["pass3_validation"]
+        pass4: Pass4Result | None = results["pass4_audit"]
+        few_shot_hash = results["extraction_context"]["few_shot_hash"]
+        flags = run.collected_flags(graph.order)
+        if pass4 is not None:
+            try:
+                pass4 = score_audit(pass4, merged_data)
+            except Exception as e:
+                logger.error("pass4_failed", error=str(e))
+                flags.append("pass4_failed")
+                pass4 = None
 
         # --- Confidence Gate ---
         validation_issues = pass3.issues if pass3 else []
@@ -278,19 +527,32 @@ class ExtractionPipeline:
             flags=flags,
             processing_time=processing_time,
             few_shot_hash=few_shot_hash,
+            timeline=timeline,
+            llm_usage=LLMUsage(
+                calls=len(call_logger.calls),
+                input_tokens=sum(c.input_tokens or 0 for c in call_logger.calls),
+                output_tokens=sum(c.output_tokens or 0 for c in call_logger.calls),
+            ),
         )
 
         # --- Store result in database ---
-        await self._store_result(result, blob_name, file_bytes)
+        if persist:
+            await self._store_result(result, blob_name, file_bytes)
 
         # --- Save LLM call logs ---
         try:
-            await call_logger.save_to_database()
-            logger.info("llm_calls_saved", count=len(call_logger.calls))
+            if persist:
+                writer = get_writer()
+                if writer is not None:
+                    queued = writer.submit(call_logger.calls)
+                    logger.info("llm_calls_queued", count=queued)
+                else:
+                    await call_logger.save_to_database()
+                    logger.info("llm_calls_saved", count=len(call_logger.calls))
         except Exception as e:
             logger.error("llm_calls_save_failed", error=str(e))
         finally:
-            set_logger(None)  # Clear the global logger
+            set_logger(None)  # Clear the logger for this task
 
         logger.info("pipeline_complete", extraction_id=str(extraction_id),
                     confidence=confidence_score, tier=confidence_tier,
@@ -298,6 +560,24 @@ class ExtractionPipeline:
 
         return result
 
+    def _max_tokens_for(
+        self,
+        stage: str,
+        classification: ClassificationResult,
+        ingestion: IngestionResult,
+        token_history: dict,
+        **signals,
+    ) -> int:
+        """Return the ``max_tokens`` to request for *stage* on this invoice."""
+        if not self.settings.adaptive_max_tokens:
+            return STAGE_BUDGETS[stage].default
+        return estimate_max_tokens(
+            stage, classification, len(ingestion.pages),
+            history=token_history.get(stage),
+            ceiling=self.settings.max_output_tokens,
+            **signals,
+        )
+
     async def _store_result(
         self,
         result: ExtractionResult,
@@ -328,10 +608,10 @@ class ExtractionPipeline:
             processing_time_ms=result.extraction_metadata.processing_time_ms,
         )
 
-        # Store in database
+        # Store in database, replacing the run's dedup claim row
         async with AsyncSessionLocal() as session:
             repo = ExtractionRepo(session)
-            await repo.create(extraction)
+            await repo.upsert(extraction)
             await session.commit()
 
         # Store PDF in local storage for development
@@ -345,7 +625,8 @@ class ExtractionPipeline:
 
     def _assemble_result(self, extraction_id, ingestion, classification, merged_data,
                          pass3, pass4, locale_info, confidence_score, confidence_tier,
-                         flags, processing_time, few_shot_hash) -> ExtractionResult:
+                         flags, processing_time, few_shot_hash, timeline=None,
+                         llm_usage=None) -> ExtractionResult:
         """Assemble the final ExtractionResult from pipeline outputs."""
 
         # Build metadata
@@ -400,7 +681,20 @@ class ExtractionPipeline:
                 language_translated=ingestion.language_detected != "en",
             ),
             locale_context=locale_context,
+            stage_timings={
+                name: StageTiming(start_ms=round(t.start_ms), end_ms=round(t.end_ms), status=t.status)
+                for name, t in timeline.timings.items()
+            } if timeline else {},
+            critical_path=timeline.critical_path if timeline else [],
+            llm_usage=llm_usage or LLMUsage(),
         )
+        if self.settings.deterministic_mapping:
+            metadata.prompt_versions["schema_mapping_residue"] = (
+                self.prompt_registry.get_version("schema_mapping_residue")
+            )
+        if "fast_lane" in flags:
+            metadata.models_used["extraction_combined"] = ModelInfo(model=self.settings.extraction_model)
+            metadata.prompt_versions["extraction_combined"] = self.prompt_registry.get_version("extraction_combined")
 
         # Build classification model
         cls = Classification(
@@ -712,3 +1006,452 @@ class ExtractionPipeline:
             traceability=[],
             bounded_variance_record=BoundedVarianceRecord(is_reprocessing=False, drift_detected=False, drift_fields=[]),
         )
+
+
+class _ExtractionRun:
+    """The passes of one extraction as a dependency graph.
+
+    Every node reads the results of the nodes it declares as dependencies,
+    restores its output from a checkpoint when one is available and
+    checkpoints it otherwise.  Passes that may fail without failing the
+    extraction have a fallback that logs, flags and continues.
+    """
+
+    def __init__(
+        self,
+        pipeline: ExtractionPipeline,
+        file_bytes: bytes,
+        extraction_id: UUID,
+        *,
+        persist: bool,
+        restored: dict[str, dict],
+        input_hashes: dict[str, str],
+    ):
+        self.pipeline = pipeline
+        self.settings = pipeline.settings
+        self.file_bytes = file_bytes
+        self.extraction_id = extraction_id
+        self.persist = persist
+        self.restored = restored
+        self.input_hashes = input_hashes
+        self._flags: dict[str, list[str]] = {}
+        self._speculation: _Speculation | None = None
+
+    def graph(self) -> Graph:
+        # Batch mode waits for provider batches; per-pass timeouts do not apply
+        timeouts = self.settings.pass_timeouts_seconds if self.settings.llm_execution_mode == "sync" else {}
+        prepared = ("pass0_ingestion", "pass05_classification", "extraction_context")
+        # Speculating only pays off when classification and 1A both still have to run
+        speculate = (
+            self.settings.speculative_classification and self.settings.llm_execution_mode == "sync"
+            and not {"pass05_classification", "pass1a_extraction"} & self.restored.keys()
+        )
+        # The multi-pass nodes wait for the fast lane's verdict and skip when it was accepted
+        full = prepared + (("fast_lane",) if self.settings.enable_fast_lane else ())
+
+        def node(name: str, run, deps: tuple[str, ...] = (), fallback=None) -> Node:
+            return Node(name, run, deps, timeout=timeouts.get(name), fallback=fallback)
+
+        return Graph([
+            node("corrections", self.load_corrections),
+            node("pass0_ingestion", self.ingest),
+            node("pass05_classification", self.classify, ("pass0_ingestion", "corrections"),
+                 fallback=self._fallback("pass05_classification", "pass05_failed", "classification_failed",
+                                         _default_classification)),
+            node("locale", self.detect_locale, ("pass0_ingestion", "pass05_classification")),
+            node("extraction_context", self.extraction_context, ("pass05_classification", "corrections")),
+            *([node("fast_lane", self.fast_lane, prepared + ("locale",),
+                    fallback=self._fallback("fast_lane", "fast_lane_failed", "fast_lane_escalated"))]
+              if self.settings.enable_fast_lane else []),
+            *([node("pass1a_speculation", self.speculate_1a, ("pass0_ingestion", "corrections"))]
+              if speculate else []),
+            node("pass1a_extraction", self.extract_1a, full + (("pass1a_speculation",) if speculate else ()),
+                 fallback=self._fallback("pass1a_extraction", "pass1a_failed", "pass1a_failed")),
+            node("pass1b_extraction", self.extract_1b,
+                 full if self.settings.parallel_extraction else full + ("pass1a_extraction",),
+                 fallback=self._fallback("pass1b_extraction", "pass1b_failed", "pass1b_failed")),
+            node("pass2_schema_mapping", self.map_schema, full + ("pass1a_extraction", "pass1b_extraction"),
+                 fallback=self._fallback("pass2_schema_mapping", "pass2_failed", "pass2_failed", dict)),
+            node("pass3_validation", self.validate, ("pass2_schema_mapping", "locale"),
+                 fallback=self._fallback("pass3_validation", "pass3_failed", "pass3_failed")),
+            # The audit model reads only the images and the question set, so it
+            # runs alongside 1A/1B/2; its answers are scored after Pass 2.  The
+            # audit policy decides from the extraction, so it waits for Pass 3
+            node("pass4_audit", self.audit,
+                 full + (("locale", "pass2_schema_mapping", "pass3_validation") if self.settings.audit_policy
+                         else ("locale",)),
+                 fallback=self._fallback("pass4_audit", "pass4_failed", "pass4_failed")),
+        ])
+
+    def collected_flags(self, order: list[str]) -> list[str]:
+        """Flags raised by the nodes, in graph order regardless of completion order."""
+        return [flag for name in order for flag in self._flags.get(name, [])]
+
+    def cancel_speculation(self) -> None:
+        """Cancel a speculative Pass 1A the run no longer waits for."""
+        if self._speculation is not None and not self._speculation.task.done():
+            self._speculation.task.cancel()
+
+    def _flag(self, node: str, flag: str) -> None:
+        self._flags.setdefault(node, []).append(flag)
+
+    def _fallback(self, node: str, event: str, flag: str, default=None):
+        def fallback(error: BaseException):
+            logger.error(event, error=str(error) or type(error).__name__)
+            self._flag(node, flag)
+            return default() if default is not None else None
+        return fallback
+
+    async def _checkpoint(self, stage: str, output: dict) -> None:
+        if self.persist:
+            await self.pipeline._save_checkpoint(self.extraction_id, stage, self.input_hashes[stage], output)
+
+    # ── Nodes ────────────────────────────────────────────────────────────
+
+    async def load_corrections(self, results: dict) -> None:
+        # Load corrections from database for learning loop
+        if self.settings.enable_learning_loop and self.persist:
+            await self.pipeline.correction_store.load_from_database()
+        if self.settings.enable_charge_cache and self.persist:
+            try:
+                await self.pipeline.charge_cache.load_from_database()
+            except Exception as e:
+                logger.warning("charge_cache_load_failed", error=str(e))
+
+    def _image_stages(self) -> frozenset[str]:
+        """The stages that may send page images in this run."""
+        classification = self.restored.get("pass05_classification")
+        if self.settings.enable_fast_lane and (
+            classification is None or classification.get("complexity_tier") == ComplexityTier.SIMPLE
+        ):
+            return IMAGE_STAGES
+        return IMAGE_STAGES - {"pass1_combined"}
+
+    async def ingest(self, results: dict) -> IngestionResult:
+        restored = self.restored
+        if "pass0_ingestion" in restored and self._image_stages() <= restored.keys():
+            return restore_ingestion(restored["pass0_ingestion"])
+        try:
+            ingestion = run_pass0(self.file_bytes, dpi=self.settings.dpi)
+        except Exception as e:
+            logger.error("pass0_failed", error=str(e))
+            raise
+        if "pass0_ingestion" not in restored:
+            await self._checkpoint("pass0_ingestion", ingestion_metadata(ingestion))
+        return ingestion
+
+    async def classify(self, results: dict) -> ClassificationResult:
+        if "pass05_classification" in self.restored:
+            return ClassificationResult.model_validate(self.restored["pass05_classification"])
+        set_current_stage("pass05_classification")
+        # Get few-shot context if learning loop enabled
+        few_shot = ""
+        if self.settings.enable_learning_loop:
+            few_shot = get_few_shot_context(self.pipeline.correction_store)
+        classification = await run_pass05(
+            results["pass0_ingestion"], self.pipeline._classification_client, self.pipeline.prompt_registry,
+            few_shot_context=few_shot or None,
+        )
+        await self._checkpoint("pass05_classification", classification.model_dump(mode="json"))
+        return classification
+
+    async def detect_locale(self, results: dict) -> dict:
+        ingestion: IngestionResult = results["pass0_ingestion"]
+        all_text = " ".join(p.extracted_text or "" for p in ingestion.pages)
+        return detect_locale(all_text, language=results["pass05_classification"].language)
+
+    async def extraction_context(self, results: dict) -> dict:
+        """Few-shot examples, output token history and review history for the passes."""
+        classification: ClassificationResult = results["pass05_classification"]
+        few_shot = ""
+        if self.settings.enable_learning_loop:
+            few_shot = get_few_shot_context(
+                self.pipeline.correction_store,
+                commodity=classification.commodity_type,
+            )
+        # Output token history for this format drives per-pass max_tokens
+        token_history: dict = {}
+        if self.settings.adaptive_max_tokens and self.persist:
+            token_history = await load_output_token_history(classification.format_fingerprint)
+        # How reviewers judged earlier invoices of this format drives the audit policy
+        review_history: list[bool] = []
+        if self.settings.audit_policy and self.persist:
+            review_history = await load_review_history(classification.format_fingerprint)
+        return {
+            "few_shot": few_shot,
+            "few_shot_hash": compute_string_hash(few_shot) if few_shot else None,
+            "token_history": token_history,
+            "review_history": review_history,
+        }
+
+    async def fast_lane(self, results: dict) -> dict | None:
+        """The combined extraction of a simple invoice, or None to run the full passes."""
+        classification: ClassificationResult = results["pass05_classification"]
+        if not routes_to_fast_lane(classification):
+            return None
+        if "pass1_combined" in self.restored:
+            combined = Pass2Result.model_validate(self.restored["pass1_combined"])
+        else:
+            set_current_stage("pass1_combined")
+            combined = await run_pass1_combined(
+                results["pass0_ingestion"], classification,
+                self.pipeline._extraction_client, self.pipeline.prompt_registry,
+                few_shot_context=results["extraction_context"]["few_shot"] or None,
+                max_tokens=self._max_tokens("pass1_combined", results),
+            )
+            await self._checkpoint("pass1_combined", combined.model_dump(mode="json"))
+        pass3 = run_pass3(combined.data, country_code=results["locale"].get("country_code"))
+        accepted, reason = accept_fast_lane(combined.data, pass3, self.settings.fast_lane_min_confidence)
+        logger.info("fast_lane", outcome="accepted" if accepted else "escalated", reason=reason)
+        if not accepted:
+            self._flag("fast_lane", "fast_lane_escalated")
+            return None
+        self._flag("fast_lane", "fast_lane")
+        return combined.data
+
+    def _max_tokens(self, stage: str, results: dict, **signals) -> int:
+        return self.pipeline._max_tokens_for(
+            stage, results["pass05_classification"], results["pass0_ingestion"],
+            results["extraction_context"]["token_history"], **signals,
+        )
+
+    async def speculate_1a(self, results: dict) -> _Speculation | None:
+        """Start Pass 1A on a predicted classification; ``extract_1a`` keeps or cancels it."""
+        ingestion: IngestionResult = results["pass0_ingestion"]
+        predicted = predict_classification(ingestion)
+        if predicted is None:
+            speculation_stats.record("skipped")
+            return None
+        few_shot = ""
+        if self.settings.enable_learning_loop:
+            few_shot = get_few_shot_context(self.pipeline.correction_store, commodity=predicted.commodity_type)
+        # No format fingerprint yet, so no token history either
+        max_tokens = self.pipeline._max_tokens_for("pass1a_extraction", predicted, ingestion, {})
+        speculation = _Speculation(predicted, started=time.perf_counter(), max_tokens=max_tokens)
+
+        async def run() -> Pass1AResult:
+            set_current_stage("pass1a_extraction")
+            try:
+                return await run_pass1a(
+                    ingestion, predicted, self.pipeline._extraction_client, self.pipeline.prompt_registry,
+                    few_shot_context=few_shot or None, max_tokens=max_tokens,
+                )
+            finally:
+                speculation.finished = time.perf_counter()
+
+        speculation.task = asyncio.create_task(run(), name=f"pass1a-speculation-{self.extraction_id}")
+        self._speculation = speculation
+        return speculation
+
+    async def _speculative_1a(self, speculation: _Speculation, results: dict) -> Pass1AResult | None:
+        """The speculative Pass 1A result if the classification agrees, else None.
+
+        The prediction knows nothing of meters or line items, so its budget
+        can be below the one the classification calls for; a response that
+        may have been cut short is not kept.
+        """
+        ready = time.perf_counter()
+        classification: ClassificationResult = results["pass05_classification"]
+        reason = None
+        if not agrees(speculation.predicted, classification):
+            reason = "classification"
+        elif speculation.max_tokens < self._max_tokens("pass1a_extraction", results):
+            reason = "max_tokens"
+        if reason is not None:
+            speculation.task.cancel()
+            speculation_stats.record("miss")
+            logger.info("pass1a_speculation", outcome="miss", reason=reason,
+                        predicted=speculation.predicted.commodity_type, classified=classification.commodity_type)
+            return None
+        try:
+            pass1a = await speculation.task
+        except Exception as e:
+            speculation_stats.record("failed")
+            logger.warning("pass1a_speculation", outcome="failed", error=str(e) or type(e).__name__)
+            return None
+        # Without speculation 1A would have started now and taken as long
+        saved_ms = (min(ready, speculation.finished) - speculation.started) * 1000
+        speculation_stats.record("hit", saved_ms)
+        logger.info("pass1a_speculation", outcome="hit", saved_ms=round(saved_ms))
+        return pass1a
+
+    async def extract_1a(self, results: dict) -> Pass1AResult | None:
+        if results.get("fast_lane"):
+            self.cancel_speculation()
+            return None
+        if "pass1a_extraction" in self.restored:
+            return Pass1AResult.model_validate(self.restored["pass1a_extraction"])
+        speculation: _Speculation | None = results.get("pass1a_speculation")
+        pass1a = None
+        if speculation is not None:
+            pass1a = await self._speculative_1a(speculation, results)
+        if pass1a is None:
+            set_current_stage("pass1a_extraction")
+            pass1a = await run_pass1a(
+                results["pass0_ingestion"], results["pass05_classification"],
+                self.pipeline._extraction_client, self.pipeline.prompt_registry,
+                few_shot_context=results["extraction_context"]["few_shot"] or None,
+                max_tokens=self._max_tokens("pass1a_extraction", results),
+            )
+        await self._checkpoint("pass1a_extraction", pass1a.model_dump(mode="json"))
+        return pass1a
+
+    async def extract_1b(self, results: dict) -> Pass1BResult | None:
+        if results.get("fast_lane"):
+            return None
+        if "pass1b_extraction" in self.restored:
+            return Pass1BResult.model_validate(self.restored["pass1b_extraction"])
+        set_current_stage("pass1b_extraction")
+        pass1a = None if self.settings.parallel_extraction else results["pass1a_extraction"]
+        pass1b = await run_pass1b(
+            results["pass0_ingestion"], results["pass05_classification"], pass1a,
+            self.pipeline._extraction_client, self.pipeline.prompt_registry,
+            few_shot_context=results["extraction_context"]["few_shot"] or None,
+            max_tokens=self._max_tokens("pass1b_extraction", results),
+        )
+        await self._checkpoint("pass1b_extraction", pass1b.model_dump(mode="json"))
+        return pass1b
+
+    async def map_schema(self, results: dict) -> dict:
+        if results.get("fast_lane"):
+            return results["fast_lane"]
+        if "pass2_schema_mapping" in self.restored:
+            return Pass2Result.model_validate(self.restored["pass2_schema_mapping"]).data
+        pass1a: Pass1AResult | None = results["pass1a_extraction"]
+        pass1b: Pass1BResult | None = results["pass1b_extraction"]
+        if self.settings.parallel_extraction and pass1a and pass1b:
+            pass1b, unmatched = reconcile_extractions(pass1a, pass1b)
+            if unmatched:
+                logger.warning("pass1b_meters_unmatched", meters=unmatched)
+                self._flag("pass2_schema_mapping", "pass1b_meter_unmatched")
+        set_current_stage("pass2_schema_mapping")
+        pass2 = await run_pass2(
+            results["pass05_classification"], pass1a, pass1b,
+            self.pipeline._schema_mapping_client, self.pipeline.prompt_registry,
+            max_tokens=self._max_tokens(
+                "pass2_schema_mapping", results, meter_count=len(pass1a.meters) if pass1a else None,
+            ),
+            deterministic=self.settings.deterministic_mapping,
+            known_charges=self._known_charges(pass1a),
+        )
+        await self._checkpoint("pass2_schema_mapping", pass2.model_dump(mode="json"))
+        return pass2.data
+
+    def _known_charges(self, pass1a: Pass1AResult | None) -> dict[str, dict] | None:
+        if not self.settings.enable_charge_cache or pass1a is None:
+            return None
+        utility = pass1a.account.get("utility_provider")
+        return self.pipeline.charge_cache.for_utility(utility.get("value") if isinstance(utility, dict) else utility)
+
+    async def validate(self, results: dict) -> Pass3Result:
+        if "pass3_validation" in self.restored:
+            pass3 = Pass3Result.model_validate(self.restored["pass3_validation"])
+        else:
+            pass3 = run_pass3(results["pass2_schema_mapping"], country_code=results["locale"].get("country_code"))
+            await self._checkpoint("pass3_validation", pass3.model_dump(mode="json"))
+        for issue in pass3.issues:
+            if issue.severity == "fatal":
+                self._flag("pass3_validation", f"fatal:{issue.field}")
+        return pass3
+
+    async def audit(self, results: dict) -> Pass4Result | None:
+        """Ask the audit questions; scored against the extraction once Pass 2 is done."""
+        if results.get("fast_lane"):
+            return None
+        if self.settings.audit_policy:
+            return await self._audit_by_policy(results)
+        if "pass4_audit" in self.restored:
+            return Pass4Result.model_validate(self.restored["pass4_audit"])
+        questions = build_audit_questions(results["pass05_classification"], results["locale"])
+        return await self._ask_audit(results, questions)
+
+    async def _audit_by_policy(self, results: dict) -> Pass4Result | None:
+        """Skip the audit or narrow its questions and pages as ``plan_audit`` decides."""
+        classification: ClassificationResult = results["pass05_classification"]
+        ingestion: IngestionResult = results["pass0_ingestion"]
+        extraction: dict = results["pass2_schema_mapping"]
+        questions = build_audit_questions(classification, results["locale"])
+        plan = plan_audit(
+            classification, questions, extraction, results["pass3_validation"], len(ingestion.pages),
+            results["extraction_context"]["review_history"],
+            min_field_confidence=self.settings.audit_min_field_confidence,
+            min_format_accuracy=self.settings.audit_min_format_accuracy,
+            min_format_history=self.settings.audit_min_format_history,
+        )
+        audit_policy_stats.record(plan, len(questions), len(ingestion.pages))
+        logger.info("audit_policy", run=plan.run, reason=plan.reason,
+                    questions=len(plan.questions), pages=plan.pages)
+
+        # A restored audit is reused only if it asked what the plan asks
+        restored = self.restored.get("pass4_audit")
+        if restored is not None:
+            audit = Pass4Result.model_validate(restored)
+            asked = [q.field_to_check for q in audit.questions_asked]
+            if plan.run and asked == [q.field_to_check for q in plan.questions]:
+                return audit
+
+        if plan.run:
+            return await self._ask_audit(results, plan.questions, plan.pages)
+        self._flag("pass4_audit", f"audit_skipped:{plan.reason}")
+        # Audit a sample of the skips anyway to measure what skipping costs;
+        # a certain full_review cannot get a better tier from the audit
+        if plan.reason == "full_review_certain" or random.random() >= self.settings.audit_shadow_rate:
+            return None
+        await self._shadow_audit(results, questions)
+        return None
+
+    async def _shadow_audit(self, results: dict, questions: list) -> None:
+        """Audit a skipped invoice for the stats only; the run is scored as skipped."""
+        extraction: dict = results["pass2_schema_mapping"]
+        try:
+            audit = await self._ask_audit(results, questions, checkpoint=False)
+        except Exception as e:
+            logger.warning("audit_shadow_failed", error=str(e))
+            return
+        scored = score_audit(audit, extraction)
+        audited_tier = compute_confidence(
+            extraction=extraction,
+            validation={"math_results": {}, "line_dispositions": []},
+            audit={"mismatches": scored.mismatches},
+        ).tier
+        tier_changed = audited_tier != pre_audit_tier(extraction)
+        audit_policy_stats.record_shadow(tier_changed)
+        self._flag("pass4_audit", "audit_shadow:tier_changed" if tier_changed else "audit_shadow")
+
+    async def _ask_audit(
+        self, results: dict, questions: list, pages: list[int] | None = None, *, checkpoint: bool = True,
+    ) -> Pass4Result:
+        ingestion: IngestionResult = results["pass0_ingestion"]
+        if any(not page.image_base64 for page in ingestion.pages):
+            # Restored without images because every image stage had a checkpoint,
+            # but the audit policy asks questions the restored audit did not
+            ingestion = run_pass0(self.file_bytes, dpi=self.settings.dpi)
+        set_current_stage("pass4_audit")
+        audit = await ask_audit_questions(
+            ingestion, results["pass05_classification"], self.pipeline._audit_client,
+            self.pipeline.prompt_registry, locale_context=results["locale"],
+            max_tokens=self._max_tokens("pass4_audit", results, question_count=len(questions)),
+            questions=questions, pages=pages,
+        )
+        if checkpoint:
+            await self._checkpoint("pass4_audit", audit.model_dump(mode="json"))
+        return audit
+
+
+@dataclass
+class _Speculation:
+    """A Pass 1A run started on a predicted classification."""
+
+    predicted: ClassificationResult
+    started: float
+    max_tokens: int = 0
+    finished: float = 0.0
+    task: asyncio.Task | None = None
+
+
+def _default_classification() -> ClassificationResult:
+    return ClassificationResult(
+        commodity_type="electricity", commodity_confidence=0.0,
+        complexity_tier="standard", complexity_signals=[],
+        market_type="unknown",
+    )
@@ -0,0 +1,114 @@
+"""Per-pass checkpoints of an extraction run.
+
+Every pass that succeeds stores its output in ``pass_checkpoints`` under
+the extraction ID, together with the hash of its inputs.  A stage's input
+hash covers the file hash, the input hashes of the stages it reads from
+(``STAGE_INPUTS``) and what configures the stage itself (model and prompt
+template), so a changed prompt or model invalidates that stage and every
+stage depending on it.  A retried run, or a reprocessing run reusing an
+earlier extraction's passes, restores every stage whose checkpoint still
+matches and whose inputs were restored too.
+
+Few-shot context from the learning loop is deliberately not part of the
+hash: a resumed run reuses what was already paid for.
+"""
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Mapping
+
+from invoice_ingestion.models.internal import IngestionResult
+
+STAGES = (
+    "pass0_ingestion",
+    "pass05_classification",
+    "pass1_combined",
+    "pass1a_extraction",
+    "pass1b_extraction",
+    "pass2_schema_mapping",
+    "pass3_validation",
+    "pass4_audit",
+)
+
+# The stages whose outputs each stage reads
+STAGE_INPUTS: dict[str, tuple[str, ...]] = {
+    "pass0_ingestion": (),
+    "pass05_classification": ("pass0_ingestion",),
+    # The simple-tier fast lane; when it is accepted 1A, 1B and 2 do not run
+    "pass1_combined": ("pass0_ingestion", "pass05_classification"),
+    "pass1a_extraction": ("pass0_ingestion", "pass05_classification"),
+    # Parallel extraction does not read 1A, but keeping the edge keeps the
+    # hashes independent of the mode (its fingerprint marks the mode instead)
+    "pass1b_extraction": ("pass0_ingestion", "pass05_classification", "pass1a_extraction"),
+    "pass2_schema_mapping": ("pass05_classification", "pass1a_extraction", "pass1b_extraction"),
+    # Locale detection reads the page text and the classified language
+    "pass3_validation": ("pass0_ingestion", "pass05_classification", "pass2_schema_mapping"),
+    # The audit answers; they are scored against Pass 2 on every run
+    "pass4_audit": ("pass0_ingestion", "pass05_classification"),
+}
+
+# ``from_pass`` values for partial reprocessing; "confidence" reuses every
+# pass and only re-scores
+REPROCESS_FROM = {
+    "pass0": "pass0_ingestion",
+    "pass05": "pass05_classification",
+    "combined": "pass1_combined",
+    "pass1a": "pass1a_extraction",
+    "pass1b": "pass1b_extraction",
+    "pass2": "pass2_schema_mapping",
+    "pass3": "pass3_validation",
+    "pass4": "pass4_audit",
+    "confidence": None,
+}
+
+# Stages that send page images, and so need Pass 0 to render them again
+IMAGE_STAGES = frozenset({
+    "pass05_classification", "pass1_combined", "pass1a_extraction", "pass1b_extraction", "pass4_audit",
+})
+
+
+def chain_input_hashes(file_hash: str, fingerprints: Mapping[str, str]) -> dict[str, str]:
+    """Input hash of every stage, in pipeline order."""
+    hashes: dict[str, str] = {}
+    for stage in STAGES:
+        parts = [file_hash, stage, fingerprints.get(stage, "")]
+        parts += [hashes[upstream] for upstream in STAGE_INPUTS[stage]]
+        hashes[stage] = hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+    return hashes
+
+
+def downstream(stage: str) -> set[str]:
+    """*stage* and every stage that reads its output, directly or not."""
+    stages = {stage}
+    for candidate in STAGES:
+        if stages.intersection(STAGE_INPUTS[candidate]):
+            stages.add(candidate)
+    return stages
+
+
+def resumable(stored: Mapping[str, tuple[str, dict]], input_hashes: Mapping[str, str]) -> dict[str, dict]:
+    """Outputs of the stages that need not run again.
+
+    *stored* maps stage to ``(input_hash, output)``.  A stage is restored
+    when its stored input hash still matches and every stage it reads from
+    was restored; the rest run again.
+    """
+    outputs: dict[str, dict] = {}
+    for stage, input_hash in input_hashes.items():
+        checkpoint = stored.get(stage)
+        if checkpoint is None or checkpoint[0] != input_hash:
+            continue
+        if all(upstream in outputs for upstream in STAGE_INPUTS[stage]):
+            outputs[stage] = checkpoint[1]
+    return outputs
+
+
+def ingestion_metadata(ingestion: IngestionResult) -> dict:
+    """Pass 0 output without the page images (re-rendered from the PDF when needed)."""
+    return ingestion.model_dump(mode="json", exclude={"pages": {"__all__": {"image_base64"}}})
+
+
+def restore_ingestion(metadata: dict) -> IngestionResult:
+    """An ``IngestionResult`` from its checkpoint, with empty page images."""
+    pages = [{**page, "image_base64": ""} for page in metadata.get("pages", [])]
+    return IngestionResult.model_validate({**metadata, "pages": pages})
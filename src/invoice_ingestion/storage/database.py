@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from contextlib import asynccontextmanager
 
+from pydantic import SecretStr
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 _engine = None
@@ -15,13 +16,47 @@ def get_engine():
     return _engine
 
 
-def init_db(database_url: str):
+def engine_options(settings) -> dict:
+    """Pool and driver options for *settings*.
+
+    Unless set explicitly, the pool is sized for one process's job
+    concurrency: a connection per running or prefetched job plus the call
+    log writer and queue polling, with the same again as burst overflow.
+    """
+    pool_size = settings.db_pool_size or settings.job_concurrency + settings.job_prefetch + 2
+    max_overflow = settings.db_max_overflow if settings.db_max_overflow is not None else settings.job_concurrency
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_pre_ping": True,
+        # asyncpg's server-side prepared statements, and SQLAlchemy's cache of
+        # them; set db_statement_cache_size=0 behind pgbouncer transaction pooling
+        "connect_args": {
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        },
+    }
+
+
+def init_db(database_url: str | SecretStr, **options):
     """Initialise the async engine and session factory.
 
-    Must be called once at application startup before any database access.
+    Call once at process startup before any database access.  Calling it
+    again with the same URL keeps the existing engine, so a process never
+    ends up with several connection pools; a different URL raises
+    ``RuntimeError`` until ``close_db`` has disposed of the current engine.
+    *options* are passed to ``create_async_engine`` (see ``engine_options``).
     """
     global _engine, _session_factory
-    _engine = create_async_engine(database_url, pool_size=10, max_overflow=20)
+    if isinstance(database_url, SecretStr):
+        database_url = database_url.get_secret_value()
+    if _engine is not None:
+        if _engine.url.render_as_string(hide_password=False) == database_url:
+            return
+        raise RuntimeError(
+            f"Database engine already initialised for {_engine.url.render_as_string()}; call close_db() first"
+        )
+    _engine = create_async_engine(database_url, **{"pool_size": 10, "max_overflow": 20, **options})
     _session_factory = async_sessionmaker(_engine, expire_on_commit=False)
 
 
@@ -39,15 +74,11 @@ async def AsyncSessionLocal():
         async with AsyncSessionLocal() as session:
             # use session
     """
-    global _engine, _session_factory
-
     if _session_factory is None:
         # Auto-initialize from settings
         from ..config import Settings
         settings = Settings()
-        database_url = settings.database_url.get_secret_value()
-        _engine = create_async_engine(database_url, pool_size=10, max_overflow=20)
-        _session_factory = async_sessionmaker(_engine, expire_on_commit=False)
+        init_db(settings.database_url, **engine_options(settings))
 
     async with _session_factory() as session:
         yield session
@@ -55,5 +86,8 @@ async def AsyncSessionLocal():
 
 async def close_db():
     """Dispose of the engine connection pool.  Call at shutdown."""
+    global _engine, _session_factory
     if _engine:
         await _engine.dispose()
+        _engine = None
+        _session_factory = None
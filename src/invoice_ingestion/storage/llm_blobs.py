@@ -0,0 +1,69 @@
+"""Content-addressed, compressed storage for LLM prompt and response text.
+
+System and user prompts are mostly template text and domain knowledge that
+repeat across calls; responses rarely repeat but are large JSON that
+compresses well.  Each distinct text is stored once in ``llm_blobs``,
+zstd-compressed and keyed by its SHA-256; ``llm_calls`` keeps only the hash
+and a short preview.
+"""
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+
+import zstandard
+
+CODEC = "zstd"
+ZSTD_LEVEL = 9
+PREVIEW_CHARS = 200
+
+# Compressor/decompressor objects are reusable but not thread-safe; the
+# event loop only touches them from one thread
+_compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+_decompressor = zstandard.ZstdDecompressor()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def preview(text: str | None) -> str | None:
+    """Truncated text for list views."""
+    if text is None or len(text) <= PREVIEW_CHARS:
+        return text
+    return text[:PREVIEW_CHARS] + "..."
+
+
+def compress_text(text: str) -> bytes:
+    return _compressor.compress(text.encode("utf-8"))
+
+
+def decompress_text(data: bytes, codec: str) -> str:
+    if codec == "zstd":
+        return _decompressor.decompress(data).decode("utf-8")
+    if codec == "none":
+        return data.decode("utf-8")
+    raise ValueError(f"Unknown blob codec: {codec}")
+
+
+class KnownHashes:
+    """Bounded LRU of hashes already stored, so repeated prompts skip the upload."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._hashes: OrderedDict[str, None] = OrderedDict()
+
+    def __contains__(self, digest: str) -> bool:
+        if digest in self._hashes:
+            self._hashes.move_to_end(digest)
+            return True
+        return False
+
+    def add(self, digest: str) -> None:
+        self._hashes[digest] = None
+        self._hashes.move_to_end(digest)
+        while len(self._hashes) > self.max_entries:
+            self._hashes.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._hashes)
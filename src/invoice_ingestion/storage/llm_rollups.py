@@ -0,0 +1,72 @@
+"""Hourly rollups of LLM call statistics.
+
+Every batch of ``llm_calls`` rows written by the call log writer is also
+folded into ``llm_call_rollups``: one row per (hour, stage, model, provider)
+holding counts, token sums and a latency histogram.  The stats endpoint
+reads these instead of aggregating the whole call table; daily or longer
+views are sums over the hourly rows.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterable
+from datetime import datetime
+
+# Upper bounds (inclusive) of the latency histogram buckets; one extra
+# overflow bucket counts everything slower than the last bound
+LATENCY_BOUNDS_MS = (250, 500, 1000, 2000, 5000, 10_000, 20_000, 40_000, 80_000)
+HISTOGRAM_SIZE = len(LATENCY_BOUNDS_MS) + 1
+
+ROLLUP_KEY = ("bucket_start", "stage", "model", "provider")
+ROLLUP_SUMS = (
+    "call_count", "error_count", "input_tokens", "output_tokens", "total_tokens",
+    "duration_count", "duration_ms_sum",
+)
+
+
+def hour_bucket(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def latency_bucket(duration_ms: int) -> int:
+    return bisect_left(LATENCY_BOUNDS_MS, duration_ms)
+
+
+def build_rollups(rows: Iterable[dict]) -> list[dict]:
+    """Aggregate ``llm_calls`` rows into rollup deltas, sorted by key."""
+    rollups: dict[tuple, dict] = {}
+    for row in rows:
+        key = (hour_bucket(row["created_at"]), row["stage"], row["model"], row["provider"])
+        rollup = rollups.get(key)
+        if rollup is None:
+            rollup = dict(zip(ROLLUP_KEY, key))
+            rollup.update({name: 0 for name in ROLLUP_SUMS})
+            rollup["latency_histogram"] = [0] * HISTOGRAM_SIZE
+            rollups[key] = rollup
+        rollup["call_count"] += 1
+        if row.get("error_message") is not None:
+            rollup["error_count"] += 1
+        rollup["input_tokens"] += row.get("input_tokens") or 0
+        rollup["output_tokens"] += row.get("output_tokens") or 0
+        rollup["total_tokens"] += row.get("total_tokens") or 0
+        duration = row.get("duration_ms")
+        if duration is not None:
+            rollup["duration_count"] += 1
+            rollup["duration_ms_sum"] += duration
+            rollup["latency_histogram"][latency_bucket(duration)] += 1
+    # Sorted so concurrent writers upsert the same keys in the same order
+    return [rollups[key] for key in sorted(rollups)]
+
+
+def histogram_percentile(histogram: list[int], pct: float) -> int | None:
+    """Upper bound of the bucket holding the *pct* percentile (None when empty)."""
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = pct / 100 * total
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen >= rank and count:
+            return LATENCY_BOUNDS_MS[min(index, len(LATENCY_BOUNDS_MS) - 1)]
+    return LATENCY_BOUNDS_MS[-1]
@@ -0,0 +1,72 @@
+"""Add llm_blobs table and reference prompts by hash from llm_calls
+
+Revision ID: 6cde345fgh67
+Revises: 5bcd234efg56
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '6cde345fgh67'
+down_revision = '5bcd234efg56'
+branch_labels = None
+depends_on = None
+
+
+def _preview(column: str) -> str:
+    return f"CASE WHEN length({column}) > 200 THEN left({column}, 200) || '...' ELSE {column} END"
+
+
+def upgrade() -> None:
+    op.create_table('llm_blobs',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('codec', sa.String(length=16), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('content_hash')
+    )
+    op.add_column('llm_calls', sa.Column('system_prompt_hash', sa.String(length=64), nullable=True))
+    op.add_column('llm_calls', sa.Column('user_prompt_hash', sa.String(length=64), nullable=True))
+    op.add_column('llm_calls', sa.Column('system_prompt_preview', sa.String(length=256), nullable=True))
+    op.add_column('llm_calls', sa.Column('user_prompt_preview', sa.String(length=256), nullable=True))
+    op.alter_column('llm_calls', 'user_prompt', existing_type=sa.Text(), nullable=True)
+
+    # Move existing prompts into llm_blobs.  Postgres has no zstd, so these
+    # are stored uncompressed (codec "none") and left to TOAST compression.
+    for column in ('system_prompt', 'user_prompt'):
+        op.execute(f"""
+            INSERT INTO llm_blobs (content_hash, codec, size_bytes, data, created_at)
+            SELECT DISTINCT ON (h) h, 'none', octet_length({column}), convert_to({column}, 'UTF8'), now()
+            FROM (
+                SELECT encode(sha256(convert_to({column}, 'UTF8')), 'hex') AS h, {column}
+                FROM llm_calls WHERE {column} IS NOT NULL
+            ) src
+            ON CONFLICT (content_hash) DO NOTHING
+        """)
+        op.execute(f"""
+            UPDATE llm_calls SET
+                {column}_hash = encode(sha256(convert_to({column}, 'UTF8')), 'hex'),
+                {column}_preview = {_preview(column)},
+                {column} = NULL
+            WHERE {column} IS NOT NULL
+        """)
+
+
+def downgrade() -> None:
+    for column in ('system_prompt', 'user_prompt'):
+        op.execute(f"""
+            UPDATE llm_calls c SET {column} = convert_from(b.data, 'UTF8')
+            FROM llm_blobs b
+            WHERE b.content_hash = c.{column}_hash AND b.codec = 'none'
+        """)
+    # zstd blobs cannot be decompressed in SQL; those prompts fall back to the preview
+    op.execute("UPDATE llm_calls SET user_prompt = coalesce(user_prompt, user_prompt_preview, '')")
+    op.alter_column('llm_calls', 'user_prompt', existing_type=sa.Text(), nullable=False)
+    op.drop_column('llm_calls', 'user_prompt_preview')
+    op.drop_column('llm_calls', 'system_prompt_preview')
+    op.drop_column('llm_calls', 'user_prompt_hash')
+    op.drop_column('llm_calls', 'system_prompt_hash')
+    op.drop_table('llm_blobs')
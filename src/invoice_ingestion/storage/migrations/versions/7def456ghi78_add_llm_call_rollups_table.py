@@ -0,0 +1,63 @@
+"""Add llm_call_rollups table with hourly LLM call aggregates
+
+Revision ID: 7def456ghi78
+Revises: 6cde345fgh67
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '7def456ghi78'
+down_revision = '6cde345fgh67'
+branch_labels = None
+depends_on = None
+
+# Histogram bucket bounds at the time of this migration (llm_rollups.LATENCY_BOUNDS_MS)
+LATENCY_BOUNDS_MS = (250, 500, 1000, 2000, 5000, 10_000, 20_000, 40_000, 80_000)
+
+
+def _histogram_sql() -> str:
+    buckets = []
+    lower = None
+    for bound in LATENCY_BOUNDS_MS:
+        condition = f"duration_ms <= {bound}" if lower is None else f"duration_ms > {lower} AND duration_ms <= {bound}"
+        buckets.append(f"count(*) FILTER (WHERE {condition})::int")
+        lower = bound
+    buckets.append(f"count(*) FILTER (WHERE duration_ms > {lower})::int")
+    return "ARRAY[" + ", ".join(buckets) + "]"
+
+
+def upgrade() -> None:
+    op.create_table('llm_call_rollups',
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('stage', sa.String(length=50), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('provider', sa.String(length=50), nullable=False),
+        sa.Column('call_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('input_tokens', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('output_tokens', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('total_tokens', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('duration_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('duration_ms_sum', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('latency_histogram', sa.ARRAY(sa.Integer()), nullable=False),
+        sa.PrimaryKeyConstraint('bucket_start', 'stage', 'model', 'provider')
+    )
+
+    # Seed from the calls logged so far
+    op.execute(f"""
+        INSERT INTO llm_call_rollups
+        SELECT date_trunc('hour', created_at), stage, model, provider,
+               count(*), count(error_message),
+               coalesce(sum(input_tokens), 0), coalesce(sum(output_tokens), 0), coalesce(sum(total_tokens), 0),
+               count(duration_ms), coalesce(sum(duration_ms), 0),
+               {_histogram_sql()}
+        FROM llm_calls
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('llm_call_rollups')
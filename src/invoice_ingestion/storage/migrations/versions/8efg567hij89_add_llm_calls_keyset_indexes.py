@@ -0,0 +1,25 @@
+"""Add keyset pagination indexes on llm_calls
+
+Revision ID: 8efg567hij89
+Revises: 7def456ghi78
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '8efg567hij89'
+down_revision = '7def456ghi78'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_llm_calls_created_at_call_id', 'llm_calls', ['created_at', 'call_id'], unique=False)
+    op.create_index('ix_llm_calls_stage_created_at_call_id', 'llm_calls', ['stage', 'created_at', 'call_id'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_llm_calls_stage_created_at_call_id', table_name='llm_calls')
+    op.drop_index('ix_llm_calls_created_at_call_id', table_name='llm_calls')
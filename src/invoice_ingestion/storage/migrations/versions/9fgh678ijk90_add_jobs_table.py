@@ -0,0 +1,43 @@
+"""Add jobs table for the durable processing queue
+
+Revision ID: 9fgh678ijk90
+Revises: 8efg567hij89
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '9fgh678ijk90'
+down_revision = '8efg567hij89'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('jobs',
+        sa.Column('job_id', sa.Uuid(), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('priority', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='3'),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('locked_by', sa.String(length=200), nullable=True),
+        sa.Column('lease_id', sa.Uuid(), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('job_id')
+    )
+    op.create_index('ix_jobs_status_priority_available_at', 'jobs', ['status', 'priority', 'available_at'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_status_priority_available_at', table_name='jobs')
+    op.drop_table('jobs')
@@ -0,0 +1,34 @@
+"""Admit one in-progress extraction per file hash
+
+Revision ID: a1hi789jkl01
+Revises: 9fgh678ijk90
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'a1hi789jkl01'
+down_revision = '9fgh678ijk90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rows left "processing" by crashed or duplicate runs would violate the
+    # index; keep the newest per hash and fail the rest
+    op.execute("""
+        UPDATE extractions SET status = 'failed', updated_at = now()
+        WHERE status = 'processing' AND extraction_id NOT IN (
+            SELECT DISTINCT ON (file_hash) extraction_id
+            FROM extractions WHERE status = 'processing'
+            ORDER BY file_hash, created_at DESC
+        )
+    """)
+    op.create_index('uq_extractions_processing_file_hash', 'extractions', ['file_hash'], unique=True,
+                    postgresql_where=sa.text("status = 'processing'"))
+
+
+def downgrade() -> None:
+    op.drop_index('uq_extractions_processing_file_hash', table_name='extractions')
@@ -0,0 +1,30 @@
+"""Add pass_checkpoints table for resumable extraction runs
+
+Revision ID: b2ij890klm12
+Revises: a1hi789jkl01
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'b2ij890klm12'
+down_revision = 'a1hi789jkl01'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('pass_checkpoints',
+        sa.Column('extraction_id', sa.Uuid(), nullable=False),
+        sa.Column('stage', sa.String(length=50), nullable=False),
+        sa.Column('input_hash', sa.String(length=64), nullable=False),
+        sa.Column('output', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('extraction_id', 'stage')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('pass_checkpoints')
@@ -0,0 +1,36 @@
+"""Add charge_classifications table for learned charge classifications
+
+Revision ID: c3jk901lmn23
+Revises: b2ij890klm12
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'c3jk901lmn23'
+down_revision = 'b2ij890klm12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('charge_classifications',
+        sa.Column('utility', sa.String(length=200), nullable=False),
+        sa.Column('description_key', sa.String(length=500), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('charge_section', sa.String(length=50), nullable=False),
+        sa.Column('charge_owner', sa.String(length=50), nullable=False),
+        sa.Column('attribution_type', sa.String(length=50), nullable=True),
+        sa.Column('confirmations', sa.Integer(), nullable=False),
+        sa.Column('contradictions', sa.Integer(), nullable=False),
+        sa.Column('source', sa.String(length=50), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('utility', 'description_key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('charge_classifications')
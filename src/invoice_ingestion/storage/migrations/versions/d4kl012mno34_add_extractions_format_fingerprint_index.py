@@ -0,0 +1,26 @@
+"""Index extractions by the format fingerprint in their result
+
+Revision ID: d4kl012mno34
+Revises: c3jk901lmn23
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'd4kl012mno34'
+down_revision = 'c3jk901lmn23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_extractions_format_fingerprint', 'extractions',
+        [sa.text("(result_json #>> '{classification,format_fingerprint}')")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_extractions_format_fingerprint', table_name='extractions')
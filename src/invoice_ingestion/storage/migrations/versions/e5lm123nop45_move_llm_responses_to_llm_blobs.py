@@ -0,0 +1,53 @@
+"""Reference LLM responses by hash from llm_calls, stored in llm_blobs
+
+Revision ID: e5lm123nop45
+Revises: d4kl012mno34
+Create Date: 2026-10-19 19:30:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e5lm123nop45'
+down_revision = 'd4kl012mno34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('llm_calls', sa.Column('response_hash', sa.String(length=64), nullable=True))
+    op.add_column('llm_calls', sa.Column('response_preview', sa.String(length=256), nullable=True))
+
+    # Move existing responses into llm_blobs, uncompressed (codec "none") as
+    # the prompts were: Postgres has no zstd
+    op.execute("""
+        INSERT INTO llm_blobs (content_hash, codec, size_bytes, data, created_at)
+        SELECT DISTINCT ON (h) h, 'none', octet_length(response_content), convert_to(response_content, 'UTF8'), now()
+        FROM (
+            SELECT encode(sha256(convert_to(response_content, 'UTF8')), 'hex') AS h, response_content
+            FROM llm_calls WHERE response_content IS NOT NULL
+        ) src
+        ON CONFLICT (content_hash) DO NOTHING
+    """)
+    op.execute("""
+        UPDATE llm_calls SET
+            response_hash = encode(sha256(convert_to(response_content, 'UTF8')), 'hex'),
+            response_preview = CASE WHEN length(response_content) > 200
+                                    THEN left(response_content, 200) || '...' ELSE response_content END,
+            response_content = NULL
+        WHERE response_content IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        UPDATE llm_calls c SET response_content = convert_from(b.data, 'UTF8')
+        FROM llm_blobs b
+        WHERE b.content_hash = c.response_hash AND b.codec = 'none'
+    """)
+    # zstd blobs cannot be decompressed in SQL; those responses fall back to the preview
+    op.execute("UPDATE llm_calls SET response_content = response_preview "
+               "WHERE response_content IS NULL AND response_hash IS NOT NULL")
+    op.drop_column('llm_calls', 'response_preview')
+    op.drop_column('llm_calls', 'response_hash')
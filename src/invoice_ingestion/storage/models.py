@@ -5,7 +5,10 @@ from __future__ import annotations
 from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, JSON, String, Text
+from sqlalchemy import (
+    ARRAY, BigInteger, Boolean, DateTime, Float, ForeignKey, Index, Integer, JSON, LargeBinary, String, Text,
+    literal_column, text,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -15,6 +18,11 @@ class Base(DeclarativeBase):
 
 class Extraction(Base):
     __tablename__ = "extractions"
+    __table_args__ = (
+        # One run in progress per file: the cross-process dedup claim
+        Index("uq_extractions_processing_file_hash", "file_hash", unique=True,
+              postgresql_where=text("status = 'processing'")),
+    )
 
     extraction_id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     file_hash: Mapped[str] = mapped_column(String(64), index=True)
@@ -30,6 +38,14 @@ class Extraction(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+# An extraction's format fingerprint; the per-format history queries
+# (output token sizing, audit policy) filter on it through this index
+EXTRACTION_FORMAT_FINGERPRINT = Extraction.result_json.op("#>>", return_type=Text())(
+    literal_column("'{classification,format_fingerprint}'")
+)
+Index("ix_extractions_format_fingerprint", EXTRACTION_FORMAT_FINGERPRINT)
+
+
 class Correction(Base):
     __tablename__ = "corrections"
 
@@ -86,6 +102,11 @@ class AuditLog(Base):
 class LLMCall(Base):
     """Store LLM prompt/response pairs for troubleshooting."""
     __tablename__ = "llm_calls"
+    __table_args__ = (
+        # Keyset pagination over (created_at, call_id), optionally per stage
+        Index("ix_llm_calls_created_at_call_id", "created_at", "call_id"),
+        Index("ix_llm_calls_stage_created_at_call_id", "stage", "created_at", "call_id"),
+    )
 
     call_id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     extraction_id: Mapped[UUID | None] = mapped_column(ForeignKey("extractions.extraction_id"), index=True, nullable=True)
@@ -97,16 +118,24 @@ class LLMCall(Base):
     model: Mapped[str] = mapped_column(String(100))
     provider: Mapped[str] = mapped_column(String(50))  # anthropic, openai, azure_openai, azure_ai
 
-    # Request
+    # Request — prompt text lives in llm_blobs, referenced by SHA-256; the
+    # inline columns are only populated on rows written before that
     system_prompt: Mapped[str | None] = mapped_column(Text, nullable=True)
-    user_prompt: Mapped[str] = mapped_column(Text)
+    user_prompt: Mapped[str | None] = mapped_column(Text, nullable=True)
+    system_prompt_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    user_prompt_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    system_prompt_preview: Mapped[str | None] = mapped_column(String(256), nullable=True)
+    user_prompt_preview: Mapped[str | None] = mapped_column(String(256), nullable=True)
     has_images: Mapped[bool] = mapped_column(Boolean, default=False)
     image_count: Mapped[int] = mapped_column(Integer, default=0)
     temperature: Mapped[float | None] = mapped_column(Float, nullable=True)
     max_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
-    # Response
+    # Response — the text lives in llm_blobs like the prompts; the inline
+    # column is only populated on rows written before that
     response_content: Mapped[str | None] = mapped_column(Text, nullable=True)
+    response_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    response_preview: Mapped[str | None] = mapped_column(String(256), nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     # Token usage
@@ -117,3 +146,94 @@ class LLMCall(Base):
     # Timing
     duration_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class LLMBlob(Base):
+    """Deduplicated, compressed prompt and response text referenced by hash from ``llm_calls``."""
+    __tablename__ = "llm_blobs"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)  # SHA-256 of the UTF-8 text
+    codec: Mapped[str] = mapped_column(String(16))  # zstd
+    size_bytes: Mapped[int] = mapped_column(Integer)  # uncompressed
+    data: Mapped[bytes] = mapped_column(LargeBinary)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class LLMCallRollup(Base):
+    """Hourly aggregates of ``llm_calls`` per (stage, model, provider)."""
+    __tablename__ = "llm_call_rollups"
+
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    stage: Mapped[str] = mapped_column(String(50), primary_key=True)
+    model: Mapped[str] = mapped_column(String(100), primary_key=True)
+    provider: Mapped[str] = mapped_column(String(50), primary_key=True)
+
+    call_count: Mapped[int] = mapped_column(Integer, default=0)
+    error_count: Mapped[int] = mapped_column(Integer, default=0)
+    input_tokens: Mapped[int] = mapped_column(BigInteger, default=0)
+    output_tokens: Mapped[int] = mapped_column(BigInteger, default=0)
+    total_tokens: Mapped[int] = mapped_column(BigInteger, default=0)
+    # Calls with a recorded duration, their summed latency and a histogram
+    # over storage.llm_rollups.LATENCY_BOUNDS_MS
+    duration_count: Mapped[int] = mapped_column(Integer, default=0)
+    duration_ms_sum: Mapped[int] = mapped_column(BigInteger, default=0)
+    latency_histogram: Mapped[list[int]] = mapped_column(ARRAY(Integer))
+
+
+class Job(Base):
+    """Durable processing queue, leased with ``SELECT ... FOR UPDATE SKIP LOCKED``."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Lease scan: highest priority, oldest first, among runnable jobs
+        Index("ix_jobs_status_priority_available_at", "status", "priority", "available_at"),
+    )
+
+    job_id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    kind: Mapped[str] = mapped_column(String(50), default="extract")
+    status: Mapped[str] = mapped_column(String(50), default="queued")  # queued, processing, completed, failed
+    priority: Mapped[int] = mapped_column(Integer, default=0)  # higher runs first
+    payload: Mapped[dict] = mapped_column(JSON)  # filename, file_path, reprocess_of
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3)
+    # Not leasable before this time (retry backoff)
+    available_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # Current lease: holder, fencing token and visibility timeout
+    locked_by: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    lease_id: Mapped[UUID | None] = mapped_column(nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class PassCheckpoint(Base):
+    """Output of one pass of an extraction run (see ``storage.checkpoints``)."""
+    __tablename__ = "pass_checkpoints"
+
+    # No foreign key: forced runs checkpoint before their extraction row exists
+    extraction_id: Mapped[UUID] = mapped_column(primary_key=True)
+    stage: Mapped[str] = mapped_column(String(50), primary_key=True)
+    input_hash: Mapped[str] = mapped_column(String(64))
+    output: Mapped[dict] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class ChargeClassification(Base):
+    """Learned classification of a utility's charge description (see ``learning.charge_cache``)."""
+    __tablename__ = "charge_classifications"
+
+    # Normalized utility name and charge description
+    utility: Mapped[str] = mapped_column(String(200), primary_key=True)
+    description_key: Mapped[str] = mapped_column(String(500), primary_key=True)
+    description: Mapped[str] = mapped_column(Text)  # as last seen
+    category: Mapped[str] = mapped_column(String(50))
+    charge_section: Mapped[str] = mapped_column(String(50))
+    charge_owner: Mapped[str] = mapped_column(String(50))
+    attribution_type: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    confirmations: Mapped[int] = mapped_column(Integer, default=0)
+    contradictions: Mapped[int] = mapped_column(Integer, default=0)
+    source: Mapped[str] = mapped_column(String(50), default="accepted")  # accepted, correction
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -2,23 +2,43 @@
 
 from __future__ import annotations
 
-from uuid import UUID
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
 
-from sqlalchemy import func, select, update
+from sqlalchemy import Row, Text, and_, case, func, literal_column, or_, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from invoice_ingestion.storage.models import (
+    EXTRACTION_FORMAT_FINGERPRINT,
+    ChargeClassification,
     Correction,
     DriftEvent,
     Extraction,
     FormatFingerprint,
+    Job,
+    LLMBlob,
     LLMCall,
+    LLMCallRollup,
+    PassCheckpoint,
+)
+from invoice_ingestion.storage.llm_blobs import CODEC, PREVIEW_CHARS, compress_text, decompress_text
+from invoice_ingestion.storage.llm_rollups import (
+    HISTOGRAM_SIZE,
+    ROLLUP_KEY,
+    ROLLUP_SUMS,
+    histogram_percentile,
 )
 
 
 # ── Extraction ───────────────────────────────────────────────────────────────
 
 
+# Statuses whose result is returned for a re-submitted file
+REUSABLE_STATUSES = ("accepted", "pending_review")
+
+
 class ExtractionRepo:
     """CRUD operations for the ``extractions`` table."""
 
@@ -46,6 +66,104 @@ class ExtractionRepo:
         result = await self._session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_reusable_by_hash(self, file_hash: str) -> Extraction | None:
+        """Latest extraction of *file_hash* whose result may be returned again."""
+        stmt = (
+            select(Extraction)
+            .where(
+                Extraction.file_hash == file_hash,
+                Extraction.status.in_(REUSABLE_STATUSES),
+                Extraction.result_json.is_not(None),
+            )
+            .order_by(Extraction.created_at.desc())
+            .limit(1)
+        )
+        result = await self._session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def claim_hash(self, file_hash: str, blob_name: str, *, stale_after: float) -> UUID | None:
+        """Claim *file_hash* for a run; return the extraction ID to run as.
+
+        The partial unique index on ``file_hash`` where ``status =
+        'processing'`` admits one claim per file; returns None while another
+        run holds it.  Claims not updated within *stale_after* seconds
+        belong to crashed runs and are failed first.  The latest failed
+        extraction of the file is claimed again rather than starting a new
+        one, so the run resumes from its pass checkpoints.
+        """
+        now = datetime.utcnow()
+        await self._session.execute(
+            update(Extraction)
+            .where(
+                Extraction.file_hash == file_hash,
+                Extraction.status == "processing",
+                Extraction.updated_at < now - timedelta(seconds=stale_after),
+            )
+            .values(status="failed", updated_at=now)
+        )
+        failed_id = (await self._session.execute(
+            select(Extraction.extraction_id)
+            .where(Extraction.file_hash == file_hash, Extraction.status == "failed")
+            .order_by(Extraction.created_at.desc())
+            .limit(1)
+        )).scalar_one_or_none()
+        if failed_id is not None:
+            try:
+                async with self._session.begin_nested():
+                    result = await self._session.execute(
+                        update(Extraction)
+                        .where(Extraction.extraction_id == failed_id, Extraction.status == "failed")
+                        .values(status="processing", blob_name=blob_name, updated_at=now)
+                    )
+            except IntegrityError:
+                return None  # Another run claimed the file meanwhile
+            return failed_id if result.rowcount else None
+
+        stmt = (
+            pg_insert(Extraction)
+            .values(
+                extraction_id=uuid4(), file_hash=file_hash, blob_name=blob_name,
+                status="processing", created_at=now, updated_at=now,
+            )
+            .on_conflict_do_nothing(index_elements=["file_hash"], index_where=text("status = 'processing'"))
+            .returning(Extraction.extraction_id)
+        )
+        result = await self._session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def touch_claim(self, extraction_id: UUID) -> bool:
+        """Keep a running claim from going stale; False when it is no longer held."""
+        result = await self._session.execute(
+            update(Extraction)
+            .where(Extraction.extraction_id == extraction_id, Extraction.status == "processing")
+            .values(updated_at=datetime.utcnow())
+        )
+        return bool(result.rowcount)
+
+    async def release_claim(self, extraction_id: UUID) -> None:
+        """Fail a claim whose run did not store a result."""
+        await self._session.execute(
+            update(Extraction)
+            .where(Extraction.extraction_id == extraction_id, Extraction.status == "processing")
+            .values(status="failed", updated_at=datetime.utcnow())
+        )
+
+    async def upsert(self, extraction: Extraction) -> None:
+        """Insert *extraction*, or overwrite the claim row with the same id."""
+        values = {
+            column.key: getattr(extraction, column.key)
+            for column in Extraction.__table__.columns
+            if getattr(extraction, column.key) is not None
+        }
+        values.setdefault("created_at", datetime.utcnow())
+        values["updated_at"] = datetime.utcnow()
+        stmt = pg_insert(Extraction).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["extraction_id"],
+            set_={key: stmt.excluded[key] for key in values if key not in ("extraction_id", "created_at")},
+        )
+        await self._session.execute(stmt)
+
     async def list_extractions(
         self,
         *,
@@ -85,6 +203,25 @@ class ExtractionRepo:
         result = await self._session.execute(stmt)
         return {tier: count for tier, count in result.all()}
 
+    async def get_review_history(self, format_fingerprint: str, limit: int = 50) -> list[bool]:
+        """Recent human review outcomes for a format, newest first.
+
+        True for an extraction approved as extracted, False for one a
+        reviewer corrected; auto-accepted extractions were never reviewed.
+        """
+        stmt = (
+            select(Extraction.status)
+            .where(
+                EXTRACTION_FORMAT_FINGERPRINT == format_fingerprint,
+                Extraction.status.in_(("accepted", "reviewed")),
+                Extraction.confidence_tier != "auto_accept",
+            )
+            .order_by(Extraction.updated_at.desc())
+            .limit(limit)
+        )
+        result = await self._session.execute(stmt)
+        return [status == "accepted" for status in result.scalars().all()]
+
     async def update_status(self, extraction_id: UUID, status: str) -> None:
         stmt = (
             update(Extraction)
@@ -114,6 +251,36 @@ class ExtractionRepo:
         await self._session.flush()
 
 
+# ── Pass checkpoints ─────────────────────────────────────────────────────────
+
+
+class CheckpointRepo:
+    """Per-pass outputs of extraction runs (``pass_checkpoints``)."""
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def save(self, extraction_id: UUID, stage: str, input_hash: str, output: dict) -> None:
+        stmt = pg_insert(PassCheckpoint).values(
+            extraction_id=extraction_id, stage=stage, input_hash=input_hash,
+            output=output, created_at=datetime.utcnow(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["extraction_id", "stage"],
+            set_={"input_hash": stmt.excluded.input_hash, "output": stmt.excluded.output,
+                  "created_at": stmt.excluded.created_at},
+        )
+        await self._session.execute(stmt)
+
+    async def get_for_extraction(self, extraction_id: UUID) -> dict[str, tuple[str, dict]]:
+        """Stage → ``(input_hash, output)`` for every checkpoint of *extraction_id*."""
+        stmt = select(PassCheckpoint.stage, PassCheckpoint.input_hash, PassCheckpoint.output).where(
+            PassCheckpoint.extraction_id == extraction_id
+        )
+        result = await self._session.execute(stmt)
+        return {stage: (input_hash, output) for stage, input_hash, output in result.all()}
+
+
 # ── Correction ───────────────────────────────────────────────────────────────
 
 
@@ -232,6 +399,45 @@ class CorrectionRepo:
         return groups
 
 
+# ── Charge classification ────────────────────────────────────────────────────
+
+
+class ChargeClassificationRepo:
+    """Learned charge classifications (``charge_classifications``)."""
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def get(self, utility: str, description_key: str) -> ChargeClassification | None:
+        stmt = select(ChargeClassification).where(
+            ChargeClassification.utility == utility,
+            ChargeClassification.description_key == description_key,
+        ).execution_options(populate_existing=True)  # save() writes around the identity map
+        result = await self._session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def list_all(self) -> list[ChargeClassification]:
+        result = await self._session.execute(select(ChargeClassification))
+        return list(result.scalars().all())
+
+    async def save(self, utility: str, description_key: str, description: str, entry) -> None:
+        """Upsert *entry* (a ``learning.charge_cache.CachedClassification``)."""
+        values = {
+            "description": description,
+            "category": entry.category,
+            "charge_section": entry.charge_section,
+            "charge_owner": entry.charge_owner,
+            "attribution_type": entry.attribution_type,
+            "confirmations": entry.confirmations,
+            "contradictions": entry.contradictions,
+            "source": entry.source,
+            "updated_at": datetime.utcnow(),
+        }
+        stmt = pg_insert(ChargeClassification).values(utility=utility, description_key=description_key, **values)
+        stmt = stmt.on_conflict_do_update(index_elements=["utility", "description_key"], set_=values)
+        await self._session.execute(stmt)
+
+
 # ── Fingerprint ──────────────────────────────────────────────────────────────
 
 
@@ -312,6 +518,42 @@ class DriftRepo:
 # ── LLM Calls ────────────────────────────────────────────────────────────────
 
 
+def _sql_preview(column):
+    """Truncate *column* to a preview in the database, so full texts are never loaded."""
+    return case(
+        (func.length(column) > PREVIEW_CHARS, func.left(column, PREVIEW_CHARS, type_=Text).concat("...")),
+        else_=column,
+    )
+
+
+def _call_summary_columns() -> tuple:
+    return (
+        LLMCall.call_id,
+        LLMCall.extraction_id,
+        LLMCall.stage,
+        LLMCall.model,
+        LLMCall.provider,
+        LLMCall.has_images,
+        LLMCall.image_count,
+        LLMCall.input_tokens,
+        LLMCall.output_tokens,
+        LLMCall.total_tokens,
+        LLMCall.duration_ms,
+        LLMCall.error_message,
+        LLMCall.created_at,
+        # Rows written before llm_blobs carry the full texts inline
+        func.coalesce(
+            LLMCall.system_prompt_preview, _sql_preview(LLMCall.system_prompt)
+        ).label("system_prompt_preview"),
+        func.coalesce(
+            LLMCall.user_prompt_preview, _sql_preview(LLMCall.user_prompt)
+        ).label("user_prompt_preview"),
+        func.coalesce(
+            LLMCall.response_preview, _sql_preview(LLMCall.response_content)
+        ).label("response_preview"),
+    )
+
+
 class LLMCallRepo:
     """CRUD operations for the ``llm_calls`` table."""
 
@@ -324,26 +566,37 @@ class LLMCallRepo:
         await self._session.refresh(call)
         return call
 
-    async def get_by_extraction(self, extraction_id: UUID) -> list[LLMCall]:
+    async def get_by_id(self, call_id: UUID) -> LLMCall | None:
+        return await self._session.get(LLMCall, call_id)
+
+    async def get_by_extraction(self, extraction_id: UUID) -> list[Row]:
+        """Call summaries (see ``list_calls``) for one extraction, oldest first."""
         stmt = (
-            select(LLMCall)
+            select(*_call_summary_columns())
             .where(LLMCall.extraction_id == extraction_id)
-            .order_by(LLMCall.created_at.asc())
+            .order_by(LLMCall.created_at.asc(), LLMCall.call_id.asc())
         )
         result = await self._session.execute(stmt)
-        return list(result.scalars().all())
+        return list(result.all())
 
     async def list_calls(
         self,
         *,
-        offset: int = 0,
         limit: int = 50,
+        before: tuple[datetime, UUID] | None = None,
         extraction_id: UUID | None = None,
         stage: str | None = None,
         model: str | None = None,
-    ) -> list[LLMCall]:
-        stmt = select(LLMCall).order_by(LLMCall.created_at.desc())
+    ) -> list[Row]:
+        """Return call summaries, newest first, with prompt/response previews.
+
+        Keyset pagination: pass the ``(created_at, call_id)`` of the last row
+        of the previous page as *before*.
+        """
+        stmt = select(*_call_summary_columns()).order_by(LLMCall.created_at.desc(), LLMCall.call_id.desc())
 
+        if before is not None:
+            stmt = stmt.where(tuple_(LLMCall.created_at, LLMCall.call_id) < tuple_(*before))
         if extraction_id:
             stmt = stmt.where(LLMCall.extraction_id == extraction_id)
         if stage:
@@ -351,9 +604,52 @@ class LLMCallRepo:
         if model:
             stmt = stmt.where(LLMCall.model == model)
 
-        stmt = stmt.offset(offset).limit(limit)
+        stmt = stmt.limit(limit)
+        result = await self._session.execute(stmt)
+        return list(result.all())
+
+    async def get_output_token_history(
+        self,
+        format_fingerprint: str,
+        stages: list[str],
+        limit_per_stage: int = 20,
+    ) -> dict[str, list[tuple[int, int | None]]]:
+        """Return recent ``(output_tokens, max_tokens)`` pairs per stage.
+
+        Only successful calls belonging to extractions whose classification
+        carries *format_fingerprint* are considered.  The limit applies per
+        stage, so the high-volume extraction passes do not crowd out the
+        history of the others.
+        """
+        ranked = (
+            select(
+                LLMCall.stage,
+                LLMCall.output_tokens,
+                LLMCall.max_tokens,
+                func.row_number().over(
+                    partition_by=LLMCall.stage, order_by=LLMCall.created_at.desc()
+                ).label("recency"),
+            )
+            .join(Extraction, Extraction.extraction_id == LLMCall.extraction_id)
+            .where(
+                EXTRACTION_FORMAT_FINGERPRINT == format_fingerprint,
+                LLMCall.stage.in_(stages),
+                LLMCall.error_message.is_(None),
+                LLMCall.output_tokens.is_not(None),
+            )
+            .subquery()
+        )
+        stmt = (
+            select(ranked.c.stage, ranked.c.output_tokens, ranked.c.max_tokens)
+            .where(ranked.c.recency <= limit_per_stage)
+            .order_by(ranked.c.stage, ranked.c.recency)
+        )
         result = await self._session.execute(stmt)
-        return list(result.scalars().all())
+
+        history: dict[str, list[tuple[int, int | None]]] = {}
+        for stage, output_tokens, max_tokens in result.all():
+            history.setdefault(stage, []).append((output_tokens, max_tokens))
+        return history
 
     async def get_stats(self, extraction_id: UUID | None = None) -> dict:
         """Get aggregate stats about LLM calls.
@@ -421,3 +717,236 @@ class LLMCallRepo:
             "by_stage": by_stage,
             "by_model": by_model,
         }
+
+
+class LLMBlobRepo:
+    """Deduplicated prompt and response text in the ``llm_blobs`` table."""
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def put_many(self, texts: dict[str, str]) -> None:
+        """Store *texts* (hash → text); hashes already present are left alone."""
+        if not texts:
+            return
+        # Sorted so concurrent writers inserting the same hashes lock in the same order
+        rows = [
+            {"content_hash": digest, "codec": CODEC, "size_bytes": len(text.encode("utf-8")),
+             "data": compress_text(text)}
+            for digest, text in sorted(texts.items())
+        ]
+        stmt = pg_insert(LLMBlob).values(rows).on_conflict_do_nothing(index_elements=["content_hash"])
+        await self._session.execute(stmt)
+
+    async def get_texts(self, hashes: list[str]) -> dict[str, str]:
+        """Return hash → decompressed text for the hashes that exist."""
+        wanted = [h for h in hashes if h]
+        if not wanted:
+            return {}
+        stmt = select(LLMBlob.content_hash, LLMBlob.codec, LLMBlob.data).where(LLMBlob.content_hash.in_(wanted))
+        result = await self._session.execute(stmt)
+        return {digest: decompress_text(data, codec) for digest, codec, data in result.all()}
+
+
+class LLMCallRollupRepo:
+    """Hourly LLM call aggregates in the ``llm_call_rollups`` table."""
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def add_many(self, rollups: list[dict]) -> None:
+        """Add rollup deltas (see ``llm_rollups.build_rollups``) to their hourly rows."""
+        if not rollups:
+            return
+        stmt = pg_insert(LLMCallRollup).values(rollups)
+        table = LLMCallRollup.__table__
+        set_ = {name: table.c[name] + stmt.excluded[name] for name in ROLLUP_SUMS}
+        set_["latency_histogram"] = literal_column(
+            "ARRAY(SELECT a + b FROM unnest(llm_call_rollups.latency_histogram, excluded.latency_histogram)"
+            " WITH ORDINALITY AS t(a, b, i) ORDER BY i)"
+        )
+        await self._session.execute(stmt.on_conflict_do_update(index_elements=list(ROLLUP_KEY), set_=set_))
+
+    async def get_stats(self, start: datetime | None = None, end: datetime | None = None) -> dict:
+        """Aggregate stats over the hourly buckets in ``[start, end)``."""
+        range_filter = []
+        if start is not None:
+            range_filter.append(LLMCallRollup.bucket_start >= start)
+        if end is not None:
+            range_filter.append(LLMCallRollup.bucket_start < end)
+
+        sums_stmt = (
+            select(
+                LLMCallRollup.stage,
+                LLMCallRollup.model,
+                *(func.sum(getattr(LLMCallRollup, name)) for name in ROLLUP_SUMS),
+            )
+            .where(*range_filter)
+            .group_by(LLMCallRollup.stage, LLMCallRollup.model)
+        )
+        by_stage: dict[str, dict] = {}
+        by_model: dict[str, dict] = {}
+        for stage, model, *values in (await self._session.execute(sums_stmt)).all():
+            sums = dict(zip(ROLLUP_SUMS, (int(v or 0) for v in values)))
+            entry = by_stage.setdefault(stage, {"count": 0, "error_count": 0, "total_tokens": 0,
+                                                "duration_count": 0, "duration_ms_sum": 0})
+            entry["count"] += sums["call_count"]
+            entry["error_count"] += sums["error_count"]
+            entry["total_tokens"] += sums["total_tokens"]
+            entry["duration_count"] += sums["duration_count"]
+            entry["duration_ms_sum"] += sums["duration_ms_sum"]
+            model_entry = by_model.setdefault(model, {"count": 0, "total_tokens": 0,
+                                                      "input_tokens": 0, "output_tokens": 0})
+            model_entry["count"] += sums["call_count"]
+            model_entry["total_tokens"] += sums["total_tokens"]
+            model_entry["input_tokens"] += sums["input_tokens"]
+            model_entry["output_tokens"] += sums["output_tokens"]
+
+        bucket = (
+            func.unnest(LLMCallRollup.latency_histogram)
+            .table_valued("value", with_ordinality="position")
+            .render_derived("bucket")
+        )
+        histogram_stmt = (
+            select(LLMCallRollup.stage, bucket.c.position, func.sum(bucket.c.value))
+            .select_from(LLMCallRollup)
+            .join(bucket, literal_column("true"))
+            .where(*range_filter)
+            .group_by(LLMCallRollup.stage, bucket.c.position)
+        )
+        histograms: dict[str, list[int]] = {}
+        for stage, position, count in (await self._session.execute(histogram_stmt)).all():
+            histograms.setdefault(stage, [0] * HISTOGRAM_SIZE)[position - 1] = int(count or 0)
+
+        for stage, entry in by_stage.items():
+            duration_count = entry.pop("duration_count")
+            duration_sum = entry.pop("duration_ms_sum")
+            histogram = histograms.get(stage, [])
+            entry["avg_duration_ms"] = round(duration_sum / duration_count) if duration_count else None
+            entry["p50_duration_ms"] = histogram_percentile(histogram, 50)
+            entry["p95_duration_ms"] = histogram_percentile(histogram, 95)
+
+        return {
+            "total_calls": sum(e["count"] for e in by_stage.values()),
+            "error_count": sum(e["error_count"] for e in by_stage.values()),
+            "by_stage": by_stage,
+            "by_model": by_model,
+        }
+
+
+# ── Jobs ─────────────────────────────────────────────────────────────────────
+
+
+class JobRepo:
+    """Durable job queue operations on the ``jobs`` table.
+
+    Consumers lease one job at a time with ``FOR UPDATE SKIP LOCKED``, so any
+    number of processes can poll the table without blocking each other.  A
+    lease expires after its visibility timeout unless renewed, after which
+    the job becomes leasable again; ``lease_id`` fences off a consumer whose
+    lease was taken over.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def enqueue(
+        self,
+        payload: dict,
+        *,
+        kind: str = "extract",
+        priority: int = 0,
+        max_attempts: int = 3,
+        job_id: UUID | None = None,
+    ) -> Job:
+        job = Job(
+            job_id=job_id or uuid4(),
+            kind=kind,
+            status="queued",
+            priority=priority,
+            payload=payload,
+            attempts=0,
+            max_attempts=max_attempts,
+            available_at=datetime.utcnow(),
+        )
+        self._session.add(job)
+        await self._session.flush()
+        return job
+
+    async def get_by_id(self, job_id: UUID) -> Job | None:
+        return await self._session.get(Job, job_id)
+
+    async def list_jobs(self, *, limit: int = 100, status: str | None = None) -> list[Job]:
+        stmt = select(Job).order_by(Job.created_at.desc()).limit(limit)
+        if status:
+            stmt = stmt.where(Job.status == status)
+        result = await self._session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def lease(self, worker_id: str, visibility_timeout: float) -> Job | None:
+        """Claim the next runnable job for *worker_id*, or return None.
+
+        Runnable means queued and past its backoff, or processing with an
+        expired lease (its consumer died).  Expired jobs already out of
+        attempts are failed instead.  Commit promptly to release the row lock.
+        """
+        now = datetime.utcnow()
+        await self._session.execute(
+            update(Job)
+            .where(Job.status == "processing", Job.lease_expires_at < now, Job.attempts >= Job.max_attempts)
+            .values(status="failed", error="Lease expired on final attempt",
+                    locked_by=None, lease_id=None, lease_expires_at=None, updated_at=now)
+        )
+        stmt = (
+            select(Job)
+            .where(or_(
+                and_(Job.status == "queued", Job.available_at <= now),
+                and_(Job.status == "processing", Job.lease_expires_at < now),
+            ))
+            .order_by(Job.priority.desc(), Job.available_at.asc())
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = (await self._session.execute(stmt)).scalar_one_or_none()
+        if job is None:
+            return None
+        job.status = "processing"
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.lease_id = uuid4()
+        job.lease_expires_at = now + timedelta(seconds=visibility_timeout)
+        await self._session.flush()
+        return job
+
+    async def heartbeat(self, job_id: UUID, lease_id: UUID, visibility_timeout: float) -> bool:
+        """Extend a lease; False when it has been lost."""
+        expires = datetime.utcnow() + timedelta(seconds=visibility_timeout)
+        return await self._update_leased(job_id, lease_id, {"lease_expires_at": expires})
+
+    async def complete(self, job_id: UUID, lease_id: UUID, result: dict) -> bool:
+        return await self._update_leased(job_id, lease_id, {"status": "completed", "result": result, "error": None})
+
+    async def fail(self, job_id: UUID, lease_id: UUID, error: str, retry_at: datetime | None) -> bool:
+        """Record a failed attempt; requeue at *retry_at*, or fail for good when None."""
+        if retry_at is None:
+            return await self._update_leased(job_id, lease_id, {"status": "failed", "error": error})
+        return await self._update_leased(
+            job_id, lease_id, {"status": "queued", "error": error, "available_at": retry_at},
+        )
+
+    async def release(self, job_id: UUID, lease_id: UUID) -> bool:
+        """Return a leased job that was never started; the attempt is not counted."""
+        return await self._update_leased(
+            job_id, lease_id, {"status": "queued", "attempts": Job.attempts - 1, "available_at": datetime.utcnow()},
+        )
+
+    async def _update_leased(self, job_id: UUID, lease_id: UUID, values: dict) -> bool:
+        if values.get("status", "processing") != "processing":
+            values = {**values, "locked_by": None, "lease_id": None, "lease_expires_at": None}
+        stmt = (
+            update(Job)
+            .where(Job.job_id == job_id, Job.lease_id == lease_id, Job.status == "processing")
+            .values(updated_at=datetime.utcnow(), **values)
+        )
+        result = await self._session.execute(stmt)
+        return result.rowcount == 1
@@ -1,13 +1,24 @@
-"""Blob processor worker: download → pipeline → store."""
+"""Blob processor worker: download → pipeline → store.
+
+``invoice-worker`` runs a long-lived ``JobConsumer`` per process (optionally
+preforked), draining running jobs on SIGTERM and logging throughput.
+"""
 from __future__ import annotations
 import asyncio
+import multiprocessing
+import os
+import signal
+import time
 import structlog
 from ..config import Settings
+from ..llm.call_log_writer import start_writer, stop_writer
+from ..passes.audit_policy import audit_policy_stats
+from ..passes.speculation import speculation_stats
 from ..pipeline import ExtractionPipeline
-from ..storage.database import init_db, get_session
-from ..storage.models import Extraction
+from ..storage.database import AsyncSessionLocal, close_db, engine_options, init_db
 from ..storage.repositories import ExtractionRepo
 from ..utils.hashing import compute_file_hash
+from .job_consumer import JobConsumer
 
 logger = structlog.get_logger(__name__)
 
@@ -15,86 +26,159 @@ logger = structlog.get_logger(__name__)
 async def process_blob(blob_name: str, file_bytes: bytes, settings: Settings) -> dict:
     """Process a single blob through the extraction pipeline.
 
-    Steps:
-    1. Check dedup (file hash)
-    2. Run pipeline
-    3. Store result
-    4. Return result summary
+    The pipeline deduplicates by file hash and stores the result; a blob
+    already extracted is reported as a duplicate of that extraction.
     """
     file_hash = compute_file_hash(file_bytes)
+    async with AsyncSessionLocal() as session:
+        existing = await ExtractionRepo(session).get_reusable_by_hash(file_hash)
+    if existing is not None:
+        logger.info("dedup_hit", file_hash=file_hash, extraction_id=str(existing.extraction_id))
+        return {"status": "duplicate", "extraction_id": str(existing.extraction_id)}
 
-    # Check for existing extraction with same hash
-    init_db(settings.database_url)
-    async for session in get_session():
-        repo = ExtractionRepo(session)
-        existing = await repo.get_by_hash(file_hash)
-        if existing and existing.status in ("accepted", "pending_review"):
-            logger.info("dedup_hit", file_hash=file_hash, extraction_id=str(existing.extraction_id))
-            return {"status": "duplicate", "extraction_id": str(existing.extraction_id)}
-
-        # Create extraction record
-        extraction_record = Extraction(
-            file_hash=file_hash,
-            blob_name=blob_name,
-            status="processing",
-        )
-        extraction_record = await repo.create(extraction_record)
-        await session.commit()
-        extraction_id = extraction_record.extraction_id
-
-    # Run pipeline
     pipeline = ExtractionPipeline(settings)
     try:
         result = await pipeline.process(file_bytes, blob_name)
-
-        # Update DB with result
-        async for session in get_session():
-            repo = ExtractionRepo(session)
-            status = "accepted" if result.extraction_metadata.confidence_tier == "auto_accept" else "pending_review"
-            await repo.update_result(
-                extraction_id=extraction_id,
-                result_json=result.model_dump(mode="json"),
-                confidence_score=result.extraction_metadata.overall_confidence,
-                confidence_tier=result.extraction_metadata.confidence_tier,
-            )
-            await repo.update_status(extraction_id, status)
-            await session.commit()
-
-        logger.info("extraction_complete", extraction_id=str(extraction_id),
-                    confidence=result.extraction_metadata.overall_confidence,
-                    tier=result.extraction_metadata.confidence_tier)
-
-        return {
-            "status": "completed",
-            "extraction_id": str(extraction_id),
-            "confidence": result.extraction_metadata.overall_confidence,
-            "tier": result.extraction_metadata.confidence_tier,
-        }
-
     except Exception as e:
-        logger.error("pipeline_failed", extraction_id=str(extraction_id), error=str(e))
-        async for session in get_session():
-            repo = ExtractionRepo(session)
-            await repo.update_status(extraction_id, "failed")
-            await session.commit()
+        logger.error("pipeline_failed", blob_name=blob_name, error=str(e))
         raise
 
+    metadata = result.extraction_metadata
+    logger.info("extraction_complete", extraction_id=str(metadata.extraction_id),
+                confidence=metadata.overall_confidence, tier=metadata.confidence_tier)
+    return {
+        "status": "completed",
+        "extraction_id": str(metadata.extraction_id),
+        "confidence": metadata.overall_confidence,
+        "tier": metadata.confidence_tier,
+    }
+
+
+async def _process_files(paths: tuple[str, ...], settings: Settings) -> None:
+    init_db(settings.database_url, **engine_options(settings))
+    start_writer(settings)
+    try:
+        for path in paths:
+            with open(path, "rb") as f:
+                file_bytes = f.read()
+            await process_blob(path, file_bytes, settings)
+    finally:
+        await stop_writer()
+        await close_db()
+
+
+async def _report_throughput(consumer: JobConsumer, interval: float) -> None:
+    last_completed, last_time = 0, time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+        now = time.monotonic()
+        stats = consumer.stats()
+        recent = (stats["completed"] - last_completed) / (now - last_time) * 60
+        speculation = speculation_stats.snapshot()
+        if speculation["started"]:
+            stats["speculation"] = speculation
+        audit_policy = audit_policy_stats.snapshot()
+        if audit_policy["decisions"]:
+            stats["audit_policy"] = audit_policy
+        logger.info("worker_throughput", worker_id=consumer.worker_id,
+                    recent_jobs_per_minute=round(recent, 2), **stats)
+        last_completed, last_time = stats["completed"], now
+
+
+async def run_worker(settings: Settings, concurrency: int | None = None) -> dict:
+    """Consume jobs until SIGTERM/SIGINT, then drain and return throughput stats."""
+    # One engine for the process lifetime, its pool sized for this consumer
+    if concurrency:
+        settings = settings.model_copy(update={"job_concurrency": concurrency})
+    init_db(settings.database_url, **engine_options(settings))
+    start_writer(settings)
+    consumer = JobConsumer(settings, concurrency=concurrency)
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+
+    consumer.start()
+    reporter = asyncio.create_task(_report_throughput(consumer, settings.worker_report_interval_seconds))
+    try:
+        await stopping.wait()
+        logger.info("worker_draining", worker_id=consumer.worker_id,
+                    timeout_seconds=settings.worker_drain_timeout_seconds)
+    finally:
+        reporter.cancel()
+        await consumer.stop(timeout=settings.worker_drain_timeout_seconds)
+        await stop_writer()
+        await close_db()
+    return consumer.stats()
+
+
+def _worker_process(concurrency: int | None) -> None:
+    """Prefork child: one consumer with its own event loop and connection pool."""
+    asyncio.run(run_worker(Settings(), concurrency))
+
+
+def _prefork(processes: int, concurrency: int | None) -> None:
+    """Run *processes* worker processes, restarting crashed ones, until signalled."""
+    ctx = multiprocessing.get_context("spawn")
+    stopping = False
+
+    def spawn(index: int):
+        child = ctx.Process(target=_worker_process, args=(concurrency,), name=f"invoice-worker-{index}")
+        child.start()
+        return child
+
+    def forward(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for child in children:
+            if child.is_alive():
+                os.kill(child.pid, signal.SIGTERM)
+
+    children = [spawn(i) for i in range(processes)]
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    logger.info("worker_prefork_started", processes=processes, pids=[c.pid for c in children])
+
+    while not stopping:
+        for index, child in enumerate(children):
+            if not child.is_alive() and not stopping:
+                logger.error("worker_process_exited", pid=child.pid, exitcode=child.exitcode)
+                children[index] = spawn(index)
+        time.sleep(1.0)
+    for child in children:
+        child.join()
+    logger.info("worker_stopped", exit_codes=[c.exitcode for c in children])
+
 
 def main():
-    """Entry point for worker process."""
-    import sys
-    settings = Settings()
-    logger.info("worker_started")
-
-    # In production, this would listen for queue messages or blob events
-    # For now, just a placeholder that can be invoked directly
-    if len(sys.argv) > 1:
-        blob_name = sys.argv[1]
-        with open(blob_name, "rb") as f:
-            file_bytes = f.read()
-        asyncio.run(process_blob(blob_name, file_bytes, settings))
-    else:
-        logger.info("worker_idle", message="No blob specified. Waiting for events...")
+    """Entry point for worker process (``invoice-worker``).
+
+    With file arguments, processes those files and exits.  Otherwise runs
+    as a long-lived consumer of the job queue.
+    """
+    import click
+
+    @click.command()
+    @click.argument("files", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+    @click.option("--concurrency", type=int, default=None,
+                  help="Concurrent pipelines per process [default: INVOICE_JOB_CONCURRENCY]")
+    @click.option("--processes", type=int, default=None,
+                  help="Worker processes to prefork [default: INVOICE_WORKER_PROCESSES]")
+    def run(files: tuple[str, ...], concurrency: int | None, processes: int | None) -> None:
+        settings = Settings()
+        logger.info("worker_started")
+        if files:
+            asyncio.run(_process_files(files, settings))
+            return
+        processes = processes or settings.worker_processes
+        if processes > 1:
+            _prefork(processes, concurrency)
+        else:
+            stats = asyncio.run(run_worker(settings, concurrency))
+            logger.info("worker_stopped", **stats)
+
+    run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,271 @@
+"""Job consumer: lease jobs from the ``jobs`` table and run the pipeline.
+
+Each consumer runs ``concurrency`` slots.  A prefetcher leases up to
+``prefetch`` jobs beyond the running ones and reads their files while the
+slots are busy in LLM calls, so a freed slot starts its next job at once.
+Every leased job has its lease renewed until it finishes.  Failed attempts
+are retried with exponential backoff up to the job's ``max_attempts``.  The
+slot count is the backpressure: uploads beyond it wait in the table.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import structlog
+
+from ..config import Settings
+from ..pipeline import ExtractionPipeline
+from ..storage.database import AsyncSessionLocal
+from ..storage.models import Job
+from ..storage.repositories import JobRepo
+
+logger = structlog.get_logger(__name__)
+
+MAX_RETRY_BACKOFF_SECONDS = 3600.0
+
+
+def retry_delay(attempts: int, base_seconds: float) -> float:
+    """Backoff before the next attempt after *attempts* failures."""
+    return min(base_seconds * 2 ** max(attempts - 1, 0), MAX_RETRY_BACKOFF_SECONDS)
+
+
+class _Leased:
+    """A leased job with its prefetched file and lease heartbeat."""
+
+    def __init__(self, job: Job, heartbeat: asyncio.Task):
+        self.job = job
+        self.heartbeat = heartbeat
+        self.file_bytes: bytes | None = None
+        self.read_error: Exception | None = None
+
+
+class JobConsumer:
+    """Run extraction jobs from the durable queue with bounded concurrency."""
+
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        concurrency: int | None = None,
+        prefetch: int | None = None,
+        worker_id: str | None = None,
+        pipeline: ExtractionPipeline | None = None,
+    ):
+        self.settings = settings
+        self.concurrency = concurrency or settings.job_concurrency
+        self.prefetch = settings.job_prefetch if prefetch is None else prefetch
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+        self._pipeline = pipeline
+        self._stopping = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._ready: asyncio.Queue[_Leased] = asyncio.Queue()
+        # Leased-but-unfinished jobs, running or prefetched
+        self._capacity = asyncio.Semaphore(self.concurrency + self.prefetch)
+        self._running = 0
+        self._busy_seconds = 0.0
+        self._started_at = time.monotonic()
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def pipeline(self) -> ExtractionPipeline:
+        if self._pipeline is None:
+            self._pipeline = ExtractionPipeline(self.settings)
+        return self._pipeline
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._started_at = time.monotonic()
+        self._tasks = [asyncio.create_task(self._prefetcher(), name="job-prefetch")]
+        self._tasks += [
+            asyncio.create_task(self._slot(), name=f"job-slot-{i}") for i in range(self.concurrency)
+        ]
+        logger.info("job_consumer_started", worker_id=self.worker_id,
+                    concurrency=self.concurrency, prefetch=self.prefetch)
+
+    async def stop(self, timeout: float | None = None) -> None:
+        """Stop leasing, hand prefetched jobs back and wait up to *timeout* for running ones.
+
+        Jobs still running after the timeout are cancelled; their leases
+        expire and another consumer picks them up.
+        """
+        self._stopping.set()
+        if self._tasks:
+            prefetcher, *slots = self._tasks
+            prefetcher.cancel()
+            await asyncio.gather(prefetcher, return_exceptions=True)
+            _, pending = await asyncio.wait(slots, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            self._tasks = []
+        while not self._ready.empty():
+            await self._release(self._ready.get_nowait())
+        if self._pipeline is not None:
+            await self._pipeline.aclose()
+        logger.info("job_consumer_stopped", worker_id=self.worker_id, **self.stats())
+
+    def stats(self) -> dict:
+        """Throughput since start: completed/failed jobs, jobs per minute and slot utilisation."""
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "running": self._running,
+            "prefetched": self._ready.qsize(),
+            "elapsed_seconds": round(elapsed, 1),
+            "jobs_per_minute": round(self.completed / elapsed * 60, 2),
+            "slot_utilisation": round(self._busy_seconds / (elapsed * self.concurrency), 3),
+        }
+
+    # ── Tasks ────────────────────────────────────────────────────────────
+
+    async def _prefetcher(self) -> None:
+        while not self._stopping.is_set():
+            await self._capacity.acquire()
+            job = None
+            while job is None and not self._stopping.is_set():
+                try:
+                    job = await self._lease()
+                except Exception as e:
+                    logger.error("job_lease_failed", worker_id=self.worker_id, error=str(e))
+                if job is None:
+                    await self._wait_stopping(self.settings.job_poll_interval_seconds)
+            if job is None:
+                self._capacity.release()
+                return
+            leased = _Leased(job, asyncio.create_task(self._heartbeat(job)))
+            try:
+                leased.file_bytes = await self.read_file(job)
+            except asyncio.CancelledError:
+                await asyncio.shield(self._release(leased))
+                raise
+            except Exception as e:
+                leased.read_error = e
+            self._ready.put_nowait(leased)
+
+    async def _slot(self) -> None:
+        stop = asyncio.create_task(self._stopping.wait())
+        try:
+            while not self._stopping.is_set():
+                get = asyncio.create_task(self._ready.get())
+                await asyncio.wait([get, stop], return_when=asyncio.FIRST_COMPLETED)
+                if not get.done():
+                    get.cancel()
+                    return
+                leased = get.result()
+                try:
+                    await self._run(leased)
+                finally:
+                    self._capacity.release()
+        finally:
+            stop.cancel()
+
+    async def _run(self, leased: _Leased) -> None:
+        job = leased.job
+        log = logger.bind(job_id=str(job.job_id), attempt=job.attempts, worker_id=self.worker_id)
+        log.info("job_started", kind=job.kind, filename=job.payload.get("filename"))
+        self._running += 1
+        started = time.monotonic()
+        try:
+            if leased.read_error is not None:
+                raise leased.read_error
+            result = await self.execute(job, leased.file_bytes)
+        except Exception as e:
+            self.failed += 1
+            error = str(e)
+            retry_at = None
+            if job.attempts < job.max_attempts:
+                delay = retry_delay(job.attempts, self.settings.job_retry_backoff_seconds)
+                retry_at = datetime.utcnow() + timedelta(seconds=delay)
+            log.error("job_failed", error=error, retry_at=retry_at.isoformat() if retry_at else None)
+            await self._finish(job, lambda repo: repo.fail(job.job_id, job.lease_id, error, retry_at))
+        else:
+            self.completed += 1
+            log.info("job_completed", extraction_id=result.get("extraction_id"),
+                     duration_ms=int((time.monotonic() - started) * 1000))
+            await self._finish(job, lambda repo: repo.complete(job.job_id, job.lease_id, result))
+            if job.payload.get("owned_file"):
+                Path(job.payload["file_path"]).unlink(missing_ok=True)
+        finally:
+            self._running -= 1
+            self._busy_seconds += time.monotonic() - started
+            leased.heartbeat.cancel()
+
+    async def read_file(self, job: Job) -> bytes:
+        return await asyncio.to_thread(Path(job.payload["file_path"]).read_bytes)
+
+    async def execute(self, job: Job, file_bytes: bytes) -> dict:
+        """Process one job and return its result payload.
+
+        Reprocessing and ``force`` jobs bypass the pipeline's dedup; they
+        run as the job ID so a retry resumes from the failed attempt's
+        pass checkpoints.  Reprocessing with ``from_pass`` reuses the
+        original extraction's earlier passes.
+        """
+        payload = job.payload
+        force = bool(payload.get("reprocess_of") or payload.get("force"))
+        from_pass = payload.get("from_pass")
+        result = await self.pipeline.process(
+            file_bytes, payload["filename"], force=force, extraction_id=job.job_id if force else None,
+            reuse_from=UUID(payload["reprocess_of"]) if from_pass else None, from_pass=from_pass,
+        )
+        metadata = result.extraction_metadata
+        return {
+            "extraction_id": str(metadata.extraction_id),
+            "confidence": metadata.overall_confidence,
+            "confidence_tier": metadata.confidence_tier.value,
+        }
+
+    async def _wait_stopping(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), seconds)
+        except TimeoutError:
+            pass
+
+    # ── Queue operations (one short transaction each) ────────────────────
+
+    async def _lease(self) -> Job | None:
+        async with AsyncSessionLocal() as session:
+            job = await JobRepo(session).lease(self.worker_id, self.settings.job_visibility_timeout_seconds)
+            await session.commit()
+            return job
+
+    async def _heartbeat(self, job: Job) -> None:
+        interval = self.settings.job_visibility_timeout_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with AsyncSessionLocal() as session:
+                    renewed = await JobRepo(session).heartbeat(
+                        job.job_id, job.lease_id, self.settings.job_visibility_timeout_seconds,
+                    )
+                    await session.commit()
+            except Exception as e:
+                logger.warning("job_heartbeat_failed", job_id=str(job.job_id), error=str(e))
+                continue
+            if not renewed:
+                logger.warning("job_lease_lost", job_id=str(job.job_id), worker_id=self.worker_id)
+                return
+
+    async def _release(self, leased: _Leased) -> None:
+        """Hand a prefetched, never-started job back to the queue."""
+        leased.heartbeat.cancel()
+        job = leased.job
+        await self._finish(job, lambda repo: repo.release(job.job_id, job.lease_id))
+
+    async def _finish(self, job: Job, update) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                if not await update(JobRepo(session)):
+                    logger.warning("job_lease_lost", job_id=str(job.job_id), worker_id=self.worker_id)
+                await session.commit()
+        except Exception as e:
+            # The lease expires and the job is retried elsewhere
+            logger.error("job_finish_failed", job_id=str(job.job_id), error=str(e))
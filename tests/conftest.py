@@ -5,6 +5,10 @@ from invoice_ingestion.llm.base import LLMClient, LLMResponse
 from invoice_ingestion.config import Settings
 from invoice_ingestion.prompts.registry import PromptRegistry
 from invoice_ingestion.learning.correction_store import CorrectionStore
+from invoice_ingestion.llm.call_logger import LLMCallLogger
+from invoice_ingestion.models.internal import Pass1AResult, Pass1BResult, Pass2Result, Pass4Result
+from invoice_ingestion.pipeline import ExtractionPipeline
+from tests.factories import make_classification, make_extraction_dict, make_ingestion_result
 
 
 @pytest.fixture
@@ -20,6 +24,45 @@ def mock_settings():
     )
 
 
+@pytest.fixture
+def stub_pipeline(mock_settings, monkeypatch):
+    """Factory for an ``ExtractionPipeline`` with every pass and database write stubbed.
+
+    ``stub_pipeline(tier="simple", pages=2, enable_fast_lane=True)`` applies the
+    keyword settings and returns a pipeline whose pass functions are the
+    ``AsyncMock``s in ``pipeline.mocks``.  Pass 0 returns ``pipeline.ingestion``
+    and Pass 0.5 a classification of ``pipeline.tier``; checkpoints are neither
+    loaded nor saved.  Tests override the mock of the pass they exercise.
+    """
+    def make(tier: str = "standard", pages: int = 1, **settings) -> ExtractionPipeline:
+        mock_settings.enable_learning_loop = False
+        mock_settings.adaptive_max_tokens = False
+        for name, value in settings.items():
+            setattr(mock_settings, name, value)
+        instance = ExtractionPipeline(mock_settings)
+        instance.tier = tier
+        instance.ingestion = make_ingestion_result(pages=pages)
+        instance.mocks = {
+            "run_pass05": AsyncMock(side_effect=lambda *a, **k: make_classification(tier=instance.tier)),
+            "run_pass1_combined": AsyncMock(return_value=Pass2Result(data=make_extraction_dict())),
+            "run_pass1a": AsyncMock(return_value=Pass1AResult(invoice={}, account={})),
+            "run_pass1b": AsyncMock(return_value=Pass1BResult()),
+            "run_pass2": AsyncMock(return_value=Pass2Result(data=make_extraction_dict())),
+            "ask_audit_questions": AsyncMock(return_value=Pass4Result()),
+        }
+        monkeypatch.setattr("invoice_ingestion.pipeline.run_pass0", lambda *a, **k: instance.ingestion)
+        for name, mock in instance.mocks.items():
+            monkeypatch.setattr(f"invoice_ingestion.pipeline.{name}", mock)
+        monkeypatch.setattr(instance, "_load_checkpoints", AsyncMock(return_value={}))
+        monkeypatch.setattr(instance, "_save_checkpoint", AsyncMock())
+        monkeypatch.setattr(instance, "_store_result", AsyncMock())
+        monkeypatch.setattr("invoice_ingestion.pipeline.get_writer", lambda: None)
+        monkeypatch.setattr(LLMCallLogger, "save_to_database", AsyncMock())
+        return instance
+
+    return make
+
+
 @pytest.fixture
 def mock_llm_client():
     """Create a mock LLM client."""
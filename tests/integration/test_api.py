@@ -38,3 +38,25 @@ class TestWebhookEndpoint:
         })
         assert response.status_code == 200
         assert response.json()["status"] == "accepted"
+
+
+@pytest.mark.integration
+class TestLLMCallsEndpoint:
+    def test_invalid_cursor_rejected(self, client):
+        from invoice_ingestion.storage.database import get_session
+
+        async def no_session():
+            yield AsyncMock()
+
+        client.app.dependency_overrides[get_session] = no_session
+        response = client.get("/llm-calls", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+    def test_cursor_round_trip(self):
+        from datetime import datetime
+        from uuid import uuid4
+
+        from invoice_ingestion.api.routes.llm_calls import _decode_cursor, _encode_cursor
+
+        created_at, call_id = datetime(2026, 10, 19, 9, 30, 1, 123456), uuid4()
+        assert _decode_cursor(_encode_cursor(created_at, call_id)) == (created_at, call_id)
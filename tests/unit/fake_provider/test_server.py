@@ -0,0 +1,98 @@
+"""Test the fake provider against the real SDK clients."""
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+import httpx
+import openai
+import pytest
+import uvicorn
+
+from invoice_ingestion.fake_provider import Scenario, create_app, load_scenario
+from invoice_ingestion.fake_provider.server import example_from_schema
+from invoice_ingestion.llm.anthropic_client import AnthropicClient
+from invoice_ingestion.llm.openai_client import OpenAIClient
+from invoice_ingestion.models.internal import AuditResponse, Pass1BResult
+
+FAST = Scenario(latency_ms=1, latency_per_output_token_ms=0, latency_sigma=0)
+
+
+@contextmanager
+def _serve(app):
+    """Run *app* on a free local port and yield its base URL."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+
+class TestWireCompatibility:
+    @pytest.mark.asyncio
+    async def test_anthropic_structured_output(self):
+        request = AnthropicClient("test").build_request(
+            "sys", "user", ["aW1n"], temperature=0.0, max_tokens=4096, response_model=Pass1BResult,
+        )
+        with _serve(create_app(FAST, seed=1)) as url:
+            async with httpx.AsyncClient(base_url=url) as http:
+                raw = await http.post("/v1/messages", json=request)
+        message = raw.json()
+        assert message["content"][0]["type"] == "tool_use"
+        assert isinstance(message["content"][0]["input"], dict)
+        assert message["usage"]["input_tokens"] > 1000  # image counted
+        assert message["usage"]["output_tokens"] > 0
+
+    @pytest.mark.asyncio
+    async def test_openai_json_schema(self):
+        with _serve(create_app(FAST, seed=1)) as url:
+            response = await OpenAIClient("test", azure_endpoint=url, max_retries=0).complete_text(
+                "sys", "user", response_model=AuditResponse,
+            )
+        assert response.content == "{}"
+        assert response.finish_reason in ("stop", "length")
+
+    @pytest.mark.asyncio
+    async def test_injected_429_surfaces_as_rate_limit(self):
+        app = create_app(FAST.model_copy(update={"error_429_rate": 1.0, "retry_after_seconds": 7}), seed=1)
+        with _serve(app) as url, pytest.raises(openai.RateLimitError) as exc_info:
+            await OpenAIClient("test", azure_endpoint=url, max_retries=0).complete_text("sys", "user")
+        assert exc_info.value.response.headers["retry-after"] == "7"
+
+    @pytest.mark.asyncio
+    async def test_tpm_quota_enforced(self):
+        app = create_app(FAST.model_copy(update={"tpm_limit": 5000}), seed=1)
+        request = AnthropicClient("test").build_request("sys", "user", None, temperature=0.0, max_tokens=4000)
+        with _serve(app) as url:
+            async with httpx.AsyncClient(base_url=url) as http:
+                first = await http.post("/v1/messages", json=request)
+                second = await http.post("/v1/messages", json=request)
+        assert first.status_code == 200
+        assert second.status_code == 429
+        assert second.json()["error"]["type"] == "rate_limit_error"
+
+
+class TestScenarios:
+    def test_bundled_scenarios_load(self):
+        for name in ("baseline", "foundry_brownout", "tpm_throttling"):
+            assert load_scenario(name).name == name
+
+    def test_brownout_only_affects_anthropic(self):
+        scenario = load_scenario("foundry_brownout")
+        assert scenario.effective(150, "anthropic").error_500_rate > 0
+        assert scenario.effective(150, "openai").error_500_rate == 0
+        assert scenario.effective(10, "anthropic").error_500_rate == 0
+
+    def test_example_from_schema_fills_required(self):
+        schema = {"type": "object", "required": ["a", "b"],
+                  "properties": {"a": {"type": "string"}, "b": {"type": "array"}, "c": {"type": "integer"}}}
+        assert example_from_schema(schema) == {"a": "", "b": []}
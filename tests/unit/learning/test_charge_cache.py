@@ -0,0 +1,52 @@
+"""Test the learned charge classification cache."""
+from invoice_ingestion.learning.charge_cache import (
+    CachedClassification,
+    ChargeClassificationCache,
+    normalize_description,
+    observe,
+)
+
+DELIVERY = {"category": "rider", "charge_section": "distribution", "charge_owner": "utility",
+            "attribution_type": "current"}
+ENERGY = {**DELIVERY, "category": "energy", "charge_section": "supply"}
+
+
+class TestNormalizeDescription:
+    def test_ignores_case_numbers_and_punctuation(self):
+        assert normalize_description("Distribution Delivery Charge 01/05-31/05:") == "distribution delivery charge"
+        assert normalize_description("NETZENTGELT (Strom)") == "netzentgelt strom"
+
+
+class TestObserve:
+    def test_agreement_confirms(self):
+        entry = observe(observe(None, DELIVERY, "accepted"), DELIVERY, "accepted")
+
+        assert entry.confirmations == 2
+        assert entry.contradictions == 0
+
+    def test_contradiction_distrusts_then_replaces(self):
+        entry = observe(CachedClassification(**DELIVERY, confirmations=3), ENERGY, "accepted")
+        assert entry.contradictions == 1
+        assert not entry.trusted()
+
+        entry = CachedClassification(**DELIVERY, confirmations=1, contradictions=1)
+        assert observe(entry, ENERGY, "accepted").classification == ENERGY
+
+    def test_correction_replaces_and_is_trusted(self):
+        entry = observe(CachedClassification(**DELIVERY, confirmations=10), ENERGY, "correction")
+
+        assert entry.classification == ENERGY
+        assert entry.trusted()
+
+
+class TestChargeClassificationCache:
+    def test_only_trusted_entries_are_looked_up(self):
+        cache = ChargeClassificationCache(min_confirmations=3)
+        cache.load({
+            ("con edison", "delivery charge"): CachedClassification(**DELIVERY, confirmations=3),
+            ("con edison", "supply charge"): CachedClassification(**ENERGY, confirmations=2),
+        })
+
+        assert cache.lookup("Con  Edison", "Delivery Charge") == DELIVERY
+        assert cache.lookup("Con Edison", "Supply Charge") is None
+        assert cache.lookup("Other Utility", "Delivery Charge") is None
@@ -0,0 +1,107 @@
+"""Test batch execution mode against the local fake batch backend."""
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from invoice_ingestion.llm.base import LLMClient, LLMResponse
+from invoice_ingestion.llm.batch import BatchLLMClient, LocalBatchBackend
+
+
+@pytest.fixture
+def handler():
+    client = AsyncMock(spec=LLMClient)
+    client.get_model_name.return_value = "fake-model"
+
+    async def complete_text(system_prompt, user_prompt, **kwargs):
+        return LLMResponse(content=f'{{"echo": "{user_prompt}"}}', model="fake-model")
+
+    client.complete_text.side_effect = complete_text
+    client.complete_vision.return_value = LLMResponse(content="{}", model="fake-model")
+    return client
+
+
+class TestBatchLLMClient:
+    @pytest.mark.asyncio
+    async def test_full_batch_submitted_once(self, handler):
+        backend = LocalBatchBackend(handler)
+        client = BatchLLMClient(backend, max_batch_size=3, max_wait_seconds=60, poll_interval_seconds=0.01)
+
+        results = await asyncio.gather(*(client.complete_text("sys", f"u{i}") for i in range(3)))
+
+        assert [r.content for r in results] == ['{"echo": "u0"}', '{"echo": "u1"}', '{"echo": "u2"}']
+        assert len(backend.submitted) == 1
+        assert len(backend.submitted[0]) == 3
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_flushed_after_wait(self, handler):
+        backend = LocalBatchBackend(handler)
+        client = BatchLLMClient(backend, max_batch_size=100, max_wait_seconds=0.01, poll_interval_seconds=0.01)
+
+        result = await client.complete_vision("sys", "user", ["img"])
+
+        assert result.content == "{}"
+        assert len(backend.submitted) == 1
+
+    @pytest.mark.asyncio
+    async def test_waits_for_turnaround(self, handler):
+        backend = LocalBatchBackend(handler, turnaround_seconds=0.05)
+        client = BatchLLMClient(backend, max_batch_size=1, poll_interval_seconds=0.01)
+
+        result = await client.complete_text("sys", "late")
+
+        assert result.content == '{"echo": "late"}'
+
+    @pytest.mark.asyncio
+    async def test_request_error_propagates(self, handler):
+        handler.complete_text.side_effect = RuntimeError("boom")
+        client = BatchLLMClient(LocalBatchBackend(handler), max_batch_size=1, poll_interval_seconds=0.01)
+
+        with pytest.raises(RuntimeError, match="boom"):
+            await client.complete_text("sys", "user")
+
+    @pytest.mark.asyncio
+    async def test_aclose_flushes_pending(self, handler):
+        backend = LocalBatchBackend(handler)
+        client = BatchLLMClient(backend, max_batch_size=100, max_wait_seconds=60, poll_interval_seconds=0.01)
+
+        task = asyncio.create_task(client.complete_text("sys", "user"))
+        await asyncio.sleep(0)
+        assert client.pending_count == 1
+
+        await client.aclose()
+        assert (await task).content == '{"echo": "user"}'
+
+
+class _FlakyBackend(LocalBatchBackend):
+    """Fails the first *failures* polls as a dropped connection would."""
+
+    def __init__(self, handler, failures: int):
+        super().__init__(handler)
+        self.failures = failures
+        self.polls = 0
+
+    async def poll(self, batch_id):
+        self.polls += 1
+        if self.polls <= self.failures:
+            raise ConnectionError("connection reset")
+        return await super().poll(batch_id)
+
+
+class TestBatchPolling:
+    @pytest.mark.asyncio
+    async def test_transient_poll_errors_are_retried(self, handler):
+        client = BatchLLMClient(_FlakyBackend(handler, failures=2), max_batch_size=1, poll_interval_seconds=0.001)
+
+        result = await client.complete_text("sys", "user")
+
+        assert result.content == '{"echo": "user"}'
+
+    @pytest.mark.asyncio
+    async def test_repeated_poll_errors_fail_callers(self, handler):
+        backend = _FlakyBackend(handler, failures=10)
+        client = BatchLLMClient(backend, max_batch_size=1, poll_interval_seconds=0.001, max_poll_errors=3)
+
+        with pytest.raises(ConnectionError):
+            await client.complete_text("sys", "user")
+        assert backend.polls == 3
@@ -0,0 +1,112 @@
+"""Test the write-behind LLM call log writer."""
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from invoice_ingestion.llm.call_log_writer import CallLogWriter
+from invoice_ingestion.llm.call_logger import LLMCallRecord
+from invoice_ingestion.storage.llm_blobs import text_hash
+
+
+def _records(n: int, extraction_id=None) -> list[LLMCallRecord]:
+    extraction_id = extraction_id or uuid4()
+    return [LLMCallRecord(extraction_id=extraction_id, stage="pass1a_extraction", user_prompt=str(i))
+            for i in range(n)]
+
+
+class _Sink:
+    def __init__(self, fail_for=None):
+        self.batches: list[list[LLMCallRecord]] = []
+        self.fail_for = fail_for
+
+    async def __call__(self, records):
+        if any(r.extraction_id == self.fail_for for r in records):
+            raise RuntimeError("foreign key violation")
+        self.batches.append(list(records))
+
+
+class TestCallLogWriter:
+    @pytest.mark.asyncio
+    async def test_batches_across_pipelines(self):
+        sink = _Sink()
+        writer = CallLogWriter(batch_size=10, flush_interval=0.05, write=sink)
+        writer.start()
+
+        writer.submit(_records(4))
+        writer.submit(_records(4))
+        await asyncio.sleep(0.15)
+        await writer.aclose()
+
+        assert [len(b) for b in sink.batches] == [8]
+        assert writer.written == 8
+
+    @pytest.mark.asyncio
+    async def test_full_batch_written_without_waiting(self):
+        sink = _Sink()
+        writer = CallLogWriter(batch_size=5, flush_interval=10.0, write=sink)
+        writer.start()
+
+        writer.submit(_records(5))
+        await asyncio.sleep(0.05)
+
+        assert [len(b) for b in sink.batches] == [5]
+        await writer.aclose()
+
+    @pytest.mark.asyncio
+    async def test_bounded_queue_drops_overflow(self):
+        writer = CallLogWriter(max_queue=3, write=_Sink())
+
+        assert writer.submit(_records(5)) == 3
+        assert writer.dropped == 2
+        assert writer.pending_count == 3
+
+    @pytest.mark.asyncio
+    async def test_aclose_flushes_queue(self):
+        sink = _Sink()
+        writer = CallLogWriter(batch_size=4, flush_interval=10.0, write=sink)
+        writer.submit(_records(10))
+
+        await writer.aclose()
+
+        assert [len(b) for b in sink.batches] == [4, 4, 2]
+        assert writer.pending_count == 0
+
+    @pytest.mark.asyncio
+    async def test_aclose_writes_batch_still_filling(self):
+        sink = _Sink()
+        writer = CallLogWriter(batch_size=10, flush_interval=10.0, write=sink)
+        writer.start()
+        writer.submit(_records(5))
+        await asyncio.sleep(0.05)
+
+        await writer.aclose()
+
+        assert [len(b) for b in sink.batches] == [5]
+        assert writer.written == 5 and writer.pending_count == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_extraction_does_not_lose_others(self):
+        bad = uuid4()
+        sink = _Sink(fail_for=bad)
+        writer = CallLogWriter(batch_size=10, write=sink)
+        writer.submit(_records(3))
+        writer.submit(_records(2, extraction_id=bad))
+
+        await writer.aclose()
+
+        assert writer.written == 3
+        assert writer.failed == 2
+
+    def test_row_references_prompts_and_response_by_hash(self):
+        record = LLMCallRecord(system_prompt="s" * 500, user_prompt="u", response_content='{"a": 1}')
+        row = record.to_row()
+
+        assert "start_time" not in row
+        assert not {"system_prompt", "user_prompt", "response_content"} & row.keys()
+        assert row["response_hash"] == text_hash('{"a": 1}')
+        assert row["response_preview"] == '{"a": 1}'
+        assert row["created_at"] is not None
+        assert row["system_prompt_hash"] == text_hash("s" * 500)
+        assert row["system_prompt_preview"] == "s" * 200 + "..."
+        assert row["user_prompt_preview"] == "u"
@@ -0,0 +1,53 @@
+"""Test LLM call instrumentation under concurrency."""
+import asyncio
+
+import pytest
+
+from invoice_ingestion.llm.call_logger import (
+    LLMCallLogger,
+    get_current_stage,
+    get_logger,
+    set_current_stage,
+    set_logger,
+)
+
+
+class TestCallRecords:
+    def test_overlapping_calls_both_recorded(self):
+        call_logger = LLMCallLogger()
+        first = call_logger.start_call("pass1a_extraction", "m", "p", "sys", "a")
+        second = call_logger.start_call("pass1b_extraction", "m", "p", "sys", "b")
+
+        call_logger.end_call(second, response_content="B", input_tokens=1, output_tokens=2)
+        call_logger.end_call(first, response_content="A", input_tokens=3, output_tokens=4)
+
+        by_stage = {c.stage: c for c in call_logger.calls}
+        assert by_stage["pass1a_extraction"].response_content == "A"
+        assert by_stage["pass1b_extraction"].response_content == "B"
+        assert by_stage["pass1b_extraction"].total_tokens == 3
+
+
+class TestContextIsolation:
+    @pytest.mark.asyncio
+    async def test_concurrent_pipelines_keep_their_own_logger_and_stage(self):
+        async def pipeline(name: str, delay: float) -> tuple[str, str, int]:
+            call_logger = LLMCallLogger()
+            set_logger(call_logger)
+            set_current_stage(f"{name}_stage")
+            await asyncio.sleep(delay)
+            logger = get_logger()
+            record = logger.start_call(get_current_stage(), "m", "p", None, name)
+            await asyncio.sleep(delay)
+            logger.end_call(record, response_content=name)
+            return get_current_stage(), logger.calls[0].user_prompt, len(logger.calls)
+
+        results = await asyncio.gather(pipeline("a", 0.02), pipeline("b", 0.01))
+
+        assert results == [("a_stage", "a", 1), ("b_stage", "b", 1)]
+
+    @pytest.mark.asyncio
+    async def test_unset_outside_pipeline(self):
+        async def outside():
+            return get_logger(), get_current_stage()
+
+        assert await asyncio.create_task(outside()) == (None, "")
@@ -0,0 +1,121 @@
+"""Test load balancing across deployments."""
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from invoice_ingestion.llm.base import LLMClient, LLMResponse
+from invoice_ingestion.llm.deployment_pool import (
+    Deployment,
+    DeploymentPool,
+    NoDeploymentAvailableError,
+)
+
+
+class ThrottledError(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after: str = "30"):
+        super().__init__("rate limited")
+        self.response = type("R", (), {"headers": {"retry-after": retry_after}})()
+
+
+class BadRequestError(Exception):
+    status_code = 400
+
+
+def _client(name: str) -> AsyncMock:
+    client = AsyncMock(spec=LLMClient)
+    client.get_model_name.return_value = name
+    client.complete_text.return_value = LLMResponse(content=name, model=name)
+    return client
+
+
+class TestRouting:
+    @pytest.mark.asyncio
+    async def test_prefers_lower_latency(self):
+        fast, slow = Deployment("fast", _client("fast")), Deployment("slow", _client("slow"))
+        fast.latency_ewma_ms, slow.latency_ewma_ms = 1000, 8000
+        pool = DeploymentPool([slow, fast])
+
+        result = await pool.complete_text("sys", "user")
+
+        assert result.content == "fast"
+
+    @pytest.mark.asyncio
+    async def test_weight_shifts_traffic(self):
+        small, big = Deployment("small", _client("small")), Deployment("big", _client("big"), weight=3.0)
+        small.outstanding, big.outstanding = 1, 3
+        pool = DeploymentPool([small, big])
+
+        result = await pool.complete_text("sys", "user")
+
+        assert result.content == "big"
+
+    @pytest.mark.asyncio
+    async def test_throttled_deployment_retried_elsewhere(self):
+        a, b = _client("a"), _client("b")
+        a.complete_text.side_effect = ThrottledError()
+        da, db = Deployment("a", a), Deployment("b", b)
+        da.latency_ewma_ms, db.latency_ewma_ms = 100, 9000
+        pool = DeploymentPool([da, db])
+
+        result = await pool.complete_text("sys", "user")
+
+        assert result.content == "b"
+        assert da.throttled == 1
+        assert da.cooldown_until > 0
+        assert da.outstanding == 0
+
+    @pytest.mark.asyncio
+    async def test_request_errors_not_retried(self):
+        a = _client("a")
+        a.complete_text.side_effect = BadRequestError("bad")
+        b = _client("b")
+        pool = DeploymentPool([Deployment("a", a, weight=10), Deployment("b", b)])
+
+        with pytest.raises(BadRequestError):
+            await pool.complete_text("sys", "user")
+        b.complete_text.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_call_releases_deployment(self):
+        a = _client("a")
+
+        async def hang(*args, **kwargs):
+            await asyncio.sleep(10)
+
+        a.complete_text.side_effect = hang
+        deployment = Deployment("a", a)
+        pool = DeploymentPool([deployment])
+
+        task = asyncio.create_task(pool.complete_text("sys", "user"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert deployment.outstanding == 0
+
+
+class TestQuota:
+    @pytest.mark.asyncio
+    async def test_routes_away_from_exhausted_quota(self):
+        a = Deployment("a", _client("a"), tpm_limit=5000, weight=10)
+        b = Deployment("b", _client("b"))
+        pool = DeploymentPool([a, b])
+
+        first = await pool.complete_text("sys", "user", max_tokens=4000)
+        second = await pool.complete_text("sys", "user", max_tokens=4000)
+
+        assert first.content == "a"
+        assert second.content == "b"
+
+    @pytest.mark.asyncio
+    async def test_all_over_quota_raises(self):
+        a = Deployment("a", _client("a"), tpm_limit=1000)
+        pool = DeploymentPool([a], max_wait_seconds=0.0)
+
+        await pool.complete_text("sys", "user", max_tokens=900)
+        with pytest.raises(NoDeploymentAvailableError):
+            await pool.complete_text("sys", "user", max_tokens=900)
@@ -0,0 +1,105 @@
+"""Test page image upload caching."""
+import asyncio
+import base64
+
+import pytest
+
+from invoice_ingestion.llm.anthropic_client import AnthropicClient
+from invoice_ingestion.llm.file_store import FILES_API_BETA, LocalFileStore, PageFileCache
+
+
+def _image(n: int) -> str:
+    return base64.b64encode(f"page-{n}".encode()).decode()
+
+
+class TestPageFileCache:
+    @pytest.mark.asyncio
+    async def test_same_page_uploaded_once(self):
+        store = LocalFileStore()
+        cache = PageFileCache(store)
+
+        first = await cache.file_ids([_image(1), _image(2)])
+        second = await cache.file_ids([_image(1), _image(2)])
+
+        assert first == second
+        assert store.upload_count == 2
+        assert cache.hits == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_upload(self):
+        store = LocalFileStore()
+        cache = PageFileCache(store)
+
+        ids = await asyncio.gather(*(cache.file_id(_image(1)) for _ in range(5)))
+
+        assert len(set(ids)) == 1
+        assert store.upload_count == 1
+
+    @pytest.mark.asyncio
+    async def test_eviction_deletes_file(self):
+        store = LocalFileStore()
+        cache = PageFileCache(store, max_entries=1)
+
+        await cache.file_id(_image(1))
+        await cache.file_id(_image(2))
+        await asyncio.sleep(0)
+
+        assert len(store.files) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_upload_not_cached(self):
+        store = LocalFileStore()
+        calls = {"n": 0}
+        original = store.upload
+
+        async def flaky(data, filename, media_type):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise RuntimeError("upload failed")
+            return await original(data, filename, media_type)
+
+        store.upload = flaky
+        cache = PageFileCache(store)
+
+        with pytest.raises(RuntimeError):
+            await cache.file_id(_image(1))
+        assert await cache.file_id(_image(1))
+
+    @pytest.mark.asyncio
+    async def test_cancelled_upload_not_cached(self):
+        store = LocalFileStore()
+        original = store.upload
+        release = asyncio.Event()
+
+        async def slow(data, filename, media_type):
+            await release.wait()
+            return await original(data, filename, media_type)
+
+        store.upload = slow
+        cache = PageFileCache(store)
+        first = asyncio.create_task(cache.file_id(_image(1)))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.file_id(_image(1)))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        release.set()
+
+        assert await asyncio.wait_for(waiter, 1.0)
+        assert await asyncio.wait_for(cache.file_id(_image(1)), 1.0)
+        assert store.upload_count == 1
+
+
+class TestFileReferencesInRequest:
+    def test_file_ids_replace_inline_images(self):
+        client = AnthropicClient(api_key="test")
+        request = client.build_request(
+            "sys", "user", [_image(1)], temperature=0.0, max_tokens=100,
+            image_file_ids=["file_abc"],
+        )
+        blocks = request["messages"][0]["content"]
+        assert blocks[0] == {"type": "image", "source": {"type": "file", "file_id": "file_abc"}}
+        assert request["extra_headers"]["anthropic-beta"] == FILES_API_BETA
+        assert _image(1) not in str(request)
@@ -0,0 +1,73 @@
+"""Test record/replay LLM client."""
+from unittest.mock import AsyncMock
+
+import pytest
+
+from invoice_ingestion.llm.base import LLMClient, LLMResponse
+from invoice_ingestion.llm.replay import Cassette, CassetteMissError, ReplayLLMClient
+from invoice_ingestion.models.internal import Pass1BResult
+
+
+@pytest.fixture
+def live():
+    client = AsyncMock(spec=LLMClient)
+    client.get_model_name.return_value = "live-model"
+    client.complete_vision.return_value = LLMResponse(
+        content='{"charges": []}', model="live-model", input_tokens=900, output_tokens=40, latency_ms=1500,
+    )
+    client.complete_text.return_value = LLMResponse(content='{"a": 1}', model="live-model", latency_ms=800)
+    return client
+
+
+class TestReplay:
+    @pytest.mark.asyncio
+    async def test_record_then_replay_offline(self, tmp_path, live):
+        path = tmp_path / "cassette.json"
+        recorder = ReplayLLMClient("gpt-4o", Cassette.load(path), live)
+        await recorder.complete_vision("sys", "user", ["img1"], response_model=Pass1BResult)
+        recorder._cassette.save()
+
+        player = ReplayLLMClient("gpt-4o", Cassette.load(path))
+        response = await player.complete_vision("sys", "user", ["img1"], max_tokens=2048,
+                                                response_model=Pass1BResult)
+
+        assert response.content == '{"charges": []}'
+        assert response.input_tokens == 900
+        assert response.latency_ms == 0
+        assert player.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_different_image_misses(self, tmp_path, live):
+        cassette = Cassette(tmp_path / "c.json")
+        await ReplayLLMClient("gpt-4o", cassette, live).complete_vision("sys", "user", ["img1"])
+
+        player = ReplayLLMClient("gpt-4o", cassette)
+        with pytest.raises(CassetteMissError):
+            await player.complete_vision("sys", "user", ["img2"])
+
+    @pytest.mark.asyncio
+    async def test_model_is_part_of_key(self, tmp_path, live):
+        cassette = Cassette(tmp_path / "c.json")
+        await ReplayLLMClient("gpt-4o", cassette, live).complete_text("sys", "user")
+
+        with pytest.raises(CassetteMissError):
+            await ReplayLLMClient("claude", cassette).complete_text("sys", "user")
+
+    @pytest.mark.asyncio
+    async def test_recorded_latency_simulated(self, tmp_path, live):
+        live.complete_text.return_value = LLMResponse(content="{}", model="m", latency_ms=30)
+        cassette = Cassette(tmp_path / "c.json")
+        await ReplayLLMClient("m", cassette, live).complete_text("sys", "user")
+
+        response = await ReplayLLMClient("m", cassette, latency="recorded").complete_text("sys", "user")
+
+        assert response.latency_ms >= 25
+
+    def test_invalid_latency_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            ReplayLLMClient("m", Cassette(tmp_path / "c.json"), latency="gaussian")
+
+    def test_save_without_recordings_writes_nothing(self, tmp_path):
+        cassette = Cassette(tmp_path / "c.json")
+        cassette.save()
+        assert not (tmp_path / "c.json").exists()
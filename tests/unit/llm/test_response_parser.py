@@ -1,6 +1,6 @@
 """Test JSON extraction from LLM responses."""
 import pytest
-from invoice_ingestion.llm.response_parser import extract_json_from_response
+from invoice_ingestion.llm.response_parser import extract_json_from_response, parse_stats
 
 
 class TestExtractJSON:
@@ -30,3 +30,17 @@ class TestExtractJSON:
     def test_whitespace_handling(self):
         result = extract_json_from_response('  \n  {"key": "value"}  \n  ')
         assert result == {"key": "value"}
+
+
+class TestParseStats:
+    def test_counts_strategies_and_failures(self):
+        parse_stats.reset()
+        extract_json_from_response('{"a": 1}')
+        extract_json_from_response('```json\n{"a": 1}\n```')
+        with pytest.raises(ValueError):
+            extract_json_from_response("nope")
+        snap = parse_stats.snapshot()
+        assert snap["total"] == 3
+        assert snap["by_strategy"]["direct"] == 1
+        assert snap["by_strategy"]["fenced_block"] == 1
+        assert snap["failures"] == 1
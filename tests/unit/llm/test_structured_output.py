@@ -0,0 +1,46 @@
+"""Test JSON schema generation for provider-native structured output."""
+from invoice_ingestion.llm.structured_output import (
+    anthropic_tool,
+    openai_response_format,
+    response_schema,
+)
+from invoice_ingestion.models.internal import AuditResponse, ClassificationResponse, Pass1BResult
+
+
+def _has_ref(node) -> bool:
+    if isinstance(node, dict):
+        return "$ref" in node or any(_has_ref(v) for v in node.values())
+    if isinstance(node, list):
+        return any(_has_ref(v) for v in node)
+    return False
+
+
+class TestResponseSchema:
+    def test_refs_inlined(self):
+        schema = response_schema(AuditResponse)
+        assert "$defs" not in schema
+        assert not _has_ref(schema)
+        item = schema["properties"]["audit_answers"]["items"]
+        assert "field_checked" in item["properties"]
+
+    def test_enum_inlined(self):
+        schema = response_schema(ClassificationResponse)
+        assert "enum" in schema["properties"]["commodity_type"]
+        assert "commodity_type" in schema["required"]
+
+    def test_returns_copy(self):
+        response_schema(Pass1BResult)["properties"].clear()
+        assert "charges" in response_schema(Pass1BResult)["properties"]
+
+
+class TestProviderFormats:
+    def test_anthropic_forces_tool(self):
+        tool, choice = anthropic_tool(Pass1BResult)
+        assert choice == {"type": "tool", "name": tool["name"]}
+        assert tool["input_schema"]["type"] == "object"
+
+    def test_openai_json_schema(self):
+        fmt = openai_response_format(AuditResponse)
+        assert fmt["type"] == "json_schema"
+        assert fmt["json_schema"]["name"] == "AuditResponse"
+        assert fmt["json_schema"]["strict"] is False
@@ -0,0 +1,76 @@
+"""Test adaptive max_tokens sizing."""
+from invoice_ingestion.llm.token_budget import (
+    STAGE_BUDGETS,
+    estimate_max_tokens,
+    estimate_meter_count,
+)
+from tests.factories import make_classification
+
+
+class TestEstimateMaxTokens:
+    def test_small_invoice_below_fixed_default(self):
+        cls = make_classification(tier="simple", line_items=5)
+        tokens = estimate_max_tokens("pass1b_extraction", cls, page_count=1)
+        assert tokens < STAGE_BUDGETS["pass1b_extraction"].default
+
+    def test_large_invoice_above_fixed_default(self):
+        cls = make_classification(tier="complex", line_items=60)
+        tokens = estimate_max_tokens("pass1b_extraction", cls, page_count=12)
+        assert tokens > 8192
+
+    def test_clamped_to_ceiling(self):
+        cls = make_classification(line_items=500)
+        assert estimate_max_tokens("pass2_schema_mapping", cls, page_count=40, ceiling=16384) == 16384
+
+    def test_floor_applied(self):
+        cls = make_classification(line_items=0)
+        tokens = estimate_max_tokens("pass4_audit", cls, page_count=1, question_count=0)
+        assert tokens == STAGE_BUDGETS["pass4_audit"].floor
+
+    def test_rounded_to_granularity(self):
+        cls = make_classification(line_items=17)
+        assert estimate_max_tokens("pass1b_extraction", cls, page_count=3) % 512 == 0
+
+    def test_more_meters_more_tokens(self):
+        cls = make_classification(line_items=10)
+        one = estimate_max_tokens("pass1a_extraction", cls, page_count=2, meter_count=1)
+        many = estimate_max_tokens("pass1a_extraction", cls, page_count=2, meter_count=8)
+        assert many > one
+
+    def test_history_replaces_heuristic_headroom(self):
+        cls = make_classification(line_items=5)
+        history = [(1200, 8192), (1500, 8192), (1350, 8192)]
+        tokens = estimate_max_tokens("pass1b_extraction", cls, page_count=4, history=history)
+        assert tokens == 2048  # 1500 * 1.25 rounded up to 512
+        assert tokens < estimate_max_tokens("pass1b_extraction", cls, page_count=4)
+
+    def test_history_never_below_line_item_estimate(self):
+        cls = make_classification(line_items=40)
+        history = [(1200, 8192), (1500, 8192), (1350, 8192)]
+        tokens = estimate_max_tokens("pass1b_extraction", cls, page_count=4, history=history)
+        assert tokens == 8704  # 600 + 190 * 40 + 40 * 4 rounded up to 512
+
+    def test_truncated_history_ignored(self):
+        cls = make_classification(line_items=40)
+        history = [(1200, 8192), (4096, 4096), (1350, 8192)]
+        with_history = estimate_max_tokens("pass1b_extraction", cls, page_count=4, history=history)
+        heuristic = estimate_max_tokens("pass1b_extraction", cls, page_count=4)
+        assert with_history == heuristic
+
+    def test_insufficient_history_ignored(self):
+        cls = make_classification(line_items=40)
+        history = [(500, 8192)]
+        assert estimate_max_tokens("pass1b_extraction", cls, page_count=4, history=history) == \
+            estimate_max_tokens("pass1b_extraction", cls, page_count=4)
+
+    def test_unknown_stage(self):
+        cls = make_classification()
+        assert estimate_max_tokens("unknown_stage", cls, page_count=1) == 8192
+
+
+class TestEstimateMeterCount:
+    def test_single_meter_default(self):
+        assert estimate_meter_count(make_classification()) == 1
+
+    def test_multi_meter_signal(self):
+        assert estimate_meter_count(make_classification(signals=["multi_meter"])) > 1
@@ -0,0 +1,91 @@
+"""Test the Pass 4 audit policy."""
+from invoice_ingestion.models.internal import Pass3Result, ValidationIssue
+from invoice_ingestion.passes.audit_policy import AuditPlan, AuditPolicyStats, plan_audit
+from invoice_ingestion.passes.pass4_audit import build_audit_questions
+from tests.factories import make_classification, make_extraction_dict
+
+
+def _extraction(total_confidence: float = 0.98) -> dict:
+    data = make_extraction_dict()
+    data["invoice"]["billing_period"]["start"] = {"value": "2024-01-01", "confidence": 0.97}
+    data["account"]["account_number"] = {"value": "123", "confidence": 0.97, "source_location": "page 1"}
+    data["totals"]["total_amount_due"].update(confidence=total_confidence, source_location="page 2, bottom")
+    return data
+
+
+def _pass3(*issues: ValidationIssue) -> Pass3Result:
+    return Pass3Result(issues=list(issues), math_disposition="clean")
+
+
+def _plan(tier="simple", extraction=None, pass3=None, review_history=None, page_count=3) -> AuditPlan:
+    classification = make_classification(tier=tier)
+    return plan_audit(
+        classification, build_audit_questions(classification), extraction or _extraction(),
+        pass3 if pass3 is not None else _pass3(), page_count, review_history,
+    )
+
+
+class TestPlanAudit:
+    def test_certain_full_review_is_not_audited(self):
+        plan = _plan(extraction=_extraction(total_confidence=0.2))
+
+        assert not plan.run
+        assert plan.reason == "full_review_certain"
+
+    def test_clean_simple_invoice_is_not_audited(self):
+        plan = _plan()
+
+        assert not plan.run
+        assert plan.reason == "clean"
+
+    def test_only_uncertain_fields_are_asked_on_their_pages(self):
+        issue = ValidationIssue(field="totals.current_charges", severity="warning", message="sum off")
+
+        plan = _plan(pass3=_pass3(issue))
+
+        assert plan.run
+        assert plan.reason == "uncertain_fields"
+        assert [q.field_to_check for q in plan.questions] == ["totals.total_amount_due"]
+        assert plan.pages == [1, 2]
+
+    def test_untrusted_complex_format_gets_every_question(self):
+        plan = _plan(tier="complex", review_history=[True] * 3)
+
+        assert plan.reason == "untrusted_format"
+        assert len(plan.questions) == len(build_audit_questions(make_classification(tier="complex")))
+
+    def test_trusted_complex_format_is_judged_by_fields(self):
+        assert _plan(tier="complex", review_history=[True] * 10).reason == "clean"
+
+    def test_poor_format_gets_every_question(self):
+        plan = _plan(review_history=[True] * 8 + [False] * 2)
+
+        assert plan.reason == "poor_format"
+        assert plan.pages == [1, 2]
+
+    def test_missing_validation_gets_every_question(self):
+        classification = make_classification(tier="simple")
+
+        plan = plan_audit(classification, build_audit_questions(classification), _extraction(), None, 3)
+
+        assert plan.reason == "no_validation"
+        assert plan.pages is None
+
+
+class TestAuditPolicyStats:
+    def test_snapshot(self):
+        stats = AuditPolicyStats()
+        questions = build_audit_questions(make_classification(tier="simple"))
+        stats.record(AuditPlan(run=False, reason="clean"), 6, 2)
+        stats.record(AuditPlan(run=False, reason="clean"), 6, 2)
+        stats.record(AuditPlan(run=True, reason="uncertain_fields", questions=questions[:3], pages=[1]), 6, 2)
+        stats.record_shadow(tier_changed=True)
+
+        snapshot = stats.snapshot()
+
+        assert snapshot["calls_avoided"] == 1
+        assert snapshot["skip_rate"] == round(2 / 3, 4)
+        assert snapshot["by_reason"] == {"clean": 2, "uncertain_fields": 1}
+        assert snapshot["question_share"] == 0.5
+        assert snapshot["page_share"] == 0.5
+        assert snapshot["accuracy_delta"] == 1.0
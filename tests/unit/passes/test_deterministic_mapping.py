@@ -0,0 +1,125 @@
+"""Test deterministic Pass 2 mapping and the residue call."""
+import json
+
+import pytest
+
+from invoice_ingestion.llm.base import LLMResponse
+from invoice_ingestion.models.internal import Pass1AResult, Pass1BResult
+from invoice_ingestion.passes.deterministic_mapping import map_deterministically
+from invoice_ingestion.passes.pass2_schema_mapping import run_pass2
+from tests.factories import make_classification
+
+
+def _pass1a(meters=None) -> Pass1AResult:
+    return Pass1AResult(
+        invoice={"billing_period": {"start": {"value": "2024-01-01"}, "end": {"value": "2024-01-31"}}},
+        account={},
+        meters=meters if meters is not None else [
+            {"meter_number": {"value": "M1"}, "consumption": {"raw_value": 100.0, "raw_unit": "ccf"}},
+        ],
+    )
+
+
+def _charge(line_id, description, category="energy", section="distribution", owner="utility", **extra) -> dict:
+    return {
+        "line_id": line_id,
+        "description": {"value": description, "confidence": 0.95},
+        "category": category,
+        "charge_section": section,
+        "charge_owner": owner,
+        "amount": {"value": 10.0, "currency": "USD", "confidence": 0.95},
+        **extra,
+    }
+
+
+class TestMapDeterministically:
+    def test_consistent_english_charges_need_no_model(self):
+        mapping = map_deterministically(
+            make_classification("natural_gas"), _pass1a(),
+            Pass1BResult(charges=[_charge("L001", "Delivery Charge", quantity_unit="therm")]),
+        )
+
+        assert mapping.complete
+        charge = mapping.data["charges"][0]
+        assert charge["applies_to_meter"] == "M1"
+        assert charge["quantity_unit"] == "therms"
+        assert charge["charge_period"] == {"start": "2024-01-01", "end": "2024-01-31", "attribution_type": "current"}
+        consumption = mapping.data["meters"][0]["consumption"]
+        assert consumption["normalized_unit"] == "therms"
+        assert consumption["normalized_value"] == pytest.approx(103.7)
+
+    def test_taxonomy_classifies_and_translates(self):
+        classification = make_classification().model_copy(update={
+            "country_code": "DE", "language": "de", "market_type": "liberalized_eu",
+        })
+        charges = [
+            _charge("L001", "Stromsteuer", category="other", section="other", owner="other"),
+            _charge("L002", "Arbeitspreis", category="other", section="other", owner="other"),
+        ]
+
+        mapping = map_deterministically(classification, _pass1a([]), Pass1BResult(charges=charges))
+
+        assert mapping.complete
+        tax, energy = mapping.data["charges"]
+        assert (tax["category"], tax["charge_section"], tax["charge_owner"]) == ("tax", "taxes", "government")
+        assert tax["description"]["value"] == "Electricity Tax (Stromsteuer)"
+        assert energy["charge_owner"] == "supplier"
+
+    def test_uncertain_items_are_left_as_residue(self):
+        meters = [
+            {"meter_number": {"value": "G1"}, "consumption": {"raw_value": 50.0, "raw_unit": "m3"}},
+        ]
+        classification = make_classification("natural_gas").model_copy(update={"country_code": "FR"})
+        charges = [
+            _charge("L001", "Taxe (TVA)", category="tax", section="taxes", owner="government"),
+            _charge("L002", "Service fee", category="tax", section="supply", owner="utility"),
+            _charge("L003", "Meter rental", category="fixed", applies_to_meter="OTHER"),
+        ]
+
+        mapping = map_deterministically(classification, _pass1a(meters), Pass1BResult(charges=charges))
+
+        assert mapping.residue_meters == [0]
+        assert mapping.residue_charges == [1, 2]
+
+    def test_learned_classification_wins(self):
+        learned = {"odd line": {"category": "adjustment", "charge_section": "other", "charge_owner": "utility",
+                                "attribution_type": "prior_period"}}
+        charges = [_charge("L001", "Odd line", category="unknown")]
+
+        mapping = map_deterministically(
+            make_classification("natural_gas"), _pass1a(), Pass1BResult(charges=charges), known_charges=learned,
+        )
+
+        assert mapping.complete
+        charge = mapping.data["charges"][0]
+        assert charge["category"] == "adjustment"
+        assert charge["charge_period"]["attribution_type"] == "prior_period"
+
+
+class TestRunPass2Deterministic:
+    @pytest.mark.asyncio
+    async def test_no_residue_makes_no_call(self, mock_llm_client, prompt_registry):
+        result = await run_pass2(
+            make_classification("natural_gas"), _pass1a(), Pass1BResult(charges=[_charge("L001", "Basic Service")]),
+            mock_llm_client, prompt_registry, deterministic=True,
+        )
+
+        mock_llm_client.complete_text.assert_not_called()
+        assert result.data["charges"][0]["applies_to_meter"] == "M1"
+
+    @pytest.mark.asyncio
+    async def test_only_residue_is_sent_and_merged_back(self, mock_llm_client, prompt_registry):
+        charges = [_charge("L001", "Basic Service"), _charge("L002", "Odd line", category="unknown")]
+        fixed = _charge("L002", "Odd line", category="other", section="other", owner="utility")
+        mock_llm_client.complete_text.return_value = LLMResponse(
+            content=json.dumps({"charges": [fixed]}), model="mock-model",
+        )
+
+        result = await run_pass2(
+            make_classification("natural_gas"), _pass1a(), Pass1BResult(charges=charges),
+            mock_llm_client, prompt_registry, deterministic=True,
+        )
+
+        prompt = mock_llm_client.complete_text.call_args.kwargs["user_prompt"]
+        assert "Odd line" in prompt and "Basic Service" not in prompt
+        assert [c["category"] for c in result.data["charges"]] == ["energy", "other"]
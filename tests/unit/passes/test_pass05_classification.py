@@ -0,0 +1,20 @@
+"""Test Pass 0.5 classification parsing."""
+import json
+
+import pytest
+
+from invoice_ingestion.llm.base import LLMResponse
+from invoice_ingestion.passes.pass05_classification import run_pass05
+from tests.factories import make_ingestion_result
+
+
+class TestRunPass05:
+    @pytest.mark.asyncio
+    async def test_null_language_falls_back_to_detected(self, mock_llm_client, prompt_registry):
+        mock_llm_client.complete_vision.return_value = LLMResponse(
+            content=json.dumps({"commodity_type": "electricity", "language": None}), model="mock-model",
+        )
+
+        result = await run_pass05(make_ingestion_result(language="de"), mock_llm_client, prompt_registry)
+
+        assert result.language == "de"
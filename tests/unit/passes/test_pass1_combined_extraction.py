@@ -0,0 +1,49 @@
+"""Test the simple-tier fast lane routing and acceptance gate."""
+from invoice_ingestion.models.internal import Pass3Result, ValidationIssue
+from invoice_ingestion.passes.pass1_combined_extraction import accept_fast_lane, routes_to_fast_lane
+from tests.factories import make_classification, make_extraction_dict
+
+CLEAN = Pass3Result(math_disposition="clean")
+
+
+def _combined(**kwargs) -> dict:
+    data = make_extraction_dict(**kwargs)
+    del data["extraction_metadata"]
+    data["totals"]["total_amount_due"]["confidence"] = 0.98
+    return data
+
+
+class TestRouting:
+    def test_only_simple_tier_routes_to_fast_lane(self):
+        assert routes_to_fast_lane(make_classification(tier="simple"))
+        assert not routes_to_fast_lane(make_classification(tier="standard"))
+        assert not routes_to_fast_lane(make_classification(tier="complex"))
+
+
+class TestAcceptFastLane:
+    def test_clean_confident_extraction_is_accepted(self):
+        assert accept_fast_lane(_combined(), CLEAN, min_confidence=0.95) == (True, "accepted")
+
+    def test_missing_charges_escalate(self):
+        accepted, reason = accept_fast_lane(_combined(charges=[]), CLEAN, min_confidence=0.95)
+
+        assert not accepted
+        assert reason == "incomplete"
+
+    def test_fatal_validation_issue_escalates(self):
+        pass3 = Pass3Result(math_disposition="discrepancy", issues=[
+            ValidationIssue(field="totals.total_amount_due", severity="fatal", message="Total mismatch"),
+        ])
+
+        accepted, reason = accept_fast_lane(_combined(), pass3, min_confidence=0.95)
+
+        assert not accepted
+        assert reason == "fatal:totals.total_amount_due"
+
+    def test_low_confidence_escalates(self):
+        data = _combined()
+        data["totals"]["total_amount_due"]["confidence"] = 0.4
+
+        accepted, _ = accept_fast_lane(data, CLEAN, min_confidence=0.95)
+
+        assert not accepted
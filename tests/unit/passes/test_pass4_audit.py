@@ -1,7 +1,10 @@
 """Test audit question builder and comparison."""
 import pytest
-from invoice_ingestion.passes.pass4_audit import build_audit_questions, compare_audit
-from tests.factories import make_classification
+from invoice_ingestion.llm.base import LLMResponse
+from invoice_ingestion.passes.pass4_audit import (
+    ask_audit_questions, build_audit_questions, compare_audit, flatten_audit_answers,
+)
+from tests.factories import make_classification, make_ingestion_result
 
 
 class TestBuildAuditQuestions:
@@ -58,3 +61,39 @@ class TestCompareAudit:
         audit = {"total_amount_due": "$250.00"}
         mismatches = compare_audit(extraction, audit)
         assert any(m["severity"] == "fatal" for m in mismatches)
+
+    def test_answers_keyed_by_question_field(self):
+        extraction = {"totals": {"total_amount_due": {"value": 187.45}}, "meters": [], "account": {}}
+        mismatches = compare_audit(extraction, {"totals.total_amount_due": "250.00", "meters.count": "1"})
+        assert {m["field"] for m in mismatches} == {"total_amount_due", "meter_count"}
+
+
+class TestAskAuditQuestions:
+    @pytest.mark.asyncio
+    async def test_given_questions_and_pages_are_sent(self, mock_llm_client, prompt_registry):
+        mock_llm_client.complete_vision.return_value = LLMResponse(content="{}", model="mock-model")
+        questions = build_audit_questions(make_classification())[:1]
+
+        result = await ask_audit_questions(
+            make_ingestion_result(pages=3), make_classification(), mock_llm_client, prompt_registry,
+            questions=questions, pages=[2],
+        )
+
+        call = mock_llm_client.complete_vision.call_args.kwargs
+        assert len(call["images"]) == 1
+        assert "1. [totals.total_amount_due]" in call["user_prompt"]
+        assert "{audit_questions}" not in call["user_prompt"] and "{commodity_type}" not in call["user_prompt"]
+        assert result.fields_checked == 1
+
+
+class TestFlattenAuditAnswers:
+    def test_structured_answers_flattened(self):
+        data = {"audit_answers": [
+            {"question_id": "Q1", "field_checked": "total_amount_due", "answer_value": "123.45"},
+            {"question_id": "Q2", "field_checked": "meter_count", "answer_value": "NOT_FOUND"},
+        ]}
+        assert flatten_audit_answers(data) == {"total_amount_due": "123.45", "meter_count": ""}
+
+    def test_flat_answers_unchanged(self):
+        data = {"total_amount_due": "$100.00"}
+        assert flatten_audit_answers(data) == data
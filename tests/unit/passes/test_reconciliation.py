@@ -0,0 +1,81 @@
+"""Test reconciliation of parallel Pass 1A / 1B output."""
+from invoice_ingestion.models.internal import Pass1AResult, Pass1BResult
+from invoice_ingestion.passes.reconciliation import reconcile_extractions
+
+
+def _pass1a(*meters: tuple[str, float]) -> Pass1AResult:
+    return Pass1AResult(
+        invoice={"billing_period": {"start": {"value": "2024-01-01"}, "end": {"value": "2024-01-31"}}},
+        account={},
+        meters=[
+            {"meter_number": {"value": number, "confidence": 0.9}, "consumption": {"raw_value": kwh, "raw_unit": "kWh"}}
+            for number, kwh in meters
+        ],
+    )
+
+
+def _charge(meter=None, quantity=None, **extra) -> dict:
+    return {"line_id": "L001", "applies_to_meter": meter, "quantity": {"value": quantity}, **extra}
+
+
+class TestMeterAlignment:
+    def test_formatting_and_leading_zeros_ignored(self):
+        pass1b = Pass1BResult(charges=[_charge("123 456")])
+
+        reconciled, unmatched = reconcile_extractions(_pass1a(("00123-456", 500), ("999", 10)), pass1b)
+
+        assert reconciled.charges[0]["applies_to_meter"] == "00123-456"
+        assert unmatched == []
+
+    def test_masked_number_matches_unique_suffix(self):
+        pass1b = Pass1BResult(charges=[_charge("****4521")])
+
+        reconciled, _ = reconcile_extractions(_pass1a(("DE0001234521", 500), ("DE0001239999", 10)), pass1b)
+
+        assert reconciled.charges[0]["applies_to_meter"] == "DE0001234521"
+
+    def test_single_meter_invoice_takes_any_reference(self):
+        pass1b = Pass1BResult(charges=[_charge("Main meter")])
+
+        reconciled, unmatched = reconcile_extractions(_pass1a(("A-1", 500)), pass1b)
+
+        assert reconciled.charges[0]["applies_to_meter"] == "A-1"
+        assert unmatched == []
+
+    def test_unknown_reference_kept_and_reported(self):
+        pass1b = Pass1BResult(charges=[_charge("77777"), _charge("77777")])
+
+        reconciled, unmatched = reconcile_extractions(_pass1a(("12345", 500), ("67890", 10)), pass1b)
+
+        assert reconciled.charges[0]["applies_to_meter"] == "77777"
+        assert unmatched == ["77777"]
+
+    def test_missing_meter_assigned_by_consumption(self):
+        pass1b = Pass1BResult(charges=[_charge(quantity=500.0), _charge(quantity=42.0)])
+
+        reconciled, _ = reconcile_extractions(_pass1a(("12345", 500), ("67890", 10)), pass1b)
+
+        assert [c["applies_to_meter"] for c in reconciled.charges] == ["12345", None]
+
+
+class TestChargePeriod:
+    def test_missing_period_takes_billing_period(self):
+        pass1b = Pass1BResult(charges=[
+            _charge(),
+            _charge(charge_period={"start": "2023-12-01", "end": "2023-12-31", "attribution_type": "prior_period"}),
+        ])
+
+        reconciled, _ = reconcile_extractions(_pass1a(("12345", 500)), pass1b)
+
+        assert reconciled.charges[0]["charge_period"] == {
+            "start": "2024-01-01", "end": "2024-01-31", "attribution_type": "current",
+        }
+        assert reconciled.charges[1]["charge_period"]["attribution_type"] == "prior_period"
+
+    def test_input_not_modified(self):
+        pass1b = Pass1BResult(charges=[_charge("123456")])
+
+        reconcile_extractions(_pass1a(("00123456", 500)), pass1b)
+
+        assert pass1b.charges[0]["applies_to_meter"] == "123456"
+        assert "charge_period" not in pass1b.charges[0]
@@ -0,0 +1,62 @@
+"""Test the local classification prediction behind speculative Pass 1A."""
+from invoice_ingestion.passes.speculation import (
+    SpeculationStats,
+    agrees,
+    predict_classification,
+    predict_commodity,
+)
+from tests.factories import make_classification, make_ingestion_result
+
+US_ELECTRIC = "Electric service 1,234 kWh at $0.12 per kWh. Demand 40 kW. Due 01/31/2024. Total $148.08"
+
+
+class TestPredictCommodity:
+    def test_unit_keywords_decide(self):
+        assert predict_commodity(US_ELECTRIC) == "electricity"
+        assert predict_commodity("Gas usage 120 therms, 118 CCF, natural gas supply") == "natural_gas"
+        assert predict_commodity("Water 12,000 gallons; sewer charge; water base fee") == "water"
+
+    def test_unclear_text_is_not_guessed(self):
+        assert predict_commodity("Sample invoice text for page 1") is None
+        # Dual-fuel invoice: no commodity dominates
+        assert predict_commodity("Electricity 500 kWh kWh; gas 40 therms therms") is None
+
+
+class TestAgreement:
+    def test_prediction_from_text_layer_agrees_with_matching_classification(self):
+        ingestion = make_ingestion_result(pages=1)
+        ingestion.pages[0].extracted_text = US_ELECTRIC
+
+        predicted = predict_classification(ingestion)
+
+        assert predicted is not None
+        assert agrees(predicted, make_classification("electricity"))
+        assert not agrees(predicted, make_classification("natural_gas"))
+
+    def test_locale_mismatch_disagrees(self):
+        predicted = make_classification("electricity")
+        classification = make_classification("electricity")
+        classification.number_format = "1.234,56"
+
+        assert not agrees(predicted, classification)
+
+    def test_market_type_is_ignored(self):
+        predicted = make_classification("electricity")
+        predicted.market_type = "deregulated"
+
+        assert agrees(predicted, make_classification("electricity"))
+
+
+class TestStats:
+    def test_hit_rate_and_saved_latency(self):
+        stats = SpeculationStats()
+        stats.record("hit", 1200.0)
+        stats.record("hit", 800.0)
+        stats.record("miss")
+        stats.record("skipped")
+
+        snapshot = stats.snapshot()
+
+        assert snapshot["started"] == 3
+        assert snapshot["hit_rate"] == round(2 / 3, 4)
+        assert snapshot["mean_saved_ms"] == 1000
@@ -0,0 +1,71 @@
+"""Test pass checkpoint hashing and resume selection."""
+from invoice_ingestion.storage.checkpoints import (
+    STAGES,
+    chain_input_hashes,
+    downstream,
+    ingestion_metadata,
+    restore_ingestion,
+    resumable,
+)
+from tests.factories import make_ingestion_result
+
+FINGERPRINTS = {"pass05_classification": "gpt-4o:aaaa", "pass2_schema_mapping": "gpt-4o:bbbb"}
+
+
+class TestInputHashes:
+    def test_covers_every_stage_in_order(self):
+        hashes = chain_input_hashes("f" * 64, FINGERPRINTS)
+
+        assert tuple(hashes) == STAGES
+        assert len(set(hashes.values())) == len(STAGES)
+
+    def test_changed_prompt_invalidates_stage_and_downstream(self):
+        before = chain_input_hashes("f" * 64, FINGERPRINTS)
+        after = chain_input_hashes("f" * 64, {**FINGERPRINTS, "pass2_schema_mapping": "gpt-4o:cccc"})
+
+        changed = [stage for stage in STAGES if before[stage] != after[stage]]
+        assert changed == ["pass2_schema_mapping", "pass3_validation"]
+
+
+class TestResumable:
+    def test_missing_checkpoint_reruns_dependent_stages(self):
+        hashes = chain_input_hashes("f" * 64, FINGERPRINTS)
+        stored = {stage: (hashes[stage], {"stage": stage}) for stage in STAGES}
+        del stored["pass1b_extraction"]
+
+        restored = resumable(stored, hashes)
+
+        assert list(restored) == [
+            "pass0_ingestion", "pass05_classification", "pass1_combined", "pass1a_extraction", "pass4_audit",
+        ]
+
+    def test_stale_checkpoint_is_not_reused(self):
+        hashes = chain_input_hashes("f" * 64, FINGERPRINTS)
+        stored = {stage: (hashes[stage], {}) for stage in STAGES}
+        stored["pass0_ingestion"] = ("0" * 64, {})
+
+        assert resumable(stored, hashes) == {}
+
+    def test_validation_rerun_keeps_audit(self):
+        hashes = chain_input_hashes("f" * 64, FINGERPRINTS)
+        rerun = downstream("pass3_validation")
+        stored = {stage: (hashes[stage], {}) for stage in STAGES if stage not in rerun}
+
+        assert rerun == {"pass3_validation"}
+        assert set(resumable(stored, hashes)) == set(STAGES) - rerun
+
+    def test_schema_mapping_rerun_keeps_audit_answers(self):
+        assert downstream("pass2_schema_mapping") == {"pass2_schema_mapping", "pass3_validation"}
+
+
+class TestIngestionMetadata:
+    def test_round_trip_drops_page_images(self):
+        ingestion = make_ingestion_result(pages=2)
+
+        metadata = ingestion_metadata(ingestion)
+        restored = restore_ingestion(metadata)
+
+        assert "image_base64" not in metadata["pages"][0]
+        assert restored.file_hash == ingestion.file_hash
+        assert [p.extracted_text for p in restored.pages] == [p.extracted_text for p in ingestion.pages]
+        assert all(p.image_base64 == "" for p in restored.pages)
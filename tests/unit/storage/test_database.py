@@ -0,0 +1,44 @@
+"""Test engine lifecycle and pool sizing."""
+import pytest
+
+from invoice_ingestion.config import Settings
+from invoice_ingestion.storage import database
+
+
+@pytest.fixture(autouse=True)
+async def _reset_engine():
+    yield
+    await database.close_db()
+
+
+class TestEngine:
+    def test_pool_sized_from_concurrency(self):
+        options = database.engine_options(Settings(job_concurrency=8, job_prefetch=2))
+
+        assert options["pool_size"] == 12
+        assert options["max_overflow"] == 8
+        assert options["connect_args"]["statement_cache_size"] == 500
+
+    def test_explicit_pool_size_wins(self):
+        options = database.engine_options(Settings(db_pool_size=3, db_max_overflow=0))
+        assert (options["pool_size"], options["max_overflow"]) == (3, 0)
+
+    def test_init_db_is_idempotent_and_accepts_secret(self):
+        settings = Settings()
+        database.init_db(settings.database_url)
+        engine = database.get_engine()
+
+        database.init_db(settings.database_url.get_secret_value())
+
+        assert database.get_engine() is engine
+        assert engine.url.password == "invoice"
+
+    async def test_init_db_with_another_url_requires_close(self):
+        database.init_db("postgresql+asyncpg://a:a@localhost:5432/a")
+
+        with pytest.raises(RuntimeError):
+            database.init_db("postgresql+asyncpg://b:b@localhost:5432/b")
+        await database.close_db()
+        database.init_db("postgresql+asyncpg://b:b@localhost:5432/b")
+
+        assert database.get_engine().url.database == "b"
@@ -0,0 +1,47 @@
+"""Test prompt blob compression and hashing."""
+import pytest
+
+from invoice_ingestion.storage.llm_blobs import (
+    KnownHashes,
+    compress_text,
+    decompress_text,
+    preview,
+    text_hash,
+)
+
+
+class TestBlobCodec:
+    def test_round_trip(self):
+        text = "Extract all charges from this invoice. € ✓\n" * 200
+        data = compress_text(text)
+
+        assert decompress_text(data, "zstd") == text
+        assert len(data) < len(text.encode("utf-8")) / 10
+
+    def test_uncompressed_legacy_codec(self):
+        assert decompress_text(b"plain", "none") == "plain"
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError):
+            decompress_text(b"", "lz4")
+
+    def test_hash_is_sha256_hex(self):
+        assert text_hash("") == "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
+
+    def test_preview(self):
+        assert preview(None) is None
+        assert preview("short") == "short"
+        assert preview("x" * 201) == "x" * 200 + "..."
+
+
+class TestKnownHashes:
+    def test_evicts_least_recently_used(self):
+        known = KnownHashes(max_entries=2)
+        known.add("a")
+        known.add("b")
+        assert "a" in known  # refresh a
+        known.add("c")
+
+        assert "a" in known
+        assert "b" not in known
+        assert len(known) == 2
@@ -0,0 +1,64 @@
+"""Test hourly LLM call rollup aggregation."""
+from datetime import datetime
+
+from invoice_ingestion.storage.llm_rollups import (
+    HISTOGRAM_SIZE,
+    build_rollups,
+    histogram_percentile,
+    latency_bucket,
+)
+
+
+def _row(minute: int, stage="pass1a_extraction", duration_ms=1200, **kwargs) -> dict:
+    return {
+        "created_at": datetime(2026, 10, 19, 9, minute),
+        "stage": stage, "model": "gpt-4o", "provider": "azure_openai",
+        "duration_ms": duration_ms, "input_tokens": 1000, "output_tokens": 200, "total_tokens": 1200,
+        "error_message": None, **kwargs,
+    }
+
+
+class TestBuildRollups:
+    def test_groups_by_hour_and_key(self):
+        rollups = build_rollups([
+            _row(5), _row(55, duration_ms=300),
+            _row(10, stage="pass4_audit"),
+            {**_row(0), "created_at": datetime(2026, 10, 19, 10, 0)},
+        ])
+
+        assert len(rollups) == 3
+        first = next(r for r in rollups if r["stage"] == "pass1a_extraction"
+                     and r["bucket_start"] == datetime(2026, 10, 19, 9))
+        assert first["call_count"] == 2
+        assert first["input_tokens"] == 2000
+        assert first["duration_ms_sum"] == 1500
+        assert sum(first["latency_histogram"]) == 2
+        assert len(first["latency_histogram"]) == HISTOGRAM_SIZE
+
+    def test_errors_and_missing_values(self):
+        [rollup] = build_rollups([_row(1, error_message="timeout", duration_ms=None, input_tokens=None)])
+
+        assert rollup["error_count"] == 1
+        assert rollup["input_tokens"] == 0
+        assert rollup["duration_count"] == 0
+        assert sum(rollup["latency_histogram"]) == 0
+
+    def test_sorted_by_key(self):
+        rollups = build_rollups([_row(1, stage="pass4_audit"), _row(1, stage="pass05_classification")])
+        assert [r["stage"] for r in rollups] == ["pass05_classification", "pass4_audit"]
+
+
+class TestHistogram:
+    def test_bucket_bounds_inclusive(self):
+        assert latency_bucket(250) == 0
+        assert latency_bucket(251) == 1
+        assert latency_bucket(10**6) == HISTOGRAM_SIZE - 1
+
+    def test_percentiles(self):
+        histogram = [0] * HISTOGRAM_SIZE
+        histogram[latency_bucket(800)] = 90
+        histogram[latency_bucket(15_000)] = 10
+
+        assert histogram_percentile(histogram, 50) == 1000
+        assert histogram_percentile(histogram, 95) == 20_000
+        assert histogram_percentile([], 50) is None
@@ -0,0 +1,88 @@
+"""Test the dependency-graph pass scheduler."""
+import asyncio
+
+import pytest
+
+from invoice_ingestion.dag import Graph, Node
+
+
+def _sleeper(seconds: float, value=None, log: list | None = None, name: str = ""):
+    async def run(results):
+        if log is not None:
+            log.append(("start", name))
+        await asyncio.sleep(seconds)
+        if log is not None:
+            log.append(("end", name))
+        return value
+    return run
+
+
+class TestGraph:
+    def test_rejects_unknown_dependency(self):
+        with pytest.raises(ValueError, match="unknown"):
+            Graph([Node("a", _sleeper(0), deps=("missing",))])
+
+    def test_rejects_cycle(self):
+        with pytest.raises(ValueError, match="cycle"):
+            Graph([Node("a", _sleeper(0), deps=("b",)), Node("b", _sleeper(0), deps=("a",))])
+
+    @pytest.mark.asyncio
+    async def test_independent_nodes_overlap(self):
+        graph = Graph([
+            Node("root", _sleeper(0.01, 1)),
+            Node("left", _sleeper(0.1, 2), deps=("root",)),
+            Node("right", _sleeper(0.05, 3), deps=("root",)),
+            Node("join", lambda r: _sleeper(0, r["left"] + r["right"])(r), deps=("left", "right")),
+        ])
+
+        results, timeline = await graph.run()
+
+        assert results["join"] == 5
+        assert timeline.total_ms < timeline.busy_ms
+        assert timeline.timings["right"].start_ms < timeline.timings["left"].end_ms
+        assert timeline.critical_path == ["root", "left", "join"]
+
+    @pytest.mark.asyncio
+    async def test_dependents_wait_for_dependencies(self):
+        log: list = []
+        graph = Graph([
+            Node("a", _sleeper(0.02, log=log, name="a")),
+            Node("b", _sleeper(0, log=log, name="b"), deps=("a",)),
+        ])
+
+        await graph.run()
+
+        assert log == [("start", "a"), ("end", "a"), ("start", "b"), ("end", "b")]
+
+    @pytest.mark.asyncio
+    async def test_timeout_uses_fallback(self):
+        graph = Graph([
+            Node("slow", _sleeper(1.0, "late"), timeout=0.02, fallback=lambda e: "fallback"),
+            Node("after", lambda r: _sleeper(0, r["slow"])(r), deps=("slow",)),
+        ])
+
+        results, timeline = await graph.run()
+
+        assert results["after"] == "fallback"
+        assert timeline.timings["slow"].status == "timeout"
+
+    @pytest.mark.asyncio
+    async def test_unhandled_failure_cancels_running_nodes(self):
+        cancelled = asyncio.Event()
+
+        async def long(results):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def broken(results):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("pass0 failed")
+
+        graph = Graph([Node("long", long), Node("broken", broken), Node("after", _sleeper(0), deps=("broken",))])
+
+        with pytest.raises(RuntimeError, match="pass0 failed"):
+            await graph.run()
+        assert cancelled.is_set()
@@ -0,0 +1,79 @@
+"""Test the Pass 4 audit policy inside the pipeline."""
+import pytest
+
+from invoice_ingestion.models.internal import Pass1AResult, Pass1BResult, Pass2Result, Pass4Result
+from invoice_ingestion.passes.audit_policy import audit_policy_stats
+from invoice_ingestion.passes.pass4_audit import build_audit_questions
+from invoice_ingestion.storage.checkpoints import ingestion_metadata
+from tests.factories import make_classification, make_extraction_dict, make_ingestion_result
+
+
+def _mapped() -> dict:
+    data = make_extraction_dict()
+    del data["extraction_metadata"]
+    data["invoice"]["billing_period"]["start"] = {"value": "2024-01-01", "confidence": 0.97}
+    data["account"]["account_number"] = {"value": "123", "confidence": 0.97}
+    data["totals"] = {"total_amount_due": {"value": 187.45, "confidence": 0.98}}
+    return data
+
+
+@pytest.fixture
+def pipeline(stub_pipeline):
+    instance = stub_pipeline(tier="simple", pages=2, audit_policy=True, audit_shadow_rate=0.0)
+    instance.mocks["run_pass2"].side_effect = lambda *a, **k: Pass2Result(data=_mapped())
+    audit_policy_stats.reset()
+    yield instance
+    audit_policy_stats.reset()
+
+
+class TestAuditPolicy:
+    @pytest.mark.asyncio
+    async def test_clean_simple_invoice_skips_audit(self, pipeline):
+        result = await pipeline.process(b"%PDF", "a.pdf", persist=False)
+
+        pipeline.mocks["ask_audit_questions"].assert_not_called()
+        assert "audit_skipped:clean" in result.extraction_metadata.flags
+        assert audit_policy_stats.snapshot()["calls_avoided"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sampled_skip_is_shadow_audited_without_changing_the_score(self, pipeline):
+        pipeline.settings.audit_shadow_rate = 1.0
+        pipeline.mocks["ask_audit_questions"].return_value = Pass4Result(answers={"total_amount_due": "500.00"})
+
+        result = await pipeline.process(b"%PDF", "a.pdf", persist=False)
+
+        pipeline.mocks["ask_audit_questions"].assert_awaited_once()
+        assert "audit_shadow:tier_changed" in result.extraction_metadata.flags
+        assert result.extraction_metadata.confidence_tier == "auto_accept"
+        snapshot = audit_policy_stats.snapshot()
+        assert (snapshot["shadow_audits"], snapshot["calls_avoided"], snapshot["accuracy_delta"]) == (1, 0, 1.0)
+
+    @pytest.mark.asyncio
+    async def test_restored_audit_asking_other_questions_renders_pages(self, pipeline):
+        pipeline.tier = "standard"
+        classification = make_classification(tier="standard")
+        restored = {
+            "pass0_ingestion": ingestion_metadata(make_ingestion_result(pages=2)),
+            "pass05_classification": classification.model_dump(mode="json"),
+            "pass1a_extraction": Pass1AResult(invoice={}, account={}).model_dump(mode="json"),
+            "pass1b_extraction": Pass1BResult().model_dump(mode="json"),
+            "pass4_audit": Pass4Result(questions_asked=build_audit_questions(classification)[:1])
+            .model_dump(mode="json"),
+        }
+
+        pipeline._load_checkpoints.return_value = restored
+
+        await pipeline.process(b"%PDF", "a.pdf", force=True)
+
+        ingestion = pipeline.mocks["ask_audit_questions"].call_args.args[0]
+        assert len(ingestion.pages) == 2 and all(page.image_base64 for page in ingestion.pages)
+
+    @pytest.mark.asyncio
+    async def test_untrusted_standard_invoice_gets_full_audit(self, pipeline):
+        pipeline.tier = "standard"
+
+        await pipeline.process(b"%PDF", "a.pdf", persist=False)
+
+        pipeline.mocks["ask_audit_questions"].assert_awaited_once()
+        assert pipeline.mocks["ask_audit_questions"].call_args.kwargs["pages"] is None
+        assert audit_policy_stats.snapshot()["by_reason"] == {"untrusted_format": 1}
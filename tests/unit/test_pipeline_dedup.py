@@ -0,0 +1,114 @@
+"""Test the pipeline's in-process single-flight dedup."""
+import asyncio
+
+import pytest
+
+from invoice_ingestion import pipeline as pipeline_module
+from invoice_ingestion.pipeline import ExtractionPipeline
+
+
+class _Runs:
+    """Stands in for the database-backed run: counts runs per file hash."""
+
+    def __init__(self, delay=0.05, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls: list[str] = []
+        self.forced = 0
+
+    async def deduplicated(self, file_bytes, blob_name, file_hash):
+        self.calls.append(file_hash)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("pass0 failed")
+        return f"result-{len(self.calls)}"
+
+    async def run(self, file_bytes, blob_name, extraction_id, **kwargs):
+        self.forced += 1
+        return "forced"
+
+
+@pytest.fixture
+def pipeline(stub_pipeline, monkeypatch):
+    runs = _Runs()
+    instance = stub_pipeline()
+    monkeypatch.setattr(instance, "_process_deduplicated", runs.deduplicated)
+    monkeypatch.setattr(instance, "_run", runs.run)
+    instance.runs = runs
+    yield instance
+    assert pipeline_module._inflight == {}
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_run(self, pipeline):
+        results = await asyncio.gather(*(pipeline.process(b"%PDF same", f"{i}.pdf") for i in range(5)))
+
+        assert results == ["result-1"] * 5
+        assert len(pipeline.runs.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_different_files_run_separately(self, pipeline):
+        await asyncio.gather(pipeline.process(b"%PDF a", "a.pdf"), pipeline.process(b"%PDF b", "b.pdf"))
+
+        assert len(set(pipeline.runs.calls)) == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_reaches_every_waiter(self, pipeline):
+        pipeline.runs.fail = True
+
+        results = await asyncio.gather(
+            *(pipeline.process(b"%PDF same", "a.pdf") for _ in range(3)), return_exceptions=True,
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert len(pipeline.runs.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_waiter_runs_again_when_leader_cancelled(self, pipeline):
+        leader = asyncio.create_task(pipeline.process(b"%PDF same", "a.pdf"))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(pipeline.process(b"%PDF same", "b.pdf"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await waiter == "result-2"
+        assert leader.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_force_bypasses_dedup(self, pipeline):
+        results = await asyncio.gather(
+            pipeline.process(b"%PDF same", "a.pdf"),
+            pipeline.process(b"%PDF same", "a.pdf", force=True),
+        )
+
+        assert results == ["result-1", "forced"]
+        assert pipeline.runs.forced == 1
+
+
+class TestClaimHeartbeat:
+    @pytest.mark.asyncio
+    async def test_running_claim_is_refreshed_until_lost(self, mock_settings, monkeypatch):
+        mock_settings.dedup_claim_ttl_seconds = 0.03
+        touched: list = []
+
+        class _Session:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def commit(self):
+                pass
+
+        async def touch_claim(self, extraction_id):
+            touched.append(extraction_id)
+            return len(touched) < 3
+
+        monkeypatch.setattr(pipeline_module, "AsyncSessionLocal", _Session)
+        monkeypatch.setattr(pipeline_module.ExtractionRepo, "touch_claim", touch_claim)
+
+        await asyncio.wait_for(ExtractionPipeline(mock_settings)._heartbeat_claim("x"), timeout=1.0)
+
+        assert touched == ["x"] * 3
@@ -0,0 +1,56 @@
+"""Test the simple-tier fast lane inside the pipeline."""
+import pytest
+
+from invoice_ingestion.models.internal import Pass2Result
+from tests.factories import make_extraction_dict
+
+
+def _combined(**kwargs) -> dict:
+    data = make_extraction_dict(**kwargs)
+    del data["extraction_metadata"]
+    return data
+
+
+@pytest.fixture
+def pipeline(stub_pipeline):
+    instance = stub_pipeline(tier="simple", enable_fast_lane=True)
+    instance.combined = _combined()
+    instance.mocks["run_pass1_combined"].side_effect = lambda *a, **k: Pass2Result(data=instance.combined)
+    instance.mocks["run_pass2"].return_value = Pass2Result(data=_combined())
+    return instance
+
+
+_EXTRACTION_PASSES = {"run_pass1_combined", "run_pass1a", "run_pass1b", "run_pass2", "ask_audit_questions"}
+
+
+def _called(pipeline) -> set[str]:
+    return {name for name in _EXTRACTION_PASSES if pipeline.mocks[name].await_count}
+
+
+class TestFastLane:
+    @pytest.mark.asyncio
+    async def test_accepted_simple_invoice_skips_multi_pass(self, pipeline):
+        result = await pipeline.process(b"%PDF", "a.pdf", persist=False)
+
+        assert _called(pipeline) == {"run_pass1_combined"}
+        assert "fast_lane" in result.extraction_metadata.flags
+        assert "extraction_combined" in result.extraction_metadata.prompt_versions
+        assert len(result.charges) == 3
+
+    @pytest.mark.asyncio
+    async def test_rejected_combined_extraction_escalates(self, pipeline):
+        pipeline.combined = _combined(charges=[])
+
+        result = await pipeline.process(b"%PDF", "a.pdf", persist=False)
+
+        assert _called(pipeline) == _EXTRACTION_PASSES
+        assert "fast_lane_escalated" in result.extraction_metadata.flags
+
+    @pytest.mark.asyncio
+    async def test_standard_tier_takes_multi_pass_path(self, pipeline):
+        pipeline.tier = "standard"
+
+        result = await pipeline.process(b"%PDF", "a.pdf", persist=False)
+
+        assert _called(pipeline) == _EXTRACTION_PASSES - {"run_pass1_combined"}
+        assert not {"fast_lane", "fast_lane_escalated"} & set(result.extraction_metadata.flags)
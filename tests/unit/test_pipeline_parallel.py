@@ -0,0 +1,55 @@
+"""Test parallel Pass 1A / 1B extraction."""
+import asyncio
+
+import pytest
+
+from invoice_ingestion.models.internal import Pass1AResult, Pass1BResult, Pass2Result, Pass4Result
+from invoice_ingestion.storage.checkpoints import ingestion_metadata
+from tests.factories import make_classification, make_extraction_dict, make_ingestion_result
+
+
+@pytest.fixture
+def pipeline(stub_pipeline):
+    instance = stub_pipeline(parallel_extraction=True)
+    instance.calls = {}
+
+    async def pass1a(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return Pass1AResult(invoice={}, account={}, meters=[{"meter_number": {"value": "00123-456"}}])
+
+    async def pass1b(ingestion, classification, pass1a_result, *args, **kwargs):
+        instance.calls["pass1b_context"] = pass1a_result
+        return Pass1BResult(charges=[{"line_id": "L001", "applies_to_meter": "123456"}])
+
+    async def pass2(classification, pass1a_result, pass1b_result, *args, **kwargs):
+        instance.calls["pass2_charges"] = pass1b_result.charges
+        return Pass2Result(data=make_extraction_dict())
+
+    instance.mocks["run_pass1a"].side_effect = pass1a
+    instance.mocks["run_pass1b"].side_effect = pass1b
+    instance.mocks["run_pass2"].side_effect = pass2
+    instance._load_checkpoints.return_value = {
+        "pass0_ingestion": ingestion_metadata(make_ingestion_result(pages=1)),
+        "pass05_classification": make_classification().model_dump(mode="json"),
+        "pass4_audit": Pass4Result().model_dump(mode="json"),
+    }
+    return instance
+
+
+class TestParallelExtraction:
+    @pytest.mark.asyncio
+    async def test_pass1b_runs_without_1a_and_is_reconciled(self, pipeline):
+        result = await pipeline.process(b"%PDF", "a.pdf", force=True)
+
+        timings = result.extraction_metadata.stage_timings
+        assert pipeline.calls["pass1b_context"] is None
+        assert timings["pass1b_extraction"].start_ms < timings["pass1a_extraction"].end_ms
+        assert pipeline.calls["pass2_charges"][0]["applies_to_meter"] == "00123-456"
+        assert "pass1b_meter_unmatched" not in result.extraction_metadata.flags
+
+    def test_mode_is_part_of_the_pass1b_fingerprint(self, pipeline):
+        parallel = pipeline._stage_fingerprints()
+        pipeline.settings.parallel_extraction = False
+
+        assert parallel["pass1b_extraction"] != pipeline._stage_fingerprints()["pass1b_extraction"]
+        assert parallel["pass1a_extraction"] == pipeline._stage_fingerprints()["pass1a_extraction"]
@@ -0,0 +1,50 @@
+"""Test that a pipeline run resumes from its pass checkpoints."""
+import pytest
+
+from invoice_ingestion.models.internal import Pass1AResult, Pass1BResult, Pass2Result, Pass3Result, Pass4Result
+from invoice_ingestion.storage.checkpoints import STAGES, ingestion_metadata
+from tests.factories import make_classification, make_extraction_dict, make_ingestion_result
+
+
+def _outputs() -> dict[str, dict]:
+    return {
+        "pass0_ingestion": ingestion_metadata(make_ingestion_result(pages=1)),
+        "pass05_classification": make_classification().model_dump(mode="json"),
+        "pass1a_extraction": Pass1AResult(invoice={}, account={}).model_dump(mode="json"),
+        "pass1b_extraction": Pass1BResult().model_dump(mode="json"),
+        "pass2_schema_mapping": Pass2Result(data=make_extraction_dict()).model_dump(mode="json"),
+        "pass3_validation": Pass3Result(math_disposition="clean").model_dump(mode="json"),
+        "pass4_audit": Pass4Result().model_dump(mode="json"),
+    }
+
+
+@pytest.fixture
+def pipeline(stub_pipeline, monkeypatch):
+    instance = stub_pipeline()
+
+    def no_pass0(*args, **kwargs):
+        raise AssertionError("pass 0 re-run")
+
+    monkeypatch.setattr("invoice_ingestion.pipeline.run_pass0", no_pass0)
+    return instance
+
+
+class TestResume:
+    @pytest.mark.asyncio
+    async def test_all_passes_restored_makes_no_llm_calls(self, pipeline):
+        pipeline._load_checkpoints.return_value = _outputs()
+
+        result = await pipeline.process(b"%PDF", "a.pdf", force=True)
+
+        assert not any(mock.await_count for mock in pipeline.mocks.values())
+        pipeline._save_checkpoint.assert_not_called()
+        pipeline._store_result.assert_awaited_once()
+        assert pipeline._store_result.call_args.args[0] is result
+        assert result.classification.commodity_type.value == "electricity"
+        assert "pass4_failed" not in result.extraction_metadata.flags
+
+    def test_stage_fingerprints_cover_llm_stages(self, pipeline):
+        fingerprints = pipeline._stage_fingerprints()
+
+        assert set(fingerprints) <= set(STAGES)
+        assert fingerprints["pass1a_extraction"] != fingerprints["pass1b_extraction"]
@@ -0,0 +1,70 @@
+"""Test speculative Pass 1A started before classification returns."""
+import asyncio
+
+import pytest
+
+from invoice_ingestion.models.internal import Pass1AResult
+from invoice_ingestion.passes.speculation import speculation_stats
+from tests.factories import make_classification
+
+
+@pytest.fixture
+def pipeline(stub_pipeline):
+    instance = stub_pipeline(speculative_classification=True)
+    instance.pass1a_calls = []
+    instance.classified = "electricity"
+    instance.ingestion.pages[0].extracted_text = (
+        "Electric service 1,234 kWh at $0.12 per kWh. Demand 40 kW. Due 01/31/2024"
+    )
+
+    async def pass05(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return make_classification(instance.classified)
+
+    async def pass1a(ingestion, classification, *args, **kwargs):
+        instance.pass1a_calls.append(classification.commodity_type)
+        await asyncio.sleep(0.1)
+        return Pass1AResult(invoice={}, account={})
+
+    instance.mocks["run_pass05"].side_effect = pass05
+    instance.mocks["run_pass1a"].side_effect = pass1a
+    speculation_stats.reset()
+    return instance
+
+
+class TestSpeculativePass1A:
+    @pytest.mark.asyncio
+    async def test_agreeing_classification_keeps_speculative_run(self, pipeline):
+        result = await pipeline.process(b"%PDF", "a.pdf", persist=False)
+
+        timings = result.extraction_metadata.stage_timings
+        assert pipeline.pass1a_calls == ["electricity"]
+        assert timings["pass1a_extraction"].end_ms - timings["pass05_classification"].end_ms < 90
+        snapshot = speculation_stats.snapshot()
+        assert snapshot["hits"] == 1
+        assert snapshot["mean_saved_ms"] >= 40
+
+    @pytest.mark.asyncio
+    async def test_speculation_below_the_classified_budget_reruns_pass1a(self, pipeline):
+        pipeline.settings.adaptive_max_tokens = True
+
+        async def pass05(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return make_classification(signals=["multi_meter"], line_items=60)
+
+        pipeline.mocks["run_pass05"].side_effect = pass05
+
+        await pipeline.process(b"%PDF", "a.pdf", persist=False)
+
+        assert pipeline.pass1a_calls == ["electricity", "electricity"]
+        assert speculation_stats.snapshot()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disagreeing_classification_reruns_pass1a(self, pipeline):
+        pipeline.classified = "natural_gas"
+
+        result = await pipeline.process(b"%PDF", "a.pdf", persist=False)
+
+        assert pipeline.pass1a_calls == ["electricity", "natural_gas"]
+        assert speculation_stats.snapshot()["misses"] == 1
+        assert "pass1a_failed" not in result.extraction_metadata.flags
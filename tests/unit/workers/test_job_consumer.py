@@ -0,0 +1,193 @@
+"""Test the job consumer's retry and concurrency behaviour."""
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from invoice_ingestion.config import Settings
+from invoice_ingestion.workers.job_consumer import JobConsumer, retry_delay
+
+
+def _job(attempts=1, max_attempts=3, **payload):
+    return SimpleNamespace(
+        job_id=uuid4(), lease_id=uuid4(), kind="extract", attempts=attempts, max_attempts=max_attempts,
+        payload={"filename": "a.pdf", "file_path": "/nonexistent/a.pdf", **payload},
+    )
+
+
+class _FakeQueue:
+    """Stands in for the jobs table: hands out jobs and records outcomes."""
+
+    def __init__(self, jobs):
+        self.jobs = list(jobs)
+        self.outcomes: list[tuple] = []
+
+    async def lease(self):
+        return self.jobs.pop(0) if self.jobs else None
+
+    async def finish(self, job, update):
+        recorder = SimpleNamespace(
+            complete=lambda job_id, lease_id, result: self._record("complete", job_id, result),
+            fail=lambda job_id, lease_id, error, retry_at: self._record("fail", job_id, retry_at),
+            release=lambda job_id, lease_id: self._record("release", job_id, None),
+        )
+        await update(recorder)
+
+    async def _record(self, *outcome):
+        self.outcomes.append(outcome)
+        return True
+
+
+@pytest.fixture
+def settings():
+    return Settings(job_poll_interval_seconds=0.01, job_retry_backoff_seconds=30.0)
+
+
+def _consumer(settings, queue, execute, concurrency=1, prefetch=1, reads=None):
+    consumer = JobConsumer(settings, concurrency=concurrency, prefetch=prefetch, worker_id="test")
+    consumer._lease = queue.lease
+    consumer._finish = queue.finish
+    consumer.execute = execute
+
+    async def read_file(job):
+        if reads is not None:
+            reads.append(job.job_id)
+        return b"%PDF"
+
+    consumer.read_file = read_file
+    return consumer
+
+
+class TestJobConsumer:
+    def test_retry_delay_doubles_and_caps(self):
+        assert retry_delay(1, 30) == 30
+        assert retry_delay(3, 30) == 120
+        assert retry_delay(20, 30) == 3600
+
+    @pytest.mark.asyncio
+    async def test_failed_attempt_requeued_with_backoff(self, settings):
+        job = _job(attempts=1)
+        queue = _FakeQueue([job])
+
+        async def execute(job, file_bytes):
+            raise RuntimeError("boom")
+
+        consumer = _consumer(settings, queue, execute)
+        consumer.start()
+        await asyncio.sleep(0.05)
+        await consumer.stop()
+
+        [(kind, job_id, retry_at)] = queue.outcomes
+        assert kind == "fail" and job_id == job.job_id
+        assert retry_at is not None
+
+    @pytest.mark.asyncio
+    async def test_final_attempt_fails_for_good(self, settings):
+        queue = _FakeQueue([_job(attempts=3, max_attempts=3)])
+
+        async def execute(job, file_bytes):
+            raise RuntimeError("boom")
+
+        consumer = _consumer(settings, queue, execute)
+        consumer.start()
+        await asyncio.sleep(0.05)
+        await consumer.stop()
+
+        assert queue.outcomes[0][0] == "fail"
+        assert queue.outcomes[0][2] is None
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounds_running_jobs(self, settings):
+        queue = _FakeQueue([_job() for _ in range(6)])
+        running = 0
+        peak = 0
+
+        async def execute(job, file_bytes):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return {"extraction_id": str(job.job_id)}
+
+        consumer = _consumer(settings, queue, execute, concurrency=2)
+        consumer.start()
+        await asyncio.sleep(0.2)
+        await consumer.stop()
+
+        assert peak == 2
+        assert [o[0] for o in queue.outcomes] == ["complete"] * 6
+        assert consumer.completed == 6
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_after_timeout(self, settings):
+        queue = _FakeQueue([_job()])
+
+        async def execute(job, file_bytes):
+            await asyncio.sleep(10)
+
+        consumer = _consumer(settings, queue, execute)
+        consumer.start()
+        await asyncio.sleep(0.02)
+        await consumer.stop(timeout=0.05)
+
+        # No outcome recorded: the lease expires and another consumer retries it
+        assert queue.outcomes == []
+
+    @pytest.mark.asyncio
+    async def test_next_job_prefetched_while_slot_busy(self, settings):
+        jobs = [_job(), _job(), _job()]
+        queue = _FakeQueue(jobs)
+        reads = []
+        release = asyncio.Event()
+
+        async def execute(job, file_bytes):
+            await release.wait()
+            return {}
+
+        consumer = _consumer(settings, queue, execute, concurrency=1, prefetch=1, reads=reads)
+        consumer.start()
+        await asyncio.sleep(0.05)
+
+        # One running, one prefetched with its file already read, one left queued
+        assert reads == [jobs[0].job_id, jobs[1].job_id]
+        assert consumer.stats()["prefetched"] == 1
+
+        await consumer.stop(timeout=0.05)
+
+        # The prefetched job is handed back; the running one is left to its lease
+        assert ("release", jobs[1].job_id, None) in queue.outcomes
+        assert len(queue.jobs) == 1
+
+    @pytest.mark.asyncio
+    async def test_unreadable_file_fails_job(self, settings):
+        queue = _FakeQueue([_job()])
+        consumer = _consumer(settings, queue, execute=None)
+
+        async def read_file(job):
+            raise FileNotFoundError(job.payload["file_path"])
+
+        consumer.read_file = read_file
+        consumer.start()
+        await asyncio.sleep(0.05)
+        await consumer.stop()
+
+        assert queue.outcomes[0][0] == "fail"
+
+    @pytest.mark.asyncio
+    async def test_partial_reprocess_reuses_original_passes(self, settings):
+        original = uuid4()
+        calls = []
+
+        async def process(file_bytes, filename, **kwargs):
+            calls.append(kwargs)
+            metadata = SimpleNamespace(extraction_id=uuid4(), overall_confidence=0.9,
+                                       confidence_tier=SimpleNamespace(value="auto_accept"))
+            return SimpleNamespace(extraction_metadata=metadata)
+
+        job = _job(reprocess_of=str(original), from_pass="pass3")
+        consumer = JobConsumer(settings, worker_id="test", pipeline=SimpleNamespace(process=process))
+        await consumer.execute(job, b"%PDF")
+
+        assert calls == [{"force": True, "extraction_id": job.job_id, "reuse_from": original, "from_pass": "pass3"}]